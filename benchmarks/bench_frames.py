@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Frame storage benchmark for TyC.
+
+Compiles every program in this directory with the optimizer and runs it
+on the matching .in file under both execution engines: the dict-based
+Interpreter, which keeps each call's variables in a dict, and the
+TypedInterpreter, which keeps them in typed slot arrays. Reports the best
+run time of each and checks that the outputs agree.
+
+Usage:
+    python benchmarks/bench_frames.py [--repeat N] [program.tyc ...]
+"""
+
+import argparse
+import glob
+import io
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from src.compiler import compile_source
+
+
+def measure(program, stdin_text: str, engine: str, repeat: int):
+    best = None
+    for _ in range(repeat):
+        out = io.StringIO()
+        start = time.perf_counter()
+        program.run(io.StringIO(stdin_text), out, engine=engine)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, out.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TyC frame storage benchmark")
+    parser.add_argument("programs", nargs="*", help="programs to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per program")
+    args = parser.parse_args()
+
+    programs = args.programs or sorted(glob.glob(os.path.join(BENCH_DIR, "*.tyc")))
+    print(f"{'program':<16}{'dict':>10}{'typed':>10}{'speedup':>9}")
+    failed = False
+    for path in programs:
+        with open(path) as f:
+            source = f.read()
+        input_path = os.path.splitext(path)[0] + ".in"
+        stdin_text = open(input_path).read() if os.path.exists(input_path) else ""
+        program = compile_source(source)
+        base = measure(program, stdin_text, "dict", args.repeat)
+        typed = measure(program, stdin_text, "typed", args.repeat)
+        name = os.path.splitext(os.path.basename(path))[0]
+        print(f"{name:<16}{base[0]:>9.3f}s{typed[0]:>9.3f}s{base[0] / typed[0]:>8.2f}x")
+        if base[1] != typed[1]:
+            print(f"  output mismatch for {name}")
+            failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Memoization benchmark for TyC.
+
+Compiles every program in this directory, runs it on the matching .in
+file with and without memoization of its pure functions and reports the
+run times and the cache hit rate of each memoized function. The outputs
+of the two runs must agree.
+
+Usage:
+    python benchmarks/bench_memo.py [--repeat N] [--engine E] [program.tyc ...]
+"""
+
+import argparse
+import glob
+import io
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from src.compiler import ENGINES, compile_source
+
+
+def measure(program, stdin_text: str, engine: str, memoize: bool, repeat: int):
+    best = None
+    for _ in range(repeat):
+        out = io.StringIO()
+        interpreter = program.interpreter(io.StringIO(stdin_text), out, engine, memoize)
+        start = time.perf_counter()
+        interpreter.run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, out.getvalue(), interpreter.memo
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TyC memoization benchmark")
+    parser.add_argument("programs", nargs="*", help="programs to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per program")
+    parser.add_argument("--engine", choices=sorted(ENGINES), default="dict")
+    args = parser.parse_args()
+
+    programs = args.programs or sorted(glob.glob(os.path.join(BENCH_DIR, "*.tyc")))
+    print(f"{'program':<16}{'time':>10}{'memo':>10}{'speedup':>9}  pure functions")
+    failed = False
+    for path in programs:
+        with open(path) as f:
+            source = f.read()
+        input_path = os.path.splitext(path)[0] + ".in"
+        stdin_text = open(input_path).read() if os.path.exists(input_path) else ""
+        program = compile_source(source)
+        base = measure(program, stdin_text, args.engine, False, args.repeat)
+        memo = measure(program, stdin_text, args.engine, True, args.repeat)
+        name = os.path.splitext(os.path.basename(path))[0]
+        pure = ", ".join(sorted(program.pure)) or "-"
+        print(f"{name:<16}{base[0]:>9.3f}s{memo[0]:>9.3f}s{base[0] / memo[0]:>8.2f}x  {pure}")
+        for cache in memo[2].values():
+            if cache.hits or cache.misses:
+                print(f"  {cache}")
+        if base[1] != memo[1]:
+            print(f"  output mismatch for {name}")
+            failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
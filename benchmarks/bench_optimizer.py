@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Optimizer benchmark for TyC.
+
+Compiles every program in this directory with and without the
+optimization pipeline, runs both on the matching .in file and reports the
+static instruction counts and the run times. The outputs of the two runs
+must agree.
+
+Usage:
+    python benchmarks/bench_optimizer.py [--repeat N] [program.tyc ...]
+"""
+
+import argparse
+import glob
+import io
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from src.compiler import compile_source
+
+
+def measure(source: str, stdin_text: str, optimize: bool, repeat: int):
+    program = compile_source(source, optimize)
+    best = None
+    for _ in range(repeat):
+        out = io.StringIO()
+        start = time.perf_counter()
+        program.run(io.StringIO(stdin_text), out)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    inlined = sum(s.changes.get("inline", 0) for s in program.stats.values())
+    return program.instruction_count(), best, out.getvalue(), inlined
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TyC optimizer benchmark")
+    parser.add_argument("programs", nargs="*", help="programs to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per program")
+    args = parser.parse_args()
+
+    programs = args.programs or sorted(glob.glob(os.path.join(BENCH_DIR, "*.tyc")))
+    print(f"{'program':<16}{'instrs':>8}{'opt':>8}{'saved':>8}{'time':>10}{'opt':>10}{'speedup':>9}{'inlined':>9}")
+    failed = False
+    for path in programs:
+        with open(path) as f:
+            source = f.read()
+        input_path = os.path.splitext(path)[0] + ".in"
+        stdin_text = open(input_path).read() if os.path.exists(input_path) else ""
+        base = measure(source, stdin_text, False, args.repeat)
+        opt = measure(source, stdin_text, True, args.repeat)
+        name = os.path.splitext(os.path.basename(path))[0]
+        saved = 100.0 * (base[0] - opt[0]) / base[0]
+        print(
+            f"{name:<16}{base[0]:>8}{opt[0]:>8}{saved:>7.1f}%"
+            f"{base[1]:>9.3f}s{opt[1]:>9.3f}s{base[1] / opt[1]:>8.2f}x{opt[3]:>9}"
+        )
+        if base[2] != opt[2]:
+            print(f"  output mismatch for {name}")
+            failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Parallel parser benchmark for TyC.
+
+Parses the programs in this directory, concatenated and repeated to the
+requested size, with ASTParser in this process and with parse_parallel
+in a pool of worker processes. Reports the time and throughput of each
+in MB/s and checks that both produce the same program.
+
+Usage:
+    python benchmarks/bench_parallel.py [--size MB] [--workers N] [--repeat N] [program.tyc ...]
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT)
+
+from src.frontend.parallel import parse_parallel
+from src.frontend.parser import ASTParser
+
+
+def measure(parse, source: str, repeat: int):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = parse(source)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TyC parallel parser benchmark")
+    parser.add_argument("programs", nargs="*", help="programs to parse (default: all)")
+    parser.add_argument("--size", type=float, default=4.0, help="input size in MB")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per parser")
+    args = parser.parse_args()
+
+    programs = args.programs or sorted(glob.glob(os.path.join(BENCH_DIR, "*.tyc")))
+    unit = "\n".join(open(path).read() for path in programs)
+    copies = max(1, int(args.size * (1 << 20) / len(unit.encode())))
+    source = "\n".join([unit] * copies)
+    megabytes = len(source.encode()) / (1 << 20)
+
+    serial, expected = measure(lambda s: ASTParser(s).parse(), source, args.repeat)
+    # The pool is started once, as a long-running compiler would keep it.
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        parallel, program = measure(
+            lambda s: parse_parallel(s, args.workers, executor=pool), source, args.repeat
+        )
+    print(f"input: {megabytes:.2f} MB, {len(program.decls)} declarations, {args.workers} workers")
+    print(f"{'parser':<12}{'time':>10}{'MB/s':>10}")
+    print(f"{'serial':<12}{serial:>9.3f}s{megabytes / serial:>10.2f}")
+    print(f"{'parallel':<12}{parallel:>9.3f}s{megabytes / parallel:>10.2f}")
+    print(f"speedup: {serial / parallel:.1f}x")
+    if str(program) != str(expected):
+        print("program mismatch")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
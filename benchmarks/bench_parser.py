@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Parser benchmark for TyC.
+
+Parses the programs in this directory, concatenated and repeated to the
+requested size, with the generated TyCParser (building the parse tree)
+and with the hand-written ASTParser (building the AST), both reading
+tokens from TyCScanner. Reports the time and throughput of each in MB/s.
+With --memory, reports instead the peak memory of TyCParser building the
+whole parse tree and of TyCParser reading a sliding window of tokens
+(src.frontend.tokenstream) and handing each declaration to ASTGeneration
+as it is parsed (src.astgen.streaming). Needs the
+generated parser in build/.
+
+Usage:
+    python benchmarks/bench_parser.py [--size MB] [--repeat N] [--memory] [program.tyc ...]
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "build"))
+
+from antlr4 import CommonTokenStream
+from build.TyCParser import TyCParser
+from src.astgen.streaming import parse_program
+from src.frontend.parser import ASTParser
+from src.frontend.scanner import TyCScanner
+from src.frontend.tokenstream import WindowTokenStream
+from src.utils.error_listener import NewErrorListener
+
+
+def tree_parser(source: str, tokens=CommonTokenStream) -> TyCParser:
+    parser = TyCParser(tokens(TyCScanner(source)))
+    parser.removeErrorListeners()
+    parser.addErrorListener(NewErrorListener.INSTANCE)
+    return parser
+
+
+def antlr(source: str):
+    return tree_parser(source).program()
+
+
+def stream(source: str):
+    return parse_program(tree_parser(source, WindowTokenStream))
+
+
+def ast(source: str):
+    return ASTParser(TyCScanner(source)).parse()
+
+
+def measure(parse, source: str, repeat: int):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = parse(source)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def peak(parse, source: str) -> float:
+    """Peak memory allocated while parsing, in MB."""
+    tracemalloc.start()
+    try:
+        parse(source)
+        return tracemalloc.get_traced_memory()[1] / (1 << 20)
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TyC parser benchmark")
+    parser.add_argument("programs", nargs="*", help="programs to parse (default: all)")
+    parser.add_argument("--size", type=float, default=0.05, help="input size in MB")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per parser")
+    parser.add_argument("--memory", action="store_true", help="report peak memory instead of time")
+    args = parser.parse_args()
+
+    programs = args.programs or sorted(glob.glob(os.path.join(BENCH_DIR, "*.tyc")))
+    unit = "\n".join(open(path).read() for path in programs)
+    copies = max(1, int(args.size * (1 << 20) / len(unit.encode())))
+    source = "\n".join([unit] * copies)
+    megabytes = len(source.encode()) / (1 << 20)
+
+    if args.memory:
+        print(f"input: {megabytes:.2f} MB")
+        print(f"{'parser':<12}{'peak MB':>10}")
+        print(f"{'TyCParser':<12}{peak(antlr, source):>10.2f}")
+        print(f"{'streaming':<12}{peak(stream, source):>10.2f}")
+        return
+
+    tree_time, tree = measure(antlr, source, args.repeat)
+    ast_time, program = measure(ast, source, args.repeat)
+    print(f"input: {megabytes:.2f} MB, {len(program.decls)} declarations")
+    print(f"{'parser':<12}{'time':>10}{'MB/s':>10}")
+    print(f"{'TyCParser':<12}{tree_time:>9.3f}s{megabytes / tree_time:>10.2f}")
+    print(f"{'ASTParser':<12}{ast_time:>9.3f}s{megabytes / ast_time:>10.2f}")
+    print(f"speedup: {tree_time / ast_time:.1f}x")
+    if len(program.decls) != tree.getChildCount() - 1:
+        print("declaration count mismatch")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Profile-guided optimization benchmark for TyC.
+
+For every program in this directory, collects a profile from a training
+run on the matching .in file, then times the statically optimized build
+against the profile-guided one on the same input. The outputs of the two
+builds must agree. With --save, each profile is written next to its
+program as NAME.profile.json.
+
+Usage:
+    python benchmarks/bench_pgo.py [--repeat N] [--engine E] [--save] [program.tyc ...]
+"""
+
+import argparse
+import glob
+import io
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from src.compiler import ENGINES, collect_profile, compile_program, parse
+
+
+def measure(program, stdin_text: str, engine: str, repeat: int):
+    best = None
+    for _ in range(repeat):
+        out = io.StringIO()
+        interpreter = program.interpreter(io.StringIO(stdin_text), out, engine)
+        start = time.perf_counter()
+        interpreter.run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, out.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TyC profile-guided optimization benchmark")
+    parser.add_argument("programs", nargs="*", help="programs to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per program")
+    parser.add_argument("--engine", choices=sorted(ENGINES), default="dict")
+    parser.add_argument("--save", action="store_true", help="write the collected profiles")
+    args = parser.parse_args()
+
+    programs = args.programs or sorted(glob.glob(os.path.join(BENCH_DIR, "*.tyc")))
+    print(f"{'program':<16}{'static':>10}{'pgo':>10}{'speedup':>9}{'instrs':>14}")
+    failed = False
+    for path in programs:
+        with open(path) as f:
+            source = f.read()
+        input_path = os.path.splitext(path)[0] + ".in"
+        stdin_text = open(input_path).read() if os.path.exists(input_path) else ""
+        profile = collect_profile(parse(source), io.StringIO(stdin_text), io.StringIO())
+        if args.save:
+            profile.save(os.path.splitext(path)[0] + ".profile.json")
+        static = compile_program(parse(source))
+        guided = compile_program(parse(source), profile=profile)
+        base = measure(static, stdin_text, args.engine, args.repeat)
+        pgo = measure(guided, stdin_text, args.engine, args.repeat)
+        name = os.path.splitext(os.path.basename(path))[0]
+        sizes = f"{static.instruction_count()}->{guided.instruction_count()}"
+        print(f"{name:<16}{base[0]:>9.3f}s{pgo[0]:>9.3f}s{base[0] / pgo[0]:>8.2f}x{sizes:>14}")
+        if base[1] != pgo[1]:
+            print(f"  output mismatch for {name}")
+            failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Scanner benchmark for TyC.
+
+Tokenizes the programs in this directory, concatenated and repeated to
+the requested size, with the generated TyCLexer and with the hand-written
+TyCScanner. Reports the throughput of each in MB/s and checks that both
+produce the same tokens. With --memory, reports instead the memory taken
+by the input stream: ANTLR's InputStream against CodePointStream.
+Needs the generated lexer in build/.
+
+Usage:
+    python benchmarks/bench_scanner.py [--size MB] [--repeat N] [--memory] [program.tyc ...]
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "build"))
+
+from antlr4 import InputStream
+from build.TyCLexer import TyCLexer
+from src.frontend.charstream import CodePointStream
+from src.frontend.scanner import TyCScanner
+
+
+def tokenize(lexer):
+    tokens = []
+    while True:
+        token = lexer.nextToken()
+        tokens.append((token.type, token.text, token.line, token.column))
+        if token.type == -1:
+            return tokens
+
+
+def measure(make, source: str, repeat: int):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        tokens = tokenize(make(source))
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, tokens
+
+
+def stream_size(make, source: str) -> float:
+    """Memory allocated to build a character stream, in MB."""
+    tracemalloc.start()
+    try:
+        stream = make(source)
+        return tracemalloc.get_traced_memory()[0] / (1 << 20)
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TyC scanner benchmark")
+    parser.add_argument("programs", nargs="*", help="programs to tokenize (default: all)")
+    parser.add_argument("--size", type=float, default=1.0, help="input size in MB")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per lexer")
+    parser.add_argument("--memory", action="store_true", help="report input stream memory instead of time")
+    args = parser.parse_args()
+
+    programs = args.programs or sorted(glob.glob(os.path.join(BENCH_DIR, "*.tyc")))
+    unit = "\n".join(open(path).read() for path in programs)
+    copies = max(1, int(args.size * (1 << 20) / len(unit.encode())))
+    source = "\n".join([unit] * copies)
+    megabytes = len(source.encode()) / (1 << 20)
+
+    if args.memory:
+        print(f"input: {megabytes:.2f} MB")
+        print(f"{'stream':<16}{'MB':>10}")
+        print(f"{'InputStream':<16}{stream_size(InputStream, source):>10.2f}")
+        print(f"{'CodePointStream':<16}{stream_size(CodePointStream, source):>10.2f}")
+        return
+
+    antlr, expected = measure(lambda s: TyCLexer(InputStream(s)), source, args.repeat)
+    scanner, tokens = measure(TyCScanner, source, args.repeat)
+    print(f"input: {megabytes:.2f} MB, {len(tokens)} tokens")
+    print(f"{'lexer':<12}{'time':>10}{'MB/s':>10}")
+    print(f"{'TyCLexer':<12}{antlr:>9.3f}s{megabytes / antlr:>10.2f}")
+    print(f"{'TyCScanner':<12}{scanner:>9.3f}s{megabytes / scanner:>10.2f}")
+    print(f"speedup: {antlr / scanner:.1f}x")
+    if tokens != expected:
+        print("token mismatch")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Tiered execution benchmark for TyC.
+
+Compiles every program in this directory with the optimizer and runs it
+on the matching .in file with the dict-based Interpreter and with the
+TieredInterpreter, which starts out interpreting the same way and moves
+hot functions to generated Python code. Reports the best run time of
+each, the functions that ended up compiled and the time spent compiling
+them, and checks that the outputs agree.
+
+Usage:
+    python benchmarks/bench_tiered.py [--repeat N] [program.tyc ...]
+"""
+
+import argparse
+import glob
+import io
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from src.compiler import compile_source
+from src.runtime.tiered import TIER_COMPILED
+
+
+def measure(program, stdin_text: str, engine: str, repeat: int):
+    best = None
+    for _ in range(repeat):
+        out = io.StringIO()
+        interpreter = program.interpreter(io.StringIO(stdin_text), out, engine)
+        start = time.perf_counter()
+        interpreter.run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, out.getvalue(), interpreter
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TyC tiered execution benchmark")
+    parser.add_argument("programs", nargs="*", help="programs to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per program")
+    args = parser.parse_args()
+
+    programs = args.programs or sorted(glob.glob(os.path.join(BENCH_DIR, "*.tyc")))
+    print(f"{'program':<16}{'dict':>10}{'tiered':>10}{'speedup':>9}{'compile':>10}  compiled")
+    failed = False
+    for path in programs:
+        with open(path) as f:
+            source = f.read()
+        input_path = os.path.splitext(path)[0] + ".in"
+        stdin_text = open(input_path).read() if os.path.exists(input_path) else ""
+        program = compile_source(source)
+        base = measure(program, stdin_text, "dict", args.repeat)
+        tiered = measure(program, stdin_text, "tiered", args.repeat)
+        interpreter = tiered[2]
+        interpreter.close()
+        stats = interpreter.tier_stats()
+        compiled = sorted(n for n, s in stats.items() if s["tier"] == TIER_COMPILED)
+        compile_ms = 1000 * sum(s["compile_time"] for s in stats.values())
+        name = os.path.splitext(os.path.basename(path))[0]
+        print(
+            f"{name:<16}{base[0]:>9.3f}s{tiered[0]:>9.3f}s{base[0] / tiered[0]:>8.2f}x"
+            f"{compile_ms:>8.1f}ms  {', '.join(compiled) or '-'}"
+        )
+        if base[1] != tiered[1]:
+            print(f"  output mismatch for {name}")
+            failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
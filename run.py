@@ -14,6 +14,10 @@ Usage:
     python run.py test-parser
     python run.py test-ast
     python run.py clean
+    python run.py run program.tyc --trace trace.json
+    python run.py errors program.tyc --max-errors 20
+    python run.py compile "programs/**/*.tyc" --workers 8
+    python run.py daemon --socket /tmp/tyc.sock
 
     # On macOS/Linux:
     python3 run.py help
@@ -23,6 +27,10 @@ Usage:
     python3 run.py test-parser
     python3 run.py test-ast
     python3 run.py clean
+    python3 run.py run program.tyc --trace trace.json
+    python3 run.py errors program.tyc --max-errors 20
+    python3 run.py compile "programs/**/*.tyc" --workers 8
+    python3 run.py daemon --socket /tmp/tyc.sock
 """
 
 import argparse
@@ -196,6 +204,43 @@ class TyCBuilder:
             )
         )
         print()
+        print(self.colors.green("Running:"))
+        print(
+            self.colors.yellow(
+                "  python3 run.py run FILE [--input IN] [--engine E] [--no-optimize]"
+            )
+        )
+        print(
+            self.colors.yellow(
+                "                 [--trace OUT.json] [--trace-memory] - Compile and run a program"
+            )
+        )
+        print(
+            self.colors.yellow(
+                "  python3 run.py errors FILE [--max-errors N] - Report every syntax error"
+            )
+        )
+        print(
+            self.colors.yellow(
+                "  python3 run.py compile FILE|GLOB|DIR... [--workers N] [--verbose]"
+            )
+        )
+        print(
+            self.colors.yellow(
+                "                 - Check many programs in worker processes"
+            )
+        )
+        print(
+            self.colors.yellow(
+                "  python3 run.py daemon [--socket PATH] - Serve compile/check/tokenize requests"
+            )
+        )
+        print(
+            self.colors.yellow(
+                "  python3 -m src.client check|compile|tokenize FILE - Ask the daemon"
+            )
+        )
+        print()
         print(self.colors.green("Cleaning:"))
         print(
             self.colors.yellow(
@@ -493,6 +538,79 @@ class TyCBuilder:
         )
         self.clean_cache()
 
+    def run_program(self, args):
+        """Compile and run a TyC program, optionally tracing the phases."""
+        if not args.program:
+            print(self.colors.red("No program given: python3 run.py run FILE"))
+            sys.exit(1)
+        sys.path.insert(0, str(self.root_dir))
+        from src.compiler import compile_source
+        from src.utils.tracing import Tracer
+
+        tracing = args.trace or args.trace_memory
+        tracer = Tracer(memory=args.trace_memory) if tracing else None
+        with open(args.program) as f:
+            source = f.read()
+        stdin = open(args.input) if args.input else sys.stdin
+        try:
+            program = compile_source(source, not args.no_optimize, tracer=tracer)
+            program.run(stdin, sys.stdout, args.engine)
+        finally:
+            if stdin is not sys.stdin:
+                stdin.close()
+        if tracer is not None:
+            sys.stdout.flush()
+            print(tracer.summary(), file=sys.stderr)
+            if args.trace:
+                tracer.write_chrome_trace(args.trace)
+
+    def report_errors(self, args):
+        """Report every lexical and syntax error of a program in one pass."""
+        if not args.program:
+            print(self.colors.red("No program given: python3 run.py errors FILE"))
+            sys.exit(1)
+        sys.path.insert(0, str(self.root_dir))
+        from src.compiler import diagnose
+
+        with open(args.program) as f:
+            source = f.read()
+        diagnostics = diagnose(source, args.max_errors)
+        for diagnostic in diagnostics:
+            print(f"{args.program}:{diagnostic.line}:{diagnostic.column}: {diagnostic}")
+        if diagnostics:
+            sys.exit(1)
+
+    def compile_batch(self, args):
+        """Check many programs in worker processes and report the throughput."""
+        patterns = ([args.program] if args.program else []) + args.files
+        if not patterns:
+            print(self.colors.red("No programs given: python3 run.py compile FILE|GLOB|DIR..."))
+            sys.exit(1)
+        sys.path.insert(0, str(self.root_dir))
+        from src.batch import check_paths
+
+        stats = check_paths(patterns, args.workers, verbose=args.verbose)
+        if stats.failed or not stats.files:
+            sys.exit(1)
+
+    def serve_daemon(self, args):
+        """Keep the compiler loaded and answer requests on a Unix socket."""
+        sys.path.insert(0, str(self.root_dir))
+        from src.daemon import CompilerDaemon
+
+        try:
+            daemon = CompilerDaemon(args.socket)
+        except OSError as e:
+            print(self.colors.red(f"Cannot start the daemon: {e}"))
+            sys.exit(1)
+        print(self.colors.green(f"TyC daemon {os.getpid()} listening on {daemon.path}"))
+        try:
+            daemon.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            daemon.server_close()
+
 
 def main():
     """Main entry point."""
@@ -517,9 +635,44 @@ def main():
             "test-lexer",
             "test-parser",
             "test-ast",
+            "run",
+            "errors",
+            "compile",
+            "daemon",
         ],
         help="Command to execute",
     )
+    parser.add_argument("program", nargs="?", help="TyC source file (run, errors)")
+    parser.add_argument(
+        "files", nargs="*", help="more source files, globs or directories (compile)"
+    )
+    parser.add_argument("--input", help="file to use as standard input (run)")
+    parser.add_argument(
+        "--engine", default="dict", help="interpreter engine: dict, typed or tiered (run)"
+    )
+    parser.add_argument(
+        "--no-optimize", action="store_true", help="skip the optimizer (run)"
+    )
+    parser.add_argument(
+        "--trace", metavar="OUT", help="write a Chrome trace of the phases to OUT (run)"
+    )
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="also record peak memory per phase with tracemalloc (run)",
+    )
+    parser.add_argument(
+        "--max-errors", type=int, default=100, help="stop after N errors (errors)"
+    )
+    parser.add_argument(
+        "--workers", type=int, help="worker processes, 0 for none (compile)"
+    )
+    parser.add_argument(
+        "--verbose", action="store_true", help="list every file and warning (compile)"
+    )
+    parser.add_argument(
+        "--socket", help="Unix socket to listen on (daemon; default: $TYC_SOCKET or a per-user socket)"
+    )
 
     args = parser.parse_args()
 
@@ -537,6 +690,10 @@ def main():
         "test-lexer": builder.test_lexer,
         "test-parser": builder.test_parser,
         "test-ast": builder.test_ast,
+        "run": lambda: builder.run_program(args),
+        "errors": lambda: builder.report_errors(args),
+        "compile": lambda: builder.compile_batch(args),
+        "daemon": lambda: builder.serve_daemon(args),
     }
 
     if args.command in commands:
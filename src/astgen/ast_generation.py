@@ -2,15 +2,278 @@
 AST Generation module for TyC programming language.
 This module contains the ASTGeneration class that converts parse trees
 into Abstract Syntax Trees using the visitor pattern.
+
+Every node is placed at the first token of the construct it stands for,
+and the trees are those src.frontend.parser builds without a parse tree.
 """
 
 from functools import reduce
+from antlr4.tree.Tree import TerminalNode
 from build.TyCVisitor import TyCVisitor
 from build.TyCParser import TyCParser
 from src.utils.nodes import *
 
+_PRIMITIVE_TYPES = {
+    TyCParser.KEYWORD_INT: IntType,
+    TyCParser.KEYWORD_FLOAT: FloatType,
+    TyCParser.KEYWORD_STRING: StringType,
+    TyCParser.KEYWORD_VOID: VoidType,
+}
+_LITERALS = {
+    TyCParser.INT_LITERAL: lambda text: IntLiteral(int(text)),
+    TyCParser.FLOAT_LITERAL: lambda text: FloatLiteral(float(text)),
+    TyCParser.STRING_LITERAL: StringLiteral,
+}
+_DECLARATIONS = (TyCParser.StructDeclarationContext, TyCParser.FunctionDeclarationContext)
+
+
+def _at(node, token):
+    node.line = token.line
+    node.column = token.column
+    return node
+
+
+def _kind(child) -> int:
+    """Token type of a terminal child, 0 for a rule."""
+    return child.symbol.type if isinstance(child, TerminalNode) else 0
+
 
 class ASTGeneration(TyCVisitor):
     """AST Generation visitor for TyC language."""
 
-    pass
+    # ------------------------------------------------------------------
+    # Declarations
+    # ------------------------------------------------------------------
+
+    def visitProgram(self, ctx: TyCParser.ProgramContext):
+        decls = [self.visit(child) for child in ctx.getChildren() if isinstance(child, _DECLARATIONS)]
+        return _at(Program(decls), ctx.start)
+
+    def visitStructDeclaration(self, ctx: TyCParser.StructDeclarationContext):
+        members = [self.visit(member) for member in ctx.structMember()]
+        return _at(StructDecl(ctx.IDENTIFIER().getText(), members), ctx.start)
+
+    def visitStructMember(self, ctx: TyCParser.StructMemberContext):
+        return _at(MemberDecl(self.visit(ctx.typeSpec()), ctx.IDENTIFIER().getText()), ctx.start)
+
+    def visitFunctionDeclaration(self, ctx: TyCParser.FunctionDeclarationContext):
+        return_type = self.visit(ctx.returnType()) if ctx.returnType() else None
+        params = self.visit(ctx.parameterList()) if ctx.parameterList() else []
+        name = ctx.IDENTIFIER().getText()
+        return _at(FuncDecl(return_type, name, params, self.visit(ctx.block())), ctx.start)
+
+    def visitReturnType(self, ctx: TyCParser.ReturnTypeContext):
+        if ctx.primitiveType():
+            return self.visit(ctx.primitiveType())
+        return _at(StructType(ctx.IDENTIFIER().getText()), ctx.start)
+
+    def visitPrimitiveType(self, ctx: TyCParser.PrimitiveTypeContext):
+        return _at(_PRIMITIVE_TYPES[ctx.start.type](), ctx.start)
+
+    def visitParameterList(self, ctx: TyCParser.ParameterListContext):
+        return [self.visit(param) for param in ctx.parameter()]
+
+    def visitParameter(self, ctx: TyCParser.ParameterContext):
+        return _at(Param(self.visit(ctx.typeSpec()), ctx.IDENTIFIER().getText()), ctx.start)
+
+    def visitTypeSpec(self, ctx: TyCParser.TypeSpecContext):
+        if ctx.IDENTIFIER():
+            return _at(StructType(ctx.IDENTIFIER().getText()), ctx.start)
+        return _at(_PRIMITIVE_TYPES[ctx.start.type](), ctx.start)
+
+    # ------------------------------------------------------------------
+    # Statements
+    # ------------------------------------------------------------------
+
+    def visitBlock(self, ctx: TyCParser.BlockContext):
+        return _at(BlockStmt([self.visit(stmt) for stmt in ctx.statement()]), ctx.start)
+
+    def visitStatement(self, ctx: TyCParser.StatementContext):
+        return self.visit(ctx.getChild(0))
+
+    def visitVarDeclaration(self, ctx: TyCParser.VarDeclarationContext):
+        return self._var_decl(ctx)
+
+    def _var_decl(self, ctx):
+        """The VarDecl of a varDeclaration or of a forInit declaring a
+        variable: auto, a type spec, or a struct name followed by the
+        variable's name."""
+        names = ctx.IDENTIFIER()
+        if ctx.KEYWORD_AUTO():
+            var_type = None
+        elif ctx.typeSpec():
+            var_type = self.visit(ctx.typeSpec())
+        else:
+            var_type = _at(StructType(names[0].getText()), names[0].symbol)
+            names = names[1:]
+        init = None
+        if ctx.LEFT_BRACE():
+            values = self.visit(ctx.expressionList()) if ctx.expressionList() else []
+            init = _at(StructLiteral(values), ctx.LEFT_BRACE().symbol)
+        elif ctx.expression():
+            init = self.visit(ctx.expression())
+        return _at(VarDecl(var_type, names[0].getText(), init), ctx.start)
+
+    def visitExpressionList(self, ctx: TyCParser.ExpressionListContext):
+        return [self.visit(expr) for expr in ctx.expression()]
+
+    def visitAssignmentStatement(self, ctx: TyCParser.AssignmentStatementContext):
+        assign = _at(AssignExpr(self.visit(ctx.lhs()), self.visit(ctx.expression())), ctx.start)
+        return _at(ExprStmt(assign), ctx.start)
+
+    def visitLhs(self, ctx: TyCParser.LhsContext):
+        first = ctx.getChild(0)
+        kind = _kind(first)
+        if kind == TyCParser.IDENTIFIER:
+            expr = _at(Identifier(first.getText()), ctx.start)
+        elif kind in _LITERALS:
+            expr = _at(_LITERALS[kind](first.getText()), ctx.start)
+        elif kind == TyCParser.LEFT_BRACE:
+            values = self.visit(ctx.expressionList()) if ctx.expressionList() else []
+            expr = _at(StructLiteral(values), ctx.start)
+        else:
+            expr = self.visit(ctx.expression())
+        return self._suffixes(ctx, expr)
+
+    def visitIfStatement(self, ctx: TyCParser.IfStatementContext):
+        stmts = ctx.statement()
+        else_stmt = self.visit(stmts[1]) if len(stmts) > 1 else None
+        return _at(IfStmt(self.visit(ctx.expression()), self.visit(stmts[0]), else_stmt), ctx.start)
+
+    def visitWhileStatement(self, ctx: TyCParser.WhileStatementContext):
+        return _at(WhileStmt(self.visit(ctx.expression()), self.visit(ctx.statement())), ctx.start)
+
+    def visitForStatement(self, ctx: TyCParser.ForStatementContext):
+        init = self.visit(ctx.forInit()) if ctx.forInit() else None
+        condition = self.visit(ctx.expression()) if ctx.expression() else None
+        update = self.visit(ctx.forUpdate()) if ctx.forUpdate() else None
+        return _at(ForStmt(init, condition, update, self.visit(ctx.statement())), ctx.start)
+
+    def visitForInit(self, ctx: TyCParser.ForInitContext):
+        if ctx.lhs():
+            assign = _at(AssignExpr(self.visit(ctx.lhs()), self.visit(ctx.expression())), ctx.start)
+            return _at(ExprStmt(assign), ctx.start)
+        return self._var_decl(ctx)
+
+    def visitForUpdate(self, ctx: TyCParser.ForUpdateContext):
+        if ctx.lhs():
+            return _at(AssignExpr(self.visit(ctx.lhs()), self.visit(ctx.expression())), ctx.start)
+        return self.visit(ctx.forUpdateIncDec())
+
+    def visitForUpdateIncDec(self, ctx: TyCParser.ForUpdateIncDecContext):
+        first = ctx.getChild(0)
+        if isinstance(first, TerminalNode):
+            operand = ctx.forUpdateIncDec() or ctx.forUpdateTarget()
+            return _at(PrefixOp(first.getText(), self.visit(operand)), ctx.start)
+        operators = [child.getText() for child in ctx.getChildren()][1:]
+        return reduce(lambda expr, op: _at(PostfixOp(op, expr), ctx.start), operators, self.visit(first))
+
+    def visitForUpdateTarget(self, ctx: TyCParser.ForUpdateTargetContext):
+        if ctx.primaryExpression():
+            return self._suffixes(ctx, self.visit(ctx.primaryExpression()))
+        if ctx.expression():
+            return self.visit(ctx.expression())
+        values = self.visit(ctx.expressionList()) if ctx.expressionList() else []
+        return _at(StructLiteral(values), ctx.start)
+
+    def visitSwitchStatement(self, ctx: TyCParser.SwitchStatementContext):
+        cases = [self.visit(case) for case in ctx.caseClause()]
+        default = self.visit(ctx.defaultClause()) if ctx.defaultClause() else None
+        return _at(SwitchStmt(self.visit(ctx.expression()), cases, default), ctx.start)
+
+    def visitCaseClause(self, ctx: TyCParser.CaseClauseContext):
+        stmts = [self.visit(stmt) for stmt in ctx.statement()]
+        return _at(CaseStmt(self.visit(ctx.caseExpression()), stmts), ctx.start)
+
+    def visitCaseExpression(self, ctx: TyCParser.CaseExpressionContext):
+        return self.visit(ctx.expression())
+
+    def visitDefaultClause(self, ctx: TyCParser.DefaultClauseContext):
+        return _at(DefaultStmt([self.visit(stmt) for stmt in ctx.statement()]), ctx.start)
+
+    def visitBreakStatement(self, ctx: TyCParser.BreakStatementContext):
+        return _at(BreakStmt(), ctx.start)
+
+    def visitContinueStatement(self, ctx: TyCParser.ContinueStatementContext):
+        return _at(ContinueStmt(), ctx.start)
+
+    def visitReturnStatement(self, ctx: TyCParser.ReturnStatementContext):
+        expr = self.visit(ctx.expression()) if ctx.expression() else None
+        return _at(ReturnStmt(expr), ctx.start)
+
+    def visitExpressionStatement(self, ctx: TyCParser.ExpressionStatementContext):
+        return _at(ExprStmt(self.visit(ctx.expression())), ctx.start)
+
+    # ------------------------------------------------------------------
+    # Expressions
+    # ------------------------------------------------------------------
+
+    def visitExpression(self, ctx: TyCParser.ExpressionContext):
+        return self.visit(ctx.assignmentExpression())
+
+    def visitAssignmentExpression(self, ctx: TyCParser.AssignmentExpressionContext):
+        if ctx.lhs():
+            value = self.visit(ctx.assignmentExpression())
+            return _at(AssignExpr(self.visit(ctx.lhs()), value), ctx.start)
+        return self.visit(ctx.logicalOrExpression())
+
+    def _binary(self, ctx):
+        """Operands separated by operators of one precedence level, which
+        associate to the left."""
+        children = list(ctx.getChildren())
+        expr = self.visit(children[0])
+        for i in range(1, len(children), 2):
+            expr = _at(BinaryOp(expr, children[i].getText(), self.visit(children[i + 1])), ctx.start)
+        return expr
+
+    visitLogicalOrExpression = _binary
+    visitLogicalAndExpression = _binary
+    visitEqualityExpression = _binary
+    visitRelationalExpression = _binary
+    visitAdditiveExpression = _binary
+    visitMultiplicativeExpression = _binary
+
+    def visitUnaryExpression(self, ctx: TyCParser.UnaryExpressionContext):
+        if ctx.unaryExpression():
+            return _at(PrefixOp(ctx.getChild(0).getText(), self.visit(ctx.unaryExpression())), ctx.start)
+        return self.visit(ctx.getChild(0))
+
+    def visitPrefixIncDec(self, ctx: TyCParser.PrefixIncDecContext):
+        if ctx.postfixExpression():
+            return self.visit(ctx.postfixExpression())
+        operand = ctx.prefixIncDec() or ctx.expression()
+        return _at(PrefixOp(ctx.getChild(0).getText(), self.visit(operand)), ctx.start)
+
+    def visitPostfixExpression(self, ctx: TyCParser.PostfixExpressionContext):
+        return self._suffixes(ctx, self.visit(ctx.primaryExpression()))
+
+    def _suffixes(self, ctx, expr):
+        """expr, the first part of ctx, with the call, member accesses and
+        '++' or '--' that follow it in ctx applied. A call names the text
+        of what is called."""
+        children = list(ctx.getChildren())
+        for i in range(1, len(children)):
+            kind = _kind(children[i])
+            if kind == TyCParser.LEFT_PAREN:
+                args = children[i + 1]
+                args = self.visit(args) if isinstance(args, TyCParser.ArgumentListContext) else []
+                expr = _at(FuncCall(children[0].getText(), args), ctx.start)
+            elif kind == TyCParser.DOT:
+                expr = _at(MemberAccess(expr, children[i + 1].getText()), ctx.start)
+            elif kind in (TyCParser.INCREMENT, TyCParser.DECREMENT):
+                expr = _at(PostfixOp(children[i].getText(), expr), ctx.start)
+        return expr
+
+    def visitPrimaryExpression(self, ctx: TyCParser.PrimaryExpressionContext):
+        kind = ctx.start.type
+        if ctx.expression():
+            return self.visit(ctx.expression())
+        if kind == TyCParser.LEFT_BRACE:
+            values = self.visit(ctx.expressionList()) if ctx.expressionList() else []
+            return _at(StructLiteral(values), ctx.start)
+        if kind == TyCParser.IDENTIFIER:
+            return _at(Identifier(ctx.start.text), ctx.start)
+        return _at(_LITERALS[kind](ctx.start.text), ctx.start)
+
+    def visitArgumentList(self, ctx: TyCParser.ArgumentListContext):
+        return [self.visit(expr) for expr in ctx.expression()]
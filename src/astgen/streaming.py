@@ -0,0 +1,79 @@
+"""
+Declaration-at-a-time AST generation for TyC.
+DeclarationBuilder is a parse listener for TyCParser: each top-level
+struct or function declaration is turned into its AST node by an
+ASTGeneration visitor as soon as the parser has finished it, and its
+parse-tree subtree is then detached from the program context. The parse
+tree of a whole program is never held at once; at most one finished
+declaration waits for its node to be built.
+
+A declaration is built only once the parser has moved past it (to the
+next declaration or to EOF), because the parser also exits a rule when a
+syntax error unwinds through it, and a partial subtree must not reach
+the visitor.
+"""
+
+from typing import List, Optional
+
+from antlr4.tree.Tree import ParseTreeListener
+from build.TyCParser import TyCParser
+from src.astgen.ast_generation import ASTGeneration
+from src.utils.nodes import Decl, Program
+from src.utils.tracing import Tracer, tracer_or_null
+
+_DECLARATIONS = (TyCParser.StructDeclarationContext, TyCParser.FunctionDeclarationContext)
+
+
+class DeclarationBuilder(ParseTreeListener):
+    """Parse listener building the AST one top-level declaration at a time."""
+
+    def __init__(self, visitor: Optional[ASTGeneration] = None, tracer: Optional[Tracer] = None):
+        self.visitor = visitor if visitor is not None else ASTGeneration()
+        self.tracer = tracer_or_null(tracer)
+        self.decls: List[Decl] = []
+        # The last declaration the parser exited, detached from the tree.
+        self._pending = None
+        # The first token, where the program is placed.
+        self._start = None
+
+    def enterEveryRule(self, ctx):
+        if isinstance(ctx, TyCParser.ProgramContext):
+            self._start = ctx.start
+        elif isinstance(ctx, _DECLARATIONS):
+            self._build()
+
+    def exitEveryRule(self, ctx):
+        if isinstance(ctx, _DECLARATIONS):
+            ctx.parentCtx.removeLastChild()
+            self._pending = ctx
+
+    def visitTerminal(self, node):
+        if node.symbol.type == TyCParser.EOF:
+            self._build()
+
+    def program(self) -> Program:
+        """The program parsed so far; call it after TyCParser.program()."""
+        self._build()
+        program = Program(self.decls)
+        if self._start is not None:
+            program.line, program.column = self._start.line, self._start.column
+        return program
+
+    def _build(self):
+        ctx, self._pending = self._pending, None
+        if ctx is None:
+            return
+        with self.tracer.span("astgen", decl=ctx.IDENTIFIER().getText()):
+            self.decls.append(self.visitor.visit(ctx))
+
+
+def parse_program(parser: TyCParser, visitor: Optional[ASTGeneration] = None, tracer: Optional[Tracer] = None) -> Program:
+    """Parse a program with the parser, building its AST declaration by
+    declaration."""
+    builder = DeclarationBuilder(visitor, tracer)
+    parser.addParseListener(builder)
+    try:
+        parser.program()
+    finally:
+        parser.removeParseListener(builder)
+    return builder.program()
@@ -0,0 +1,204 @@
+"""
+Batch compilation for TyC.
+compile_files() checks many programs at once: each file is lexed, parsed
+and lowered, and its control-flow graphs are analysed, as
+CompiledProgram does without optimizing; nothing is run. Files are
+handed to a pool of worker processes a few at a time, and results come
+back in the order they complete, so a caller can report each one as soon
+as it is known.
+
+Workers are warmed when they start: they import the compiler and compile
+a small program once, so that the first real file does not pay for
+imports and lazily built tables. With workers=0 the files are checked in
+this process.
+
+check_paths() is the command-line front end (python run.py compile):
+it expands globs and directories, prints a line per file and a summary
+with the throughput in files/s and MB/s.
+"""
+
+import glob
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Iterable, Iterator, List, Optional, TextIO
+
+from src.frontend.parallel import pool_context
+
+# Files per task sent to a worker, and tasks in flight per worker.
+BATCH_SIZE = 8
+_IN_FLIGHT = 4
+
+_WARM_UP = "int f(int n) { return n + 1; } void main() { printInt(f(1)); }"
+
+
+class FileResult:
+    """The outcome of checking one file."""
+
+    __slots__ = ("path", "size", "error", "warnings", "seconds")
+
+    def __init__(self, path: str, size: int, error: Optional[str], warnings: List[str], seconds: float):
+        self.path = path
+        self.size = size
+        self.error = error
+        self.warnings = warnings
+        self.seconds = seconds
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __str__(self):
+        if self.error is not None:
+            return f"FAIL {self.path}: {self.error}"
+        if self.warnings:
+            return f"ok   {self.path} ({len(self.warnings)} warnings)"
+        return f"ok   {self.path}"
+
+
+class BatchStats:
+    """Totals over the results of a batch."""
+
+    def __init__(self):
+        self.files = 0
+        self.failed = 0
+        self.bytes = 0
+        self.start = time.perf_counter()
+        self.seconds = 0.0
+
+    def add(self, result: FileResult):
+        self.files += 1
+        self.failed += not result.ok
+        self.bytes += result.size
+        self.seconds = time.perf_counter() - self.start
+
+    @property
+    def files_per_second(self) -> float:
+        return self.files / self.seconds if self.seconds else 0.0
+
+    @property
+    def megabytes_per_second(self) -> float:
+        return self.bytes / (1 << 20) / self.seconds if self.seconds else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.files} files, {self.failed} failed, {self.bytes / (1 << 20):.2f} MB "
+            f"in {self.seconds:.2f}s: {self.files_per_second:.1f} files/s, "
+            f"{self.megabytes_per_second:.2f} MB/s"
+        )
+
+
+def expand(patterns: Iterable[str]) -> List[str]:
+    """The files named by paths, globs (** included) and directories,
+    which stand for every .tyc file below them, without duplicates."""
+    paths = []
+    seen = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = sorted(glob.glob(os.path.join(pattern, "**", "*.tyc"), recursive=True))
+        elif glob.has_magic(pattern):
+            matches = sorted(glob.glob(pattern, recursive=True))
+        else:
+            matches = [pattern]
+        for path in matches:
+            if path not in seen:
+                seen.add(path)
+                paths.append(path)
+    return paths
+
+
+def check_source(source: str, optimize: bool = False, lexer: str = "scanner", parser: str = "ast"):
+    """Lex, parse, lower and analyse TyC source (and optimize it, with
+    optimize); lexer and parser are as in src.compiler.parse. The first
+    error, or None, the analysis warnings, and the CompiledProgram, or
+    None on an error."""
+    from src.compiler import compile_program, parse
+
+    try:
+        program = compile_program(parse(source, lexer=lexer, parser=parser), optimize=optimize)
+    except Exception as e:
+        return str(e) or type(e).__name__, [], None
+    warnings = [f"line {w.line}: {w.name} may be read before it is assigned" for w in program.warnings]
+    return None, warnings, program
+
+
+def check_file(path: str) -> FileResult:
+    """Lex, parse, lower and analyse one file."""
+    start = time.perf_counter()
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        source = data.decode("utf-8")
+    except (OSError, UnicodeDecodeError) as e:
+        return FileResult(path, 0, str(e), [], time.perf_counter() - start)
+    error, warnings, _ = check_source(source)
+    return FileResult(path, len(data), error, warnings, time.perf_counter() - start)
+
+
+def _check_batch(paths: List[str]) -> List[FileResult]:
+    return [check_file(path) for path in paths]
+
+
+def _warm():
+    from src.compiler import compile_source
+
+    compile_source(_WARM_UP, optimize=False)
+
+
+def compile_files(
+    paths: Iterable[str],
+    workers: Optional[int] = None,
+    batch_size: int = BATCH_SIZE,
+) -> Iterator[FileResult]:
+    """Check files in a pool of workers (by default one per CPU; none with
+    workers=0), yielding each result as its batch completes."""
+    if workers == 0:
+        for path in paths:
+            yield check_file(path)
+        return
+    workers = workers or os.cpu_count() or 1
+    batches = _batches(iter(paths), batch_size)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=pool_context(), initializer=_warm) as pool:
+        pending = set()
+        for batch in batches:
+            pending.add(pool.submit(_check_batch, batch))
+            if len(pending) >= workers * _IN_FLIGHT:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
+
+
+def _batches(paths: Iterator[str], size: int) -> Iterator[List[str]]:
+    batch = []
+    for path in paths:
+        batch.append(path)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def check_paths(
+    patterns: Iterable[str],
+    workers: Optional[int] = None,
+    out: TextIO = sys.stdout,
+    verbose: bool = False,
+) -> BatchStats:
+    """Check the files named by patterns, printing each failure (and with
+    verbose, each success and its warnings) as it comes, then a summary."""
+    stats = BatchStats()
+    for result in compile_files(expand(patterns), workers):
+        stats.add(result)
+        if verbose or not result.ok:
+            print(result, file=out)
+        if verbose:
+            for warning in result.warnings:
+                print(f"     {warning}", file=out)
+    print(stats.summary(), file=out)
+    return stats
@@ -0,0 +1,177 @@
+"""
+Client of the TyC compiler daemon.
+The daemon (src.daemon, started with python run.py daemon) keeps the
+compiler loaded in a long-lived process and answers requests over a Unix
+socket, so a check costs a round trip instead of starting Python and
+importing the front end.
+
+Messages in both directions are JSON objects, each sent as a 4-byte
+big-endian length followed by that many bytes of UTF-8. A request names
+an op ("check", "compile", "tokenize", "ping", "stats" or "shutdown")
+and gives the source; every response has "ok", and "error" when it is
+false. A connection may carry any number of requests.
+
+This module imports nothing from the compiler, so that the command line
+client starts quickly:
+
+    python -m src.client check program.tyc
+    python -m src.client tokenize - < program.tyc
+"""
+
+import argparse
+import json
+import os
+import socket
+import stat
+import struct
+import sys
+import tempfile
+from typing import Any, Dict, List, Optional
+
+HEADER = struct.Struct(">I")
+MAX_MESSAGE = 64 << 20
+
+OPS = ("check", "compile", "tokenize", "ping", "stats", "shutdown")
+
+
+class ProtocolError(Exception):
+    """A malformed, truncated or oversized message."""
+
+
+def default_socket_path() -> str:
+    """$TYC_SOCKET, or tyc.sock in $XDG_RUNTIME_DIR, or in a directory of
+    the temporary directory that only this user may enter (made if need
+    be). A fixed name in the shared temporary directory could be taken
+    by another user first."""
+    path = os.environ.get("TYC_SOCKET")
+    if path:
+        return path
+    directory = os.environ.get("XDG_RUNTIME_DIR")
+    if not directory:
+        directory = os.path.join(tempfile.gettempdir(), f"tyc-{os.getuid()}")
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        info = os.lstat(directory)
+        if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+            raise OSError(f"{directory} is not a directory private to this user")
+    return os.path.join(directory, "tyc.sock")
+
+
+def send_message(sock: socket.socket, message: Dict[str, Any]):
+    data = json.dumps(message, separators=(",", ":")).encode("utf-8")
+    if len(data) > MAX_MESSAGE:
+        raise ProtocolError(f"Message of {len(data)} bytes is over the limit of {MAX_MESSAGE}")
+    sock.sendall(HEADER.pack(len(data)) + data)
+
+
+def recv_message(sock: socket.socket) -> Optional[Dict[str, Any]]:
+    """The next message, or None if the peer closed the connection
+    between messages."""
+    header = _recv_exactly(sock, HEADER.size, eof_ok=True)
+    if header is None:
+        return None
+    (size,) = HEADER.unpack(header)
+    if size > MAX_MESSAGE:
+        raise ProtocolError(f"Message of {size} bytes is over the limit of {MAX_MESSAGE}")
+    try:
+        message = json.loads(_recv_exactly(sock, size).decode("utf-8"))
+    except ValueError as e:
+        raise ProtocolError(f"Malformed message: {e}") from None
+    if not isinstance(message, dict):
+        raise ProtocolError("Malformed message: not an object")
+    return message
+
+
+def _recv_exactly(sock: socket.socket, size: int, eof_ok: bool = False) -> Optional[bytes]:
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            if eof_ok and not data:
+                return None
+            raise ProtocolError("Connection closed in the middle of a message")
+        data += chunk
+    return bytes(data)
+
+
+class Client:
+    """A connection to the daemon."""
+
+    def __init__(self, path: Optional[str] = None, timeout: Optional[float] = None):
+        self.path = path or default_socket_path()
+        # Sources are sent to whoever listens: only to a daemon of ours.
+        if os.stat(self.path).st_uid != os.getuid():
+            raise OSError(f"{self.path} belongs to another user")
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        try:
+            self.sock.connect(self.path)
+        except OSError:
+            self.sock.close()
+            raise
+
+    def request(self, op: str, **fields) -> Dict[str, Any]:
+        send_message(self.sock, dict(fields, op=op))
+        response = recv_message(self.sock)
+        if response is None:
+            raise ProtocolError("Connection closed before a response")
+        return response
+
+    def close(self):
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def report(op: str, name: str, response: Dict[str, Any]) -> List[str]:
+    """The lines the command line client prints for a response."""
+    if op == "tokenize" and response["ok"]:
+        lines = [f"{line}:{column} {kind} {json.dumps(text)}" for kind, text, line, column in response["tokens"]]
+        return lines + [f"{name}:{d['line']}:{d['column']}: {d['message']}" for d in response["errors"]]
+    if not response["ok"]:
+        return [f"{name}: {response['error']}"]
+    lines = [f"{name}: {warning}" for warning in response.get("warnings", [])]
+    if op == "compile":
+        lines.append(f"{name}: {response['instructions']} instructions in {len(response['functions'])} functions")
+    elif op == "ping":
+        lines.append(f"daemon {response['pid']} is up")
+    elif op == "stats":
+        lines.extend(response["caches"])
+    return lines
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src.client", description="TyC compiler daemon client")
+    parser.add_argument("op", choices=OPS)
+    parser.add_argument("program", nargs="?", default="-", help="TyC source file, - for standard input")
+    parser.add_argument("--socket", help="daemon socket (default: $TYC_SOCKET or a per-user socket)")
+    parser.add_argument("--timeout", type=float, default=30.0, help="seconds to wait for the daemon")
+    args = parser.parse_args(argv)
+
+    fields = {}
+    name = args.program
+    if args.op in ("check", "compile", "tokenize"):
+        if args.program == "-":
+            name = "<stdin>"
+            fields["source"] = sys.stdin.read()
+        else:
+            with open(args.program, encoding="utf-8") as f:
+                fields["source"] = f.read()
+    path = args.socket
+    try:
+        path = path or default_socket_path()
+        with Client(path, args.timeout) as client:
+            response = client.request(args.op, **fields)
+    except (OSError, ProtocolError) as e:
+        print(f"cannot reach the daemon at {path or 'its default socket'}: {e}", file=sys.stderr)
+        return 2
+    for line in report(args.op, name, response):
+        print(line)
+    return 0 if response["ok"] and not response.get("errors") else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,281 @@
+"""
+Compiler driver for TyC.
+Ties the front end (the hand-written scanner or the ANTLR lexer, and the
+hand-written parser or the ANTLR parser and ASTGeneration), the IR
+builder, the optimizer and the interpreter together.
+
+Every entry point takes an optional src.utils.tracing.Tracer, which gets
+a span per phase and, for lowering and optimization, per function.
+"""
+
+import os
+import sys
+from typing import Dict, List, Optional, Set, TextIO, Union
+
+from src.ir.callgraph import CallGraph
+from src.ir.cfg import CFG, CFGBuilder
+from src.ir.dataflow import UninitializedRead, find_uninitialized_reads
+from src.ir.profile import ProgramProfile
+from src.ir.purity import find_pure_functions
+from src.ir.types import resolve_members
+from src.optimizer.pipeline import OptimizationStats, optimize_all
+from src.runtime.frames import TypedInterpreter
+from src.runtime.interpreter import Interpreter
+from src.runtime.profiler import CountingProfiler, Profiler
+from src.runtime.tiered import TieredInterpreter
+from src.utils.error_listener import Diagnostic
+from src.utils.nodes import FuncDecl, Program, StructDecl
+from src.utils.tracing import Tracer, tracer_or_null
+
+ENGINES = {
+    "dict": Interpreter,
+    "typed": TypedInterpreter,
+    "tiered": TieredInterpreter,
+}
+
+LEXERS = ("scanner", "antlr")
+PARSERS = ("ast", "antlr", "stream", "parallel")
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class _DeferredError:
+    """Token source raising a lexical error met while buffering tokens."""
+
+    def __init__(self, source, error: Exception):
+        self.source = source
+        self.error = error
+
+    def __getattr__(self, name):
+        return getattr(self.source, name)
+
+    def nextToken(self):
+        raise self.error
+
+
+def _fill(tokens):
+    """Buffer every token of a CommonTokenStream up front. A lexical error
+    is raised only when the parser asks for the token it stopped at, as
+    with on-demand lexing, so a syntax error before it is still reported
+    first."""
+    try:
+        tokens.fill()
+    except Exception as e:
+        tokens.tokenSource = _DeferredError(tokens.tokenSource, e)
+
+
+def parse(
+    source: str,
+    tracer: Optional[Tracer] = None,
+    lexer: str = "scanner",
+    parser: str = "ast",
+) -> Program:
+    """Parse TyC source into an AST.
+    lexer selects the token source: "scanner" is src.frontend.scanner,
+    "antlr" the generated TyCLexer; both produce the same tokens. parser
+    selects how the AST is built: "ast" is src.frontend.parser, which
+    builds it directly, "antlr" the generated TyCParser followed by
+    ASTGeneration, "stream" TyCParser reading a sliding window of tokens
+    (see src.frontend.tokenstream) with ASTGeneration run on each
+    declaration as soon as it is parsed (see src.astgen.streaming), so
+    neither all the tokens nor the whole parse tree are ever held,
+    "parallel" the "ast" parser run on pieces of the source in worker
+    processes (see src.frontend.parallel), with the scanner; all accept
+    the same programs and report the same errors. The generated
+    code lives in build/, so it is imported on first use.
+    """
+    if lexer not in LEXERS:
+        raise ValueError(f"Unknown lexer: {lexer}")
+    if parser not in PARSERS:
+        raise ValueError(f"Unknown parser: {parser}")
+    if parser == "parallel" and lexer != "scanner":
+        raise ValueError("The parallel parser reads tokens with the scanner")
+    tracer = tracer_or_null(tracer)
+    build_dir = os.path.join(_ROOT, "build")
+    if build_dir not in sys.path:
+        sys.path.insert(0, build_dir)
+    from antlr4 import CommonTokenStream
+    from src.frontend.charstream import CodePointStream
+    from src.frontend.parser import ASTParser
+    from src.frontend.scanner import TyCScanner
+    from src.frontend.tokenstream import WindowTokenStream
+
+    if parser == "parallel":
+        from src.frontend.parallel import parse_parallel
+
+        with tracer.span("parse"):
+            return parse_parallel(source)
+
+    with tracer.span("lex"):
+        if lexer == "scanner":
+            token_source = TyCScanner(source)
+        else:
+            from build.TyCLexer import TyCLexer
+
+            token_source = TyCLexer(CodePointStream(source))
+        if parser == "ast":
+            ast_parser = ASTParser(token_source)
+        elif parser == "stream":
+            tokens = WindowTokenStream(token_source)
+        else:
+            tokens = CommonTokenStream(token_source)
+            _fill(tokens)
+    if parser == "ast":
+        with tracer.span("parse"):
+            return ast_parser.parse()
+
+    from build.TyCParser import TyCParser
+    from src.astgen.ast_generation import ASTGeneration
+    from src.astgen.streaming import parse_program
+    from src.utils.error_listener import NewErrorListener
+
+    with tracer.span("parse"):
+        tree_parser = TyCParser(tokens)
+        tree_parser.removeErrorListeners()
+        tree_parser.addErrorListener(NewErrorListener.INSTANCE)
+        if parser == "stream":
+            return parse_program(tree_parser, ASTGeneration(), tracer)
+        tree = tree_parser.program()
+    with tracer.span("astgen"):
+        return ASTGeneration().visit(tree)
+
+
+def diagnose(source: str, max_errors: Optional[int] = None, lexer: str = "scanner") -> List[Diagnostic]:
+    """Every lexical and syntax error of TyC source, or the first
+    max_errors of them, in one pass; see src.frontend.recovery. parse()
+    stops at the first error instead."""
+    if lexer not in LEXERS:
+        raise ValueError(f"Unknown lexer: {lexer}")
+    build_dir = os.path.join(_ROOT, "build")
+    if build_dir not in sys.path:
+        sys.path.insert(0, build_dir)
+    from src.frontend.recovery import collect_errors
+
+    return collect_errors(source, max_errors, lexer)
+
+
+class CompiledProgram:
+    """A program lowered to control-flow graphs, ready to run.
+    A profile of earlier runs (see collect_profile) guides the switch case
+    order, inlining and block layout. A tracer records the time of each
+    phase; it is kept, so that run() is traced too."""
+
+    def __init__(
+        self,
+        program: Program,
+        optimize: bool = True,
+        profile: Optional[ProgramProfile] = None,
+        tracer: Optional[Tracer] = None,
+    ):
+        self.tracer = tracer_or_null(tracer)
+        self.structs: Dict[str, StructDecl] = {
+            d.name: d for d in program.decls if isinstance(d, StructDecl)
+        }
+        self.functions: Dict[str, CFG] = {}
+        with self.tracer.span("cfg"):
+            builder = CFGBuilder(program, profile)
+            for decl in program.decls:
+                if isinstance(decl, FuncDecl):
+                    with self.tracer.span("function", decl=decl.name):
+                        self.functions[decl.name] = builder.build(decl)
+        with self.tracer.span("analysis"):
+            self.warnings: List[UninitializedRead] = [
+                read for cfg in self.functions.values() for read in find_uninitialized_reads(cfg)
+            ]
+        self.stats: Dict[str, OptimizationStats] = {}
+        if optimize:
+            with self.tracer.span("optimize"):
+                self.stats = optimize_all(
+                    self.functions, structs=self.structs, profile=profile, tracer=self.tracer
+                )
+                if "main" in self.functions:
+                    live = CallGraph(self.functions).reachable_from("main")
+                    self.functions = {n: f for n, f in self.functions.items() if n in live}
+        with self.tracer.span("resolve"):
+            resolve_members(self.functions, self.structs)
+            self.pure: Set[str] = find_pure_functions(self.functions, self.structs)
+
+    def instruction_count(self) -> int:
+        return sum(cfg.instruction_count() for cfg in self.functions.values())
+
+    def interpreter(
+        self,
+        stdin: Optional[TextIO] = None,
+        stdout: Optional[TextIO] = None,
+        engine: str = "dict",
+        memoize: bool = False,
+        memo_size: int = 4096,
+        profiler: Optional[Union[Profiler, CountingProfiler]] = None,
+    ) -> Interpreter:
+        """An interpreter for the program.
+        engine selects the interpreter: "dict" keeps variables in a dict
+        per call, "typed" in typed slot arrays (see src.runtime.frames),
+        "tiered" interprets like "dict" and compiles hot functions to
+        Python code (see src.runtime.tiered).
+        With memoize, calls to the pure functions are cached, at most
+        memo_size results per function; the caches are in its memo.
+        With a profiler, the interpreter runs an instrumented copy of the
+        program that reports to it.
+        """
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine: {engine}")
+        functions = self.functions if profiler is None else profiler.instrument(self.functions)
+        interpreter = ENGINES[engine](
+            functions,
+            self.structs,
+            stdin,
+            stdout,
+            memoize=self.pure if memoize else None,
+            memo_size=memo_size,
+        )
+        if profiler is not None:
+            profiler.install(interpreter)
+        return interpreter
+
+    def run(
+        self,
+        stdin: Optional[TextIO] = None,
+        stdout: Optional[TextIO] = None,
+        engine: str = "dict",
+        memoize: bool = False,
+        profiler: Optional[Union[Profiler, CountingProfiler]] = None,
+    ):
+        """Run main() and return its result."""
+        interpreter = self.interpreter(stdin, stdout, engine, memoize, profiler=profiler)
+        with self.tracer.span("run", engine=engine):
+            return interpreter.run("main")
+
+
+def compile_program(
+    program: Program,
+    optimize: bool = True,
+    profile: Optional[ProgramProfile] = None,
+    tracer: Optional[Tracer] = None,
+) -> CompiledProgram:
+    """Lower (and by default optimize) a parsed program."""
+    return CompiledProgram(program, optimize, profile, tracer)
+
+
+def compile_source(
+    source: str,
+    optimize: bool = True,
+    profile: Optional[ProgramProfile] = None,
+    tracer: Optional[Tracer] = None,
+) -> CompiledProgram:
+    """Parse, lower and optimize TyC source."""
+    return CompiledProgram(parse(source, tracer), optimize, profile, tracer)
+
+
+def collect_profile(
+    program: Program,
+    stdin: Optional[TextIO] = None,
+    stdout: Optional[TextIO] = None,
+    engine: str = "dict",
+) -> ProgramProfile:
+    """Run main() of an unoptimized build of program, counting branches,
+    loop iterations and calls; the profile can be saved and passed to a
+    later compilation. The unoptimized build keeps every call site, so
+    sites that later get inlined are counted too."""
+    counter = CountingProfiler()
+    CompiledProgram(program, optimize=False).run(stdin, stdout, engine, profiler=counter)
+    return counter.profile()
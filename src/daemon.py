@@ -0,0 +1,200 @@
+"""
+Compiler daemon for TyC.
+Starting Python and importing the front end costs more than checking a
+small file. CompilerDaemon is a long-lived process serving the requests
+of src.client over a Unix socket:
+
+- check lexes, parses, lowers and analyses the source, and returns the
+  first error or the analysis warnings (as src.batch does for a file);
+- compile does the same and optimizes, and returns the functions and
+  the instruction count of the result;
+- tokenize returns every token, with the lexical errors among them
+  reported rather than raised (see src.frontend.recovery);
+- ping, stats and shutdown manage the daemon.
+
+The daemon is warm: the compiler is imported and a small program is put
+through the configured lexer and parser when it starts, which for the
+ANTLR front end also deserializes the ATNs and seeds the DFA caches that
+every later parser shares. Responses to check, compile and tokenize are
+kept in an LRU cache per op keyed by a hash of the source, so an editor
+asking again about an unchanged file is answered without compiling.
+
+Each connection gets a thread, so an idle client does not hold the
+others up. Check, compile and tokenize requests are served one at a
+time, as the front end is not thread-safe; ping, stats and shutdown are
+answered while one of them runs. Only the owner of the socket may connect to it.
+"""
+
+import hashlib
+import os
+import socket
+import socketserver
+import stat
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from src.batch import check_source
+from src.client import ProtocolError, default_socket_path, recv_message, send_message
+from src.runtime.memo import make_caches
+
+SOURCE_OPS = ("check", "compile", "tokenize")
+
+_WARM_UP = "int f(int n) { return n + 1; } void main() { printInt(f(1)); }"
+
+
+class _Connection(socketserver.BaseRequestHandler):
+    def handle(self):
+        while True:
+            try:
+                request = recv_message(self.request)
+            except ProtocolError as e:
+                send_message(self.request, {"ok": False, "error": str(e)})
+                return
+            except OSError:
+                return
+            if request is None:
+                return
+            try:
+                send_message(self.request, self.server.dispatch(request))
+            except OSError:
+                return
+            if request.get("op") == "shutdown":
+                # From this thread, not the one in serve_forever(), and
+                # once the client has its answer.
+                self.server.shutdown()
+                return
+
+
+class CompilerDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """The daemon, listening on path once made; serve_forever() answers
+    requests until a shutdown request or shutdown()."""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        cache_size: int = 256,
+        lexer: str = "scanner",
+        parser: str = "ast",
+    ):
+        from src.compiler import LEXERS, PARSERS
+
+        if lexer not in LEXERS:
+            raise ValueError(f"Unknown lexer: {lexer}")
+        if parser not in PARSERS:
+            raise ValueError(f"Unknown parser: {parser}")
+        self.path = path or default_socket_path()
+        self.lexer = lexer
+        self.parser = parser
+        self.caches = make_caches(SOURCE_OPS, cache_size)
+        self.requests = 0
+        self.started = time.time()
+        # Held while compiling, and the other for the request counter.
+        self._lock = threading.Lock()
+        self._count_lock = threading.Lock()
+
+        warm_up(lexer, parser)
+
+        _remove_stale_socket(self.path)
+        mask = os.umask(0o077)
+        try:
+            super().__init__(self.path, _Connection)
+        finally:
+            os.umask(mask)
+
+    def dispatch(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """The response to a request."""
+        op = request.get("op")
+        with self._count_lock:
+            self.requests += 1
+        if op == "ping":
+            return {"ok": True, "pid": os.getpid(), "uptime": time.time() - self.started}
+        if op == "stats":
+            return {"ok": True, "requests": self.requests, "caches": [str(c) for c in self.caches.values()]}
+        if op == "shutdown":
+            return {"ok": True}
+        if op not in SOURCE_OPS:
+            return {"ok": False, "error": f"Unknown op: {op}"}
+        source = request.get("source")
+        if not isinstance(source, str):
+            return {"ok": False, "error": f"{op} needs the source"}
+        cache = self.caches[op]
+        key = hashlib.sha256(source.encode("utf-8", "surrogatepass")).digest()
+        with self._lock:
+            hit, response = cache.lookup(key)
+            if not hit:
+                response = respond(op, source, self.lexer, self.parser)
+                cache.store(key, response)
+        return dict(response, cached=hit)
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def warm_up(lexer: str = "scanner", parser: str = "ast"):
+    """Import the compiler and put a small program through every phase."""
+    from src.compiler import compile_program, parse
+
+    compile_program(parse(_WARM_UP, lexer=lexer, parser=parser))
+    respond("tokenize", _WARM_UP)
+
+
+def respond(op: str, source: str, lexer: str = "scanner", parser: str = "ast") -> Dict[str, Any]:
+    """The response to a check, compile or tokenize request for source."""
+    if op == "tokenize":
+        return _tokenize(source)
+    if op not in SOURCE_OPS:
+        raise ValueError(f"Unknown op: {op}")
+    error, warnings, program = check_source(source, op == "compile", lexer, parser)
+    if error is not None:
+        return {"ok": False, "error": error}
+    if op == "check":
+        return {"ok": True, "warnings": warnings}
+    return {
+        "ok": True,
+        "warnings": warnings,
+        "functions": sorted(program.functions),
+        "instructions": program.instruction_count(),
+    }
+
+
+def _tokenize(source: str) -> Dict[str, Any]:
+    from src.frontend.recovery import lexical_error
+    from src.frontend.scanner import TyCScanner
+    from src.frontend.tokens import EOF, SYMBOLIC_NAMES
+
+    tokens, errors = [], []
+    for token in TyCScanner(source, recover=True).tokens():
+        name = "EOF" if token.type == EOF else SYMBOLIC_NAMES[token.type]
+        tokens.append([name, token.text, token.line, token.column])
+        if token.channel:
+            errors.append({"line": token.line, "column": token.column, "message": str(lexical_error(token))})
+    return {"ok": True, "tokens": tokens, "errors": errors}
+
+
+def _remove_stale_socket(path: str):
+    """Remove the socket of a daemon that is gone; refuse to replace one
+    that still answers, or anything that is not a socket of ours."""
+    try:
+        info = os.lstat(path)
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(info.st_mode):
+        raise OSError(f"{path} exists and is not a socket")
+    if info.st_uid != os.getuid():
+        raise OSError(f"{path} belongs to another user")
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except OSError:
+        os.unlink(path)
+    else:
+        raise OSError(f"A daemon is already listening on {path}")
+    finally:
+        probe.close()
@@ -0,0 +1,3 @@
+"""
+Hand-written front end for the TyC language
+"""
@@ -0,0 +1,161 @@
+"""
+Compact character streams for TyC.
+ANTLR's InputStream copies its input into a list of code points, eight
+bytes of list slot per character plus an int object for every character
+above 255. The streams here implement the same CharStream interface over
+the input as it already is:
+
+- CodePointStream reads a str, whose characters are code points;
+- ByteStream reads a buffer of bytes, each one a code point, as a
+  memory-mapped Latin-1 file or a UTF-8 file that is pure ASCII is.
+
+LA() is an index into the input and getText() a slice of it, both O(1)
+in the size of the input. open_source() maps a file and picks the stream
+that reads it without decoding it, or decodes it once into a str when it
+is UTF-8 with multi-byte characters.
+
+Every stream can be given to TyCLexer in place of an InputStream, and to
+TyCScanner.
+"""
+
+import mmap
+from typing import Union
+
+from antlr4.Token import Token
+
+# Bytes checked at a time for non-ASCII characters.
+_CHUNK = 1 << 20
+
+
+class CodePointStream:
+    """CharStream over a str."""
+
+    __slots__ = ("name", "strdata", "_index", "_size")
+
+    def __init__(self, data: str, name: str = "<string>"):
+        self.name = name
+        self.strdata = data
+        self._index = 0
+        self._size = len(data)
+
+    @property
+    def index(self) -> int:
+        return self._index
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def sourceName(self) -> str:
+        return self.name
+
+    def getSourceName(self) -> str:
+        return self.name
+
+    def reset(self):
+        self._index = 0
+
+    def consume(self):
+        if self._index >= self._size:
+            raise Exception("cannot consume EOF")
+        self._index += 1
+
+    def LA(self, offset: int) -> int:
+        if offset == 0:
+            return 0
+        if offset < 0:
+            offset += 1
+        pos = self._index + offset - 1
+        if pos < 0 or pos >= self._size:
+            return Token.EOF
+        return ord(self.strdata[pos])
+
+    def LT(self, offset: int) -> int:
+        return self.LA(offset)
+
+    # The whole input is available, so marks do nothing.
+    def mark(self) -> int:
+        return -1
+
+    def release(self, marker: int):
+        pass
+
+    def seek(self, index: int):
+        self._index = min(index, self._size)
+
+    def getText(self, start: int, stop: int) -> str:
+        return self.strdata[start:stop + 1]
+
+    def __str__(self) -> str:
+        return self.strdata
+
+
+class ByteStream(CodePointStream):
+    """CharStream over a buffer of Latin-1 (or ASCII) bytes."""
+
+    __slots__ = ("data", "_mapping")
+
+    def __init__(self, data: Union[bytes, bytearray, memoryview, mmap.mmap], name: str = "<bytes>"):
+        self.name = name
+        self._mapping = data if isinstance(data, mmap.mmap) else None
+        self.data = memoryview(data)
+        self._index = 0
+        self._size = len(self.data)
+
+    @property
+    def strdata(self) -> str:
+        return str(self)
+
+    def LA(self, offset: int) -> int:
+        if offset == 0:
+            return 0
+        if offset < 0:
+            offset += 1
+        pos = self._index + offset - 1
+        if pos < 0 or pos >= self._size:
+            return Token.EOF
+        return self.data[pos]
+
+    def getText(self, start: int, stop: int) -> str:
+        return str(self.data[start:stop + 1], "latin-1")
+
+    def close(self):
+        """Release the buffer, and unmap it if it is a mapped file."""
+        self.data.release()
+        if self._mapping is not None:
+            self._mapping.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __str__(self) -> str:
+        return str(self.data, "latin-1")
+
+
+def open_source(path: str, encoding: str = "utf-8") -> CodePointStream:
+    """A stream over a TyC source file, in UTF-8 or Latin-1.
+    The file is memory-mapped and read in place when every byte is one
+    character; a UTF-8 file with other characters is decoded into a str.
+    """
+    if encoding.lower().replace("_", "-") not in ("utf-8", "utf8", "latin-1", "latin1", "iso-8859-1"):
+        raise ValueError(f"Unsupported encoding: {encoding}")
+    with open(path, "rb") as f:
+        size = f.seek(0, 2)
+        if size == 0:
+            return CodePointStream("", path)
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if encoding.lower().startswith(("latin", "iso")) or _is_ascii(mapping):
+        return ByteStream(mapping, path)
+    try:
+        text = str(mapping, "utf-8")
+    finally:
+        mapping.close()
+    return CodePointStream(text, path)
+
+
+def _is_ascii(mapping: mmap.mmap) -> bool:
+    return all(mapping[start:start + _CHUNK].isascii() for start in range(0, len(mapping), _CHUNK))
@@ -0,0 +1,150 @@
+"""
+Parallel parsing for TyC.
+The top-level declarations of a program are independent, so a large file
+can be cut between declarations and the pieces parsed in worker
+processes with ASTParser, each scanner starting at the line and column
+of its piece so that the nodes carry their positions in the whole file.
+
+Declaration boundaries are found by a pre-scan that skips string
+literals and comments and counts braces: a declaration ends at a ';' or
+a '}' outside any braces, the '}' of a struct being followed by its ';'.
+Up to the first lexical error, the pre-scan reads strings and comments
+as the scanner does, so every cut falls between two tokens and a piece
+starts in the state the scanner would be in there.
+
+If every piece parses, the program is the concatenation of the pieces,
+as TyC.g4 makes a program a sequence of declarations. Workers send their
+declarations back pickled, to be unpickled with the garbage collector
+paused. If any piece fails, the whole source is parsed again in this
+process: the error reported then is the one of a serial parse, which
+may depend on tokens past the failing piece.
+"""
+
+import gc
+import multiprocessing
+import os
+import pickle
+import re
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+from src.frontend.parser import ASTParser
+from src.frontend.scanner import TyCScanner
+from src.utils.nodes import Decl, Program
+
+# Strings and comments, whose braces do not count, and the tokens that do.
+_BOUNDARY = re.compile(r'"(?:[^"\\\r\n]|\\[^\r\n])*(?P<closed>")?|//[^\r\n]*|/\*[\s\S]*?\*/|/\*|[{};]')
+# Text that may separate a struct's '}' from its ';'.
+_GAP = re.compile(r"(?:\s+|//[^\r\n]*|/\*[\s\S]*?\*/)*")
+
+# Smallest piece worth sending to a worker, in characters.
+CHUNK_SIZE = 1 << 16
+
+# (text, line, column) of a piece of a source.
+Chunk = Tuple[str, int, int]
+
+
+def declaration_ends(source: str) -> List[int]:
+    """Offsets just past the end of each top-level declaration."""
+    ends = []
+    depth = 0
+    for m in _BOUNDARY.finditer(source):
+        text = m.group()
+        if text == "{":
+            depth += 1
+        elif text == "}":
+            depth -= 1
+            if depth == 0:
+                gap = _GAP.match(source, m.end()).end()
+                if not source.startswith(";", gap):
+                    ends.append(m.end())
+            elif depth < 0:
+                break
+        elif text == ";":
+            if depth == 0:
+                ends.append(m.end())
+        elif text == "/*" or (text[0] == '"' and m.group("closed") is None):
+            # An unterminated comment or string: the scanner reads on
+            # differently, so no later cut is safe.
+            break
+    return ends
+
+
+def split(source: str, chunk_size: int = CHUNK_SIZE) -> List[Chunk]:
+    """The source cut between declarations into pieces of at least
+    chunk_size characters, with the position of the start of each."""
+    chunks = []
+    start, line, column = 0, 1, 0
+    for end in declaration_ends(source) + [len(source)]:
+        if end == start or (end - start < chunk_size and end < len(source)):
+            continue
+        chunks.append((source[start:end], line, column))
+        newlines = source.count("\n", start, end)
+        if newlines:
+            line += newlines
+            column = end - source.rfind("\n", start, end) - 1
+        else:
+            column += end - start
+        start = end
+    return chunks
+
+
+def parse_chunk(chunk: Chunk) -> Optional[bytes]:
+    """The declarations of a piece, pickled, or None if it does not parse."""
+    text, line, column = chunk
+    try:
+        decls = ASTParser(TyCScanner(text, line=line, column=column)).parse().decls
+    except Exception:
+        return None
+    return pickle.dumps(decls, pickle.HIGHEST_PROTOCOL)
+
+
+def _unpickle(results: List[bytes]) -> List[Decl]:
+    """The declarations of every piece. Unpickling makes every node at
+    once, which would otherwise set off the cyclic garbage collector
+    many times over, so it is paused."""
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return [decl for data in results for decl in pickle.loads(data)]
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def pool_context():
+    """The multiprocessing context for worker pools. Forking a process that
+    runs threads may copy a lock another thread holds, so workers are
+    started by a fork server where there is one, and spawned otherwise."""
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return multiprocessing.get_context(method)
+
+
+def parse_parallel(
+    source: str,
+    workers: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    executor: Optional[Executor] = None,
+) -> Program:
+    """Parse TyC source with ASTParser, in pieces, in worker processes.
+    workers defaults to the number of CPUs, and pieces are sized to give
+    each a few of them; an executor, if given, is used instead of a pool
+    made for the call, whose workers are not forked (see pool_context()).
+    Errors are those of ASTParser(source).parse()."""
+    workers = workers or os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(CHUNK_SIZE, len(source) // (workers * 4))
+    chunks = split(source, chunk_size)
+    if len(chunks) < 2 or (workers < 2 and executor is None):
+        return ASTParser(source).parse()
+    if executor is None:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks)), mp_context=pool_context()) as pool:
+            results = list(pool.map(parse_chunk, chunks))
+    else:
+        results = list(executor.map(parse_chunk, chunks))
+    if any(data is None for data in results):
+        return ASTParser(source).parse()
+    program = Program(_unpickle(results))
+    # Placed at its first token, as ASTParser places it.
+    program.line, program.column = program.decls[0].line, program.decls[0].column
+    return program
@@ -0,0 +1,732 @@
+"""
+Hand-written parser for TyC.
+ASTParser reads the tokens of src.frontend.scanner and builds the AST of
+src.utils.nodes directly, without the ANTLR parse tree that ASTGeneration
+would otherwise walk. Statements and declarations are parsed by recursive
+descent and expressions by precedence climbing.
+
+It accepts exactly the programs TyC.g4 accepts and rejects the others
+with the message NewErrorListener gives, "Error on line X col Y: tok",
+naming the token the generated parser reports: the first one at which the
+input stops being the beginning of some program. Two places need more
+than a fixed lookahead:
+
+- An assignment's target (lhs in the grammar) is a restricted postfix
+  expression. The left side is parsed as an expression and checked to
+  have that shape when '=' follows.
+- A statement starting with '{' is a block or a struct literal. Unless
+  the next tokens settle it, both are tried, preferring the expression
+  as ANTLR does when both parse, and an error is reported at the point
+  where the longer attempt failed.
+
+Tokens are read ahead of the parse. A lexical error is raised where the
+generated parser would meet it: when the parse reaches the offending
+token, or when reporting a mismatched token directly before it, which
+ANTLR's error recovery looks past.
+"""
+
+from typing import List, Optional, Union
+
+from antlr4 import InputStream
+from antlr4.Token import CommonToken
+
+from src.frontend.scanner import TyCScanner
+from src.frontend.tokens import *
+from src.utils.error_listener import SyntaxException
+from src.utils.nodes import *
+
+# Type of the pseudo-token standing for a lexical error.
+_LEXICAL_ERROR = -2
+
+_PRIMITIVE_TYPES = {
+    KEYWORD_INT: IntType,
+    KEYWORD_FLOAT: FloatType,
+    KEYWORD_STRING: StringType,
+    KEYWORD_VOID: VoidType,
+}
+_TYPE_START = frozenset([KEYWORD_INT, KEYWORD_FLOAT, KEYWORD_STRING, IDENTIFIER])
+_DECL_START = _TYPE_START | {KEYWORD_VOID}
+_PRIMARY_START = frozenset([
+    IDENTIFIER, INT_LITERAL, FLOAT_LITERAL, STRING_LITERAL, LEFT_PAREN, LEFT_BRACE,
+])
+_EXPR_START = _PRIMARY_START | {PLUS, MINUS, LOGICAL_NOT, INCREMENT, DECREMENT}
+_VAR_DECL_START = frozenset([KEYWORD_AUTO, KEYWORD_INT, KEYWORD_FLOAT, KEYWORD_STRING])
+# Tokens after '{' that only a block can continue with.
+_BLOCK_ONLY = _VAR_DECL_START | {
+    KEYWORD_IF, KEYWORD_WHILE, KEYWORD_FOR, KEYWORD_SWITCH,
+    KEYWORD_BREAK, KEYWORD_CONTINUE, KEYWORD_RETURN,
+}
+_STATEMENT_START = _EXPR_START | _BLOCK_ONLY
+# Tokens that can follow a statement somewhere in the grammar.
+_STATEMENT_FOLLOW = _STATEMENT_START | {
+    LEFT_BRACE, RIGHT_BRACE, KEYWORD_ELSE, KEYWORD_CASE, KEYWORD_DEFAULT,
+}
+_FOR_INIT_START = _PRIMARY_START | _VAR_DECL_START
+_INC_DEC = frozenset([INCREMENT, DECREMENT])
+_FOR_UPDATE_START = _PRIMARY_START | _INC_DEC
+_LITERALS = {
+    INT_LITERAL: lambda text: IntLiteral(int(text)),
+    FLOAT_LITERAL: lambda text: FloatLiteral(float(text)),
+    STRING_LITERAL: StringLiteral,
+}
+_PRECEDENCE = {
+    LOGICAL_OR: 1,
+    LOGICAL_AND: 2,
+    EQUAL: 3, NOT_EQUAL: 3,
+    LESS_THAN: 4, LESS_EQUAL: 4, GREATER_THAN: 4, GREATER_EQUAL: 4,
+    PLUS: 5, MINUS: 5,
+    MULTIPLY: 6, DIVIDE: 6, MODULO: 6,
+}
+
+
+# How far past a failing token ANTLR reads before reporting it, which
+# decides whether a lexical error further on is reported instead.
+_TOKEN = 0  # unwanted token at the end of a loop iteration
+_DELETION = 1  # mismatched token: single-token deletion looks at the next one
+_PREDICTION = 2  # no viable alternative: the message text fills the stream
+
+
+class _Failure(Exception):
+    """A syntax error at a token index, before it is turned into the
+    exception the caller sees."""
+
+    def __init__(self, index: int, reach: int):
+        super().__init__(index)
+        self.index = index
+        self.reach = reach
+
+
+def _further(a: _Failure, b: _Failure) -> _Failure:
+    """The failure of two alternatives that ANTLR reports: the later one,
+    or, when both stop at the same token, that token as the end of a
+    failed prediction."""
+    if a.index == b.index:
+        return _Failure(a.index, _PREDICTION)
+    return a if a.index > b.index else b
+
+
+def _at(node: ASTNode, token) -> ASTNode:
+    node.line = token.line
+    node.column = token.column
+    return node
+
+
+class ASTParser:
+    """Parse TyC source, or the tokens of a token source, to a Program."""
+
+    def __init__(self, source: Union[str, InputStream, "TyCScanner"]):
+        if not hasattr(source, "nextToken"):
+            source = TyCScanner(source)
+        self.tokens = []
+        self.types: List[int] = []
+        self.lexical_error: Optional[Exception] = None
+        self._read(source)
+        self.pos = 0
+        # The last postfix expression parsed, when it may be assigned to.
+        self._target: Optional[Expr] = None
+        # The token after the last predicted expression; see _predicted.
+        self._prediction_end = -1
+        # Enclosing ifs without an else that end where the statement being
+        # parsed ends, and ifs without an else that end the last statement
+        # controlled by an if, while or for.
+        self._dangling = 0
+        self._open = 0
+        # Statements parsed as blocks although read as struct literals they
+        # fail later: (token after the block, failure as an expression).
+        self._blocks = []
+
+    def _read(self, source):
+        tokens, types = self.tokens, self.types
+        try:
+            while True:
+                token = source.nextToken()
+                tokens.append(token)
+                types.append(token.type)
+                if token.type == EOF:
+                    break
+        except Exception as e:
+            self.lexical_error = e
+            tokens.append(CommonToken(type=_LEXICAL_ERROR))
+            types.append(_LEXICAL_ERROR)
+        # Lookahead past the end stays at the last token.
+        tokens.extend([tokens[-1]] * 3)
+        types.extend([types[-1]] * 3)
+
+    def parse(self) -> Program:
+        try:
+            return self._program()
+        except _Failure as failure:
+            raise self._exception(self._settled(failure)) from None
+
+    def _settled(self, failure: _Failure) -> _Failure:
+        """The failure ANTLR reports, given that one at failure.index ends
+        the reading of a statement as a block started by _block_or_expression
+        before its reading as an expression fails."""
+        for end, as_expression in reversed(self._blocks):
+            if end <= failure.index < as_expression.index:
+                return as_expression
+        return failure
+
+    def _exception(self, failure: _Failure) -> Exception:
+        index = failure.index
+        if self.types[index] == _LEXICAL_ERROR:
+            return self.lexical_error
+        if failure.reach == _DELETION and self.types[index + 1] == _LEXICAL_ERROR:
+            return self.lexical_error
+        if failure.reach == _PREDICTION and self.lexical_error is not None:
+            return self.lexical_error
+        token = self.tokens[index]
+        return SyntaxException(f"Error on line {token.line} col {token.column}: {token.text}")
+
+    # ------------------------------------------------------------------
+    # Tokens
+    # ------------------------------------------------------------------
+
+    def _fail(self, index: int, reach: int) -> _Failure:
+        if index == self._prediction_end:
+            reach = _PREDICTION
+        return _Failure(index, reach)
+
+    def _predicting(self, parse, *args):
+        """Parse a construct that ANTLR's adaptive prediction reads through
+        before choosing an alternative, so that an error in it is
+        reported as a failed prediction."""
+        try:
+            return parse(*args)
+        except _Failure as failure:
+            failure.reach = _PREDICTION
+            raise
+
+    def _predicted(self, parse, *args):
+        """Like _predicting, for a construct after which the prediction
+        reads one more token (a unary expression starting with a primary
+        could be a prefixIncDec without operators, for instance), unless
+        that token ends an alternative."""
+        result = self._predicting(parse, *args)
+        self._prediction_end = self.pos
+        return result
+
+    def _expect(self, kind: int):
+        """Consume a token of the given type and return it."""
+        pos = self.pos
+        if self.types[pos] != kind:
+            raise self._fail(pos, _DELETION)
+        self.pos = pos + 1
+        return self.tokens[pos]
+
+    def _name(self) -> str:
+        return self._expect(IDENTIFIER).text
+
+    # ------------------------------------------------------------------
+    # Declarations
+    # ------------------------------------------------------------------
+
+    def _program(self) -> Program:
+        decls = []
+        types = self.types
+        while True:
+            kind = types[self.pos]
+            if kind == KEYWORD_STRUCT:
+                decls.append(self._struct())
+            elif kind in _DECL_START:
+                decls.append(self._function())
+            elif kind == EOF:
+                break
+            else:
+                raise self._fail(self.pos, _DELETION if not decls else _TOKEN)
+        return _at(Program(decls), self.tokens[0])
+
+    def _struct(self) -> StructDecl:
+        start = self._expect(KEYWORD_STRUCT)
+        name = self._name()
+        self._expect(LEFT_BRACE)
+        members = []
+        while self.types[self.pos] in _TYPE_START:
+            token = self.tokens[self.pos]
+            member_type = self._type()
+            members.append(_at(MemberDecl(member_type, self._name()), token))
+            self._expect(SEMICOLON)
+        if self.types[self.pos] != RIGHT_BRACE:
+            raise self._fail(self.pos, _DELETION if not members else _TOKEN)
+        self.pos += 1
+        self._expect(SEMICOLON)
+        return _at(StructDecl(name, members), start)
+
+    def _type(self) -> Type:
+        token = self.tokens[self.pos]
+        kind = token.type
+        if kind == IDENTIFIER:
+            node = StructType(token.text)
+        elif kind in _PRIMITIVE_TYPES and kind != KEYWORD_VOID:
+            node = _PRIMITIVE_TYPES[kind]()
+        else:
+            raise self._fail(self.pos, _DELETION)
+        self.pos += 1
+        return _at(node, token)
+
+    def _function(self) -> FuncDecl:
+        start = self.tokens[self.pos]
+        kind = start.type
+        return_type = None
+        if kind in _PRIMITIVE_TYPES:
+            return_type = _at(_PRIMITIVE_TYPES[kind](), start)
+            self.pos += 1
+        elif self.types[self.pos + 1] == IDENTIFIER:
+            return_type = self._type()
+        elif self.types[self.pos + 1] != LEFT_PAREN:
+            raise self._fail(self.pos + 1, _PREDICTION)
+        name = self._name()
+        self._expect(LEFT_PAREN)
+        params = []
+        if self.types[self.pos] in _TYPE_START:
+            params.append(self._param())
+            while self.types[self.pos] == COMMA:
+                self.pos += 1
+                params.append(self._param())
+        self._expect(RIGHT_PAREN)
+        return _at(FuncDecl(return_type, name, params, self._block()), start)
+
+    def _param(self) -> Param:
+        token = self.tokens[self.pos]
+        param_type = self._type()
+        return _at(Param(param_type, self._name()), token)
+
+    # ------------------------------------------------------------------
+    # Statements
+    # ------------------------------------------------------------------
+
+    def _block(self) -> BlockStmt:
+        start = self._expect(LEFT_BRACE)
+        statements = []
+        types = self.types
+        dangling = self._dangling
+        self._dangling = 0
+        while types[self.pos] in _STATEMENT_START:
+            statements.append(self._statement())
+        self._dangling = dangling
+        if types[self.pos] != RIGHT_BRACE:
+            raise self._fail(self.pos, _DELETION if not statements else _TOKEN)
+        self.pos += 1
+        self._open = 0
+        return _at(BlockStmt(statements), start)
+
+    def _statements(self) -> List[Stmt]:
+        """The statements of a case or default clause."""
+        statements = []
+        dangling = self._dangling
+        self._dangling = 0
+        while self.types[self.pos] in _STATEMENT_START:
+            statements.append(self._statement())
+        self._dangling = dangling
+        return statements
+
+    def _statement(self) -> Stmt:
+        pos = self.pos
+        kind = self.types[pos]
+        if kind in _VAR_DECL_START or (kind == IDENTIFIER and self.types[pos + 1] == IDENTIFIER):
+            return self._var_decl()
+        if kind == KEYWORD_IF:
+            return self._if()
+        if kind == KEYWORD_WHILE:
+            return self._while()
+        if kind == KEYWORD_FOR:
+            return self._for()
+        if kind == KEYWORD_SWITCH:
+            return self._switch()
+        if kind == KEYWORD_BREAK or kind == KEYWORD_CONTINUE:
+            self.pos += 1
+            self._expect(SEMICOLON)
+            node = BreakStmt() if kind == KEYWORD_BREAK else ContinueStmt()
+            return _at(node, self.tokens[pos])
+        if kind == KEYWORD_RETURN:
+            return self._return()
+        if kind == LEFT_BRACE:
+            after = self.types[pos + 1]
+            if after in _BLOCK_ONLY or (after == IDENTIFIER and self.types[pos + 2] == IDENTIFIER):
+                return self._block()
+            return self._block_or_expression()
+        if kind in _EXPR_START:
+            return self._expression_statement()
+        raise self._fail(pos, _DELETION)
+
+    def _block_or_expression(self) -> Stmt:
+        """A statement starting with '{', which could be a block or a
+        struct literal. ANTLR takes the alternative that parses further,
+        and the block if both stop at the same token. Its prediction
+        follows a block into whatever statements come after it, so when
+        the expression fails after the end of the block, the choice
+        depends on where the parse of the following tokens fails; see
+        _settled."""
+        start = self.pos
+        prediction_end = self._prediction_end
+        try:
+            return self._expression_statement()
+        except _Failure as failure:
+            as_expression = failure
+        self.pos = start
+        self._prediction_end = prediction_end
+        try:
+            block = self._block()
+        except _Failure as failure:
+            raise _further(as_expression, self._settled(failure)) from None
+        if as_expression.index > self.pos:
+            if self.types[self.pos] not in _STATEMENT_FOLLOW:
+                raise as_expression
+            self._blocks.append((self.pos, as_expression))
+        return block
+
+    def _expression_statement(self) -> ExprStmt:
+        token = self.tokens[self.pos]
+        left = self._binary(1)
+        if self.types[self.pos] == ASSIGN and left is self._target:
+            # assignmentStatement or an expressionStatement holding an
+            # assignment: ANTLR reads to the ';' before choosing.
+            try:
+                expr = self._assignment(left, token)
+                self._expect(SEMICOLON)
+            except _Failure as failure:
+                failure.reach = _PREDICTION
+                raise
+        else:
+            expr = self._assigned(left, token)
+            self._expect(SEMICOLON)
+        return _at(ExprStmt(expr), token)
+
+    def _var_decl(self, terminated: bool = True) -> VarDecl:
+        """A variable declaration, or the one of a for init if not
+        terminated. ANTLR predicts which kind of declaration it is from
+        the tokens up to the name, and in a statement declaring a struct
+        variable also the one after it."""
+        token = self.tokens[self.pos]
+        predicted = not terminated or token.type == IDENTIFIER
+        if token.type == KEYWORD_AUTO:
+            self.pos += 1
+            var_type = None
+        else:
+            var_type = self._type()
+        if predicted:
+            self._prediction_end = self.pos
+        name = self._name()
+        if token.type == IDENTIFIER and terminated:
+            self._prediction_end = self.pos
+        init = None
+        if self.types[self.pos] == ASSIGN:
+            self.pos += 1
+            if token.type == IDENTIFIER:
+                self._prediction_end = self.pos
+            init = self._expression()
+        if terminated:
+            self._expect(SEMICOLON)
+        return _at(VarDecl(var_type, name, init), token)
+
+    def _body(self) -> Stmt:
+        """The statement controlled by if, while or for."""
+        if self.types[self.pos] not in _STATEMENT_START:
+            raise self._fail(self.pos, _DELETION)
+        self._open = 0
+        return self._statement()
+
+    def _condition(self) -> Expr:
+        self._expect(LEFT_PAREN)
+        expr = self._expression()
+        self._expect(RIGHT_PAREN)
+        return expr
+
+    def _if(self) -> IfStmt:
+        token = self._expect(KEYWORD_IF)
+        condition = self._condition()
+        dangling = self._dangling
+        self._dangling = dangling + 1
+        then_stmt = self._body()
+        self._dangling = dangling
+        if self.types[self.pos] != KEYWORD_ELSE:
+            self._open += 1
+            return _at(IfStmt(condition, then_stmt), token)
+        self.pos += 1
+        if not dangling:
+            else_stmt = self._body()
+        else:
+            # An enclosing if could take the else as well; ANTLR reads
+            # the statement to choose, and one token on while two ifs
+            # could still take an else after it.
+            else_stmt = self._predicting(self._body)
+            if dangling + self._open > 1:
+                self._prediction_end = self.pos
+        return _at(IfStmt(condition, then_stmt, else_stmt), token)
+
+    def _while(self) -> WhileStmt:
+        token = self._expect(KEYWORD_WHILE)
+        condition = self._condition()
+        return _at(WhileStmt(condition, self._body()), token)
+
+    def _for(self) -> ForStmt:
+        token = self._expect(KEYWORD_FOR)
+        self._expect(LEFT_PAREN)
+        init = None
+        kind = self.types[self.pos]
+        if kind in _FOR_INIT_START:
+            init = self._for_init()
+        self._expect(SEMICOLON)
+        condition = None
+        if self.types[self.pos] in _EXPR_START:
+            condition = self._expression()
+        self._expect(SEMICOLON)
+        update = None
+        if self.types[self.pos] in _FOR_UPDATE_START:
+            update = self._for_update()
+        self._expect(RIGHT_PAREN)
+        return _at(ForStmt(init, condition, update, self._body()), token)
+
+    def _for_init(self) -> Stmt:
+        pos = self.pos
+        kind = self.types[pos]
+        if kind in _VAR_DECL_START or (kind == IDENTIFIER and self.types[pos + 1] == IDENTIFIER):
+            return self._var_decl(terminated=False)
+        token = self.tokens[pos]
+        if kind == IDENTIFIER:
+            self._prediction_end = pos + 1
+        target = self._target_expression()
+        return _at(ExprStmt(self._assignment(target, token)), token)
+
+    def _for_update(self) -> Expr:
+        token = self.tokens[self.pos]
+        if self.types[self.pos] in _INC_DEC:
+            return self._prefix_inc_dec(update=True)
+        operand = self._predicted(self._postfix, True)
+        if self.types[self.pos] == ASSIGN:
+            if operand is not self._target:
+                raise self._fail(self.pos, _DELETION)
+            return self._assignment(operand, token)
+        if self.types[self.pos] not in _INC_DEC:
+            raise self._fail(self.pos, _DELETION)
+        return self._postfix_inc_dec(operand, token)
+
+    def _switch(self) -> SwitchStmt:
+        token = self._expect(KEYWORD_SWITCH)
+        expr = self._condition()
+        self._expect(LEFT_BRACE)
+        cases = []
+        default = None
+        # Cases after the default clause, in the grammar's second loop.
+        later = 0
+        while True:
+            clause = self.tokens[self.pos]
+            kind = clause.type
+            if kind == KEYWORD_CASE and default is None:
+                # A case could belong to either loop of caseClause* defaultClause?
+                # caseClause*, so ANTLR reads on to the default or the '}'.
+                cases.append(self._predicted(self._case))
+            elif kind == KEYWORD_CASE:
+                cases.append(self._case())
+                later += 1
+            elif kind == KEYWORD_DEFAULT and default is None:
+                self.pos += 1
+                self._expect(COLON)
+                default = _at(DefaultStmt(self._statements()), clause)
+            elif kind == RIGHT_BRACE:
+                self.pos += 1
+                self._open = 0
+                return _at(SwitchStmt(expr, cases, default), token)
+            else:
+                raise self._fail(self.pos, _TOKEN if later else _DELETION)
+
+    def _case(self) -> CaseStmt:
+        token = self._expect(KEYWORD_CASE)
+        value = self._expression()
+        self._expect(COLON)
+        return _at(CaseStmt(value, self._statements()), token)
+
+    def _return(self) -> ReturnStmt:
+        token = self._expect(KEYWORD_RETURN)
+        expr = None
+        if self.types[self.pos] != SEMICOLON:
+            if self.types[self.pos] not in _EXPR_START:
+                raise self._fail(self.pos, _DELETION)
+            expr = self._expression()
+        self._expect(SEMICOLON)
+        return _at(ReturnStmt(expr), token)
+
+    # ------------------------------------------------------------------
+    # Expressions
+    # ------------------------------------------------------------------
+
+    def _expression(self) -> Expr:
+        token = self.tokens[self.pos]
+        return self._assigned(self._binary(1), token)
+
+    def _assigned(self, left: Expr, token) -> Expr:
+        """left, or the assignment to it if '=' follows."""
+        if self.types[self.pos] != ASSIGN:
+            return left
+        if left is not self._target:
+            raise self._fail(self.pos, _DELETION)
+        return self._assignment(left, token)
+
+    def _assignment(self, target: Expr, token) -> AssignExpr:
+        self._expect(ASSIGN)
+        return _at(AssignExpr(target, self._expression()), token)
+
+    def _binary(self, level: int) -> Expr:
+        token = self.tokens[self.pos]
+        left = self._unary()
+        types = self.types
+        precedence = _PRECEDENCE
+        while True:
+            op = precedence.get(types[self.pos], 0)
+            if op < level:
+                return left
+            operator = self.tokens[self.pos].text
+            self.pos += 1
+            left = _at(BinaryOp(left, operator, self._binary(op + 1)), token)
+
+    def _unary(self) -> Expr:
+        token = self.tokens[self.pos]
+        kind = token.type
+        if kind == LOGICAL_NOT or kind == MINUS or kind == PLUS:
+            self.pos += 1
+            return _at(PrefixOp(token.text, self._unary()), token)
+        if kind in _INC_DEC:
+            return self._prefix_inc_dec()
+        if kind in _PRIMARY_START:
+            return self._predicted(self._postfix)
+        raise self._fail(self.pos, _DELETION)
+
+    def _prefix_inc_dec(self, update: bool = False) -> Expr:
+        """'++' and '--' applied to a postfix expression, or in a for
+        update to an operand that may be followed by more of them."""
+        token = self.tokens[self.pos]
+        self.pos += 1
+        if self.types[self.pos] in _INC_DEC:
+            operand = self._prefix_inc_dec(update)
+        elif update:
+            start = self.tokens[self.pos]
+            operand = self._predicting(self._postfix, True)
+            if self.types[self.pos] in _INC_DEC:
+                operand = self._postfix_inc_dec(operand, start)
+        elif self.types[self.pos] == LEFT_PAREN:
+            # '(' expression ')' or a postfix expression starting with one
+            operand = self._postfix(predicted=True)
+        else:
+            operand = self._postfix()
+        return _at(PrefixOp(token.text, operand), token)
+
+    def _postfix_inc_dec(self, operand: Expr, token) -> Expr:
+        types = self.types
+        while types[self.pos] in _INC_DEC:
+            operand = _at(PostfixOp(self.tokens[self.pos].text, operand), token)
+            self.pos += 1
+        return operand
+
+    def _postfix(self, update: bool = False, predicted: bool = False) -> Expr:
+        """primary ('(' args ')')? ('.' IDENTIFIER)* ('++' | '--')*; the
+        trailing operators are left to the caller in a for update, and
+        the primary is read by a prediction if predicted. Sets _target to
+        the result when it has the form of an assignment target."""
+        token = self.tokens[self.pos]
+        kind = token.type
+        types = self.types
+        if kind == IDENTIFIER:
+            self.pos += 1
+            expr = _at(Identifier(token.text), token)
+        elif kind in _LITERALS:
+            self.pos += 1
+            expr = _at(_LITERALS[kind](token.text), token)
+        elif kind == LEFT_PAREN:
+            self.pos += 1
+            if predicted:
+                expr = self._predicting(self._parenthesized)
+            else:
+                expr = self._parenthesized()
+        elif kind == LEFT_BRACE:
+            expr = self._struct_literal()
+        else:
+            raise self._fail(self.pos, _PREDICTION)
+        called = types[self.pos] == LEFT_PAREN
+        if called:
+            callee = self._source_text(token)
+            expr = _at(FuncCall(callee, self._arguments()), token)
+        members = 0
+        while types[self.pos] == DOT:
+            self.pos += 1
+            expr = _at(MemberAccess(expr, self._name()), token)
+            members += 1
+        if kind == IDENTIFIER:
+            target = members > 0 or not called
+        else:
+            target = members > 0 and not called
+        if not update and types[self.pos] in _INC_DEC:
+            expr = self._postfix_inc_dec(expr, token)
+            target = False
+        self._target = expr if target else None
+        return expr
+
+    def _parenthesized(self) -> Expr:
+        expr = self._expression()
+        self._expect(RIGHT_PAREN)
+        return expr
+
+    def _source_text(self, start) -> str:
+        """Text of the tokens from start to the current one, as the name
+        of a called expression (an identifier, unless the program calls
+        something else, which the grammar allows)."""
+        if start is self.tokens[self.pos - 1]:
+            return start.text
+        index = self.tokens.index(start, 0, self.pos)
+        return "".join(t.text for t in self.tokens[index:self.pos])
+
+    def _arguments(self) -> List[Expr]:
+        self._expect(LEFT_PAREN)
+        args = []
+        if self.types[self.pos] in _EXPR_START:
+            args.append(self._expression())
+            while self.types[self.pos] == COMMA:
+                self.pos += 1
+                args.append(self._expression())
+        self._expect(RIGHT_PAREN)
+        return args
+
+    def _struct_literal(self) -> StructLiteral:
+        token = self._expect(LEFT_BRACE)
+        values = []
+        if self.types[self.pos] in _EXPR_START:
+            values.append(self._expression())
+            while self.types[self.pos] == COMMA:
+                self.pos += 1
+                values.append(self._expression())
+        self._expect(RIGHT_BRACE)
+        return _at(StructLiteral(values), token)
+
+    def _target_expression(self) -> Expr:
+        """An assignment target (lhs in the grammar)."""
+        token = self.tokens[self.pos]
+        kind = token.type
+        types = self.types
+        if kind == IDENTIFIER:
+            self.pos += 1
+            expr = _at(Identifier(token.text), token)
+            required = types[self.pos] == LEFT_PAREN
+            if required:
+                expr = _at(FuncCall(token.text, self._arguments()), token)
+        else:
+            if kind in _LITERALS:
+                self.pos += 1
+                expr = _at(_LITERALS[kind](token.text), token)
+            elif kind == LEFT_PAREN:
+                self.pos += 1
+                expr = self._expression()
+                self._expect(RIGHT_PAREN)
+            else:
+                expr = self._struct_literal()
+            required = True
+        if required:
+            self._expect(DOT)
+            expr = _at(MemberAccess(expr, self._name()), token)
+        while types[self.pos] == DOT:
+            self.pos += 1
+            expr = _at(MemberAccess(expr, self._name()), token)
+        return expr
+
+
+def parse_program(source: Union[str, InputStream, "TyCScanner"]) -> Program:
+    """Parse TyC source to its AST with the hand-written front end."""
+    return ASTParser(source).parse()
@@ -0,0 +1,104 @@
+"""
+Recovering parse for TyC.
+By default the front end stops at the first error: the lexers raise on a
+bad lexeme and NewErrorListener raises on a syntax error. collect_errors()
+reports every error of a source in one pass instead, up to a limit:
+
+- RecoveringLexer turns each bad lexeme into a token on the hidden
+  channel, which the parser never sees, and reports it with the message
+  the lexer would raise;
+- TyCParser recovers from syntax errors with ANTLR's default strategy,
+  resynchronising on a token that can follow the rule it failed in, and
+  CollectingErrorListener records each one.
+
+Lexical errors are found as the parser reads ahead, so the diagnostics
+are returned sorted by position.
+"""
+
+from typing import List, Optional
+
+from antlr4 import CommonTokenStream
+from antlr4.Token import CommonToken, Token
+from build.TyCLexer import TyCLexer
+from build.TyCParser import TyCParser
+from src.frontend.charstream import CodePointStream
+from src.frontend.scanner import TyCScanner
+from src.frontend.tokens import ERROR_CHAR, ILLEGAL_ESCAPE, UNCLOSE_STRING
+from src.grammar.lexererr import ErrorToken, IllegalEscape, LexerError, UncloseString
+from src.utils.error_listener import CollectingErrorListener, Diagnostic, TooManyErrors
+
+# TyCLexer raises the classes of build/lexererr.py, copies of these.
+_ERROR_TYPES = {
+    ErrorToken.__name__: ERROR_CHAR,
+    IllegalEscape.__name__: ILLEGAL_ESCAPE,
+    UncloseString.__name__: UNCLOSE_STRING,
+}
+
+
+def lexical_error(token: Token) -> LexerError:
+    """The error TyCLexer raises for a bad lexeme, given its token."""
+    text = token.text
+    if token.type == ERROR_CHAR:
+        return ErrorToken(text)
+    if token.type == ILLEGAL_ESCAPE:
+        return IllegalEscape(text[1:])
+    for end in ("\r\n", "\n", "\r"):
+        if text.endswith(end):
+            text = text[:-len(end)]
+            break
+    return UncloseString(text[1:])
+
+
+class RecoveringLexer:
+    """Token source reporting the lexical errors of a TyCScanner made with
+    recover=True, or of a TyCLexer, to an error listener, and passing them
+    on as hidden tokens."""
+
+    def __init__(self, lexer, listener: CollectingErrorListener):
+        self.lexer = lexer
+        self.listener = listener
+
+    def __getattr__(self, name):
+        return getattr(self.lexer, name)
+
+    def nextToken(self) -> Token:
+        try:
+            token = self.lexer.nextToken()
+        except Exception as error:
+            if type(error).__name__ not in _ERROR_TYPES:
+                raise
+            token = self._error_token(error)
+            self.listener.add(token.line, token.column, str(error))
+            return token
+        if token.channel == Token.HIDDEN_CHANNEL:
+            self.listener.add(token.line, token.column, str(lexical_error(token)))
+        return token
+
+    def _error_token(self, error: Exception) -> Token:
+        """A hidden token for the lexeme TyCLexer raised the error on."""
+        lexer = self.lexer
+        start, stop = lexer._tokenStartCharIndex, lexer._input.index - 1
+        token = CommonToken(lexer._tokenFactorySourcePair, _ERROR_TYPES[type(error).__name__], Token.HIDDEN_CHANNEL, start, stop)
+        token.line = lexer._tokenStartLine
+        token.column = lexer._tokenStartColumn
+        token.text = lexer._input.getText(start, stop)
+        return token
+
+
+def collect_errors(source: str, limit: Optional[int] = None, lexer: str = "scanner") -> List[Diagnostic]:
+    """Every lexical and syntax error of a source, or the first limit of
+    them found, sorted by position. lexer is "scanner" or "antlr", as in
+    src.compiler.parse."""
+    listener = CollectingErrorListener(limit)
+    if lexer == "scanner":
+        token_source = TyCScanner(source, recover=True)
+    else:
+        token_source = TyCLexer(CodePointStream(source))
+    parser = TyCParser(CommonTokenStream(RecoveringLexer(token_source, listener)))
+    parser.removeErrorListeners()
+    parser.addErrorListener(listener)
+    try:
+        parser.program()
+    except TooManyErrors:
+        pass
+    return sorted(listener.diagnostics, key=lambda d: (d.line, d.column))
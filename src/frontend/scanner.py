@@ -0,0 +1,221 @@
+"""
+Hand-written scanner for TyC.
+TyCScanner produces the tokens the generated TyCLexer produces, with the
+same types, texts, positions and errors, but matches each token with one
+regular expression instead of walking the lexer ATN one code point at a
+time.
+
+The expression is an alternation ordered so that, at every position, the
+first alternative to match is the one ANTLR's longest-match rule picks:
+comments before '/', floats before ints and '.', two-character operators
+before their prefixes, and a catch-all single character last. String
+literals are matched up to the first character that cannot continue
+them; that character decides between STRING_LITERAL, ILLEGAL_ESCAPE and
+UNCLOSE_STRING, which raise the lexererr exceptions of TyC.g4's actions.
+
+The scanner is a token source: CommonTokenStream(TyCScanner(source)) can
+be given to TyCParser in place of the generated lexer. Tokens are made
+lazily, so a lexical error surfaces at the same point of the parse as
+with TyCLexer.
+
+With recover=True, lexical errors are not raised: each bad lexeme becomes
+an ILLEGAL_ESCAPE, UNCLOSE_STRING or ERROR_CHAR token on the hidden
+channel, spanning what TyCLexer consumes before raising, and scanning
+goes on after it (see src.frontend.recovery).
+"""
+
+import re
+from typing import Iterator, List, Union
+
+from antlr4 import InputStream
+from antlr4.CommonTokenFactory import CommonTokenFactory
+from antlr4.Token import CommonToken, Token
+
+from src.frontend.charstream import CodePointStream
+from src.frontend.tokens import (
+    EOF,
+    ERROR_CHAR,
+    FLOAT_LITERAL,
+    IDENTIFIER,
+    ILLEGAL_ESCAPE,
+    INT_LITERAL,
+    KEYWORDS,
+    OPERATORS,
+    STRING_LITERAL,
+    SYMBOLIC_NAMES,
+    UNCLOSE_STRING,
+)
+from src.grammar.lexererr import ErrorToken, IllegalEscape, LexerError, UncloseString
+
+_STR_BODY = r'"[^"\\\r\n]*(?:\\[bfrnt"\\][^"\\\r\n]*)*'
+_EXPONENT = r"(?:[eE][+-]?[0-9]+)"
+
+# One group per kind of token, in priority order; see the module docstring.
+_TOKEN = re.compile(
+    "|".join([
+        r"([ \t\r\n\f]+)",
+        r"(//[^\r\n]*|/\*[\s\S]*?\*/)",
+        r"([a-zA-Z_][a-zA-Z0-9_]*)",
+        rf"([0-9]+\.[0-9]*{_EXPONENT}?|\.[0-9]+{_EXPONENT}?|[0-9]+{_EXPONENT})",
+        r"([0-9]+)",
+        rf"({_STR_BODY})",
+        r"(\+\+|--|==|!=|<=|>=|&&|\|\||[-+*/%=<>!.(){};,:])",
+        r"(.)",
+    ]),
+    re.DOTALL,
+)
+_SKIP, _NAME, _FLOAT, _INT, _STRING, _OPERATOR = 2, 3, 4, 5, 6, 7
+
+
+class ScannedToken(CommonToken):
+    """A CommonToken built in one step, with its text set."""
+
+    def __init__(self, source, type: int, start: int, stop: int, line: int, column: int, text: str):
+        self.source = source
+        self.type = type
+        self.channel = 0
+        self.start = start
+        self.stop = stop
+        self.tokenIndex = -1
+        self.line = line
+        self.column = column
+        self._text = text
+
+
+class TyCScanner:
+    """Token source equivalent to the generated TyCLexer."""
+
+    symbolicNames = SYMBOLIC_NAMES
+
+    def __init__(
+        self,
+        source: Union[str, InputStream, CodePointStream],
+        name: str = "<string>",
+        line: int = 1,
+        column: int = 0,
+        recover: bool = False,
+    ):
+        """line and column are the position of the start of source, when
+        it is a piece of a larger file; tokens are placed in that file."""
+        if isinstance(source, (InputStream, CodePointStream)):
+            name = source.name
+            source = str(source)
+        self.source = source
+        self.name = name
+        # Position of the start of the source, then of its end once the
+        # scanner has reached it.
+        self.line = line
+        self.column = column
+        self.recover = recover
+        self._factory = CommonTokenFactory.DEFAULT
+        self._pair = (self, None)
+        self._tokens = self._scan()
+
+    def getSourceName(self) -> str:
+        return self.name
+
+    def nextToken(self) -> CommonToken:
+        return next(self._tokens)
+
+    def tokens(self) -> List[CommonToken]:
+        """Every token up to and including EOF."""
+        tokens = []
+        for token in self._tokens:
+            tokens.append(token)
+            if token.type == EOF:
+                return tokens
+
+    def _scan(self) -> Iterator[CommonToken]:
+        source = self.source
+        size = len(source)
+        match = _TOKEN.match
+        keyword = KEYWORDS.get
+        operators = OPERATORS
+        pair = self._pair
+        line, line_start, pos = self.line, -self.column, 0
+        while pos < size:
+            m = match(source, pos)
+            kind = m.lastindex
+            end = m.end()
+            if kind <= _SKIP:
+                newlines = source.count("\n", pos, end)
+                if newlines:
+                    line += newlines
+                    line_start = source.rfind("\n", pos, end) + 1
+                pos = end
+                continue
+            if kind == _NAME:
+                text = m.group()
+                kind = keyword(text, IDENTIFIER)
+            elif kind == _OPERATOR:
+                text = m.group()
+                kind = operators[text]
+            elif kind == _INT:
+                text = m.group()
+                kind = INT_LITERAL
+            elif kind == _FLOAT:
+                text = m.group()
+                kind = FLOAT_LITERAL
+            elif kind == _STRING:
+                try:
+                    text = self._string(pos, end)
+                except LexerError:
+                    if not self.recover:
+                        raise
+                    kind, end = self._bad_string(end)
+                    yield self._error_token(kind, pos, end, line, pos - line_start)
+                    if source[end - 1] == "\n":
+                        line += 1
+                        line_start = end
+                    pos = end
+                    continue
+                kind = STRING_LITERAL
+                end += 1
+            elif self.recover:
+                yield self._error_token(ERROR_CHAR, pos, end, line, pos - line_start)
+                pos = end
+                continue
+            else:
+                raise ErrorToken(m.group())
+            yield ScannedToken(pair, kind, pos, end - 1, line, pos - line_start, text)
+            pos = end
+        self.line, self.column = line, pos - line_start
+        while True:
+            yield ScannedToken(pair, EOF, pos, pos - 1, self.line, self.column, "<EOF>")
+
+    def _string(self, start: int, end: int) -> str:
+        """Text of the string literal whose body runs from start to end,
+        or the error its next character makes it."""
+        source = self.source
+        body = source[start + 1:end]
+        stop = source[end:end + 1]
+        if stop == '"':
+            return body
+        if stop == "\\":
+            escape = source[end + 1:end + 2]
+            if escape and escape not in "\r\n":
+                raise IllegalEscape(body + stop + escape)
+            body += stop
+        raise UncloseString(body)
+
+    def _error_token(self, kind: int, start: int, end: int, line: int, column: int) -> CommonToken:
+        """A hidden token for the bad lexeme from start to end."""
+        token = ScannedToken(self._pair, kind, start, end - 1, line, column, self.source[start:end])
+        token.channel = Token.HIDDEN_CHANNEL
+        return token
+
+    def _bad_string(self, end: int):
+        """Type and end of the bad string token whose body ends at end:
+        an illegal escape ends after the escaped character, an unclosed
+        string after the line break that ends it, if any."""
+        source = self.source
+        if source[end:end + 1] == "\\":
+            escape = source[end + 1:end + 2]
+            if escape and escape not in "\r\n":
+                return ILLEGAL_ESCAPE, end + 2
+            end += 1
+        if source.startswith("\r\n", end):
+            return UNCLOSE_STRING, end + 2
+        if source[end:end + 1] in ("\r", "\n"):
+            return UNCLOSE_STRING, end + 1
+        return UNCLOSE_STRING, end
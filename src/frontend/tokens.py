@@ -0,0 +1,123 @@
+"""
+Token types of the TyC language.
+The numbers are the ones ANTLR assigns to the lexer rules of TyC.g4 (see
+build/TyC.tokens), so tokens from the hand-written front end and from the
+generated TyCLexer are interchangeable.
+"""
+
+from typing import Dict, List
+
+KEYWORD_AUTO = 1
+KEYWORD_BREAK = 2
+KEYWORD_CASE = 3
+KEYWORD_CONTINUE = 4
+KEYWORD_DEFAULT = 5
+KEYWORD_ELSE = 6
+KEYWORD_FLOAT = 7
+KEYWORD_FOR = 8
+KEYWORD_IF = 9
+KEYWORD_INT = 10
+KEYWORD_RETURN = 11
+KEYWORD_STRING = 12
+KEYWORD_STRUCT = 13
+KEYWORD_SWITCH = 14
+KEYWORD_VOID = 15
+KEYWORD_WHILE = 16
+IDENTIFIER = 17
+INT_LITERAL = 18
+FLOAT_LITERAL = 19
+STRING_LITERAL = 20
+PLUS = 21
+MINUS = 22
+MULTIPLY = 23
+DIVIDE = 24
+MODULO = 25
+ASSIGN = 26
+EQUAL = 27
+NOT_EQUAL = 28
+LESS_THAN = 29
+LESS_EQUAL = 30
+GREATER_THAN = 31
+GREATER_EQUAL = 32
+LOGICAL_AND = 33
+LOGICAL_OR = 34
+LOGICAL_NOT = 35
+INCREMENT = 36
+DECREMENT = 37
+DOT = 38
+LEFT_PAREN = 39
+RIGHT_PAREN = 40
+LEFT_BRACE = 41
+RIGHT_BRACE = 42
+SEMICOLON = 43
+COMMA = 44
+COLON = 45
+WS = 46
+LINE_COMMENT = 47
+BLOCK_COMMENT = 48
+ILLEGAL_ESCAPE = 49
+UNCLOSE_STRING = 50
+ERROR_CHAR = 51
+EOF = -1
+
+SYMBOLIC_NAMES: List[str] = [
+    "<INVALID>",
+    "KEYWORD_AUTO", "KEYWORD_BREAK", "KEYWORD_CASE", "KEYWORD_CONTINUE",
+    "KEYWORD_DEFAULT", "KEYWORD_ELSE", "KEYWORD_FLOAT", "KEYWORD_FOR",
+    "KEYWORD_IF", "KEYWORD_INT", "KEYWORD_RETURN", "KEYWORD_STRING",
+    "KEYWORD_STRUCT", "KEYWORD_SWITCH", "KEYWORD_VOID", "KEYWORD_WHILE",
+    "IDENTIFIER", "INT_LITERAL", "FLOAT_LITERAL", "STRING_LITERAL",
+    "PLUS", "MINUS", "MULTIPLY", "DIVIDE", "MODULO", "ASSIGN", "EQUAL",
+    "NOT_EQUAL", "LESS_THAN", "LESS_EQUAL", "GREATER_THAN", "GREATER_EQUAL",
+    "LOGICAL_AND", "LOGICAL_OR", "LOGICAL_NOT", "INCREMENT", "DECREMENT",
+    "DOT", "LEFT_PAREN", "RIGHT_PAREN", "LEFT_BRACE", "RIGHT_BRACE",
+    "SEMICOLON", "COMMA", "COLON", "WS", "LINE_COMMENT", "BLOCK_COMMENT",
+    "ILLEGAL_ESCAPE", "UNCLOSE_STRING", "ERROR_CHAR",
+]
+
+KEYWORDS: Dict[str, int] = {
+    "auto": KEYWORD_AUTO,
+    "break": KEYWORD_BREAK,
+    "case": KEYWORD_CASE,
+    "continue": KEYWORD_CONTINUE,
+    "default": KEYWORD_DEFAULT,
+    "else": KEYWORD_ELSE,
+    "float": KEYWORD_FLOAT,
+    "for": KEYWORD_FOR,
+    "if": KEYWORD_IF,
+    "int": KEYWORD_INT,
+    "return": KEYWORD_RETURN,
+    "string": KEYWORD_STRING,
+    "struct": KEYWORD_STRUCT,
+    "switch": KEYWORD_SWITCH,
+    "void": KEYWORD_VOID,
+    "while": KEYWORD_WHILE,
+}
+
+OPERATORS: Dict[str, int] = {
+    "+": PLUS,
+    "-": MINUS,
+    "*": MULTIPLY,
+    "/": DIVIDE,
+    "%": MODULO,
+    "=": ASSIGN,
+    "==": EQUAL,
+    "!=": NOT_EQUAL,
+    "<": LESS_THAN,
+    "<=": LESS_EQUAL,
+    ">": GREATER_THAN,
+    ">=": GREATER_EQUAL,
+    "&&": LOGICAL_AND,
+    "||": LOGICAL_OR,
+    "!": LOGICAL_NOT,
+    "++": INCREMENT,
+    "--": DECREMENT,
+    ".": DOT,
+    "(": LEFT_PAREN,
+    ")": RIGHT_PAREN,
+    "{": LEFT_BRACE,
+    "}": RIGHT_BRACE,
+    ";": SEMICOLON,
+    ",": COMMA,
+    ":": COLON,
+}
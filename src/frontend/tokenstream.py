@@ -0,0 +1,145 @@
+"""
+Sliding-window token stream for TyC.
+CommonTokenStream keeps every token of the input until the parse ends.
+WindowTokenStream gives TyCParser the same tokens, with the same token
+indexes (the TyC lexer puts no token off the default channel), but keeps
+only the ones the parser can still look at:
+
+- every token from the oldest outstanding mark on, since adaptive
+  prediction marks the stream, reads ahead as far as the decision needs
+  and seeks back to the mark;
+- the token before the current one, read by LT(-1) when a rule exits;
+- the tokens already fetched ahead of the current one.
+
+Everything older is dropped in batches as the parser consumes. The
+window is therefore as long as the longest prediction, at most one
+statement or declaration of TyC, whatever the size of the file. With
+src.astgen.streaming dropping the parse tree of each declaration, a
+parse runs in memory bounded by the largest declaration.
+
+Reporting a syntax error reads the rest of the input, as
+CommonTokenStream.getText() does, so that a later lexical error is
+reported instead in the same cases. Only the tokens of a failing parse
+are ever all held.
+"""
+
+from typing import List, Optional
+
+from antlr4.Token import Token
+
+# Dropped tokens are deleted from the window once there are this many.
+_DROP = 1024
+
+
+class WindowTokenStream:
+    """TokenStream keeping a bounded window of tokens."""
+
+    def __init__(self, token_source):
+        self.tokenSource = token_source
+        self._tokens: List[Token] = []
+        # Index of the first token in the window, and of the current one.
+        self._base = 0
+        self._index = 0
+        self._marks: List[int] = []
+        self._done = False
+
+    @property
+    def index(self) -> int:
+        return self._index
+
+    @property
+    def window(self) -> int:
+        """Number of tokens held."""
+        return len(self._tokens)
+
+    def getTokenSource(self):
+        return self.tokenSource
+
+    def getSourceName(self) -> str:
+        return self.tokenSource.getSourceName()
+
+    def mark(self) -> int:
+        self._marks.append(self._index)
+        return self._index
+
+    def release(self, marker: int):
+        self._marks.remove(marker)
+
+    def reset(self):
+        self.seek(0)
+
+    def seek(self, index: int):
+        if index < self._base:
+            raise IndexError(f"token {index} is no longer in the window")
+        self._fetch(index)
+        self._index = min(index, self._base + len(self._tokens) - 1)
+
+    def consume(self):
+        if self.LA(1) == Token.EOF:
+            raise Exception("cannot consume EOF")
+        self._index += 1
+        self._fetch(self._index)
+        if not self._marks and self._index - self._base > _DROP:
+            self._drop(self._index - 1)
+
+    def get(self, index: int) -> Token:
+        if index < self._base:
+            raise IndexError(f"token {index} is no longer in the window")
+        self._fetch(index)
+        return self._tokens[index - self._base]
+
+    def LT(self, offset: int) -> Optional[Token]:
+        if offset == 0:
+            return None
+        if offset < 0:
+            index = self._index + offset
+            if index < 0:
+                return None
+            return self.get(index)
+        index = self._index + offset - 1
+        self._fetch(index)
+        last = self._base + len(self._tokens) - 1
+        return self._tokens[min(index, last) - self._base]
+
+    def LA(self, offset: int) -> int:
+        return self.LT(offset).type
+
+    def getText(self, start=None, stop=None) -> str:
+        """Text of the tokens from start to stop, after reading the rest of
+        the input (see the module docstring)."""
+        self.fill()
+        if isinstance(start, Token):
+            start = start.tokenIndex
+        elif start is None:
+            start = self._base
+        if isinstance(stop, Token):
+            stop = stop.tokenIndex
+        elif stop is None:
+            stop = self._base + len(self._tokens) - 1
+        start = max(start, self._base)
+        stop = min(stop, self._base + len(self._tokens) - 1)
+        return "".join(
+            t.text for t in self._tokens[start - self._base:stop - self._base + 1]
+            if t.type != Token.EOF
+        )
+
+    def fill(self):
+        """Read every remaining token into the window."""
+        while not self._done:
+            self._add()
+
+    def _fetch(self, index: int):
+        """Read tokens until the window reaches index, or EOF."""
+        while not self._done and self._base + len(self._tokens) <= index:
+            self._add()
+
+    def _add(self):
+        token = self.tokenSource.nextToken()
+        token.tokenIndex = self._base + len(self._tokens)
+        self._tokens.append(token)
+        self._done = token.type == Token.EOF
+
+    def _drop(self, index: int):
+        """Forget the tokens before index."""
+        del self._tokens[:index - self._base]
+        self._base = index
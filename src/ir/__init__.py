@@ -0,0 +1,3 @@
+"""
+Intermediate representation for TyC programs
+"""
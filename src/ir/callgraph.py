@@ -0,0 +1,97 @@
+"""
+Call graph of a TyC program.
+Nodes are the functions with a CFG; calls to builtins and to unknown
+functions are recorded per function but have no node.
+"""
+
+from typing import Dict, List, Set
+
+from src.ir.cfg import CFG
+from src.ir.instructions import Call
+
+
+class CallGraph:
+    """Direct call edges between the functions of a program."""
+
+    def __init__(self, cfgs: Dict[str, CFG]):
+        self.functions = list(cfgs)
+        self.callees: Dict[str, Set[str]] = {name: set() for name in cfgs}
+        self.external: Dict[str, Set[str]] = {name: set() for name in cfgs}
+        self.callers: Dict[str, Set[str]] = {name: set() for name in cfgs}
+        for name, cfg in cfgs.items():
+            for block in cfg.blocks:
+                for instr in block.instructions:
+                    if not isinstance(instr, Call):
+                        continue
+                    if instr.func in cfgs:
+                        self.callees[name].add(instr.func)
+                        self.callers[instr.func].add(name)
+                    else:
+                        self.external[name].add(instr.func)
+        self._components = self._strongly_connected_components()
+        self._component_of = {
+            name: i for i, component in enumerate(self._components) for name in component
+        }
+
+    def _strongly_connected_components(self) -> List[List[str]]:
+        """Tarjan's algorithm, iteratively; components come out callees
+        first."""
+        index: Dict[str, int] = {}
+        low: Dict[str, int] = {}
+        on_stack: Set[str] = set()
+        stack: List[str] = []
+        components: List[List[str]] = []
+        for root in self.functions:
+            if root in index:
+                continue
+            work = [(root, iter(sorted(self.callees[root])))]
+            index[root] = low[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            while work:
+                node, it = work[-1]
+                for callee in it:
+                    if callee not in index:
+                        index[callee] = low[callee] = len(index)
+                        stack.append(callee)
+                        on_stack.add(callee)
+                        work.append((callee, iter(sorted(self.callees[callee]))))
+                        break
+                    if callee in on_stack:
+                        low[node] = min(low[node], index[callee])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        low[parent] = min(low[parent], low[node])
+                    if low[node] == index[node]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member == node:
+                                break
+                        components.append(component)
+        return components
+
+    def bottom_up(self) -> List[str]:
+        """Functions ordered so that callees come before their callers,
+        except within a cycle of mutually recursive functions."""
+        return [name for component in self._components for name in component]
+
+    def is_recursive(self, name: str) -> bool:
+        """True if name can call itself, directly or through others."""
+        component = self._components[self._component_of[name]]
+        return len(component) > 1 or name in self.callees[name]
+
+    def reachable_from(self, root: str) -> Set[str]:
+        """Functions that root can call, directly or not, and root itself."""
+        seen = {root}
+        work = [root]
+        while work:
+            for callee in self.callees.get(work.pop(), ()):
+                if callee not in seen:
+                    seen.add(callee)
+                    work.append(callee)
+        return seen
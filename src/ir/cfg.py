@@ -0,0 +1,700 @@
+"""
+Control-flow graph construction for TyC functions.
+This module lowers the body of each FuncDecl into basic blocks of
+three-address instructions connected by explicit edges.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from src.utils.nodes import *
+from src.utils.visitor import BaseVisitor
+from src.ir.instructions import *
+from src.runtime.operators import BINARY_OPS, TRAPPING, UNARY_OPS
+
+
+class CFGError(Exception):
+    def __init__(self, msg):
+        self.message = msg
+        super().__init__(msg)
+
+
+class BasicBlock:
+    """Straight-line sequence of instructions ending in a terminator."""
+
+    __slots__ = ("id", "instructions", "terminator")
+
+    def __init__(self, block_id: int):
+        self.id = block_id
+        self.instructions: List[Instruction] = []
+        self.terminator: Optional[Terminator] = None
+
+    def __str__(self):
+        lines = [f"B{self.id}:"]
+        lines.extend(f"  {instr}" for instr in self.instructions)
+        if self.terminator is not None:
+            lines.append(f"  {self.terminator}")
+        return "\n".join(lines)
+
+
+class CFG:
+    """Control-flow graph of a single TyC function.
+    Blocks are indexed by their integer id; succs[b] and preds[b] are the
+    adjacency arrays of block b. The entry block is always block 0.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        params: List[str],
+        blocks: List[BasicBlock],
+        var_types: Optional[Dict[str, Optional[Type]]] = None,
+        return_type: Optional[Type] = None,
+    ):
+        self.name = name
+        self.params = params
+        self.blocks = blocks
+        self.var_types = var_types if var_types is not None else {}
+        self.return_type = return_type
+        self.entry = 0
+        self.ssa = False
+        self.succs: List[List[int]] = []
+        self.preds: List[List[int]] = []
+        self.compute_edges()
+
+    def compute_edges(self):
+        """Rebuild the adjacency arrays from the block terminators."""
+        n = len(self.blocks)
+        succs = [[] for _ in range(n)]
+        preds = [[] for _ in range(n)]
+        for block in self.blocks:
+            targets = block.terminator.targets() if block.terminator else []
+            succs[block.id] = targets
+            for target in targets:
+                preds[target].append(block.id)
+        self.succs = succs
+        self.preds = preds
+
+    def reverse_postorder(self) -> List[int]:
+        """Block ids reachable from the entry, in reverse postorder."""
+        succs = self.succs
+        visited = [False] * len(self.blocks)
+        order = []
+        visited[self.entry] = True
+        stack = [(self.entry, iter(succs[self.entry]))]
+        while stack:
+            block_id, it = stack[-1]
+            for succ in it:
+                if not visited[succ]:
+                    visited[succ] = True
+                    stack.append((succ, iter(succs[succ])))
+                    break
+            else:
+                stack.pop()
+                order.append(block_id)
+        order.reverse()
+        return order
+
+    def remove_unreachable(self):
+        """Drop blocks unreachable from the entry and renumber the rest.
+        Phi operands flowing in from dropped blocks are removed as well.
+        """
+        order = self.reverse_postorder()
+        if len(order) == len(self.blocks):
+            return
+        self.reorder(sorted(order))
+
+    def reorder(self, order: List[int]):
+        """Renumber the blocks so that block order[i] becomes block i.
+        Blocks missing from order are dropped, along with phi operands
+        flowing in from them.
+        """
+        new_ids = {old: new for new, old in enumerate(order)}
+        blocks = []
+        for old in order:
+            block = self.blocks[old]
+            block.id = new_ids[old]
+            block.terminator.replace_targets(new_ids.__getitem__)
+            for instr in block.instructions:
+                if isinstance(instr, Phi):
+                    instr.incoming = {
+                        new_ids[b]: v for b, v in instr.incoming.items() if b in new_ids
+                    }
+            blocks.append(block)
+        self.blocks = blocks
+        self.entry = new_ids[self.entry]
+        self.compute_edges()
+
+    def new_block(self) -> BasicBlock:
+        """Append an empty block; the caller must give it a terminator."""
+        block = BasicBlock(len(self.blocks))
+        self.blocks.append(block)
+        self.succs.append([])
+        self.preds.append([])
+        return block
+
+    def copy(self) -> "CFG":
+        """Copy whose blocks and instructions can be changed without
+        affecting this graph."""
+        blocks = []
+        for block in self.blocks:
+            clone = BasicBlock(block.id)
+            clone.instructions = [instr.copy() for instr in block.instructions]
+            clone.terminator = block.terminator.copy() if block.terminator else None
+            blocks.append(clone)
+        cfg = CFG(self.name, list(self.params), blocks, dict(self.var_types), self.return_type)
+        cfg.entry = self.entry
+        cfg.ssa = self.ssa
+        return cfg
+
+    def instruction_count(self) -> int:
+        """Number of instructions, terminators included."""
+        return sum(len(b.instructions) + 1 for b in self.blocks)
+
+    def __str__(self):
+        header = f"function {self.name}({', '.join(self.params)}):"
+        return "\n".join([header] + [str(b) for b in self.blocks])
+
+
+class CFGBuilder(BaseVisitor):
+    """Lower TyC function bodies into control-flow graphs.
+    Statement visitors emit instructions into the current block; expression
+    visitors return the Operand holding the value of the expression. The
+    visitor argument 'o' of an expression is its expected type, used to
+    name the struct type of struct literals.
+
+    With a profile (src.ir.profile), switch statements test their cases
+    most frequent first.
+    """
+
+    def __init__(self, program: Optional[Program] = None, profile=None):
+        decls = program.decls if program is not None else []
+        self.structs = {d.name: d for d in decls if isinstance(d, StructDecl)}
+        self.functions = {d.name: d for d in decls if isinstance(d, FuncDecl)}
+        self.profile = profile
+
+    def build(self, func: FuncDecl) -> CFG:
+        """Build the control-flow graph of a single function."""
+        self.blocks: List[BasicBlock] = []
+        self.current = self._new_block()
+        self.scopes: List[Dict[str, str]] = [{}]
+        self.var_types: Dict[str, Optional[Type]] = {}
+        self.name_counts: Dict[str, int] = {}
+        self.temp_count = 0
+        self.break_targets: List[int] = []
+        self.continue_targets: List[int] = []
+        self.return_type = func.return_type
+
+        params = [self._declare(p.name, p.param_type) for p in func.params]
+        self.visit(func.body)
+        if self.current.terminator is None:
+            self._terminate(Return(), None)
+
+        self._thread_jumps()
+        cfg = CFG(func.name, params, self.blocks, self.var_types, func.return_type)
+        cfg.remove_unreachable()
+        return cfg
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    def _new_block(self) -> BasicBlock:
+        block = BasicBlock(len(self.blocks))
+        self.blocks.append(block)
+        return block
+
+    def _new_temp(self) -> str:
+        self.temp_count += 1
+        return f"${self.temp_count}"
+
+    def _emit(self, instr: Instruction, node: Optional[ASTNode]) -> Instruction:
+        instr.line = node.line if node is not None else None
+        instr.column = node.column if node is not None else None
+        self.current.instructions.append(instr)
+        return instr
+
+    def _terminate(self, term: Terminator, node: Optional[ASTNode]):
+        """End the current block; code that follows lands in a fresh,
+        unreachable block that is dropped when the graph is finished."""
+        term.line = node.line if node is not None else None
+        term.column = node.column if node is not None else None
+        self.current.terminator = term
+        self.current = self._new_block()
+
+    def _jump(self, target: BasicBlock, node: Optional[ASTNode] = None):
+        self._terminate(Jump(target.id), node)
+
+    def _start(self, block: BasicBlock):
+        """Continue emitting into block, falling through from the current one."""
+        self.current.terminator = Jump(block.id)
+        self.current = block
+
+    def _declare(self, name: str, var_type: Optional[Type]) -> str:
+        count = self.name_counts.get(name, 0) + 1
+        self.name_counts[name] = count
+        ir_name = name if count == 1 else f"{name}#{count}"
+        self.scopes[-1][name] = ir_name
+        self.var_types[ir_name] = var_type
+        return ir_name
+
+    def _lookup(self, name: str) -> str:
+        for scope in reversed(self.scopes):
+            if name in scope:
+                return scope[name]
+        raise CFGError(f"Undeclared variable: {name}")
+
+    def _assign(self, dest: str, value: Operand, node: ASTNode):
+        """dest = value, retargeting the instruction that produced a fresh
+        temporary instead of emitting a copy when possible."""
+        instrs = self.current.instructions
+        if (
+            is_temp(value)
+            and instrs
+            and instrs[-1].dest == value
+            and not isinstance(instrs[-1], SetField)
+        ):
+            instrs[-1].dest = dest
+        else:
+            self._emit(Copy(dest, value), node)
+
+    def _pin(self, operand: Operand, later: List[Expr]) -> Operand:
+        """Copy a named variable into a temporary when evaluating the
+        remaining operands could reassign it (left-to-right evaluation)."""
+        if is_var(operand) and not is_temp(operand) and any(
+            _writes_locals(e) for e in later
+        ):
+            temp = self._new_temp()
+            self._emit(Copy(temp, operand), None)
+            return temp
+        return operand
+
+    def _type_of_lvalue(self, lhs: Expr) -> Optional[Type]:
+        if isinstance(lhs, Identifier):
+            for scope in reversed(self.scopes):
+                if lhs.name in scope:
+                    return self.var_types.get(scope[lhs.name])
+            return None
+        if isinstance(lhs, MemberAccess):
+            return self._member_type(self._type_of_lvalue(lhs.obj), lhs.member)
+        return None
+
+    def _member_type(self, struct_type: Optional[Type], member: str) -> Optional[Type]:
+        if not isinstance(struct_type, StructType):
+            return None
+        decl = self.structs.get(struct_type.struct_name)
+        if decl is None:
+            return None
+        for m in decl.members:
+            if m.name == member:
+                return m.member_type
+        return None
+
+    def _branch(self, expr: Expr, if_true: BasicBlock, if_false: BasicBlock):
+        """Lower expr in a condition context with short-circuit evaluation."""
+        if isinstance(expr, BinaryOp) and expr.operator in ("&&", "||"):
+            rhs = self._new_block()
+            if expr.operator == "&&":
+                self._branch(expr.left, rhs, if_false)
+            else:
+                self._branch(expr.left, if_true, rhs)
+            self.current = rhs
+            self._branch(expr.right, if_true, if_false)
+        elif isinstance(expr, PrefixOp) and expr.operator == "!":
+            self._branch(expr.operand, if_false, if_true)
+        else:
+            cond = self.visit(expr)
+            self._terminate(Branch(cond, if_true.id, if_false.id), expr)
+
+    def _lvalue(self, lhs: Expr, what: str) -> Tuple[str, Tuple[str, ...]]:
+        """The variable and member path an Identifier or MemberAccess
+        lvalue names; anything else cannot be assigned to."""
+        path = []
+        root = lhs
+        while isinstance(root, MemberAccess):
+            path.append(root.member)
+            root = root.obj
+        if not isinstance(root, Identifier):
+            raise CFGError(f"{what} needs a variable or a member of one")
+        path.reverse()
+        return self._lookup(root.name), tuple(path)
+
+    def _store(self, lhs: Expr, value: Operand, node: ASTNode):
+        """Assign value to an Identifier or MemberAccess lvalue."""
+        obj, path = self._lvalue(lhs, "Assignment")
+        if not path:
+            self._assign(obj, value, node)
+        else:
+            self._emit(SetField(obj, obj, path, value), node)
+
+    def _lower_call(self, node: FuncCall, dest: Optional[str]) -> Optional[str]:
+        callee = self.functions.get(node.name)
+        param_types = [p.param_type for p in callee.params] if callee else []
+        args = []
+        for i, arg in enumerate(node.args):
+            hint = param_types[i] if i < len(param_types) else None
+            args.append(self._pin(self.visit(arg, hint), node.args[i + 1:]))
+        self._emit(Call(dest, node.name, args), node)
+        return dest
+
+    def _incdec(self, node: Expr, operand: Expr, operator: str, postfix: bool) -> Operand:
+        self._lvalue(operand, operator)
+        old = self._pin(self.visit(operand), [])
+        if postfix and is_var(old) and not is_temp(old):
+            saved = self._new_temp()
+            self._emit(Copy(saved, old), node)
+            old = saved
+        new = self._new_temp()
+        self._emit(BinOp(new, operator[0], old, Const(1)), node)
+        self._store(operand, new, node)
+        if not postfix:
+            return self._lookup(operand.name) if isinstance(operand, Identifier) else new
+        return old
+
+    # ------------------------------------------------------------------
+    # Statements
+    # ------------------------------------------------------------------
+
+    def visit_block_stmt(self, node: "BlockStmt", o: Any = None):
+        self.scopes.append({})
+        for stmt in node.statements:
+            self.visit(stmt)
+        self.scopes.pop()
+
+    def visit_var_decl(self, node: "VarDecl", o: Any = None):
+        if node.init_value is not None:
+            value = self.visit(node.init_value, node.var_type)
+            self._assign(self._declare(node.name, node.var_type), value, node)
+        else:
+            self._emit(Declare(self._declare(node.name, node.var_type), node.var_type), node)
+
+    def visit_assign_stmt(self, node, o: Any = None):
+        self.visit(node.assign_expr)
+
+    def visit_expr_stmt(self, node: "ExprStmt", o: Any = None):
+        if isinstance(node.expr, FuncCall):
+            self._lower_call(node.expr, None)
+        else:
+            self.visit(node.expr)
+
+    def visit_if_stmt(self, node: "IfStmt", o: Any = None):
+        then_block = self._new_block()
+        join = self._new_block()
+        else_block = self._new_block() if node.else_stmt is not None else join
+        self._branch(node.condition, then_block, else_block)
+        self.current = then_block
+        self.visit(node.then_stmt)
+        if node.else_stmt is None:
+            self._start(join)
+            return
+        self._jump(join)
+        self.current = else_block
+        self.visit(node.else_stmt)
+        self._start(join)
+
+    def visit_while_stmt(self, node: "WhileStmt", o: Any = None):
+        header = self._new_block()
+        body = self._new_block()
+        exit_block = self._new_block()
+        self._start(header)
+        self._branch(node.condition, body, exit_block)
+        self.current = body
+        self.break_targets.append(exit_block.id)
+        self.continue_targets.append(header.id)
+        self.visit(node.body)
+        self.break_targets.pop()
+        self.continue_targets.pop()
+        self._jump(header)
+        self.current = exit_block
+
+    def visit_for_stmt(self, node: "ForStmt", o: Any = None):
+        self.scopes.append({})
+        if node.init is not None:
+            self.visit(node.init)
+        header = self._new_block()
+        body = self._new_block()
+        update = self._new_block()
+        exit_block = self._new_block()
+        self._start(header)
+        if node.condition is not None:
+            self._branch(node.condition, body, exit_block)
+        else:
+            self._jump(body)
+        self.current = body
+        self.break_targets.append(exit_block.id)
+        self.continue_targets.append(update.id)
+        self.visit(node.body)
+        self.break_targets.pop()
+        self.continue_targets.pop()
+        self._start(update)
+        if node.update is not None:
+            self.visit(node.update)
+        self._jump(header)
+        self.current = exit_block
+        self.scopes.pop()
+
+    def visit_switch_stmt(self, node: "SwitchStmt", o: Any = None):
+        clauses = _clauses_in_source_order(node)
+        case_exprs = [c.expr for c in clauses if isinstance(c, CaseStmt)]
+        subject = self._pin(self.visit(node.expr), case_exprs)
+        bodies = [self._new_block() for _ in clauses]
+        exit_block = self._new_block()
+        default_target = exit_block
+        for clause, body in zip(clauses, bodies):
+            if isinstance(clause, DefaultStmt):
+                default_target = body
+
+        # Dispatch: compare against each case label in source order, or
+        # by frequency when the profile allows reordering.
+        tests = [(c, b) for c, b in zip(clauses, bodies) if isinstance(c, CaseStmt)]
+        if self.profile is not None:
+            tests = self._order_cases(tests)
+        for clause, body in tests:
+            label = self.visit(clause.expr)
+            cond = self._new_temp()
+            self._emit(BinOp(cond, "==", subject, label), clause)
+            next_test = self._new_block()
+            self._terminate(Branch(cond, body.id, next_test.id), clause)
+            self.current = next_test
+        self._jump(default_target)
+
+        # Bodies fall through to the next clause unless they break.
+        self.break_targets.append(exit_block.id)
+        for clause, body in zip(clauses, bodies):
+            self._start(body)
+            self.scopes.append({})
+            for stmt in clause.statements:
+                self.visit(stmt)
+            self.scopes.pop()
+        self.break_targets.pop()
+        self._start(exit_block)
+
+    def _order_cases(self, tests):
+        """Case tests sorted by how often they matched in the profile.
+        Only distinct constant labels are reordered: evaluating them has
+        no effect and at most one of them can match."""
+        values = [_case_value(clause.expr) for clause, _ in tests]
+        if None in values or len(set(values)) != len(values):
+            return tests
+        counts = [self.profile.branch(clause) for clause, _ in tests]
+        if all(c is None for c in counts):
+            return tests
+        matched = [c[0] if c is not None else 0 for c in counts]
+        order = sorted(range(len(tests)), key=lambda i: -matched[i])
+        return [tests[i] for i in order]
+
+    def visit_break_stmt(self, node: "BreakStmt", o: Any = None):
+        if not self.break_targets:
+            raise CFGError("break outside loop or switch")
+        self._terminate(Jump(self.break_targets[-1]), node)
+
+    def visit_continue_stmt(self, node: "ContinueStmt", o: Any = None):
+        if not self.continue_targets:
+            raise CFGError("continue outside loop")
+        self._terminate(Jump(self.continue_targets[-1]), node)
+
+    def visit_return_stmt(self, node: "ReturnStmt", o: Any = None):
+        value = None
+        if node.expr is not None:
+            value = self.visit(node.expr, self.return_type)
+        self._terminate(Return(value), node)
+
+    # ------------------------------------------------------------------
+    # Expressions
+    # ------------------------------------------------------------------
+
+    def visit_binary_op(self, node: "BinaryOp", o: Any = None):
+        if node.operator in ("&&", "||"):
+            result = self._new_temp()
+            if_true = self._new_block()
+            if_false = self._new_block()
+            join = self._new_block()
+            self._branch(node, if_true, if_false)
+            self.current = if_true
+            self._emit(Copy(result, Const(1)), node)
+            self._jump(join)
+            self.current = if_false
+            self._emit(Copy(result, Const(0)), node)
+            self._jump(join)
+            self.current = join
+            return result
+        left = self._pin(self.visit(node.left), [node.right])
+        right = self.visit(node.right)
+        dest = self._new_temp()
+        self._emit(BinOp(dest, node.operator, left, right), node)
+        return dest
+
+    def visit_prefix_op(self, node: "PrefixOp", o: Any = None):
+        if node.operator in ("++", "--"):
+            return self._incdec(node, node.operand, node.operator, postfix=False)
+        operand = self.visit(node.operand)
+        dest = self._new_temp()
+        self._emit(UnaryOp(dest, node.operator, operand), node)
+        return dest
+
+    def visit_postfix_op(self, node: "PostfixOp", o: Any = None):
+        return self._incdec(node, node.operand, node.operator, postfix=True)
+
+    def visit_assign_expr(self, node: "AssignExpr", o: Any = None):
+        self._lvalue(node.lhs, "Assignment")
+        value = self.visit(node.rhs, self._type_of_lvalue(node.lhs))
+        self._store(node.lhs, value, node)
+        if isinstance(node.lhs, Identifier):
+            return self._lookup(node.lhs.name)
+        return value
+
+    def visit_member_access(self, node: "MemberAccess", o: Any = None):
+        obj = self.visit(node.obj)
+        dest = self._new_temp()
+        self._emit(GetField(dest, obj, node.member), node)
+        return dest
+
+    def visit_func_call(self, node: "FuncCall", o: Any = None):
+        return self._lower_call(node, self._new_temp())
+
+    def visit_identifier(self, node: "Identifier", o: Any = None):
+        return self._lookup(node.name)
+
+    def visit_struct_literal(self, node: "StructLiteral", o: Any = None):
+        struct_name = o.struct_name if isinstance(o, StructType) else None
+        decl = self.structs.get(struct_name)
+        member_types = [m.member_type for m in decl.members] if decl else []
+        values = []
+        for i, value in enumerate(node.values):
+            hint = member_types[i] if i < len(member_types) else None
+            values.append(self._pin(self.visit(value, hint), node.values[i + 1:]))
+        dest = self._new_temp()
+        self._emit(MakeStruct(dest, struct_name, values), node)
+        return dest
+
+    def visit_int_literal(self, node: "IntLiteral", o: Any = None):
+        return Const(int(node.value))
+
+    def visit_float_literal(self, node: "FloatLiteral", o: Any = None):
+        return Const(float(node.value))
+
+    def visit_string_literal(self, node: "StringLiteral", o: Any = None):
+        return Const(_unescape(node.value))
+
+    # ------------------------------------------------------------------
+    # Finishing
+    # ------------------------------------------------------------------
+
+    def _thread_jumps(self):
+        """Retarget edges that lead to empty blocks ending in a jump."""
+        forward = {}
+        for block in self.blocks:
+            term = block.terminator
+            if not block.instructions and isinstance(term, Jump) and term.target != block.id:
+                forward[block.id] = term.target
+
+        def resolve(target):
+            seen = set()
+            while target in forward and target not in seen:
+                seen.add(target)
+                target = forward[target]
+            return target
+
+        for block in self.blocks:
+            term = block.terminator
+            if term is None:
+                continue
+            term.replace_targets(resolve)
+            if isinstance(term, Branch) and term.if_true == term.if_false:
+                jump = Jump(term.if_true)
+                jump.line, jump.column = term.line, term.column
+                block.terminator = jump
+
+
+_ESCAPES = {"b": "\b", "f": "\f", "r": "\r", "n": "\n", "t": "\t", '"': '"', "\\": "\\"}
+
+
+def _unescape(text: str) -> str:
+    """Decode the escape sequences kept verbatim in string literal tokens."""
+    if "\\" not in text:
+        return text
+    chars = []
+    i = 0
+    while i < len(text):
+        ch = text[i]
+        if ch == "\\" and i + 1 < len(text) and text[i + 1] in _ESCAPES:
+            chars.append(_ESCAPES[text[i + 1]])
+            i += 2
+        else:
+            chars.append(ch)
+            i += 1
+    return "".join(chars)
+
+
+def _clauses_in_source_order(node: SwitchStmt) -> List[ASTNode]:
+    """Case and default clauses in the order they appear in the source.
+    The AST keeps the default clause apart, so its position among the
+    cases is recovered from line/column information (defaulting to last).
+    """
+    clauses: List[ASTNode] = list(node.cases)
+    default = node.default_case
+    if default is None:
+        return clauses
+    if default.line is None:
+        return clauses + [default]
+    key = (default.line, default.column or 0)
+    index = len(clauses)
+    for i, case in enumerate(clauses):
+        if case.line is not None and (case.line, case.column or 0) > key:
+            index = i
+            break
+    clauses.insert(index, default)
+    return clauses
+
+
+def _case_value(expr: Expr) -> Optional[int]:
+    """Value of a constant case label (integer literals and operators),
+    or None if it is not one or evaluating it would fail."""
+    if isinstance(expr, IntLiteral):
+        return int(expr.value)
+    if isinstance(expr, PrefixOp) and expr.operator in UNARY_OPS:
+        value = _case_value(expr.operand)
+        return None if value is None else UNARY_OPS[expr.operator](value)
+    if isinstance(expr, BinaryOp) and expr.operator in BINARY_OPS:
+        left, right = _case_value(expr.left), _case_value(expr.right)
+        if left is None or right is None or (expr.operator in TRAPPING and right == 0):
+            return None
+        return BINARY_OPS[expr.operator](left, right)
+    return None
+
+
+class _LocalWriteFinder(BaseVisitor):
+    """Detect expressions that may assign a local variable."""
+
+    def __init__(self):
+        self.found = False
+
+    def visit_assign_expr(self, node, o=None):
+        self.found = True
+
+    def visit_prefix_op(self, node, o=None):
+        if node.operator in ("++", "--"):
+            self.found = True
+        else:
+            self.visit(node.operand, o)
+
+    def visit_postfix_op(self, node, o=None):
+        self.found = True
+
+
+def _writes_locals(expr: Expr) -> bool:
+    finder = _LocalWriteFinder()
+    finder.visit(expr)
+    return finder.found
+
+
+def build_cfg(func: FuncDecl, program: Optional[Program] = None) -> CFG:
+    """Build the control-flow graph of one function."""
+    return CFGBuilder(program).build(func)
+
+
+def build_cfgs(program: Program, profile=None) -> Dict[str, CFG]:
+    """Build control-flow graphs for every function of a program."""
+    builder = CFGBuilder(program, profile)
+    return {
+        d.name: builder.build(d) for d in program.decls if isinstance(d, FuncDecl)
+    }
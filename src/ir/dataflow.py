@@ -0,0 +1,387 @@
+"""
+Bit-vector dataflow analysis over TyC control-flow graphs.
+Facts are Python ints used as bitsets; a BitIndex assigns a bit to every
+variable or definition an analysis tracks. DataflowAnalysis solves a
+forward or backward problem with a worklist processed in reverse
+postorder (postorder for backward problems), and GenKillAnalysis covers
+the common case of transfer(x) = gen | (x & ~kill).
+
+Liveness, reaching definitions and definite assignment are provided as
+ready-made analyses. In this module a block's "in" fact holds at its first
+instruction and its "out" fact after its terminator, whichever way the
+analysis runs.
+"""
+
+import heapq
+from typing import Dict, Generic, Hashable, Iterable, List, Optional, Tuple, TypeVar
+
+from src.ir.cfg import CFG, BasicBlock
+from src.ir.instructions import *
+
+T = TypeVar("T", bound=Hashable)
+
+
+class BitIndex(Generic[T]):
+    """Bijection between tracked items and bit positions."""
+
+    def __init__(self, items: Iterable[T] = ()):
+        self.items: List[T] = []
+        self.positions: Dict[T, int] = {}
+        for item in items:
+            self.add(item)
+
+    def add(self, item: T) -> int:
+        """Bit position of item, allocating one if needed."""
+        position = self.positions.get(item)
+        if position is None:
+            position = len(self.items)
+            self.positions[item] = position
+            self.items.append(item)
+        return position
+
+    def bit(self, item: T) -> int:
+        return 1 << self.positions[item]
+
+    def bits(self, items: Iterable[T]) -> int:
+        result = 0
+        for item in items:
+            result |= 1 << self.positions[item]
+        return result
+
+    def members(self, bits: int) -> List[T]:
+        """Items whose bits are set, in index order."""
+        result = []
+        position = 0
+        while bits:
+            if bits & 1:
+                result.append(self.items[position])
+            bits >>= 1
+            position += 1
+        return result
+
+    @property
+    def full(self) -> int:
+        return (1 << len(self.items)) - 1
+
+    def __contains__(self, item) -> bool:
+        return item in self.positions
+
+    def __len__(self):
+        return len(self.items)
+
+
+class DataflowAnalysis:
+    """Iterative worklist solver for a monotone bit-vector problem.
+    Subclasses set 'forward' and 'may' (union meet if True, intersection
+    otherwise) and implement transfer(); boundary() is the fact at the
+    entry (forward) or at the exits (backward).
+    """
+
+    forward = True
+    may = True
+
+    def __init__(self, cfg: CFG):
+        self.cfg = cfg
+        self.fact_in: List[int] = []
+        self.fact_out: List[int] = []
+
+    def boundary(self) -> int:
+        return 0
+
+    def top(self) -> int:
+        """Initial fact of interior blocks: the identity of the meet."""
+        return 0
+
+    def transfer(self, block: BasicBlock, fact: int) -> int:
+        raise NotImplementedError
+
+    def solve(self) -> "DataflowAnalysis":
+        cfg = self.cfg
+        n = len(cfg.blocks)
+        top = self.top()
+        boundary = self.boundary()
+        self.fact_in = [top] * n
+        self.fact_out = [top] * n
+        order = cfg.reverse_postorder()
+        if self.forward:
+            sources, sinks = cfg.preds, cfg.succs
+            before, after = self.fact_in, self.fact_out
+        else:
+            order.reverse()
+            sources, sinks = cfg.succs, cfg.preds
+            before, after = self.fact_out, self.fact_in
+        rank = {block_id: i for i, block_id in enumerate(order)}
+        may = self.may
+
+        work = list(range(len(order)))
+        queued = [True] * len(order)
+        while work:
+            i = heapq.heappop(work)
+            queued[i] = False
+            block_id = order[i]
+            on_boundary = (
+                block_id == cfg.entry if self.forward else not sources[block_id]
+            )
+            fact = boundary if on_boundary else None
+            for source in sources[block_id]:
+                if source not in rank:
+                    continue
+                value = after[source]
+                if fact is None:
+                    fact = value
+                elif may:
+                    fact |= value
+                else:
+                    fact &= value
+            if fact is None:
+                fact = top
+            before[block_id] = fact
+            new = self.transfer(cfg.blocks[block_id], fact)
+            if new != after[block_id]:
+                after[block_id] = new
+                for sink in sinks[block_id]:
+                    j = rank.get(sink)
+                    if j is not None and not queued[j]:
+                        queued[j] = True
+                        heapq.heappush(work, j)
+        return self
+
+
+class GenKillAnalysis(DataflowAnalysis):
+    """Analysis whose transfer function is gen | (fact & ~kill).
+    Subclasses implement gen_kill(block), called once per block.
+    """
+
+    def gen_kill(self, block: BasicBlock) -> Tuple[int, int]:
+        raise NotImplementedError
+
+    def solve(self) -> "GenKillAnalysis":
+        self.gen: List[int] = []
+        self.kill: List[int] = []
+        for block in self.cfg.blocks:
+            gen, kill = self.gen_kill(block)
+            self.gen.append(gen)
+            self.kill.append(kill)
+        return super().solve()
+
+    def transfer(self, block: BasicBlock, fact: int) -> int:
+        return self.gen[block.id] | (fact & ~self.kill[block.id])
+
+
+def _variables(cfg: CFG) -> BitIndex:
+    index = BitIndex(cfg.params)
+    for block in cfg.blocks:
+        for instr in block.instructions + [block.terminator]:
+            for use in instr.uses():
+                if is_var(use):
+                    index.add(use)
+            if instr.dest is not None:
+                index.add(instr.dest)
+    return index
+
+
+# ============================================================================
+# Liveness
+# ============================================================================
+
+
+class Liveness(GenKillAnalysis):
+    """Backward may-analysis of the variables live at each point.
+    In SSA form a phi operand is live out of its predecessor only, and a
+    phi destination is defined at the top of its block.
+    """
+
+    forward = False
+
+    def __init__(self, cfg: CFG):
+        super().__init__(cfg)
+        self.variables = _variables(cfg)
+
+    def gen_kill(self, block):
+        bit = self.variables.bit
+        gen = kill = 0
+        for instr in block.instructions:
+            if not isinstance(instr, Phi):
+                for use in instr.uses():
+                    if is_var(use) and not kill & bit(use):
+                        gen |= bit(use)
+            if instr.dest is not None:
+                kill |= bit(instr.dest)
+        for use in block.terminator.uses():
+            if is_var(use) and not kill & bit(use):
+                gen |= bit(use)
+        phi_uses = 0
+        for succ in self.cfg.succs[block.id]:
+            for instr in self.cfg.blocks[succ].instructions:
+                if not isinstance(instr, Phi):
+                    break
+                value = instr.incoming.get(block.id)
+                if is_var(value):
+                    phi_uses |= bit(value)
+        self.phi_uses.append(phi_uses)
+        return gen, kill
+
+    def solve(self) -> "Liveness":
+        self.phi_uses: List[int] = []
+        super().solve()
+        for block_id, phi_uses in enumerate(self.phi_uses):
+            self.fact_out[block_id] |= phi_uses
+        return self
+
+    def transfer(self, block, fact):
+        fact |= self.phi_uses[block.id]
+        return self.gen[block.id] | (fact & ~self.kill[block.id])
+
+    def live_in(self, block_id: int) -> List[str]:
+        return self.variables.members(self.fact_in[block_id])
+
+    def live_out(self, block_id: int) -> List[str]:
+        return self.variables.members(self.fact_out[block_id])
+
+
+def liveness(cfg: CFG) -> Liveness:
+    """Solve liveness for cfg."""
+    return Liveness(cfg).solve()
+
+
+# ============================================================================
+# Reaching definitions
+# ============================================================================
+
+
+class ReachingDefinitions(GenKillAnalysis):
+    """Forward may-analysis of the definitions reaching each point.
+    Definitions are (variable, instruction) pairs; parameters are defined
+    on entry by a pair whose instruction is None.
+    """
+
+    def __init__(self, cfg: CFG):
+        super().__init__(cfg)
+        self.definitions: BitIndex = BitIndex()
+        self.defs_of: Dict[str, int] = {}
+        for param in cfg.params:
+            self._add((param, None))
+        for block in cfg.blocks:
+            for instr in block.instructions:
+                if instr.dest is not None:
+                    self._add((instr.dest, instr))
+
+    def _add(self, definition: Tuple[str, Optional[Instruction]]):
+        position = self.definitions.add(definition)
+        var = definition[0]
+        self.defs_of[var] = self.defs_of.get(var, 0) | (1 << position)
+
+    def boundary(self) -> int:
+        return self.definitions.bits((p, None) for p in self.cfg.params)
+
+    def gen_kill(self, block):
+        gen = kill = 0
+        for instr in block.instructions:
+            if instr.dest is None:
+                continue
+            same_var = self.defs_of[instr.dest]
+            gen = (gen & ~same_var) | self.definitions.bit((instr.dest, instr))
+            kill |= same_var
+        return gen, kill
+
+    def reaching(self, block_id: int, var: Optional[str] = None) -> List[Tuple[str, Optional[Instruction]]]:
+        """Definitions reaching the top of a block, optionally of one variable."""
+        fact = self.fact_in[block_id]
+        if var is not None:
+            fact &= self.defs_of.get(var, 0)
+        return self.definitions.members(fact)
+
+
+def reaching_definitions(cfg: CFG) -> ReachingDefinitions:
+    """Solve reaching definitions for cfg."""
+    return ReachingDefinitions(cfg).solve()
+
+
+# ============================================================================
+# Definite assignment
+# ============================================================================
+
+
+class UninitializedRead:
+    """A read of a variable that may not have been assigned."""
+
+    __slots__ = ("name", "line", "column")
+
+    def __init__(self, name: str, line: Optional[int], column: Optional[int]):
+        self.name = name
+        self.line = line
+        self.column = column
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, UninitializedRead)
+            and (self.name, self.line, self.column) == (other.name, other.line, other.column)
+        )
+
+    def __str__(self):
+        return f"Variable {self.name} may be used before being assigned on line {self.line} col {self.column}"
+
+    __repr__ = __str__
+
+
+class DefiniteAssignment(GenKillAnalysis):
+    """Forward must-analysis of the variables assigned on every path.
+    A declaration without initializer ('int a;', 'auto a;') un-assigns its
+    variable, which matters for declarations inside loops. A member store
+    counts as assigning the whole struct; members are not tracked apart.
+    """
+
+    may = False
+
+    def __init__(self, cfg: CFG):
+        super().__init__(cfg)
+        self.variables = _variables(cfg)
+
+    def boundary(self) -> int:
+        return self.variables.bits(self.cfg.params)
+
+    def top(self) -> int:
+        return self.variables.full
+
+    def gen_kill(self, block):
+        gen = kill = 0
+        for instr in block.instructions:
+            if instr.dest is None:
+                continue
+            bit = self.variables.bit(instr.dest)
+            if isinstance(instr, Declare):
+                gen &= ~bit
+                kill |= bit
+            else:
+                gen |= bit
+        return gen, kill
+
+    def uninitialized_reads(self) -> List[UninitializedRead]:
+        """Reads of source variables not assigned on every path, in block
+        order."""
+        bit = self.variables.bit
+        reads = []
+        for block_id in self.cfg.reverse_postorder():
+            block = self.cfg.blocks[block_id]
+            assigned = self.fact_in[block_id]
+            for instr in block.instructions + [block.terminator]:
+                if not isinstance(instr, Phi):
+                    uses = instr.uses()
+                    if isinstance(instr, SetField):
+                        uses = [instr.value]
+                    for use in uses:
+                        if is_var(use) and not is_temp(use) and not assigned & bit(use):
+                            reads.append(
+                                UninitializedRead(use.split("#")[0], instr.line, instr.column)
+                            )
+                if instr.dest is not None:
+                    if isinstance(instr, Declare):
+                        assigned &= ~bit(instr.dest)
+                    else:
+                        assigned |= bit(instr.dest)
+        return reads
+
+
+def find_uninitialized_reads(cfg: CFG) -> List[UninitializedRead]:
+    """Reads of possibly-uninitialized variables in a CFG not in SSA form."""
+    return DefiniteAssignment(cfg).solve().uninitialized_reads()
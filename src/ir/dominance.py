@@ -0,0 +1,78 @@
+"""
+Dominator analysis for TyC control-flow graphs.
+This module computes immediate dominators (Cooper, Harvey and Kennedy's
+iterative algorithm over reverse postorder), dominator trees and
+dominance frontiers using the integer block ids of a CFG.
+"""
+
+from typing import List, Set
+
+from src.ir.cfg import CFG
+
+
+def immediate_dominators(cfg: CFG) -> List[int]:
+    """idom[b] for every block; the entry is its own idom and unreachable
+    blocks get -1."""
+    rpo = cfg.reverse_postorder()
+    order = [-1] * len(cfg.blocks)
+    for i, block_id in enumerate(rpo):
+        order[block_id] = i
+    idom = [-1] * len(cfg.blocks)
+    idom[cfg.entry] = cfg.entry
+    preds = cfg.preds
+
+    def intersect(a: int, b: int) -> int:
+        while a != b:
+            while order[a] > order[b]:
+                a = idom[a]
+            while order[b] > order[a]:
+                b = idom[b]
+        return a
+
+    changed = True
+    while changed:
+        changed = False
+        for block_id in rpo[1:]:
+            new_idom = -1
+            for pred in preds[block_id]:
+                if idom[pred] == -1:
+                    continue
+                new_idom = pred if new_idom == -1 else intersect(pred, new_idom)
+            if idom[block_id] != new_idom:
+                idom[block_id] = new_idom
+                changed = True
+    return idom
+
+
+def dominator_tree(cfg: CFG, idom: List[int]) -> List[List[int]]:
+    """Children of each block in the dominator tree."""
+    children = [[] for _ in cfg.blocks]
+    for block_id, parent in enumerate(idom):
+        if parent != -1 and block_id != cfg.entry:
+            children[parent].append(block_id)
+    return children
+
+
+def dominance_frontiers(cfg: CFG, idom: List[int]) -> List[Set[int]]:
+    """Dominance frontier of each block."""
+    frontiers = [set() for _ in cfg.blocks]
+    for block_id, preds in enumerate(cfg.preds):
+        if len(preds) < 2 or idom[block_id] == -1:
+            continue
+        for pred in preds:
+            runner = pred
+            while runner != idom[block_id] and runner != -1:
+                frontiers[runner].add(block_id)
+                runner = idom[runner]
+    return frontiers
+
+
+def dominates(idom: List[int], a: int, b: int) -> bool:
+    """True if block a dominates block b."""
+    while True:
+        if a == b:
+            return True
+        parent = idom[b]
+        if parent == b or parent == -1:
+            return False
+        b = parent
@@ -0,0 +1,436 @@
+"""
+Three-address instructions for the TyC intermediate representation.
+This module defines the operands, instructions and terminators stored in
+the basic blocks of a control-flow graph.
+
+An operand is either a variable name (a plain ``str``) or a ``Const``.
+Source variables keep their TyC name, shadowed declarations are renamed
+to ``name#N`` and compiler temporaries are named ``$N``; none of these
+can clash because ``#`` and ``$`` never appear in TyC identifiers.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+
+class Const:
+    """Constant operand (int, float or string value)."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any):
+        self.value = value
+
+    def __eq__(self, other):
+        return isinstance(other, Const) and const_key(self.value) == const_key(other.value)
+
+    def __hash__(self):
+        return hash(const_key(self.value))
+
+    def __str__(self):
+        if self.value is None:
+            return "undef"
+        if isinstance(self.value, str):
+            return '"' + self.value + '"'
+        return str(self.value)
+
+    __repr__ = __str__
+
+
+def const_key(value: Any) -> Tuple[str, Any]:
+    """Key telling constants apart. 0.0 and -0.0 compare equal but are
+    different values (printing tells them apart), so floats are
+    keyed by their repr."""
+    if value.__class__ is float:
+        return ("float", repr(value))
+    return (type(value).__name__, value)
+
+
+Operand = Union[str, Const]
+
+
+UNDEF = Const(None)
+"""Operand standing for the value of a variable on a path that never defines it."""
+
+
+def is_var(operand: Any) -> bool:
+    """Return True if the operand names a variable."""
+    return isinstance(operand, str)
+
+
+def is_temp(operand: Any) -> bool:
+    """Return True if the operand is a compiler temporary."""
+    return isinstance(operand, str) and operand.startswith("$")
+
+
+# ============================================================================
+# Instructions
+# ============================================================================
+
+
+class Instruction:
+    """Base class for IR instructions.
+    ``dest`` is the variable defined by the instruction, or None.
+    """
+
+    __slots__ = ("line", "column")
+
+    dest = None
+    has_side_effects = False
+
+    def uses(self) -> List[Operand]:
+        """Operands read by the instruction, in evaluation order."""
+        return []
+
+    def replace_uses(self, fn: Callable[[Operand], Operand]):
+        """Replace every operand read by the instruction with fn(operand)."""
+        pass
+
+    def copy(self) -> "Instruction":
+        """Return a shallow copy of the instruction (operand lists are copied)."""
+        raise NotImplementedError
+
+    def _with_position(self, other: "Instruction") -> "Instruction":
+        other.line = self.line
+        other.column = self.column
+        return other
+
+
+class Copy(Instruction):
+    """dest = src"""
+
+    __slots__ = ("dest", "src")
+
+    def __init__(self, dest: str, src: Operand):
+        self.dest = dest
+        self.src = src
+        self.line = self.column = None
+
+    def uses(self):
+        return [self.src]
+
+    def replace_uses(self, fn):
+        self.src = fn(self.src)
+
+    def copy(self):
+        return self._with_position(Copy(self.dest, self.src))
+
+    def __str__(self):
+        return f"{self.dest} = {self.src}"
+
+
+class BinOp(Instruction):
+    """dest = left <operator> right (never && or ||, which become branches)"""
+
+    __slots__ = ("dest", "operator", "left", "right")
+
+    def __init__(self, dest: str, operator: str, left: Operand, right: Operand):
+        self.dest = dest
+        self.operator = operator
+        self.left = left
+        self.right = right
+        self.line = self.column = None
+
+    def uses(self):
+        return [self.left, self.right]
+
+    def replace_uses(self, fn):
+        self.left = fn(self.left)
+        self.right = fn(self.right)
+
+    def copy(self):
+        return self._with_position(
+            BinOp(self.dest, self.operator, self.left, self.right)
+        )
+
+    def __str__(self):
+        return f"{self.dest} = {self.left} {self.operator} {self.right}"
+
+
+class UnaryOp(Instruction):
+    """dest = <operator> operand, for the unary '+', '-' and '!' operators"""
+
+    __slots__ = ("dest", "operator", "operand")
+
+    def __init__(self, dest: str, operator: str, operand: Operand):
+        self.dest = dest
+        self.operator = operator
+        self.operand = operand
+        self.line = self.column = None
+
+    def uses(self):
+        return [self.operand]
+
+    def replace_uses(self, fn):
+        self.operand = fn(self.operand)
+
+    def copy(self):
+        return self._with_position(UnaryOp(self.dest, self.operator, self.operand))
+
+    def __str__(self):
+        return f"{self.dest} = {self.operator}{self.operand}"
+
+
+class Call(Instruction):
+    """dest = func(args); dest is None when the result is discarded."""
+
+    __slots__ = ("dest", "func", "args")
+
+    has_side_effects = True
+
+    def __init__(self, dest: Optional[str], func: str, args: List[Operand]):
+        self.dest = dest
+        self.func = func
+        self.args = args
+        self.line = self.column = None
+
+    def uses(self):
+        return list(self.args)
+
+    def replace_uses(self, fn):
+        self.args = [fn(a) for a in self.args]
+
+    def copy(self):
+        return self._with_position(Call(self.dest, self.func, list(self.args)))
+
+    def __str__(self):
+        args_str = ", ".join(str(a) for a in self.args)
+        call_str = f"call {self.func}({args_str})"
+        return f"{self.dest} = {call_str}" if self.dest else call_str
+
+
+class GetField(Instruction):
+    """dest = obj.member
+    index is the member's position in its struct layout once resolved
+    (see src.ir.types.resolve_members), or None.
+    """
+
+    __slots__ = ("dest", "obj", "member", "index")
+
+    def __init__(self, dest: str, obj: Operand, member: str, index: Optional[int] = None):
+        self.dest = dest
+        self.obj = obj
+        self.member = member
+        self.index = index
+        self.line = self.column = None
+
+    def uses(self):
+        return [self.obj]
+
+    def replace_uses(self, fn):
+        self.obj = fn(self.obj)
+
+    def copy(self):
+        return self._with_position(GetField(self.dest, self.obj, self.member, self.index))
+
+    def __str__(self):
+        return f"{self.dest} = {self.obj}.{self.member}"
+
+
+class SetField(Instruction):
+    """dest = obj with obj.path[0].path[1]... replaced by value.
+    Struct values have copy semantics, so a member store is modelled as
+    producing a new struct value; the builder always emits dest == obj.
+    indexes holds the member positions along path once resolved, or None.
+    """
+
+    __slots__ = ("dest", "obj", "path", "value", "indexes")
+
+    def __init__(
+        self,
+        dest: str,
+        obj: Operand,
+        path: Tuple[str, ...],
+        value: Operand,
+        indexes: Optional[Tuple[int, ...]] = None,
+    ):
+        self.dest = dest
+        self.obj = obj
+        self.path = tuple(path)
+        self.value = value
+        self.indexes = indexes
+        self.line = self.column = None
+
+    def uses(self):
+        return [self.obj, self.value]
+
+    def replace_uses(self, fn):
+        self.obj = fn(self.obj)
+        self.value = fn(self.value)
+
+    def copy(self):
+        return self._with_position(
+            SetField(self.dest, self.obj, self.path, self.value, self.indexes)
+        )
+
+    def __str__(self):
+        path_str = ".".join(self.path)
+        return f"{self.dest} = setfield {self.obj}.{path_str}, {self.value}"
+
+
+class MakeStruct(Instruction):
+    """dest = {values}; struct_name is None when the context does not say."""
+
+    __slots__ = ("dest", "struct_name", "values")
+
+    def __init__(self, dest: str, struct_name: Optional[str], values: List[Operand]):
+        self.dest = dest
+        self.struct_name = struct_name
+        self.values = values
+        self.line = self.column = None
+
+    def uses(self):
+        return list(self.values)
+
+    def replace_uses(self, fn):
+        self.values = [fn(v) for v in self.values]
+
+    def copy(self):
+        return self._with_position(
+            MakeStruct(self.dest, self.struct_name, list(self.values))
+        )
+
+    def __str__(self):
+        values_str = ", ".join(str(v) for v in self.values)
+        name_str = f" : {self.struct_name}" if self.struct_name else ""
+        return f"{self.dest} = {{{values_str}}}{name_str}"
+
+
+class Declare(Instruction):
+    """Declaration without initializer; dest holds an undefined value.
+    var_type is the declared AST type, or None for 'auto'.
+    """
+
+    __slots__ = ("dest", "var_type")
+
+    def __init__(self, dest: str, var_type=None):
+        self.dest = dest
+        self.var_type = var_type
+        self.line = self.column = None
+
+    def copy(self):
+        return self._with_position(Declare(self.dest, self.var_type))
+
+    def __str__(self):
+        type_str = "auto" if self.var_type is None else str(self.var_type)
+        return f"declare {type_str} {self.dest}"
+
+
+class Phi(Instruction):
+    """SSA phi function: dest = incoming[pred] for the edge taken.
+    incoming maps predecessor block ids to operands.
+    """
+
+    __slots__ = ("dest", "incoming")
+
+    def __init__(self, dest: str, incoming: Optional[Dict[int, Operand]] = None):
+        self.dest = dest
+        self.incoming = incoming if incoming is not None else {}
+        self.line = self.column = None
+
+    def uses(self):
+        return list(self.incoming.values())
+
+    def replace_uses(self, fn):
+        self.incoming = {b: fn(v) for b, v in self.incoming.items()}
+
+    def copy(self):
+        return self._with_position(Phi(self.dest, dict(self.incoming)))
+
+    def __str__(self):
+        args_str = ", ".join(f"B{b}: {v}" for b, v in sorted(self.incoming.items()))
+        return f"{self.dest} = phi({args_str})"
+
+
+# ============================================================================
+# Terminators
+# ============================================================================
+
+
+class Terminator(Instruction):
+    """Base class for instructions that end a basic block."""
+
+    __slots__ = ()
+
+    def targets(self) -> List[int]:
+        """Successor block ids, in branch order."""
+        return []
+
+    def replace_targets(self, fn: Callable[[int], int]):
+        """Replace every successor block id with fn(block_id)."""
+        pass
+
+
+class Jump(Terminator):
+    """Unconditional jump."""
+
+    __slots__ = ("target",)
+
+    def __init__(self, target: int):
+        self.target = target
+        self.line = self.column = None
+
+    def targets(self):
+        return [self.target]
+
+    def replace_targets(self, fn):
+        self.target = fn(self.target)
+
+    def copy(self):
+        return self._with_position(Jump(self.target))
+
+    def __str__(self):
+        return f"jump B{self.target}"
+
+
+class Branch(Terminator):
+    """Two-way branch on an int condition (non-zero is true)."""
+
+    __slots__ = ("cond", "if_true", "if_false")
+
+    def __init__(self, cond: Operand, if_true: int, if_false: int):
+        self.cond = cond
+        self.if_true = if_true
+        self.if_false = if_false
+        self.line = self.column = None
+
+    def uses(self):
+        return [self.cond]
+
+    def replace_uses(self, fn):
+        self.cond = fn(self.cond)
+
+    def targets(self):
+        return [self.if_true, self.if_false]
+
+    def replace_targets(self, fn):
+        self.if_true = fn(self.if_true)
+        self.if_false = fn(self.if_false)
+
+    def copy(self):
+        return self._with_position(Branch(self.cond, self.if_true, self.if_false))
+
+    def __str__(self):
+        return f"branch {self.cond} ? B{self.if_true} : B{self.if_false}"
+
+
+class Return(Terminator):
+    """Return from the function, with an optional value."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: Optional[Operand] = None):
+        self.value = value
+        self.line = self.column = None
+
+    def uses(self):
+        return [] if self.value is None else [self.value]
+
+    def replace_uses(self, fn):
+        if self.value is not None:
+            self.value = fn(self.value)
+
+    def copy(self):
+        return self._with_position(Return(self.value))
+
+    def __str__(self):
+        return "return" if self.value is None else f"return {self.value}"
@@ -0,0 +1,157 @@
+"""
+Execution counts of a TyC program, for profile-guided optimization.
+A profile records, per function and source position ("line:column"):
+
+- branches: how often each conditional branch went to its true and to
+  its false target (switch case tests are branches at their case);
+- loops: how often each loop was entered and how many iterations it ran,
+  keyed by the position of its header (the loop condition);
+- calls: how often each call site was executed.
+
+Profiles are collected by src.runtime.profiler.CountingProfiler and saved
+as JSON. Lookups go by source position alone: positions are unique within
+a source file, and code inlined into another function keeps the positions
+(and so the counts) of the function it came from.
+"""
+
+import json
+from typing import Dict, Optional, Tuple
+
+from src.ir.instructions import Instruction
+
+FORMAT_VERSION = 1
+
+Position = Tuple[int, int]
+
+
+def position_key(line: int, column: int) -> str:
+    return f"{line}:{column}"
+
+
+def parse_key(key: str) -> Position:
+    line, column = key.split(":")
+    return int(line), int(column)
+
+
+def _add(a, b):
+    if isinstance(a, tuple):
+        return tuple(x + y for x, y in zip(a, b))
+    return a + b
+
+
+class FunctionCounts:
+    """Counters of one function, by position key."""
+
+    def __init__(self):
+        self.branches: Dict[str, Tuple[int, int]] = {}
+        self.loops: Dict[str, Tuple[int, int]] = {}
+        self.calls: Dict[str, int] = {}
+
+    def as_dict(self) -> Dict[str, Dict]:
+        return {
+            "branches": {k: list(v) for k, v in self.branches.items()},
+            "loops": {k: list(v) for k, v in self.loops.items()},
+            "calls": dict(self.calls),
+        }
+
+
+class ProgramProfile:
+    """Branch, loop and call counts of a program."""
+
+    def __init__(self):
+        self.functions: Dict[str, FunctionCounts] = {}
+        self._index: Optional[Dict[str, Dict[Position, object]]] = None
+
+    def counts(self, function: str) -> FunctionCounts:
+        self._index = None
+        if function not in self.functions:
+            self.functions[function] = FunctionCounts()
+        return self.functions[function]
+
+    def add_branch(self, function: str, position: Position, taken: int, not_taken: int):
+        branches = self.counts(function).branches
+        key = position_key(*position)
+        old = branches.get(key, (0, 0))
+        branches[key] = (old[0] + taken, old[1] + not_taken)
+
+    def add_loop(self, function: str, position: Position, entries: int, iterations: int):
+        loops = self.counts(function).loops
+        key = position_key(*position)
+        old = loops.get(key, (0, 0))
+        loops[key] = (old[0] + entries, old[1] + iterations)
+
+    def add_call(self, function: str, position: Position, count: int):
+        calls = self.counts(function).calls
+        key = position_key(*position)
+        calls[key] = calls.get(key, 0) + count
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def _lookup(self, kind: str, instr: Instruction):
+        if instr.line is None or instr.column is None:
+            return None
+        if self._index is None:
+            self._index = {"branches": {}, "loops": {}, "calls": {}}
+            for counts in self.functions.values():
+                for name, table in self._index.items():
+                    for key, value in getattr(counts, name).items():
+                        # Code inlined before profiling is counted in
+                        # every function it was inlined into.
+                        position = parse_key(key)
+                        old = table.get(position)
+                        table[position] = value if old is None else _add(old, value)
+        return self._index[kind].get((instr.line, instr.column))
+
+    def branch(self, instr: Instruction) -> Optional[Tuple[int, int]]:
+        """(taken, not taken) counts of the branch at instr's position, or
+        None if the profile has no branch there."""
+        return self._lookup("branches", instr)
+
+    def loop(self, instr: Instruction) -> Optional[Tuple[int, int]]:
+        """(entries, iterations) of the loop whose header is at instr's
+        position, or None."""
+        return self._lookup("loops", instr)
+
+    def calls(self, instr: Instruction) -> Optional[int]:
+        """Execution count of the call site at instr's position, or None.
+        A count of 0 means the site was never reached."""
+        return self._lookup("calls", instr)
+
+    def total_calls(self) -> int:
+        return sum(sum(c.calls.values()) for c in self.functions.values())
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def to_dict(self) -> Dict:
+        return {
+            "version": FORMAT_VERSION,
+            "functions": {n: c.as_dict() for n, c in sorted(self.functions.items())},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ProgramProfile":
+        if data.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported profile version: {data.get('version')}")
+        profile = cls()
+        for name, tables in data.get("functions", {}).items():
+            for key, (taken, not_taken) in tables.get("branches", {}).items():
+                profile.add_branch(name, parse_key(key), taken, not_taken)
+            for key, (entries, iterations) in tables.get("loops", {}).items():
+                profile.add_loop(name, parse_key(key), entries, iterations)
+            for key, count in tables.get("calls", {}).items():
+                profile.add_call(name, parse_key(key), count)
+        return profile
+
+    def save(self, path: str):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+            f.write("\n")
+
+    @classmethod
+    def load(cls, path: str) -> "ProgramProfile":
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
@@ -0,0 +1,77 @@
+"""
+Side-effect analysis of the functions of a TyC program.
+A function is pure when it calls no I/O builtin, calls only pure
+functions (unknown functions count as impure), and takes and returns
+only int, float and string values. TyC has no global variables and
+struct values are copied, so a pure function's result depends only on
+its arguments and the call can be skipped when the same arguments have
+been seen before (see src.runtime.memo).
+
+Purity is the greatest fixed point over the call graph: every function
+starts out pure and loses the property when a callee does, so mutually
+recursive functions are pure together.
+"""
+
+from typing import Dict, Optional, Set
+
+from src.ir.callgraph import CallGraph
+from src.ir.cfg import CFG
+from src.ir.types import FLOAT, INT, STRING, BUILTIN_RETURNS, TypeInference, type_of
+from src.utils.nodes import StructDecl
+
+_VALUE_TYPES = frozenset([INT, FLOAT, STRING])
+
+
+class PurityAnalysis:
+    """Find the pure functions of a program."""
+
+    def __init__(
+        self,
+        cfgs: Dict[str, CFG],
+        structs: Optional[Dict[str, StructDecl]] = None,
+        graph: Optional[CallGraph] = None,
+    ):
+        self.cfgs = cfgs
+        self.graph = graph if graph is not None else CallGraph(cfgs)
+        inference = TypeInference(cfgs, structs)
+        inference.run()
+        self.returns = inference.returns
+        self.reasons: Dict[str, str] = {}
+
+    def run(self) -> Set[str]:
+        """Names of the pure functions."""
+        for name, cfg in self.cfgs.items():
+            reason = self._local_reason(name, cfg)
+            if reason is not None:
+                self.reasons[name] = reason
+        changed = True
+        while changed:
+            changed = False
+            for name in self.graph.bottom_up():
+                if name in self.reasons:
+                    continue
+                impure = sorted(c for c in self.graph.callees[name] if c in self.reasons)
+                if impure:
+                    self.reasons[name] = f"calls impure function {impure[0]}"
+                    changed = True
+        return {name for name in self.cfgs if name not in self.reasons}
+
+    def _local_reason(self, name: str, cfg: CFG) -> Optional[str]:
+        """Why the function is impure on its own, or None."""
+        for param in cfg.params:
+            if type_of(cfg.var_types.get(param)) not in _VALUE_TYPES:
+                return f"parameter {param} is not an int, float or string"
+        if self.returns.get(name) not in _VALUE_TYPES:
+            return "does not return an int, float or string"
+        for callee in sorted(self.graph.external[name]):
+            if callee in BUILTIN_RETURNS:
+                return f"calls I/O builtin {callee}"
+            return f"calls unknown function {callee}"
+        return None
+
+
+def find_pure_functions(
+    cfgs: Dict[str, CFG], structs: Optional[Dict[str, StructDecl]] = None
+) -> Set[str]:
+    """Names of the pure functions of a program."""
+    return PurityAnalysis(cfgs, structs).run()
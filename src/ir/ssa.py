@@ -0,0 +1,260 @@
+"""
+Static single assignment form for TyC control-flow graphs.
+This module converts a CFG into SSA form (semi-pruned phi placement on
+dominance frontiers, renaming over the dominator tree) and back out of
+SSA form by splitting critical edges and lowering phis to parallel copies.
+
+SSA versions of a variable are named ``name.N``; parameters keep their
+name as version 0. '.' never appears in TyC identifiers.
+"""
+
+from typing import Dict, List, Set, Tuple
+
+from src.ir.cfg import CFG
+from src.ir.dataflow import liveness
+from src.ir.dominance import dominance_frontiers, dominator_tree, immediate_dominators
+from src.ir.instructions import *
+
+
+def construct_ssa(cfg: CFG) -> CFG:
+    """Rewrite cfg into SSA form in place and return it."""
+    if cfg.ssa:
+        return cfg
+    idom = immediate_dominators(cfg)
+    frontiers = dominance_frontiers(cfg, idom)
+    children = dominator_tree(cfg, idom)
+
+    # Variables live across blocks ("globals") and the blocks defining them.
+    def_blocks: Dict[str, Set[int]] = {p: {cfg.entry} for p in cfg.params}
+    non_locals: Set[str] = set()
+    for block in cfg.blocks:
+        killed = set()
+        for instr in block.instructions + [block.terminator]:
+            for use in instr.uses():
+                if is_var(use) and use not in killed:
+                    non_locals.add(use)
+            if instr.dest is not None:
+                killed.add(instr.dest)
+                def_blocks.setdefault(instr.dest, set()).add(block.id)
+
+    # Phi placement on iterated dominance frontiers.
+    phi_vars: Dict[int, Phi] = {}
+    phis_in: List[List[Phi]] = [[] for _ in cfg.blocks]
+    for var in sorted(non_locals):
+        work = list(def_blocks.get(var, ()))
+        has_phi = set()
+        while work:
+            block_id = work.pop()
+            for frontier in frontiers[block_id]:
+                if frontier in has_phi:
+                    continue
+                has_phi.add(frontier)
+                phi = Phi(var)
+                phi_vars[id(phi)] = var
+                phis_in[frontier].append(phi)
+                if frontier not in def_blocks.get(var, ()):
+                    work.append(frontier)
+    for block in cfg.blocks:
+        block.instructions[:0] = phis_in[block.id]
+
+    # Renaming over the dominator tree.
+    counters: Dict[str, int] = {}
+    stacks: Dict[str, List[str]] = {p: [p] for p in cfg.params}
+
+    def current(operand):
+        if is_var(operand):
+            stack = stacks.get(operand)
+            return stack[-1] if stack else UNDEF
+        return operand
+
+    def fresh(var: str) -> str:
+        n = counters.get(var, 0) + 1
+        counters[var] = n
+        name = f"{var}.{n}"
+        stacks.setdefault(var, []).append(name)
+        if var in cfg.var_types:
+            cfg.var_types[name] = cfg.var_types[var]
+        return name
+
+    work: List[Tuple[int, bool, List[str]]] = [(cfg.entry, False, [])]
+    while work:
+        block_id, leaving, pushed = work.pop()
+        if leaving:
+            for var in pushed:
+                stacks[var].pop()
+            continue
+        block = cfg.blocks[block_id]
+        pushed = []
+        for instr in block.instructions:
+            if isinstance(instr, Phi):
+                var = phi_vars[id(instr)]
+            else:
+                instr.replace_uses(current)
+                var = instr.dest
+            if var is not None:
+                instr.dest = fresh(var)
+                pushed.append(var)
+        block.terminator.replace_uses(current)
+        for succ in cfg.succs[block_id]:
+            for instr in cfg.blocks[succ].instructions:
+                if not isinstance(instr, Phi):
+                    break
+                instr.incoming[block_id] = current(phi_vars[id(instr)])
+        work.append((block_id, True, pushed))
+        for child in reversed(children[block_id]):
+            work.append((child, False, []))
+
+    cfg.ssa = True
+    return cfg
+
+
+def split_critical_edges(cfg: CFG):
+    """Insert an empty block on every edge from a block with several
+    successors to a block with several predecessors."""
+    for block_id in range(len(cfg.blocks)):
+        preds = cfg.preds[block_id]
+        if len(preds) < 2:
+            continue
+        for pred in list(preds):
+            if len(cfg.succs[pred]) < 2:
+                continue
+            middle = cfg.new_block()
+            middle.terminator = Jump(block_id)
+            cfg.blocks[pred].terminator.replace_targets(
+                lambda t, b=block_id, m=middle.id: m if t == b else t
+            )
+            for instr in cfg.blocks[block_id].instructions:
+                if not isinstance(instr, Phi):
+                    break
+                if pred in instr.incoming:
+                    instr.incoming[middle.id] = instr.incoming.pop(pred)
+        cfg.compute_edges()
+
+
+def sequentialize_copies(pairs: List[Tuple[str, Operand]], new_temp) -> List[Copy]:
+    """Order the parallel copies dest_i = src_i as sequential copies,
+    breaking cycles with temporaries from new_temp()."""
+    pending = [(d, s) for d, s in pairs if d != s]
+    copies = []
+    while pending:
+        sources = {s for _, s in pending if is_var(s)}
+        for i, (dest, src) in enumerate(pending):
+            if dest not in sources:
+                copies.append(Copy(dest, src))
+                del pending[i]
+                break
+        else:
+            # Every destination is still needed as a source: a cycle.
+            dest, _ = pending[0]
+            temp = new_temp()
+            copies.append(Copy(temp, dest))
+            pending = [(d, temp if s == dest else s) for d, s in pending]
+    return copies
+
+
+def destruct_ssa(cfg: CFG) -> CFG:
+    """Replace phis by copies in the predecessors, in place."""
+    if not cfg.ssa:
+        return cfg
+    split_critical_edges(cfg)
+    counter = [0]
+
+    def new_temp():
+        counter[0] += 1
+        return f"$phi{counter[0]}"
+
+    copies_for: Dict[int, List[Tuple[str, Operand]]] = {}
+    for block in cfg.blocks:
+        phis = [i for i in block.instructions if isinstance(i, Phi)]
+        if not phis:
+            continue
+        block.instructions = block.instructions[len(phis):]
+        for pred in cfg.preds[block.id]:
+            pairs = [
+                (phi.dest, phi.incoming[pred])
+                for phi in phis
+                if pred in phi.incoming and phi.incoming[pred] != UNDEF
+            ]
+            copies_for.setdefault(pred, []).extend(pairs)
+
+    for pred, pairs in copies_for.items():
+        cfg.blocks[pred].instructions.extend(sequentialize_copies(pairs, new_temp))
+    cfg.ssa = False
+    coalesce_copies(cfg)
+    return cfg
+
+
+def coalesce_copies(cfg: CFG) -> int:
+    """Merge the source and destination of copies whose live ranges do not
+    interfere and delete the copies; returns how many were deleted.
+
+    Two variables interfere when one is live where the other is defined,
+    except that a copy does not make its source and destination interfere.
+    Parameters are never renamed, so two parameters are never merged.
+
+    The struct and result of a member store are merged the same way when
+    they do not interfere, so that the store can update its struct in
+    place at run time (see src.runtime.structs.store_member).
+    """
+    live_vars = liveness(cfg)
+    interference: Dict[str, Set[str]] = {}
+    copies: List[Copy] = []
+    stores: List[SetField] = []
+    for block in cfg.blocks:
+        live = set(live_vars.live_out(block.id))
+        live.update(u for u in block.terminator.uses() if is_var(u))
+        for instr in reversed(block.instructions):
+            dest = instr.dest
+            if dest is not None:
+                source = None
+                if isinstance(instr, Copy) and is_var(instr.src):
+                    source = instr.src
+                    copies.append(instr)
+                elif isinstance(instr, SetField) and is_var(instr.obj):
+                    stores.append(instr)
+                for var in live:
+                    if var != dest and var != source:
+                        interference.setdefault(dest, set()).add(var)
+                        interference.setdefault(var, set()).add(dest)
+                live.discard(dest)
+            live.update(u for u in instr.uses() if is_var(u))
+
+    params = set(cfg.params)
+    parent: Dict[str, str] = {}
+
+    def find(var: str) -> str:
+        while var in parent:
+            var = parent[var]
+        return var
+
+    for a, b in [(c.dest, c.src) for c in copies] + [(s.dest, s.obj) for s in stores]:
+        a, b = find(a), find(b)
+        if a == b or (a in params and b in params):
+            continue
+        if any(find(v) == b for v in interference.get(a, ())):
+            continue
+        if b in params or (is_temp(a) and not is_temp(b)):
+            a, b = b, a
+        parent[b] = a
+        interference.setdefault(a, set()).update(interference.pop(b, ()))
+
+    if not parent:
+        return 0
+
+    def rename(operand):
+        return find(operand) if is_var(operand) else operand
+
+    removed = 0
+    for block in cfg.blocks:
+        kept = []
+        for instr in block.instructions:
+            instr.replace_uses(rename)
+            if instr.dest is not None:
+                instr.dest = find(instr.dest)
+            if isinstance(instr, Copy) and instr.src == instr.dest:
+                removed += 1
+                continue
+            kept.append(instr)
+        block.instructions = kept
+        block.terminator.replace_uses(rename)
+    return removed
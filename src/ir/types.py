@@ -0,0 +1,212 @@
+"""
+Type inference for the variables of TyC control-flow graphs.
+Declared types are taken from the CFG; temporaries, 'auto' variables and
+'auto' return types are inferred from the instructions defining them,
+iterating over the whole program until nothing changes.
+
+resolve_members uses the inferred types to annotate member accesses with
+the position of the member in its struct, so the runtime can index
+struct values instead of searching them by member name.
+
+Types are plain strings: "int", "float", "string", "void", or the name of
+a struct type (struct names never clash with these keywords). A variable
+whose type cannot be determined has no entry, and one that is assigned
+values of different types gets MIXED.
+"""
+
+from typing import Dict, Optional
+
+from src.ir.cfg import CFG
+from src.ir.instructions import *
+from src.utils.nodes import FloatType, IntType, StringType, StructDecl, StructType, VoidType
+
+INT = "int"
+FLOAT = "float"
+STRING = "string"
+VOID = "void"
+MIXED = "mixed"
+
+BUILTIN_RETURNS = {
+    "readInt": INT,
+    "readFloat": FLOAT,
+    "readString": STRING,
+    "printInt": VOID,
+    "printFloat": VOID,
+    "printString": VOID,
+}
+
+_RELATIONAL = frozenset(["==", "!=", "<", "<=", ">", ">="])
+
+
+def type_of(ast_type) -> Optional[str]:
+    """Type string of an AST type node; None for 'auto'."""
+    if isinstance(ast_type, IntType):
+        return INT
+    if isinstance(ast_type, FloatType):
+        return FLOAT
+    if isinstance(ast_type, StringType):
+        return STRING
+    if isinstance(ast_type, VoidType):
+        return VOID
+    if isinstance(ast_type, StructType):
+        return ast_type.struct_name
+    return None
+
+
+def join(a: Optional[str], b: Optional[str]) -> Optional[str]:
+    if a is None:
+        return b
+    if b is None or a == b:
+        return a
+    return MIXED
+
+
+def const_type(value) -> Optional[str]:
+    if isinstance(value, int):
+        return INT
+    if isinstance(value, float):
+        return FLOAT
+    if isinstance(value, str):
+        return STRING
+    return None
+
+
+class TypeInference:
+    """Infer the type of every variable of a set of CFGs."""
+
+    def __init__(self, cfgs: Dict[str, CFG], structs: Optional[Dict[str, StructDecl]] = None):
+        self.cfgs = cfgs
+        self.members: Dict[str, Dict[str, Optional[str]]] = {
+            name: {m.name: type_of(m.member_type) for m in decl.members}
+            for name, decl in (structs or {}).items()
+        }
+        self.returns: Dict[str, Optional[str]] = dict(BUILTIN_RETURNS)
+        self.declared_returns = set()
+        for name, cfg in cfgs.items():
+            declared = type_of(cfg.return_type)
+            self.returns[name] = declared
+            if declared is not None:
+                self.declared_returns.add(name)
+        self.types: Dict[str, Dict[str, str]] = {}
+
+    def run(self) -> Dict[str, Dict[str, str]]:
+        """Types of the variables of every function, by function name."""
+        changed = True
+        while changed:
+            changed = False
+            for name, cfg in self.cfgs.items():
+                self.types[name] = types = self._infer(cfg)
+                if name in self.declared_returns:
+                    continue
+                result = self.returns.get(name)
+                for block in cfg.blocks:
+                    term = block.terminator
+                    if isinstance(term, Return):
+                        value = VOID if term.value is None else self._operand(term.value, types)
+                        result = join(result, value)
+                if result != self.returns.get(name):
+                    self.returns[name] = result
+                    changed = True
+        return self.types
+
+    def _operand(self, operand, types) -> Optional[str]:
+        if is_var(operand):
+            return types.get(operand)
+        return const_type(operand.value)
+
+    def _infer(self, cfg: CFG) -> Dict[str, str]:
+        declared = {v: type_of(t) for v, t in cfg.var_types.items() if type_of(t) is not None}
+        types: Dict[str, str] = dict(declared)
+        changed = True
+        while changed:
+            changed = False
+            for block in cfg.blocks:
+                for instr in block.instructions:
+                    dest = instr.dest
+                    if dest is None or dest in declared:
+                        continue
+                    new = join(types.get(dest), self._result(instr, types))
+                    if new is not None and new != types.get(dest):
+                        types[dest] = new
+                        changed = True
+        return types
+
+    def _result(self, instr: Instruction, types) -> Optional[str]:
+        operand = lambda o: self._operand(o, types)
+        if isinstance(instr, Copy):
+            return operand(instr.src)
+        if isinstance(instr, BinOp):
+            if instr.operator in _RELATIONAL:
+                return INT
+            left, right = operand(instr.left), operand(instr.right)
+            if left is None or right is None:
+                return None
+            if FLOAT in (left, right) and {left, right} <= {INT, FLOAT}:
+                return FLOAT
+            return left if left == right else MIXED
+        if isinstance(instr, UnaryOp):
+            return INT if instr.operator == "!" else operand(instr.operand)
+        if isinstance(instr, Call):
+            return self.returns.get(instr.func)
+        if isinstance(instr, GetField):
+            struct = operand(instr.obj)
+            return self.members.get(struct, {}).get(instr.member)
+        if isinstance(instr, SetField):
+            return operand(instr.obj)
+        if isinstance(instr, MakeStruct):
+            return instr.struct_name
+        if isinstance(instr, Declare):
+            return type_of(instr.var_type)
+        if isinstance(instr, Phi):
+            result = None
+            for value in instr.incoming.values():
+                result = join(result, operand(value))
+            return result
+        return None
+
+
+def infer_types(cfgs: Dict[str, CFG], structs: Optional[Dict[str, StructDecl]] = None) -> Dict[str, Dict[str, str]]:
+    """Infer variable types for every function of a program."""
+    return TypeInference(cfgs, structs).run()
+
+
+def resolve_members(
+    cfgs: Dict[str, CFG],
+    structs: Dict[str, StructDecl],
+    types: Optional[Dict[str, Dict[str, str]]] = None,
+) -> int:
+    """Set GetField.index and SetField.indexes wherever the struct type of
+    the accessed value is known; returns how many accesses were resolved."""
+    if types is None:
+        types = infer_types(cfgs, structs)
+    members = {
+        name: {m.name: (i, type_of(m.member_type)) for i, m in enumerate(decl.members)}
+        for name, decl in structs.items()
+    }
+
+    def path_indexes(struct: Optional[str], path) -> Optional[tuple]:
+        indexes = []
+        for member in path:
+            entry = members.get(struct, {}).get(member)
+            if entry is None:
+                return None
+            index, struct = entry
+            indexes.append(index)
+        return tuple(indexes)
+
+    resolved = 0
+    for name, cfg in cfgs.items():
+        fn_types = types.get(name, {})
+        for block in cfg.blocks:
+            for instr in block.instructions:
+                if isinstance(instr, GetField):
+                    struct = fn_types.get(instr.obj) if is_var(instr.obj) else None
+                    indexes = path_indexes(struct, (instr.member,))
+                    instr.index = indexes[0] if indexes else None
+                elif isinstance(instr, SetField):
+                    struct = fn_types.get(instr.obj) if is_var(instr.obj) else None
+                    indexes = instr.indexes = path_indexes(struct, instr.path)
+                else:
+                    continue
+                resolved += indexes is not None
+    return resolved
@@ -0,0 +1,3 @@
+"""
+Optimization passes over the TyC intermediate representation
+"""
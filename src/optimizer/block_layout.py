@@ -0,0 +1,56 @@
+"""
+Profile-guided block layout.
+Blocks are renumbered so that the likelier successor of every branch (by
+the branch counts of a ProgramProfile) directly follows it, building
+chains of hot blocks starting at the entry. Successors a branch never
+went to during the profiled runs are moved to the end of the function.
+Branches without counts keep their true target first.
+"""
+
+from typing import List, Tuple
+
+from src.ir.cfg import CFG, BasicBlock
+from src.ir.instructions import *
+from src.ir.profile import ProgramProfile
+
+
+def _successors(block: BasicBlock, profile: ProgramProfile) -> Tuple[List[int], List[int]]:
+    """Successors to chain, likeliest first, and the cold ones."""
+    term = block.terminator
+    if isinstance(term, Branch):
+        counts = profile.branch(term)
+        if counts is not None and max(counts) > 0:
+            taken, not_taken = counts
+            hot, cold = term.if_true, term.if_false
+            if not_taken > taken:
+                hot, cold = cold, hot
+            if min(counts) == 0:
+                return [hot], [cold]
+            return [hot, cold], []
+    return term.targets(), []
+
+
+def run_block_layout(cfg: CFG, profile: ProgramProfile) -> int:
+    """Lay out the blocks of cfg hot paths first; returns the number of
+    blocks that moved."""
+    order: List[int] = []
+    placed = set()
+    pending = [cfg.entry]
+    cold: List[int] = []
+    while pending or cold:
+        block_id = pending.pop() if pending else cold.pop(0)
+        while block_id is not None and block_id not in placed:
+            placed.add(block_id)
+            order.append(block_id)
+            likely, never = _successors(cfg.blocks[block_id], profile)
+            cold.extend(never)
+            block_id = None
+            for succ in reversed(likely):
+                if succ not in placed:
+                    if block_id is not None:
+                        pending.append(block_id)
+                    block_id = succ
+    moved = sum(1 for new, old in enumerate(order) if new != old)
+    if moved or len(order) != len(cfg.blocks):
+        cfg.reorder(order)
+    return moved
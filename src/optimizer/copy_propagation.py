@@ -0,0 +1,61 @@
+"""
+Copy propagation on SSA form.
+Every use of the destination of a copy 'x = y' is replaced by y, and phis
+whose operands all name the same value collapse the same way. Struct
+values are immutable in the IR (member stores produce new values), so
+forwarding struct copies is safe.
+"""
+
+from typing import Dict
+
+from src.ir.cfg import CFG
+from src.ir.instructions import *
+
+
+def run_copy_propagation(cfg: CFG) -> int:
+    """Propagate copies in an SSA CFG; returns the number of copies and
+    phis removed."""
+    replacement: Dict[str, Operand] = {}
+
+    def resolve(operand):
+        seen = 0
+        while is_var(operand) and operand in replacement and seen < len(replacement):
+            operand = replacement[operand]
+            seen += 1
+        return operand
+
+    changed = True
+    while changed:
+        changed = False
+        for block in cfg.blocks:
+            for instr in block.instructions:
+                if instr.dest in replacement:
+                    continue
+                if isinstance(instr, Copy):
+                    src = resolve(instr.src)
+                    if src != instr.dest:
+                        replacement[instr.dest] = src
+                        changed = True
+                elif isinstance(instr, Phi):
+                    values = {
+                        resolve(v) for v in instr.incoming.values()
+                    } - {instr.dest}
+                    if len(values) == 1:
+                        (value,) = values
+                        replacement[instr.dest] = value
+                        changed = True
+
+    if not replacement:
+        return 0
+    removed = 0
+    for block in cfg.blocks:
+        kept = []
+        for instr in block.instructions:
+            if instr.dest in replacement and isinstance(instr, (Copy, Phi)):
+                removed += 1
+                continue
+            instr.replace_uses(resolve)
+            kept.append(instr)
+        block.instructions = kept
+        block.terminator.replace_uses(resolve)
+    return removed
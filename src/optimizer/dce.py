@@ -0,0 +1,55 @@
+"""
+Dead-code elimination on SSA form.
+Instructions are live when they have side effects (calls, divisions that
+may trap), feed a terminator, or feed another live instruction; all other
+instructions and phis are deleted.
+"""
+
+from typing import Dict, List
+
+from src.ir.cfg import CFG
+from src.ir.instructions import *
+from src.runtime.operators import TRAPPING
+
+
+def _is_root(instr: Instruction) -> bool:
+    if instr.has_side_effects:
+        return True
+    if isinstance(instr, BinOp) and instr.operator in TRAPPING:
+        divisor = instr.right
+        return not (isinstance(divisor, Const) and divisor.value not in (0, None))
+    return False
+
+
+def run_dce(cfg: CFG) -> int:
+    """Delete dead instructions from an SSA CFG; returns how many."""
+    definitions: Dict[str, Instruction] = {}
+    for block in cfg.blocks:
+        for instr in block.instructions:
+            if instr.dest is not None:
+                definitions[instr.dest] = instr
+
+    live = set()
+    work: List[Instruction] = []
+    for block in cfg.blocks:
+        for instr in block.instructions:
+            if _is_root(instr):
+                live.add(id(instr))
+                work.append(instr)
+        work.append(block.terminator)
+    while work:
+        instr = work.pop()
+        for use in instr.uses():
+            if not is_var(use):
+                continue
+            definition = definitions.get(use)
+            if definition is not None and id(definition) not in live:
+                live.add(id(definition))
+                work.append(definition)
+
+    removed = 0
+    for block in cfg.blocks:
+        kept = [i for i in block.instructions if id(i) in live]
+        removed += len(block.instructions) - len(kept)
+        block.instructions = kept
+    return removed
@@ -0,0 +1,119 @@
+"""
+Global value numbering over the dominator tree.
+This pass runs on SSA form. Walking the dominator tree with a scoped hash
+table, an instruction that recomputes a value already available in a
+dominating block is deleted and its uses are redirected to the earlier
+result. Calls are never numbered since they may have side effects.
+Algebraic identities such as x - 0 and x * 1 are simplified on the way
+(x + 0 is not one: it turns a float -0.0 into 0.0).
+"""
+
+from typing import Dict, List, Tuple
+
+from src.ir.cfg import CFG
+from src.ir.dominance import dominator_tree, immediate_dominators
+from src.ir.instructions import *
+from src.runtime.operators import COMMUTATIVE
+
+
+def _operand_key(operand):
+    if is_var(operand):
+        return operand
+    return const_key(operand.value)
+
+
+def _value_key(instr: Instruction):
+    if isinstance(instr, BinOp):
+        left, right = _operand_key(instr.left), _operand_key(instr.right)
+        if instr.operator in COMMUTATIVE and repr(left) > repr(right):
+            left, right = right, left
+        return ("bin", instr.operator, left, right)
+    if isinstance(instr, UnaryOp):
+        return ("un", instr.operator, _operand_key(instr.operand))
+    if isinstance(instr, GetField):
+        return ("get", _operand_key(instr.obj), instr.member)
+    if isinstance(instr, SetField):
+        return ("set", _operand_key(instr.obj), instr.path, _operand_key(instr.value))
+    if isinstance(instr, MakeStruct):
+        return ("make", instr.struct_name, tuple(_operand_key(v) for v in instr.values))
+    return None
+
+
+_IDENTITIES = {
+    "-": ("right",),
+    "*": ("left", "right"),
+    "/": ("right",),
+}
+
+
+def _identity_operand(instr: Instruction):
+    """Operand equal to the result of instr by an algebraic identity."""
+    if not isinstance(instr, BinOp) or instr.operator not in _IDENTITIES:
+        return None
+    neutral = 0 if instr.operator == "-" else 1
+    for side in _IDENTITIES[instr.operator]:
+        operand = getattr(instr, side)
+        if isinstance(operand, Const) and type(operand.value) is int and operand.value == neutral:
+            return instr.right if side == "left" else instr.left
+    return None
+
+
+def run_gvn(cfg: CFG) -> int:
+    """Remove redundant computations in an SSA CFG; returns the number of
+    instructions removed."""
+    idom = immediate_dominators(cfg)
+    children = dominator_tree(cfg, idom)
+    replacement: Dict[str, Operand] = {}
+    table: Dict[tuple, str] = {}
+    removed = 0
+
+    def resolve(operand):
+        if is_var(operand):
+            return replacement.get(operand, operand)
+        return operand
+
+    work: List[Tuple[int, bool, List[tuple]]] = [(cfg.entry, False, [])]
+    while work:
+        block_id, leaving, added = work.pop()
+        if leaving:
+            for key in added:
+                del table[key]
+            continue
+        block = cfg.blocks[block_id]
+        added = []
+        kept = []
+        for instr in block.instructions:
+            instr.replace_uses(resolve)
+            same = _identity_operand(instr)
+            if same is not None:
+                replacement[instr.dest] = same
+                removed += 1
+                continue
+            if isinstance(instr, Phi):
+                key = ("phi", block_id, tuple(sorted(
+                    (b, _operand_key(v)) for b, v in instr.incoming.items()
+                )))
+            else:
+                key = _value_key(instr)
+            if key is not None:
+                if key in table:
+                    replacement[instr.dest] = table[key]
+                    removed += 1
+                    continue
+                table[key] = instr.dest
+                added.append(key)
+            kept.append(instr)
+        block.instructions = kept
+        block.terminator.replace_uses(resolve)
+        work.append((block_id, True, added))
+        for child in reversed(children[block_id]):
+            work.append((child, False, []))
+
+    # Phi operands flowing around back edges may name values that were
+    # replaced after the phi was visited.
+    if replacement:
+        for block in cfg.blocks:
+            for instr in block.instructions:
+                if isinstance(instr, Phi):
+                    instr.replace_uses(resolve)
+    return removed
@@ -0,0 +1,164 @@
+"""
+Function inlining for TyC control-flow graphs.
+A call to a small, non-recursive function is replaced by a renamed copy
+of the callee's blocks: arguments become copies into the renamed
+parameters and every return becomes a copy into the call's destination
+followed by a jump to the code after the call, wherever the return sits
+in the callee's control flow.
+
+With a ProgramProfile, call sites are judged by how often they ran:
+sites that never ran are not inlined, and hot sites get a larger size
+budget.
+
+Inlining works on CFGs that are not in SSA form. Callee variables are
+renamed ``name@N`` for the N-th call inlined into the caller; '@' never
+appears in TyC identifiers.
+"""
+
+from typing import Dict, Optional
+
+from src.ir.callgraph import CallGraph
+from src.ir.cfg import CFG, BasicBlock
+from src.ir.instructions import *
+from src.ir.profile import ProgramProfile
+
+
+class Inliner:
+    """Inline calls using a size/benefit heuristic.
+
+    A call is inlined when the callee is not recursive and its size (in
+    instructions, terminators included) is at most max_callee_size plus
+    constant_arg_bonus for every constant argument, since constant
+    arguments usually let the inlined body fold. Inlining into a caller
+    stops once the caller has grown past max_caller_size.
+
+    With a profile, a call site the profiled runs never reached is not
+    inlined, and one that accounts for at least hot_call_share of all
+    profiled calls may inline callees of up to hot_callee_size. Sites the
+    profile has no count for use the static heuristic.
+    """
+
+    def __init__(
+        self,
+        cfgs: Dict[str, CFG],
+        graph: Optional[CallGraph] = None,
+        max_callee_size: int = 24,
+        max_caller_size: int = 1000,
+        constant_arg_bonus: int = 4,
+        profile: Optional[ProgramProfile] = None,
+        hot_callee_size: int = 96,
+        hot_call_share: float = 0.01,
+    ):
+        self.cfgs = cfgs
+        self.graph = graph if graph is not None else CallGraph(cfgs)
+        self.max_callee_size = max_callee_size
+        self.max_caller_size = max_caller_size
+        self.constant_arg_bonus = constant_arg_bonus
+        self.profile = profile
+        self.hot_callee_size = hot_callee_size
+        self.hot_calls = hot_call_share * profile.total_calls() if profile is not None else 0
+        self.inlined = 0
+        self.inlined_into: Dict[str, int] = {}
+        self.sites: Dict[str, int] = {}
+
+    def run(self) -> int:
+        """Inline into every function, callees first; returns the number
+        of calls inlined."""
+        for name in self.graph.bottom_up():
+            self.inline_calls(self.cfgs[name])
+        return self.inlined
+
+    def should_inline(self, caller: CFG, call: Call) -> bool:
+        callee = self.cfgs.get(call.func)
+        if callee is None or callee.ssa or self.graph.is_recursive(call.func):
+            return False
+        if caller.instruction_count() > self.max_caller_size:
+            return False
+        budget = self.max_callee_size + self.constant_arg_bonus * sum(
+            1 for a in call.args if isinstance(a, Const)
+        )
+        count = self.profile.calls(call) if self.profile is not None else None
+        if count == 0:
+            return False
+        if count is not None and count >= self.hot_calls:
+            budget = max(budget, self.hot_callee_size)
+        return callee.instruction_count() <= budget
+
+    def inline_calls(self, caller: CFG) -> int:
+        """Inline the eligible calls of caller in place; returns how many."""
+        if caller.ssa:
+            return 0
+        count = 0
+        work = [b.id for b in caller.blocks]
+        while work:
+            block = caller.blocks[work.pop()]
+            for i, instr in enumerate(block.instructions):
+                if isinstance(instr, Call) and self.should_inline(caller, instr):
+                    work.append(self._inline(caller, block, i).id)
+                    count += 1
+                    break
+        if count:
+            caller.remove_unreachable()
+            self.inlined += count
+            self.inlined_into[caller.name] = self.inlined_into.get(caller.name, 0) + count
+        return count
+
+    def _inline(self, caller: CFG, block: BasicBlock, index: int) -> BasicBlock:
+        """Inline the call at block.instructions[index]; returns the block
+        holding the code after the call."""
+        call = block.instructions[index]
+        callee = self.cfgs[call.func]
+        site = self.sites.get(caller.name, 0) + 1
+        self.sites[caller.name] = site
+        suffix = f"@{site}"
+
+        def rename(operand):
+            return operand + suffix if is_var(operand) else operand
+
+        after = caller.new_block()
+        after.instructions = block.instructions[index + 1:]
+        after.terminator = block.terminator
+        for succ in caller.succs[block.id]:
+            for instr in caller.blocks[succ].instructions:
+                if isinstance(instr, Phi) and block.id in instr.incoming:
+                    instr.incoming[after.id] = instr.incoming.pop(block.id)
+
+        offset = len(caller.blocks)
+        block.instructions = block.instructions[:index]
+        for param, arg in zip(callee.params, call.args):
+            block.instructions.append(_at(Copy(param + suffix, arg), call))
+        block.terminator = _at(Jump(callee.entry + offset), call)
+
+        for source in callee.blocks:
+            clone = caller.new_block()
+            for instr in source.instructions:
+                copy = instr.copy()
+                copy.replace_uses(rename)
+                if copy.dest is not None:
+                    copy.dest = copy.dest + suffix
+                clone.instructions.append(copy)
+            term = source.terminator
+            if isinstance(term, Return):
+                if call.dest is not None and term.value is not None:
+                    clone.instructions.append(_at(Copy(call.dest, rename(term.value)), term))
+                clone.terminator = _at(Jump(after.id), term)
+            else:
+                clone.terminator = term.copy()
+                clone.terminator.replace_uses(rename)
+                clone.terminator.replace_targets(lambda t: t + offset)
+
+        for var, var_type in callee.var_types.items():
+            caller.var_types[var + suffix] = var_type
+        caller.compute_edges()
+        return after
+
+
+def _at(instr: Instruction, origin: Instruction) -> Instruction:
+    instr.line, instr.column = origin.line, origin.column
+    return instr
+
+
+def run_inliner(cfgs: Dict[str, CFG], **options) -> int:
+    """Inline small non-recursive functions throughout a program; returns
+    the number of calls inlined."""
+    return Inliner(cfgs, **options).run()
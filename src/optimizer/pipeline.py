@@ -0,0 +1,117 @@
+"""
+Optimization pipeline for TyC control-flow graphs.
+Self tail calls are first turned into loops and small functions inlined
+into their callers, then each function is converted to SSA form, has its
+non-escaping struct values replaced by scalars, is run through the scalar
+passes and converted back, ready for the interpreter. Given a profile of
+earlier runs, inlining follows the call counts and blocks are finally
+laid out hot paths first.
+Statistics record how many changes every pass made and the instruction
+counts before and after. A tracer (src.utils.tracing) gets a span per
+function and, within it, per pass.
+"""
+
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.ir.callgraph import CallGraph
+from src.ir.cfg import CFG
+from src.ir.profile import ProgramProfile
+from src.ir.ssa import construct_ssa, destruct_ssa
+from src.optimizer.block_layout import run_block_layout
+from src.optimizer.copy_propagation import run_copy_propagation
+from src.optimizer.dce import run_dce
+from src.optimizer.gvn import run_gvn
+from src.optimizer.inliner import Inliner
+from src.optimizer.scalar_replacement import run_scalar_replacement
+from src.optimizer.sccp import run_sccp
+from src.optimizer.simplify_cfg import run_simplify_cfg
+from src.optimizer.tail_calls import eliminate_tail_calls
+from src.utils.nodes import StructDecl
+from src.utils.tracing import NULL_TRACER
+
+SSA_PASSES: List[Tuple[str, Callable[[CFG], int]]] = [
+    ("sccp", run_sccp),
+    ("copy_propagation", run_copy_propagation),
+    ("gvn", run_gvn),
+    ("copy_propagation", run_copy_propagation),
+    ("dce", run_dce),
+    ("simplify_cfg", run_simplify_cfg),
+]
+
+
+class OptimizationStats:
+    """Per-function record of what the pipeline did."""
+
+    def __init__(self, name: str, before: int):
+        self.name = name
+        self.before = before
+        self.after = before
+        self.changes: Dict[str, int] = {}
+
+    def record(self, pass_name: str, changes: int):
+        self.changes[pass_name] = self.changes.get(pass_name, 0) + changes
+
+    def __str__(self):
+        passes = ", ".join(f"{k}={v}" for k, v in self.changes.items())
+        return f"{self.name}: {self.before} -> {self.after} instructions ({passes})"
+
+
+def optimize(
+    cfg: CFG,
+    stats: Optional[OptimizationStats] = None,
+    structs: Optional[Dict[str, StructDecl]] = None,
+    profile: Optional[ProgramProfile] = None,
+    tracer=NULL_TRACER,
+) -> OptimizationStats:
+    """Optimize cfg in place; it is left out of SSA form. Struct values
+    are only scalar-replaced when the program's structs are given, and
+    blocks only laid out when a profile is."""
+    if stats is None:
+        stats = OptimizationStats(cfg.name, cfg.instruction_count())
+    with tracer.span("construct_ssa"):
+        construct_ssa(cfg)
+    if structs:
+        with tracer.span("scalar_replacement"):
+            stats.record("scalar_replacement", run_scalar_replacement(cfg, structs))
+    for name, run_pass in SSA_PASSES:
+        with tracer.span(name):
+            stats.record(name, run_pass(cfg))
+    with tracer.span("destruct_ssa"):
+        destruct_ssa(cfg)
+    with tracer.span("simplify_cfg"):
+        stats.record("simplify_cfg", run_simplify_cfg(cfg))
+    if profile is not None:
+        with tracer.span("block_layout"):
+            stats.record("block_layout", run_block_layout(cfg, profile))
+    stats.after = cfg.instruction_count()
+    return stats
+
+
+def optimize_all(
+    cfgs: Dict[str, CFG],
+    inline: bool = True,
+    structs: Optional[Dict[str, StructDecl]] = None,
+    profile: Optional[ProgramProfile] = None,
+    tracer=NULL_TRACER,
+) -> Dict[str, OptimizationStats]:
+    """Optimize every function of a program.
+    Self tail calls are turned into loops first. Functions are then
+    processed callees first, so calls are inlined with the already
+    optimized body of the callee.
+    """
+    results = {}
+    with tracer.span("tail_calls"):
+        for name, cfg in cfgs.items():
+            results[name] = OptimizationStats(name, cfg.instruction_count())
+            results[name].record("tail_calls", eliminate_tail_calls(cfg))
+    graph = CallGraph(cfgs)
+    inliner = Inliner(cfgs, graph, profile=profile)
+    for name in graph.bottom_up():
+        cfg = cfgs[name]
+        stats = results[name]
+        with tracer.span("function", decl=name):
+            if inline:
+                with tracer.span("inline"):
+                    stats.record("inline", inliner.inline_calls(cfg))
+            results[name] = optimize(cfg, stats, structs, profile, tracer)
+    return {name: results[name] for name in cfgs}
@@ -0,0 +1,244 @@
+"""
+Escape analysis and scalar replacement of struct values, on SSA form.
+Struct values that are connected through copies, phis, member stores,
+nested member reads and nested struct literals form a web. A web escapes
+when one of its values is a parameter, the result of a call, an argument
+of a call, a returned value, or is used in any other way the pass does
+not model. Every value of a web that does not escape is replaced by one
+scalar per leaf member of its struct type (members of nested structs are
+flattened), so building, copying and updating it becomes plain copies
+between scalars and no struct value is ever allocated for it.
+
+Leaf scalars created for phis are named ``value:path``, where path is the
+dotted member path; ':' never appears in TyC identifiers.
+"""
+
+from typing import Dict, List, Optional, Set, Tuple
+
+from src.ir.cfg import CFG
+from src.ir.instructions import *
+from src.ir.types import FLOAT, INT, STRING, TypeInference, type_of
+from src.utils.nodes import StructDecl, StructType
+
+_DEFAULTS = {INT: 0, FLOAT: 0.0, STRING: ""}
+
+
+class StructShape:
+    """Leaf members of a struct type in layout order, nested structs
+    flattened, with the leaf range covered by each member."""
+
+    def __init__(self, name: str, structs: Dict[str, StructDecl]):
+        self.leaves: List[Tuple[Tuple[str, ...], object]] = []
+        self.spans: Dict[str, Tuple[int, int, Optional[str]]] = {}
+        for member in structs[name].members:
+            start = len(self.leaves)
+            member_type = member.member_type
+            if isinstance(member_type, StructType):
+                nested = StructShape(member_type.struct_name, structs)
+                self.leaves.extend(((member.name,) + p, t) for p, t in nested.leaves)
+                self.spans[member.name] = (start, len(self.leaves), member_type.struct_name)
+            else:
+                self.leaves.append(((member.name,), member_type))
+                self.spans[member.name] = (start, start + 1, None)
+
+
+class ScalarReplacement:
+    """Find the struct values of an SSA CFG that do not escape and
+    replace them with scalars."""
+
+    def __init__(self, cfg: CFG, structs: Dict[str, StructDecl]):
+        self.cfg = cfg
+        self.structs = structs
+        self.types = TypeInference({cfg.name: cfg}, structs).run()[cfg.name]
+        self.shapes: Dict[str, StructShape] = {}
+        self.parent: Dict[str, str] = {}
+        self.escaping: Set[str] = set()
+
+    def shape(self, struct: str) -> StructShape:
+        if struct not in self.shapes:
+            self.shapes[struct] = StructShape(struct, self.structs)
+        return self.shapes[struct]
+
+    def is_struct(self, operand) -> bool:
+        return is_var(operand) and self.types.get(operand) in self.structs
+
+    # ------------------------------------------------------------------
+    # Escape analysis
+    # ------------------------------------------------------------------
+
+    def find(self, var: str) -> str:
+        while var in self.parent:
+            var = self.parent[var]
+        return var
+
+    def union(self, a: str, b):
+        if not self.is_struct(b):
+            self.escaping.add(self.find(a))
+            return
+        a, b = self.find(a), self.find(b)
+        if a != b:
+            self.parent[b] = a
+            if b in self.escaping:
+                self.escaping.add(a)
+
+    def escape(self, operand):
+        if is_var(operand):
+            self.escaping.add(self.find(operand))
+
+    def analyze(self):
+        """Group struct values into webs and mark the escaping webs."""
+        for param in self.cfg.params:
+            self.escape(param)
+        for block in self.cfg.blocks:
+            for instr in block.instructions:
+                self._analyze(instr)
+            for use in block.terminator.uses():
+                self.escape(use)
+
+    def _analyze(self, instr: Instruction):
+        dest = instr.dest
+        if dest is not None and not self.is_struct(dest):
+            # Struct operands feeding a non-struct result only stay local
+            # if they are read through a leaf member access.
+            if isinstance(instr, GetField) and self.is_struct(instr.obj):
+                return
+            for use in instr.uses():
+                if self.is_struct(use):
+                    self.escape(use)
+            return
+        if isinstance(instr, Copy):
+            self.union(dest, instr.src)
+        elif isinstance(instr, Phi):
+            for value in instr.incoming.values():
+                if value != UNDEF:
+                    self.union(dest, value)
+        elif isinstance(instr, SetField):
+            self.union(dest, instr.obj)
+            if self._stores_struct(self.types.get(instr.obj), instr.path):
+                self.union(dest, instr.value)
+            elif self.is_struct(instr.value):
+                self.escape(instr.value)
+        elif isinstance(instr, GetField):
+            self.union(dest, instr.obj)
+        elif isinstance(instr, MakeStruct):
+            decl = self.structs.get(instr.struct_name)
+            if decl is None or len(decl.members) != len(instr.values):
+                self.escape(dest)
+                return
+            for member, value in zip(decl.members, instr.values):
+                if isinstance(member.member_type, StructType):
+                    self.union(dest, value)
+                elif self.is_struct(value):
+                    self.escape(value)
+        elif isinstance(instr, Declare):
+            if not isinstance(instr.var_type, StructType):
+                self.escape(dest)
+        else:
+            # Call results and anything else come from outside the web.
+            for use in [dest] + instr.uses():
+                self.escape(use)
+
+    def _stores_struct(self, struct: Optional[str], path) -> bool:
+        """True if the member at path of a struct is itself a struct."""
+        for member in path:
+            if struct not in self.structs or member not in self.shape(struct).spans:
+                return False
+            struct = self.shape(struct).spans[member][2]
+        return struct is not None
+
+    def replaceable(self, var: str) -> bool:
+        return self.is_struct(var) and self.find(var) not in self.escaping
+
+    # ------------------------------------------------------------------
+    # Scalar replacement
+    # ------------------------------------------------------------------
+
+    def run(self) -> int:
+        """Replace the values of non-escaping webs; returns the number of
+        struct instructions removed."""
+        self.cfg.remove_unreachable()
+        self.analyze()
+        self.phis: List[Phi] = []
+        vectors: Dict[str, List[Operand]] = {}
+        self.leaf_phis: Dict[str, List[Phi]] = {}
+        for block in self.cfg.blocks:
+            for instr in block.instructions:
+                if isinstance(instr, Phi) and self.replaceable(instr.dest):
+                    leaves = []
+                    for path, leaf_type in self.shape(self.types[instr.dest]).leaves:
+                        name = f"{instr.dest}:{'.'.join(path)}"
+                        self.cfg.var_types[name] = leaf_type
+                        leaves.append(_at(Phi(name), instr))
+                    vectors[instr.dest] = [leaf.dest for leaf in leaves]
+                    self.leaf_phis[instr.dest] = leaves
+
+        removed = 0
+        for block_id in self.cfg.reverse_postorder():
+            block = self.cfg.blocks[block_id]
+            kept = []
+            for instr in block.instructions:
+                replacement = self._replace(instr, vectors)
+                if replacement is instr:
+                    kept.append(instr)
+                    continue
+                removed += 1
+                kept.extend(replacement)
+            block.instructions = kept
+
+        for phi in self.phis:
+            leaves = self.leaf_phis[phi.dest]
+            for pred, value in phi.incoming.items():
+                for i, leaf in enumerate(leaves):
+                    leaf.incoming[pred] = UNDEF if value == UNDEF else vectors[value][i]
+        return removed
+
+    def _replace(self, instr: Instruction, vectors: Dict[str, List[Operand]]):
+        """The instructions standing for instr, or instr itself."""
+        if isinstance(instr, GetField) and self.replaceable(instr.obj):
+            start, end, nested = self.shape(self.types[instr.obj]).spans[instr.member]
+            if nested is None:
+                return [_at(Copy(instr.dest, vectors[instr.obj][start]), instr)]
+            vectors[instr.dest] = vectors[instr.obj][start:end]
+            return []
+        dest = instr.dest
+        if dest is None or not self.replaceable(dest):
+            return instr
+        if isinstance(instr, Phi):
+            self.phis.append(instr)
+            return self.leaf_phis[dest]
+        shape = self.shape(self.types[dest])
+        if isinstance(instr, Copy):
+            vectors[dest] = vectors[instr.src]
+        elif isinstance(instr, Declare):
+            vectors[dest] = [Const(_default(t)) for _, t in shape.leaves]
+        elif isinstance(instr, MakeStruct):
+            vector = []
+            for member, value in zip(self.structs[instr.struct_name].members, instr.values):
+                nested = isinstance(member.member_type, StructType)
+                vector.extend(vectors[value] if nested else [value])
+            vectors[dest] = vector
+        elif isinstance(instr, SetField):
+            vector = list(vectors[instr.obj])
+            struct, start = self.types[instr.obj], 0
+            for member in instr.path:
+                first, end, struct = self.shape(struct).spans[member]
+                start, end = start + first, start + end
+            nested = struct is not None
+            vector[start:end] = vectors[instr.value] if nested else [instr.value]
+            vectors[dest] = vector
+        return []
+
+
+def _default(ast_type):
+    return _DEFAULTS.get(type_of(ast_type))
+
+
+def _at(instr: Instruction, origin: Instruction) -> Instruction:
+    instr.line, instr.column = origin.line, origin.column
+    return instr
+
+
+def run_scalar_replacement(cfg: CFG, structs: Dict[str, StructDecl]) -> int:
+    """Scalar-replace the non-escaping struct values of an SSA CFG;
+    returns the number of struct instructions removed."""
+    return ScalarReplacement(cfg, structs).run()
@@ -0,0 +1,189 @@
+"""
+Sparse conditional constant propagation (Wegman and Zadeck).
+This pass runs on SSA form. It discovers SSA values that are constant on
+every executable path, replaces their uses by constants, folds branches
+on constant conditions and deletes the blocks that become unreachable.
+"""
+
+from typing import Dict, List, Set, Tuple
+
+from src.ir.cfg import CFG
+from src.ir.instructions import *
+from src.runtime.errors import TyCRuntimeError
+from src.runtime.operators import binary, unary
+
+# Lattice: a missing entry is TOP (no information yet), a Const is a
+# known constant and BOTTOM means the value varies.
+BOTTOM = object()
+
+
+class SCCP:
+    """Sparse conditional constant propagation over one SSA CFG."""
+
+    def __init__(self, cfg: CFG):
+        self.cfg = cfg
+        self.values: Dict[str, object] = {p: BOTTOM for p in cfg.params}
+        self.executable_edges: Set[Tuple[int, int]] = set()
+        self.executable_blocks: Set[int] = set()
+        self.uses: Dict[str, List[Tuple[int, Instruction]]] = {}
+        for block in cfg.blocks:
+            for instr in block.instructions + [block.terminator]:
+                for use in instr.uses():
+                    if is_var(use):
+                        self.uses.setdefault(use, []).append((block.id, instr))
+
+    def run(self) -> int:
+        """Run the analysis and rewrite the graph; returns the number of
+        instructions folded or removed."""
+        self._solve()
+        return self._rewrite()
+
+    # ------------------------------------------------------------------
+    # Analysis
+    # ------------------------------------------------------------------
+
+    def _value(self, operand):
+        if is_var(operand):
+            return self.values.get(operand)
+        return BOTTOM if operand is UNDEF or operand == UNDEF else operand
+
+    def _solve(self):
+        cfg = self.cfg
+        self.flow_work: List[Tuple[int, int]] = [(-1, cfg.entry)]
+        self.ssa_work: List[Tuple[int, Instruction]] = []
+        while self.flow_work or self.ssa_work:
+            while self.flow_work:
+                pred, block_id = self.flow_work.pop()
+                if (pred, block_id) in self.executable_edges:
+                    continue
+                self.executable_edges.add((pred, block_id))
+                block = cfg.blocks[block_id]
+                first_visit = block_id not in self.executable_blocks
+                self.executable_blocks.add(block_id)
+                for instr in block.instructions:
+                    if isinstance(instr, Phi):
+                        self._visit(block_id, instr)
+                    elif first_visit:
+                        self._visit(block_id, instr)
+                if first_visit:
+                    self._visit(block_id, block.terminator)
+            while self.ssa_work:
+                block_id, instr = self.ssa_work.pop()
+                if block_id in self.executable_blocks:
+                    self._visit(block_id, instr)
+
+    def _lower(self, var: str, value):
+        """Move var down the lattice to meet(old, value)."""
+        if value is None:
+            return
+        old = self.values.get(var)
+        if old is BOTTOM:
+            return
+        if old is not None:
+            if value is not BOTTOM and old == value:
+                return
+            value = BOTTOM
+        self.values[var] = value
+        for use in self.uses.get(var, ()):
+            self.ssa_work.append(use)
+
+    def _visit(self, block_id: int, instr: Instruction):
+        if isinstance(instr, Phi):
+            result = None
+            for pred, operand in instr.incoming.items():
+                if (pred, block_id) not in self.executable_edges:
+                    continue
+                value = self._value(operand)
+                if value is None:
+                    continue
+                if value is BOTTOM or (result is not None and result != value):
+                    result = BOTTOM
+                    break
+                result = value
+            self._lower(instr.dest, result)
+        elif isinstance(instr, Copy):
+            self._lower(instr.dest, self._value(instr.src))
+        elif isinstance(instr, (BinOp, UnaryOp)):
+            self._lower(instr.dest, self._fold(instr))
+        elif isinstance(instr, Branch):
+            cond = self._value(instr.cond)
+            if cond is None:
+                return
+            if cond is BOTTOM:
+                self.flow_work.append((block_id, instr.if_true))
+                self.flow_work.append((block_id, instr.if_false))
+            else:
+                target = instr.if_true if cond.value else instr.if_false
+                self.flow_work.append((block_id, target))
+        elif isinstance(instr, Jump):
+            self.flow_work.append((block_id, instr.target))
+        elif instr.dest is not None:
+            self._lower(instr.dest, BOTTOM)
+
+    def _fold(self, instr):
+        operands = [self._value(u) for u in instr.uses()]
+        if any(v is BOTTOM for v in operands):
+            return BOTTOM
+        if any(v is None for v in operands):
+            return None
+        try:
+            if isinstance(instr, BinOp):
+                return Const(binary(instr.operator, operands[0].value, operands[1].value))
+            return Const(unary(instr.operator, operands[0].value))
+        except (TyCRuntimeError, TypeError, ArithmeticError):
+            return BOTTOM
+
+    # ------------------------------------------------------------------
+    # Rewriting
+    # ------------------------------------------------------------------
+
+    def _rewrite(self) -> int:
+        cfg = self.cfg
+        changed = 0
+
+        def substitute(operand):
+            if is_var(operand):
+                value = self.values.get(operand)
+                if isinstance(value, Const):
+                    return value
+            return operand
+
+        for block in cfg.blocks:
+            if block.id not in self.executable_blocks:
+                continue
+            kept = []
+            for instr in block.instructions:
+                value = self.values.get(instr.dest) if instr.dest else None
+                if isinstance(value, Const) and not instr.has_side_effects:
+                    changed += 1
+                    continue
+                before = instr.uses()
+                instr.replace_uses(substitute)
+                if instr.uses() != before:
+                    changed += 1
+                kept.append(instr)
+            block.instructions = kept
+            term = block.terminator
+            term.replace_uses(substitute)
+            if isinstance(term, Branch):
+                live = [t for t in term.targets() if (block.id, t) in self.executable_edges]
+                if len(live) == 1:
+                    jump = Jump(live[0])
+                    jump.line, jump.column = term.line, term.column
+                    block.terminator = jump
+                    changed += 1
+        cfg.compute_edges()
+        for block in cfg.blocks:
+            for instr in block.instructions:
+                if not isinstance(instr, Phi):
+                    break
+                preds = cfg.preds[block.id]
+                instr.incoming = {b: v for b, v in instr.incoming.items() if b in preds}
+        before = len(cfg.blocks)
+        cfg.remove_unreachable()
+        return changed + before - len(cfg.blocks)
+
+
+def run_sccp(cfg: CFG) -> int:
+    """Run SCCP on an SSA CFG; returns the number of changes made."""
+    return SCCP(cfg).run()
@@ -0,0 +1,121 @@
+"""
+Control-flow graph clean-up.
+Folds branches on constants, threads jumps through empty blocks, merges
+straight-line block pairs and drops unreachable blocks. Phis are kept
+consistent, so the pass runs both on SSA form and after it.
+"""
+
+from src.ir.cfg import CFG
+from src.ir.instructions import *
+
+
+def _phis(block):
+    for instr in block.instructions:
+        if not isinstance(instr, Phi):
+            break
+        yield instr
+
+
+def _set_terminator(block, term):
+    term.line, term.column = block.terminator.line, block.terminator.column
+    block.terminator = term
+
+
+def _fold_branches(cfg: CFG) -> int:
+    changed = 0
+    for block in cfg.blocks:
+        term = block.terminator
+        if not isinstance(term, Branch):
+            continue
+        if isinstance(term.cond, Const) and term.cond.value is not None:
+            kept, dropped = (
+                (term.if_true, term.if_false) if term.cond.value else (term.if_false, term.if_true)
+            )
+        elif term.if_true == term.if_false:
+            kept, dropped = term.if_true, None
+        else:
+            continue
+        if dropped is not None and dropped != kept:
+            for phi in _phis(cfg.blocks[dropped]):
+                phi.incoming.pop(block.id, None)
+        _set_terminator(block, Jump(kept))
+        changed += 1
+    if changed:
+        cfg.compute_edges()
+    return changed
+
+
+def _thread_jumps(cfg: CFG) -> int:
+    changed = 0
+    for block in cfg.blocks:
+        term = block.terminator
+        if (
+            block.id == cfg.entry
+            or block.instructions
+            or not isinstance(term, Jump)
+            or term.target == block.id
+        ):
+            continue
+        target = term.target
+        target_block = cfg.blocks[target]
+        target_phis = list(_phis(target_block))
+        for pred in list(cfg.preds[block.id]):
+            if pred == block.id:
+                continue
+            if target_phis and pred in cfg.preds[target]:
+                continue
+            pred_term = cfg.blocks[pred].terminator
+            pred_term.replace_targets(lambda t: target if t == block.id else t)
+            for phi in target_phis:
+                phi.incoming[pred] = phi.incoming[block.id]
+            cfg.compute_edges()
+            changed += 1
+        if changed and not cfg.preds[block.id]:
+            for phi in target_phis:
+                phi.incoming.pop(block.id, None)
+    return changed
+
+
+def _merge_blocks(cfg: CFG) -> int:
+    changed = 0
+    for block in cfg.blocks:
+        while True:
+            term = block.terminator
+            if not isinstance(term, Jump):
+                break
+            succ = term.target
+            if succ == block.id or succ == cfg.entry or cfg.preds[succ] != [block.id]:
+                break
+            succ_block = cfg.blocks[succ]
+            merged = []
+            for instr in succ_block.instructions:
+                if isinstance(instr, Phi):
+                    copy = Copy(instr.dest, instr.incoming[block.id])
+                    copy.line, copy.column = instr.line, instr.column
+                    merged.append(copy)
+                else:
+                    merged.append(instr)
+            block.instructions.extend(merged)
+            block.terminator = succ_block.terminator
+            succ_block.instructions = []
+            succ_block.terminator = Jump(succ)
+            for next_id in cfg.succs[succ]:
+                for phi in _phis(cfg.blocks[next_id]):
+                    if succ in phi.incoming:
+                        phi.incoming[block.id] = phi.incoming.pop(succ)
+            cfg.compute_edges()
+            changed += 1
+    return changed
+
+
+def run_simplify_cfg(cfg: CFG) -> int:
+    """Simplify the control flow of cfg; returns the number of changes."""
+    total = 0
+    while True:
+        changed = _fold_branches(cfg) + _thread_jumps(cfg) + _merge_blocks(cfg)
+        before = len(cfg.blocks)
+        cfg.remove_unreachable()
+        changed += before - len(cfg.blocks)
+        if not changed:
+            return total
+        total += changed
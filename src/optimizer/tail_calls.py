@@ -0,0 +1,78 @@
+"""
+Self tail-call elimination for TyC control-flow graphs.
+A call of a function to itself whose result is returned right away
+('return f(...);', or a void call followed by 'return;') is replaced by
+assignments to the parameters and a jump back to the top of the body,
+turning the recursion into a loop.
+
+The pass works on CFGs that are not in SSA form. The parameter
+assignments are parallel copies, so 'return f(b, a);' swaps correctly.
+"""
+
+from typing import Optional
+
+from src.ir.cfg import CFG, BasicBlock
+from src.ir.instructions import *
+from src.ir.ssa import sequentialize_copies
+
+
+def _returned_value(cfg: CFG, block: BasicBlock) -> Optional[Return]:
+    """The Return the block ends in, directly or through an empty block."""
+    term = block.terminator
+    if isinstance(term, Jump):
+        target = cfg.blocks[term.target]
+        if not target.instructions:
+            term = target.terminator
+    return term if isinstance(term, Return) else None
+
+
+def _is_tail_call(cfg: CFG, block: BasicBlock) -> bool:
+    if not block.instructions:
+        return False
+    call = block.instructions[-1]
+    if not isinstance(call, Call) or call.func != cfg.name:
+        return False
+    ret = _returned_value(cfg, block)
+    if ret is None or len(call.args) != len(cfg.params):
+        return False
+    if ret.value is None:
+        return True
+    return call.dest is not None and ret.value == call.dest
+
+
+def eliminate_tail_calls(cfg: CFG) -> int:
+    """Turn self tail calls of cfg into jumps; returns how many."""
+    if cfg.ssa:
+        return 0
+    sites = [b for b in cfg.blocks if _is_tail_call(cfg, b)]
+    if not sites:
+        return 0
+
+    # The loop header takes over the entry block's code; the entry keeps
+    # only a jump so that it still has no predecessors.
+    entry = cfg.blocks[cfg.entry]
+    header = cfg.new_block()
+    header.instructions, entry.instructions = entry.instructions, []
+    header.terminator = entry.terminator
+    entry.terminator = Jump(header.id)
+    for block in cfg.blocks:
+        if block is not entry:
+            block.terminator.replace_targets(lambda t: header.id if t == cfg.entry else t)
+
+    temps = [0]
+
+    def new_temp():
+        temps[0] += 1
+        return f"$tail{temps[0]}"
+
+    for block in sites:
+        call = block.instructions.pop()
+        for copy in sequentialize_copies(list(zip(cfg.params, call.args)), new_temp):
+            copy.line, copy.column = call.line, call.column
+            block.instructions.append(copy)
+        jump = Jump(header.id)
+        jump.line, jump.column = call.line, call.column
+        block.terminator = jump
+    cfg.compute_edges()
+    cfg.remove_unreachable()
+    return len(sites)
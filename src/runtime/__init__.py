@@ -0,0 +1,3 @@
+"""
+Execution backend for the TyC intermediate representation
+"""
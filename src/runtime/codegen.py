@@ -0,0 +1,324 @@
+"""
+Compilation of TyC control-flow graphs to Python functions.
+Each CFG becomes the source of one Python function whose TyC variables
+are Python locals and whose blocks are the arms of a dispatch loop:
+
+    def tyc_function(_args, _state=None):
+        if _state is None:
+            v_n, = _args
+            _bb = 0
+        else:
+            ...
+        while True:
+            if _bb == 0:
+                ...
+                if v_n < 2:
+                    _bb = 1
+                else:
+                    _bb = 2
+            if _bb == 1:
+                return v_n
+            ...
+
+Blocks are emitted in id order, so control reaching a later block falls
+into its arm without going round the loop; laying out the hot path first
+(src.optimizer.block_layout) keeps most transfers that way. Phis are
+resolved as parallel assignments on the incoming edges. A relational
+temporary used only by the branch ending its block is folded into the
+branch condition.
+
+The function computes what the dict-based Interpreter computes: operators
+have the same semantics (src.runtime.operators), TyC calls and builtins go
+through the interpreter, and struct stores follow the same copy-on-write
+rule (src.runtime.structs.update_member). Reading a variable that was
+never assigned raises UnboundLocalError; NativeFunction.variable maps the
+Python name back to the TyC one.
+
+Passing _state = (block id, {variable: value}) enters the function at that
+block with those variables set, which lets an interpreted activation
+continue in compiled code (on-stack replacement). The block must not
+start with phis.
+"""
+
+import math
+import re
+from typing import Any, Callable, Dict, List, Optional
+
+from src.ir.cfg import CFG
+from src.ir.instructions import *
+from src.runtime.operators import BINARY_OPS
+from src.runtime.structs import get_member, replace_path, update_member
+from src.utils.nodes import FloatType, IntType, StringType, StructType
+
+_ARITHMETIC = frozenset(["+", "-", "*"])
+_RELATIONAL = frozenset(["==", "!=", "<", "<=", ">", ">="])
+_UNBOUND = re.compile(r"'(v_\w+)'")
+
+
+def mangle(var: str) -> str:
+    """Python identifier of a TyC variable. Identifier characters other
+    than letters and digits are escaped, so distinct names stay distinct."""
+    out = ["v_"]
+    for ch in var:
+        if ch.isalnum() and ch.isascii():
+            out.append(ch)
+        elif ch == "_":
+            out.append("__")
+        else:
+            out.append(f"_{ord(ch):02x}")
+    return "".join(out)
+
+
+class NativeFunction:
+    """A CFG compiled to a Python function, with its generated source."""
+
+    def __init__(self, cfg: CFG, source: str, function: Callable, variables: Dict[str, str]):
+        self.cfg = cfg
+        self.source = source
+        self.function = function
+        # Python local name -> TyC variable
+        self.variables = variables
+
+    def variable(self, error: NameError) -> str:
+        """TyC name of the variable an UnboundLocalError is about."""
+        match = _UNBOUND.search(str(error))
+        if match is None:
+            return "?"
+        return self.variables.get(match.group(1), match.group(1))
+
+
+class PythonCodeGenerator:
+    """Generate and compile the Python function of one CFG."""
+
+    def __init__(self, cfg: CFG, interpreter):
+        self.cfg = cfg
+        self.interpreter = interpreter
+        self.namespace: Dict[str, Any] = {
+            "_invoke": interpreter.invoke,
+            "_builtin": interpreter._call_builtin,
+            "_div": BINARY_OPS["/"],
+            "_mod": BINARY_OPS["%"],
+            "_get_member": get_member,
+            "_replace": replace_path,
+            "_update": update_member,
+            "_declare": interpreter.default_value,
+            "_layout": interpreter.struct_layout,
+        }
+        self.names: Dict[str, str] = {}
+        self.variables: Dict[str, str] = {}
+        self.lines: List[str] = []
+        self.uses: Dict[str, int] = {}
+        for block in cfg.blocks:
+            for instr in block.instructions + [block.terminator]:
+                for use in instr.uses():
+                    if is_var(use):
+                        self.uses[use] = self.uses.get(use, 0) + 1
+                if isinstance(instr, Phi):
+                    for value in instr.incoming.values():
+                        if is_var(value):
+                            self.uses[value] = self.uses.get(value, 0) + 1
+
+    def compile(self) -> NativeFunction:
+        source = self.generate()
+        code = compile(source, f"<tyc {self.cfg.name}>", "exec")
+        exec(code, self.namespace)
+        function = self.namespace["tyc_function"]
+        return NativeFunction(self.cfg, source, function, self.variables)
+
+    # ------------------------------------------------------------------
+    # Operands
+    # ------------------------------------------------------------------
+
+    def var(self, name: str) -> str:
+        python = self.names.get(name)
+        if python is None:
+            python = self.names[name] = mangle(name)
+            self.variables[python] = name
+        return python
+
+    def bind(self, value: Any) -> str:
+        name = f"_k{len(self.namespace)}"
+        self.namespace[name] = value
+        return name
+
+    def operand(self, operand: Operand) -> str:
+        if is_var(operand):
+            return self.var(operand)
+        value = operand.value
+        if value is None or isinstance(value, (int, str)):
+            return repr(value)
+        if isinstance(value, float) and math.isfinite(value):
+            return f"({value!r})"
+        return self.bind(value)
+
+    # ------------------------------------------------------------------
+    # Function
+    # ------------------------------------------------------------------
+
+    def emit(self, depth: int, line: str):
+        self.lines.append("    " * depth + line)
+
+    def generate(self) -> str:
+        cfg = self.cfg
+        params = [self.var(p) for p in cfg.params]
+        self.emit(0, "def tyc_function(_args, _state=None):")
+        self.emit(1, "if _state is None:")
+        if params:
+            self.emit(2, f"{', '.join(params)}, = _args")
+        self.emit(2, f"_bb = {cfg.entry}")
+        self.emit(1, "else:")
+        self.emit(2, "_bb, _env = _state")
+        variables = sorted(
+            {v for b in cfg.blocks for i in b.instructions for v in [i.dest] + i.uses() if is_var(v)}
+            | {v for b in cfg.blocks for v in b.terminator.uses() if is_var(v)}
+        )
+        for name in variables:
+            self.emit(2, f"if {name!r} in _env:")
+            self.emit(3, f"{self.var(name)} = _env[{name!r}]")
+        self.emit(2, "_env = _state = None")
+        self.emit(1, "while True:")
+        for block in cfg.blocks:
+            self.emit(2, f"if _bb == {block.id}:")
+            start = len(self.lines)
+            self.block(block)
+            if len(self.lines) == start:
+                self.emit(3, "pass")
+        return "\n".join(self.lines) + "\n"
+
+    def block(self, block):
+        instructions = [i for i in block.instructions if not isinstance(i, Phi)]
+        term = block.terminator
+        condition = None
+        if isinstance(term, Branch) and is_var(term.cond) and instructions:
+            last = instructions[-1]
+            if (
+                isinstance(last, BinOp)
+                and last.dest == term.cond
+                and last.operator in _RELATIONAL
+                and self.uses.get(last.dest) == 1
+            ):
+                instructions.pop()
+                condition = self.comparison(last)
+        for instr in instructions:
+            self.instruction(instr)
+        if isinstance(term, Return):
+            value = "None" if term.value is None else self.operand(term.value)
+            self.emit(3, f"return {value}")
+        elif isinstance(term, Jump):
+            self.edge(3, block.id, term.target)
+        else:
+            if condition is None:
+                condition = self.operand(term.cond)
+            self.emit(3, f"if {condition}:")
+            self.edge(4, block.id, term.if_true)
+            self.emit(3, "else:")
+            self.edge(4, block.id, term.if_false)
+
+    def edge(self, depth: int, source: int, target: int):
+        moves = []
+        for instr in self.cfg.blocks[target].instructions:
+            if not isinstance(instr, Phi):
+                break
+            moves.append((self.var(instr.dest), self.operand(instr.incoming[source])))
+        if moves:
+            dests = ", ".join(d for d, _ in moves)
+            values = ", ".join(v for _, v in moves)
+            self.emit(depth, f"{dests}, = {values},")
+        self.emit(depth, f"_bb = {target}")
+        if target <= source:
+            self.emit(depth, "continue")
+
+    # ------------------------------------------------------------------
+    # Instructions
+    # ------------------------------------------------------------------
+
+    def comparison(self, instr: BinOp) -> str:
+        return f"{self.operand(instr.left)} {instr.operator} {self.operand(instr.right)}"
+
+    def instruction(self, instr: Instruction):
+        cls = instr.__class__
+        if cls is Copy:
+            self.assign(instr.dest, self.operand(instr.src))
+        elif cls is BinOp:
+            left, right = self.operand(instr.left), self.operand(instr.right)
+            if instr.operator in _ARITHMETIC:
+                self.assign(instr.dest, f"{left} {instr.operator} {right}")
+            elif instr.operator in _RELATIONAL:
+                self.assign(instr.dest, f"1 if {self.comparison(instr)} else 0")
+            elif instr.operator == "/":
+                self.assign(instr.dest, f"_div({left}, {right})")
+            elif instr.operator == "%":
+                self.assign(instr.dest, f"_mod({left}, {right})")
+            else:
+                fn = self.bind(BINARY_OPS[instr.operator])
+                self.assign(instr.dest, f"{fn}({left}, {right})")
+        elif cls is UnaryOp:
+            operand = self.operand(instr.operand)
+            if instr.operator == "!":
+                self.assign(instr.dest, f"0 if {operand} else 1")
+            elif instr.operator == "+":
+                self.assign(instr.dest, operand)
+            else:
+                self.assign(instr.dest, f"{instr.operator}{operand}")
+        elif cls is Call:
+            self.call(instr)
+        elif cls is GetField:
+            obj = self.operand(instr.obj)
+            if instr.index is None:
+                self.assign(instr.dest, f"_get_member({obj}, {instr.member!r})")
+            else:
+                self.assign(instr.dest, f"{obj}[{instr.index}]")
+        elif cls is SetField:
+            obj, value = self.operand(instr.obj), self.operand(instr.value)
+            args = f"{obj}, {instr.path!r}, {value}, {instr.indexes!r}"
+            update = "_update" if instr.obj == instr.dest else "_replace"
+            self.assign(instr.dest, f"{update}({args})")
+        elif cls is MakeStruct:
+            values = ", ".join(self.operand(v) for v in instr.values)
+            layout = self.interpreter.layouts.get(instr.struct_name)
+            if layout is not None and layout.size == len(instr.values):
+                self.assign(instr.dest, f"{self.bind(layout.value_class)}([{values}])")
+            else:
+                self.assign(instr.dest, f"_layout({instr.struct_name!r}).make([{values}])")
+        elif cls is Declare:
+            self.assign(instr.dest, self.default(instr.var_type))
+        else:
+            raise NotImplementedError(f"Cannot compile {instr}")
+
+    def assign(self, dest: str, expression: str):
+        self.emit(3, f"{self.var(dest)} = {expression}")
+
+    def default(self, var_type) -> str:
+        if isinstance(var_type, IntType):
+            return "0"
+        if isinstance(var_type, FloatType):
+            return "0.0"
+        if isinstance(var_type, StringType):
+            return "''"
+        if isinstance(var_type, StructType):
+            layout = self.interpreter.layouts.get(var_type.struct_name)
+            if layout is not None:
+                return f"{self.bind(layout.default)}()"
+        if var_type is None:
+            return "None"
+        return f"_declare({self.bind(var_type)})"
+
+    def call(self, instr: Call):
+        args = [self.operand(a) for a in instr.args]
+        if instr.func in self.interpreter.functions:
+            expression = f"_invoke({instr.func!r}, [{', '.join(args)}])"
+        elif instr.func in self.interpreter.BUILTINS:
+            method = self.bind(getattr(self.interpreter, "_builtin_" + instr.func))
+            expression = f"{method}({', '.join(args)})"
+        else:
+            expression = f"_builtin({instr.func!r}, [{', '.join(args)}])"
+        if instr.dest is None:
+            self.emit(3, expression)
+        else:
+            self.assign(instr.dest, expression)
+
+
+def compile_function(cfg: CFG, interpreter) -> NativeFunction:
+    """Compile cfg to a Python function calling back into interpreter,
+    which provides invoke, the builtins and the struct layouts."""
+    return PythonCodeGenerator(cfg, interpreter).compile()
@@ -0,0 +1,7 @@
+class TyCRuntimeError(Exception):
+    def __init__(self, msg):
+        self.message = msg
+        super().__init__(msg)
+
+    def __str__(self):
+        return "Runtime Error: " + self.message
@@ -0,0 +1,438 @@
+"""
+Typed frame storage for the TyC runtime.
+TyC variables have a single static type, so every local of a function can
+be given a fixed slot when the function is compiled: int locals live in an
+``array('q')``, float locals in an ``array('d')`` and strings and structs
+in a plain list. The types come from src.ir.types; a variable whose type
+cannot be determined, or that holds values of several types, is kept in
+the object list.
+
+TypedInterpreter compiles each CFG once into blocks of small closures
+that read and write slots by index, so executing an instruction never
+looks a name up in a dict. It runs the same heap-allocated call stack as
+the dict-based Interpreter and shares its builtins and struct values;
+member accesses are resolved to slot indexes of the struct layout.
+
+Two differences from the dict-based Interpreter follow from the storage:
+an int that does not fit in 64 bits is a runtime error ("Integer
+overflow") rather than a Python big int, and a variable read before it is
+assigned yields the zero value of its slot instead of an error.
+"""
+
+from array import array
+from typing import Any, Callable, Dict, Iterable, List, Optional, TextIO, Tuple
+
+from src.ir.cfg import CFG
+from src.ir.instructions import *
+from src.ir.types import FLOAT, INT, infer_types, resolve_members
+from src.runtime.errors import TyCRuntimeError
+from src.runtime.interpreter import Interpreter
+from src.runtime.memo import MemoCache, memo_key
+from src.runtime.structs import get_member, replace_path, store_member
+from src.runtime.operators import BINARY_OPS, UNARY_OPS
+from src.utils.nodes import StructDecl
+
+INT_SLOT = 0
+FLOAT_SLOT = 1
+OBJECT_SLOT = 2
+
+Slot = Tuple[int, int]
+
+
+class FrameLayout:
+    """Slot assignment for the variables of one function.
+    slots maps each variable to (kind, index), where kind selects the int
+    array, the float array or the object list of a frame."""
+
+    def __init__(self, cfg: CFG, types: Dict[str, str]):
+        self.slots: Dict[str, Slot] = {}
+        self.counts = [0, 0, 0]
+        for var in cfg.params:
+            self._assign(var, types)
+        for block in cfg.blocks:
+            for instr in block.instructions:
+                for operand in [instr.dest] + instr.uses():
+                    if is_var(operand):
+                        self._assign(operand, types)
+            for operand in block.terminator.uses() if block.terminator else ():
+                if is_var(operand):
+                    self._assign(operand, types)
+        self._ints = array("q", [0]) * self.counts[INT_SLOT]
+        self._floats = array("d", [0.0]) * self.counts[FLOAT_SLOT]
+
+    def _assign(self, var: str, types: Dict[str, str]):
+        if var in self.slots:
+            return
+        var_type = types.get(var)
+        kind = INT_SLOT if var_type == INT else FLOAT_SLOT if var_type == FLOAT else OBJECT_SLOT
+        self.slots[var] = (kind, self.counts[kind])
+        self.counts[kind] += 1
+
+    def new_frame(self) -> List[Any]:
+        """Fresh storage for one activation: [ints, floats, objects]."""
+        return [self._ints[:], self._floats[:], [None] * self.counts[OBJECT_SLOT]]
+
+
+class CallSite:
+    """A call to a TyC function inside compiled code; cache is the memo
+    cache of the callee when it is memoized."""
+
+    __slots__ = ("func", "args", "dest", "cache")
+
+    def __init__(
+        self,
+        func: str,
+        args: List[Callable],
+        dest: Optional[Slot],
+        cache: Optional[MemoCache] = None,
+    ):
+        self.func = func
+        self.args = args
+        self.dest = dest
+        self.cache = cache
+
+
+class CompiledBlock:
+    """A basic block compiled to closures over frame storage.
+    code holds closures and CallSites; phis maps a predecessor id to the
+    closure performing the block's phi moves for that edge. kind is 0 for
+    a jump, 1 for a branch and 2 for a return."""
+
+    __slots__ = ("id", "code", "phis", "kind", "target", "cond", "if_true", "if_false", "value")
+
+    def __init__(self, block_id: int):
+        self.id = block_id
+        self.code: List[Any] = []
+        self.phis: Dict[int, Callable] = {}
+        self.kind = 0
+        self.target = None
+        self.cond = None
+        self.if_true = None
+        self.if_false = None
+        self.value = None
+
+
+class CompiledFunction:
+    """A CFG compiled against its FrameLayout."""
+
+    def __init__(self, cfg: CFG, layout: FrameLayout, interpreter: "TypedInterpreter"):
+        self.cfg = cfg
+        self.layout = layout
+        self.params = [layout.slots[p] for p in cfg.params]
+        self.blocks = [_compile_block(block, layout, interpreter) for block in cfg.blocks]
+        for compiled in self.blocks:
+            if compiled.kind == 0:
+                compiled.target = self.blocks[compiled.target]
+            elif compiled.kind == 1:
+                compiled.if_true = self.blocks[compiled.if_true]
+                compiled.if_false = self.blocks[compiled.if_false]
+        self.entry = self.blocks[cfg.entry]
+
+
+class TypedFrame:
+    """Activation record of a compiled function."""
+
+    __slots__ = ("function", "regs", "block", "index", "pred", "memo")
+
+    def __init__(self, function: CompiledFunction, regs: List[Any]):
+        self.function = function
+        self.regs = regs
+        self.block = function.entry
+        self.index = 0
+        self.pred = -1
+        self.memo = None
+
+
+class TypedInterpreter(Interpreter):
+    """Execute a TyC program with typed, slot-indexed frames."""
+
+    def __init__(
+        self,
+        functions: Dict[str, CFG],
+        structs: Optional[Dict[str, StructDecl]] = None,
+        stdin: Optional[TextIO] = None,
+        stdout: Optional[TextIO] = None,
+        max_call_depth: Optional[int] = None,
+        memoize: Optional[Iterable[str]] = None,
+        memo_size: int = 4096,
+    ):
+        super().__init__(functions, structs, stdin, stdout, max_call_depth, memoize, memo_size)
+        self.types = infer_types(functions, self.structs)
+        resolve_members(functions, self.structs, self.types)
+        self.compiled: Dict[str, CompiledFunction] = {}
+
+    def compile(self, name: str) -> CompiledFunction:
+        """The compiled form of a function, built on first use."""
+        compiled = self.compiled.get(name)
+        if compiled is None:
+            cfg = self.functions[name]
+            layout = FrameLayout(cfg, self.types.get(name, {}))
+            compiled = self.compiled[name] = CompiledFunction(cfg, layout, self)
+        return compiled
+
+    def call(self, name: str, args: List[Any]) -> Any:
+        if name not in self.functions:
+            return self._call_builtin(name, args)
+        try:
+            return self._run(self._enter_compiled(self.compile(name), args))
+        except OverflowError:
+            raise TyCRuntimeError("Integer overflow") from None
+        except TypeError as e:
+            raise TyCRuntimeError(f"Type mismatch: {e}") from None
+
+    def _enter_compiled(self, function: CompiledFunction, args: List[Any]) -> TypedFrame:
+        if len(args) != len(function.params):
+            raise TyCRuntimeError(f"Wrong number of arguments in call to {function.cfg.name}")
+        regs = function.layout.new_frame()
+        for (kind, index), arg in zip(function.params, args):
+            regs[kind][index] = arg
+        return TypedFrame(function, regs)
+
+    def _run(self, frame: TypedFrame) -> Any:
+        """Run frame to completion on an explicit stack of frames."""
+        stack: List[TypedFrame] = []
+        regs = frame.regs
+        block = frame.block
+        index = frame.index
+        pred = frame.pred
+        while True:
+            if index == 0 and block.phis:
+                block.phis[pred](regs)
+            code = block.code
+            count = len(code)
+            while index < count:
+                step = code[index]
+                index += 1
+                if step.__class__ is CallSite:
+                    args = [arg(regs) for arg in step.args]
+                    cache = step.cache
+                    if cache is not None:
+                        key = memo_key(args)
+                        hit, result = cache.lookup(key)
+                        if hit:
+                            if step.dest is not None:
+                                regs[step.dest[0]][step.dest[1]] = result
+                            continue
+                    frame.block, frame.index = block, index
+                    stack.append(frame)
+                    if self.max_call_depth is not None and len(stack) >= self.max_call_depth:
+                        raise TyCRuntimeError("Stack overflow")
+                    frame = self._enter_compiled(self.compile(step.func), args)
+                    if cache is not None:
+                        frame.memo = (cache, key)
+                    regs, block, index, pred = frame.regs, frame.block, 0, -1
+                    break
+                step(regs)
+            else:
+                kind = block.kind
+                if kind == 0:
+                    pred, block, index = block.id, block.target, 0
+                elif kind == 1:
+                    target = block.if_true if block.cond(regs) else block.if_false
+                    pred, block, index = block.id, target, 0
+                else:
+                    result = None if block.value is None else block.value(regs)
+                    if frame.memo is not None:
+                        frame.memo[0].store(frame.memo[1], result)
+                    if not stack:
+                        return result
+                    frame = stack.pop()
+                    regs, block, index = frame.regs, frame.block, frame.index
+                    dest = block.code[index - 1].dest
+                    if dest is not None:
+                        regs[dest[0]][dest[1]] = result
+
+
+# ----------------------------------------------------------------------
+# Compilation of blocks to closures
+# ----------------------------------------------------------------------
+
+
+def _reader(operand: Operand, slots: Dict[str, Slot]) -> Callable:
+    if is_var(operand):
+        kind, index = slots[operand]
+        return lambda r: r[kind][index]
+    value = operand.value
+    return lambda r: value
+
+
+def _compile_block(block, layout: FrameLayout, interp: TypedInterpreter) -> CompiledBlock:
+    slots = layout.slots
+    compiled = CompiledBlock(block.id)
+    phis = [i for i in block.instructions if isinstance(i, Phi)]
+    if phis:
+        preds = set()
+        for phi in phis:
+            preds.update(phi.incoming)
+        for pred in preds:
+            compiled.phis[pred] = _compile_phis(phis, pred, slots)
+    for instr in block.instructions:
+        if isinstance(instr, Phi):
+            continue
+        if isinstance(instr, Call) and instr.func in interp.functions:
+            dest = slots[instr.dest] if instr.dest is not None else None
+            args = [_reader(a, slots) for a in instr.args]
+            compiled.code.append(CallSite(instr.func, args, dest, interp.memo.get(instr.func)))
+        else:
+            step = _compile_instruction(instr, slots, interp)
+            if step is not None:
+                compiled.code.append(step)
+    term = block.terminator
+    if isinstance(term, Jump):
+        compiled.kind, compiled.target = 0, term.target
+    elif isinstance(term, Branch):
+        compiled.kind, compiled.cond = 1, _reader(term.cond, slots)
+        compiled.if_true, compiled.if_false = term.if_true, term.if_false
+    else:
+        compiled.kind = 2
+        if term is not None and term.value is not None:
+            compiled.value = _reader(term.value, slots)
+    return compiled
+
+
+def _compile_phis(phis: List[Phi], pred: int, slots: Dict[str, Slot]) -> Callable:
+    """Parallel moves for the edge from pred; undefined incoming values
+    leave the destination as it is."""
+    moves = [
+        (_reader(phi.incoming[pred], slots), slots[phi.dest])
+        for phi in phis
+        if phi.incoming.get(pred, UNDEF) != UNDEF
+    ]
+
+    def run(r):
+        values = [read(r) for read, _ in moves]
+        for value, (_, (kind, index)) in zip(values, moves):
+            r[kind][index] = value
+
+    return run
+
+
+def _compile_instruction(instr: Instruction, slots: Dict[str, Slot], interp: TypedInterpreter):
+    cls = instr.__class__
+    if cls is Declare:
+        dk, di = slots[instr.dest]
+        var_type = instr.var_type
+        # Struct values are never mutated, so every execution of the
+        # declaration can share one default value.
+        if dk == OBJECT_SLOT:
+            value = interp.default_value(var_type)
+        else:
+            value = 0.0 if dk == FLOAT_SLOT else 0
+
+        def declare(r):
+            r[dk][di] = value
+
+        return declare
+    if cls is Copy:
+        dk, di = slots[instr.dest]
+        if instr.src == UNDEF:
+            return None
+        if is_var(instr.src):
+            sk, si = slots[instr.src]
+
+            def copy(r):
+                r[dk][di] = r[sk][si]
+        else:
+            value = instr.src.value
+
+            def copy(r):
+                r[dk][di] = value
+
+        return copy
+    if cls is BinOp:
+        return _compile_binop(instr, slots)
+    if cls is UnaryOp:
+        dk, di = slots[instr.dest]
+        fn = UNARY_OPS[instr.operator]
+        read = _reader(instr.operand, slots)
+
+        def unary(r):
+            r[dk][di] = fn(read(r))
+
+        return unary
+    if cls is Call:
+        name = instr.func
+        args = [_reader(a, slots) for a in instr.args]
+        builtin = interp._call_builtin
+        if instr.dest is None:
+            return lambda r: builtin(name, [a(r) for a in args])
+        dk, di = slots[instr.dest]
+
+        def call(r):
+            r[dk][di] = builtin(name, [a(r) for a in args])
+
+        return call
+    if cls is GetField:
+        dk, di = slots[instr.dest]
+        read = _reader(instr.obj, slots)
+        member, index = instr.member, instr.index
+        if index is None:
+
+            def getfield(r):
+                r[dk][di] = get_member(read(r), member)
+        else:
+
+            def getfield(r):
+                r[dk][di] = read(r)[index]
+
+        return getfield
+    if cls is SetField:
+        dk, di = slots[instr.dest]
+        read_obj = _reader(instr.obj, slots)
+        read_value = _reader(instr.value, slots)
+        path, indexes = instr.path, instr.indexes
+        if instr.obj == instr.dest and dk == OBJECT_SLOT:
+
+            def setfield(r):
+                store_member(r[dk], di, path, read_value(r), indexes)
+        else:
+
+            def setfield(r):
+                r[dk][di] = replace_path(read_obj(r), path, read_value(r), indexes)
+
+        return setfield
+    if cls is MakeStruct:
+        dk, di = slots[instr.dest]
+        layout = interp.struct_layout(instr.struct_name)
+        if layout.size != len(instr.values):
+            raise TyCRuntimeError(f"Wrong number of values for struct {layout.name}")
+        make = layout.value_class
+        reads = [_reader(v, slots) for v in instr.values]
+
+        def makestruct(r):
+            r[dk][di] = make([read(r) for read in reads])
+
+        return makestruct
+    raise TyCRuntimeError(f"Cannot execute {instr}")
+
+
+def _compile_binop(instr: BinOp, slots: Dict[str, Slot]) -> Callable:
+    """Binary operations, specialized on which operands are constants."""
+    dk, di = slots[instr.dest]
+    fn = BINARY_OPS[instr.operator]
+    left, right = instr.left, instr.right
+    if is_var(left) and is_var(right):
+        lk, li = slots[left]
+        rk, ri = slots[right]
+
+        def binop(r):
+            r[dk][di] = fn(r[lk][li], r[rk][ri])
+    elif is_var(left):
+        lk, li = slots[left]
+        b = right.value
+
+        def binop(r):
+            r[dk][di] = fn(r[lk][li], b)
+    elif is_var(right):
+        a = left.value
+        rk, ri = slots[right]
+
+        def binop(r):
+            r[dk][di] = fn(a, r[rk][ri])
+    else:
+        a, b = left.value, right.value
+
+        def binop(r):
+            r[dk][di] = fn(a, b)
+
+    return binop
@@ -0,0 +1,277 @@
+"""
+Interpreter for TyC control-flow graphs.
+This module executes the IR produced by src.ir.cfg, before or after
+optimization, and is the execution backend used to check that optimized
+programs behave like unoptimized ones.
+
+Calls between TyC functions push Frame objects on a heap-allocated list
+rather than recursing in Python, so deep TyC recursion only needs memory.
+
+The I/O builtins read and write through the buffered InputReader and
+OutputWriter of src.runtime.io; run() flushes the output at the end.
+
+Functions named in memoize (which must be pure, see src.ir.purity) have
+their results cached per argument list in the MemoCaches of self.memo.
+
+Struct values are fixed-size lists laid out by src.runtime.structs.
+Copies of a struct share one value; a member store copies the value
+first unless nothing else references it (see store_member).
+"""
+
+import sys
+from typing import Any, Callable, Dict, Iterable, List, Optional, TextIO
+
+from src.ir.cfg import CFG
+from src.ir.instructions import *
+from src.runtime.errors import TyCRuntimeError
+from src.runtime.io import InputReader, OutputWriter
+from src.runtime.memo import MemoCache, make_caches, memo_key
+from src.runtime.operators import binary, unary
+from src.runtime.structs import (
+    build_layouts,
+    default_value,
+    get_member,
+    replace_path,
+    store_member,
+)
+from src.utils.nodes import StructDecl
+
+
+class Frame:
+    """Activation record of a TyC function: its variables and where to
+    resume execution."""
+
+    __slots__ = ("cfg", "env", "block", "index", "pred", "memo")
+
+    def __init__(self, cfg: CFG, env: Dict[str, Any]):
+        self.cfg = cfg
+        self.env = env
+        self.block = cfg.blocks[cfg.entry]
+        self.index = 0
+        self.pred = -1
+        # (cache, key) when the result is to be memoized.
+        self.memo = None
+
+
+class Interpreter:
+    """Execute a TyC program given as one CFG per function."""
+
+    BUILTINS = (
+        "readInt",
+        "readFloat",
+        "readString",
+        "printInt",
+        "printFloat",
+        "printString",
+    )
+
+    def __init__(
+        self,
+        functions: Dict[str, CFG],
+        structs: Optional[Dict[str, StructDecl]] = None,
+        stdin: Optional[TextIO] = None,
+        stdout: Optional[TextIO] = None,
+        max_call_depth: Optional[int] = None,
+        memoize: Optional[Iterable[str]] = None,
+        memo_size: int = 4096,
+    ):
+        self.functions = functions
+        self.structs = structs or {}
+        self.memo: Dict[str, MemoCache] = make_caches(memoize or (), memo_size)
+        # Extra callables reachable from the program by name, such as the
+        # hooks of src.runtime.profiler; their names are not TyC
+        # identifiers.
+        self.hooks: Dict[str, Callable[..., Any]] = {}
+        self.layouts = build_layouts(self.structs)
+        self.stdin = stdin if stdin is not None else sys.stdin
+        self.stdout = stdout if stdout is not None else sys.stdout
+        self.max_call_depth = max_call_depth
+        self.input = InputReader(self.stdin)
+        self.output = OutputWriter(self.stdout)
+
+    def run(self, entry: str = "main") -> Any:
+        """Call the entry function with no arguments and return its result.
+        Buffered output is flushed even if the program fails."""
+        try:
+            return self.call(entry, [])
+        finally:
+            self.output.flush()
+            self.input.close()
+
+    def call(self, name: str, args: List[Any]) -> Any:
+        """Call a TyC function or builtin by name."""
+        cfg = self.functions.get(name)
+        if cfg is None:
+            return self._call_builtin(name, args)
+        return self._execute(self._enter(cfg, args))
+
+    def _call_builtin(self, name: str, args: List[Any]) -> Any:
+        if name in self.BUILTINS:
+            return getattr(self, "_builtin_" + name)(*args)
+        hook = self.hooks.get(name)
+        if hook is not None:
+            return hook(*args)
+        raise TyCRuntimeError(f"Undefined function: {name}")
+
+    def _enter(self, cfg: CFG, args: List[Any]) -> Frame:
+        if len(args) != len(cfg.params):
+            raise TyCRuntimeError(f"Wrong number of arguments in call to {cfg.name}")
+        return Frame(cfg, dict(zip(cfg.params, args)))
+
+    # ------------------------------------------------------------------
+    # Execution
+    # ------------------------------------------------------------------
+
+    def _execute(self, frame: Frame) -> Any:
+        """Run frame to completion. Calls between TyC functions push frames
+        on a list instead of recursing, so the depth of TyC recursion is
+        bounded by memory (or max_call_depth), not by Python's stack."""
+        stack: List[Frame] = []
+        functions = self.functions
+        memo = self.memo
+        dispatch = self._dispatch
+        value = self._value
+        env = frame.env
+        block = frame.block
+        index = frame.index
+        while True:
+            instructions = block.instructions
+            if index == 0 and instructions and isinstance(instructions[0], Phi):
+                values = {}
+                for instr in instructions:
+                    if not isinstance(instr, Phi):
+                        break
+                    values[instr.dest] = value(instr.incoming[frame.pred], env)
+                    index += 1
+                env.update(values)
+            count = len(instructions)
+            while index < count:
+                instr = instructions[index]
+                index += 1
+                if instr.__class__ is Call and instr.func in functions:
+                    args = [value(a, env) for a in instr.args]
+                    cache = memo.get(instr.func) if memo else None
+                    if cache is not None:
+                        key = memo_key(args)
+                        hit, result = cache.lookup(key)
+                        if hit:
+                            if instr.dest is not None:
+                                env[instr.dest] = result
+                            continue
+                    frame.block, frame.index = block, index
+                    stack.append(frame)
+                    if self.max_call_depth is not None and len(stack) >= self.max_call_depth:
+                        raise TyCRuntimeError("Stack overflow")
+                    frame = self._enter(functions[instr.func], args)
+                    if cache is not None:
+                        frame.memo = (cache, key)
+                    env, block, index = frame.env, frame.block, 0
+                    break
+                dispatch[instr.__class__](self, instr, env)
+            else:
+                term = block.terminator
+                if term.__class__ is Jump:
+                    frame.pred, block, index = block.id, frame.cfg.blocks[term.target], 0
+                elif term.__class__ is Branch:
+                    target = term.if_true if value(term.cond, env) else term.if_false
+                    frame.pred, block, index = block.id, frame.cfg.blocks[target], 0
+                else:
+                    result = None if term.value is None else value(term.value, env)
+                    if frame.memo is not None:
+                        frame.memo[0].store(frame.memo[1], result)
+                    if not stack:
+                        return result
+                    frame = stack.pop()
+                    env, block, index = frame.env, frame.block, frame.index
+                    dest = block.instructions[index - 1].dest
+                    if dest is not None:
+                        env[dest] = result
+
+    @staticmethod
+    def _value(operand: Operand, env: Dict[str, Any]) -> Any:
+        if isinstance(operand, str):
+            try:
+                return env[operand]
+            except KeyError:
+                raise TyCRuntimeError(f"Undefined variable: {operand}") from None
+        return operand.value
+
+    def _exec_copy(self, instr: Copy, env):
+        env[instr.dest] = self._value(instr.src, env)
+
+    def _exec_binop(self, instr: BinOp, env):
+        env[instr.dest] = binary(
+            instr.operator, self._value(instr.left, env), self._value(instr.right, env)
+        )
+
+    def _exec_unaryop(self, instr: UnaryOp, env):
+        env[instr.dest] = unary(instr.operator, self._value(instr.operand, env))
+
+    def _exec_call(self, instr: Call, env):
+        result = self._call_builtin(instr.func, [self._value(a, env) for a in instr.args])
+        if instr.dest is not None:
+            env[instr.dest] = result
+
+    def _exec_getfield(self, instr: GetField, env):
+        env[instr.dest] = get_member(self._value(instr.obj, env), instr.member, instr.index)
+
+    def _exec_setfield(self, instr: SetField, env):
+        value = self._value(instr.value, env)
+        if instr.obj == instr.dest and instr.dest in env:
+            store_member(env, instr.dest, instr.path, value, instr.indexes)
+        else:
+            env[instr.dest] = replace_path(
+                self._value(instr.obj, env), instr.path, value, instr.indexes
+            )
+
+    def _exec_makestruct(self, instr: MakeStruct, env):
+        env[instr.dest] = self.struct_layout(instr.struct_name).make(
+            [self._value(v, env) for v in instr.values]
+        )
+
+    def _exec_declare(self, instr: Declare, env):
+        env[instr.dest] = self.default_value(instr.var_type)
+
+    _dispatch = {
+        Copy: _exec_copy,
+        BinOp: _exec_binop,
+        UnaryOp: _exec_unaryop,
+        Call: _exec_call,
+        GetField: _exec_getfield,
+        SetField: _exec_setfield,
+        MakeStruct: _exec_makestruct,
+        Declare: _exec_declare,
+    }
+
+    def default_value(self, var_type) -> Any:
+        """Value of a variable declared without an initializer."""
+        return default_value(var_type, self.layouts)
+
+    def struct_layout(self, struct_name: Optional[str]):
+        layout = self.layouts.get(struct_name)
+        if layout is None:
+            raise TyCRuntimeError("Cannot determine the struct type of a struct literal")
+        return layout
+
+    # ------------------------------------------------------------------
+    # Builtins
+    # ------------------------------------------------------------------
+
+    def _builtin_readInt(self):
+        return self.input.read_int()
+
+    def _builtin_readFloat(self):
+        return self.input.read_float()
+
+    def _builtin_readString(self):
+        return self.input.read_string()
+
+    def _builtin_printInt(self, value):
+        self.output.write(f"{value}\n")
+
+    def _builtin_printFloat(self, value):
+        self.output.write(f"{float(value)}\n")
+
+    def _builtin_printString(self, value):
+        self.output.write(f"{value}\n")
+
@@ -0,0 +1,163 @@
+"""
+Buffered input and output for the TyC I/O builtins.
+InputReader memory-maps stdin when it is a regular file and otherwise
+reads it in chunks of up to a large size, taking whatever a pipe or
+terminal has ready rather than waiting for a whole chunk; tokens are cut out of the buffer one at a time,
+only when a read builtin asks for one. OutputWriter collects printed text
+and hands it to the stream in large writes, flushing after every write
+only when the stream is a terminal.
+"""
+
+import mmap
+import os
+import re
+import stat
+from typing import List, Optional, TextIO, Union
+
+from src.runtime.errors import TyCRuntimeError
+
+_TEXT_TOKEN = re.compile(r"\S+")
+_BYTES_TOKEN = re.compile(rb"\S+")
+
+
+class InputReader:
+    """Whitespace-separated tokens from a text stream, read lazily."""
+
+    CHUNK_SIZE = 1 << 16
+
+    def __init__(self, stream: TextIO, chunk_size: int = CHUNK_SIZE):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self._read = None
+        self._buffer: Union[bytes, str, mmap.mmap, None] = None
+        self._pattern = None
+        self._pos = 0
+        self._eof = False
+        self._map: Optional[mmap.mmap] = None
+
+    def _open(self):
+        binary = getattr(self.stream, "buffer", None)
+        if binary is not None:
+            self._map = _map_file(binary)
+            if self._map is not None:
+                self._buffer, self._pattern = self._map, _BYTES_TOKEN
+                self._pos, self._eof = binary.tell(), True
+                return
+            # read1() returns what is available, so a line typed at a
+            # terminal is seen when it is entered.
+            self._read = getattr(binary, "read1", binary.read)
+            self._buffer, self._pattern = b"", _BYTES_TOKEN
+        else:
+            self._read = self.stream.read
+            self._buffer, self._pattern = "", _TEXT_TOKEN
+            # A StringIO can hand over its whole contents at once.
+            getvalue = getattr(self.stream, "getvalue", None)
+            if getvalue is not None:
+                self._buffer = getvalue()[self.stream.tell():]
+                self._eof = True
+
+    def _fill(self) -> bool:
+        """Append the next chunk to the unread part of the buffer."""
+        chunk = self._read(self.chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def token(self) -> Union[bytes, str]:
+        """The next token; bytes or str depending on the stream."""
+        if self._buffer is None:
+            self._open()
+        while True:
+            match = self._pattern.search(self._buffer, self._pos)
+            # A token touching the end of the buffer may continue in the
+            # next chunk.
+            if match is not None and (self._eof or match.end() < len(self._buffer)):
+                self._pos = match.end()
+                return match.group()
+            if self._eof:
+                raise TyCRuntimeError("Unexpected end of input")
+            if match is None:
+                self._pos = len(self._buffer)
+            self._fill()
+
+    def read_int(self) -> int:
+        token = self.token()
+        try:
+            return int(token)
+        except ValueError:
+            raise TyCRuntimeError(f"Invalid int input: {_text(token)}") from None
+
+    def read_float(self) -> float:
+        token = self.token()
+        try:
+            return float(token)
+        except ValueError:
+            raise TyCRuntimeError(f"Invalid float input: {_text(token)}") from None
+
+    def read_string(self) -> str:
+        return _text(self.token())
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+
+def _map_file(binary) -> Optional[mmap.mmap]:
+    """Memory-map a binary stream backed by a non-empty regular file."""
+    try:
+        fd = binary.fileno()
+        info = os.fstat(fd)
+    except (AttributeError, OSError, ValueError):
+        return None
+    if not stat.S_ISREG(info.st_mode) or info.st_size == 0:
+        return None
+    try:
+        return mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+
+def _text(token: Union[bytes, str]) -> str:
+    return token.decode("utf-8", "replace") if isinstance(token, bytes) else token
+
+
+class OutputWriter:
+    """Growable output buffer written to a text stream in large pieces."""
+
+    BUFFER_SIZE = 1 << 16
+
+    def __init__(
+        self,
+        stream: TextIO,
+        buffer_size: int = BUFFER_SIZE,
+        line_buffered: Optional[bool] = None,
+    ):
+        self.stream = stream
+        self.buffer_size = buffer_size
+        if line_buffered is None:
+            try:
+                line_buffered = stream.isatty()
+            except (AttributeError, ValueError):
+                line_buffered = False
+        self.line_buffered = line_buffered
+        self._pieces: List[str] = []
+        self._size = 0
+
+    def write(self, text: str):
+        self._pieces.append(text)
+        self._size += len(text)
+        if self.line_buffered or self._size >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if self._pieces:
+            self.stream.write("".join(self._pieces))
+            self._pieces = []
+            self._size = 0
+        flush = getattr(self.stream, "flush", None)
+        if flush is not None:
+            flush()
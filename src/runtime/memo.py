@@ -0,0 +1,67 @@
+"""
+Memoization of pure TyC functions.
+Each memoized function gets a bounded LRU cache from argument tuples to
+results, with hit and miss counters. The interpreters consult the cache
+when a call is made and fill it when the call returns; which functions
+may be memoized is decided by src.ir.purity.
+"""
+
+import math
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, List
+
+
+class MemoCache:
+    """Bounded LRU cache of the results of one function."""
+
+    __slots__ = ("name", "maxsize", "entries", "hits", "misses")
+
+    def __init__(self, name: str, maxsize: int = 4096):
+        self.name = name
+        self.maxsize = maxsize
+        self.entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, key: Hashable):
+        """(True, result) on a hit, (False, None) on a miss."""
+        entries = self.entries
+        if key in entries:
+            entries.move_to_end(key)
+            self.hits += 1
+            return True, entries[key]
+        self.misses += 1
+        return False, None
+
+    def store(self, key: Hashable, result: Any):
+        self.entries[key] = result
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    @property
+    def hit_rate(self) -> float:
+        calls = self.hits + self.misses
+        return self.hits / calls if calls else 0.0
+
+    def __str__(self):
+        return (
+            f"{self.name}: {self.hits} hits, {self.misses} misses "
+            f"({100.0 * self.hit_rate:.1f}%), {len(self.entries)}/{self.maxsize} entries"
+        )
+
+
+def make_caches(names: Iterable[str], maxsize: int = 4096) -> Dict[str, MemoCache]:
+    """One cache per function name."""
+    return {name: MemoCache(name, maxsize) for name in names}
+
+
+def memo_key(args: List[Any]) -> Hashable:
+    """Cache key for an argument list. 0.0 and -0.0 compare equal but
+    can give different results, so float arguments carry their sign."""
+    for arg in args:
+        if arg.__class__ is float:
+            return tuple(
+                (a, math.copysign(1.0, a)) if a.__class__ is float else a for a in args
+            )
+    return tuple(args)
@@ -0,0 +1,64 @@
+"""
+Operator semantics shared by the TyC runtime and the optimizer.
+Integer division and remainder truncate toward zero as in C, relational
+operators yield the int 0 or 1, and division by zero is a runtime error.
+Constant folding uses these same functions so that optimized programs
+compute exactly what the interpreter computes.
+"""
+
+from typing import Any, Callable, Dict
+
+from src.runtime.errors import TyCRuntimeError
+
+
+def _div(a, b):
+    if b == 0:
+        raise TyCRuntimeError("Division by zero")
+    if type(a) is int and type(b) is int:
+        q = abs(a) // abs(b)
+        return q if (a < 0) == (b < 0) else -q
+    return a / b
+
+
+def _mod(a, b):
+    if b == 0:
+        raise TyCRuntimeError("Division by zero")
+    r = abs(a) % abs(b)
+    return r if a >= 0 else -r
+
+
+BINARY_OPS: Dict[str, Callable[[Any, Any], Any]] = {
+    "+": lambda a, b: a + b,
+    "-": lambda a, b: a - b,
+    "*": lambda a, b: a * b,
+    "/": _div,
+    "%": _mod,
+    "==": lambda a, b: int(a == b),
+    "!=": lambda a, b: int(a != b),
+    "<": lambda a, b: int(a < b),
+    "<=": lambda a, b: int(a <= b),
+    ">": lambda a, b: int(a > b),
+    ">=": lambda a, b: int(a >= b),
+}
+
+UNARY_OPS: Dict[str, Callable[[Any], Any]] = {
+    "-": lambda a: -a,
+    "+": lambda a: a,
+    "!": lambda a: int(not a),
+}
+
+COMMUTATIVE = frozenset(["+", "*", "==", "!="])
+
+# Operators that raise for some operand values and so cannot be dropped
+# as dead code unless the divisor is known to be non-zero.
+TRAPPING = frozenset(["/", "%"])
+
+
+def binary(operator: str, left, right):
+    """Evaluate a binary operator."""
+    return BINARY_OPS[operator](left, right)
+
+
+def unary(operator: str, operand):
+    """Evaluate a unary operator."""
+    return UNARY_OPS[operator](operand)
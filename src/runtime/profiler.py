@@ -0,0 +1,337 @@
+"""
+Execution profiler for TyC programs.
+Profiling works on instrumented copies of a program's CFGs, so it needs
+nothing from the execution engine beyond the ability to call a hook: the
+entry block of every function calls a hook recording the call, every
+return calls one recording the exit, and each run of instructions from
+one source line calls one counting the line. The hooks are registered
+with Interpreter.hooks, which is only consulted for calls to functions
+that are neither TyC functions nor builtins, so a program run without a
+profiler executes exactly as before.
+
+From the hook events the profiler keeps call counts, inclusive and
+exclusive time per function and execution counts per source line, and
+exports them as collapsed stacks (the input format of flame graph tools,
+weighted by exclusive time in microseconds) and as a JSON summary.
+Calls answered from a memoization cache never enter the callee and are
+not counted.
+
+CountingProfiler uses the same mechanism to count branch outcomes, loop
+iterations and call-site executions by source position, producing the
+ProgramProfile (src.ir.profile) that profile-guided optimization reads.
+"""
+
+import json
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.ir.cfg import CFG
+from src.ir.dominance import dominates, immediate_dominators
+from src.ir.instructions import *
+from src.ir.profile import ProgramProfile
+
+ENTER_HOOK = "$profile_enter"
+EXIT_HOOK = "$profile_exit"
+LINE_HOOK = "$profile_line"
+BRANCH_HOOK = "$count_branch"
+LOOP_HOOK = "$count_loop"
+CALL_HOOK = "$count_call"
+
+
+class FunctionProfile:
+    """Counters of one function."""
+
+    __slots__ = ("name", "calls", "inclusive", "exclusive", "active")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.inclusive = 0.0
+        self.exclusive = 0.0
+        self.active = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"calls": self.calls, "inclusive": self.inclusive, "exclusive": self.exclusive}
+
+
+class Profiler:
+    """Collect a profile from one or more runs of a program."""
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.functions: Dict[str, FunctionProfile] = {}
+        self.lines: Dict[int, int] = {}
+        # Call stacks as a trie: node 0 is the root, and _children[n] maps
+        # the name of each function called from the stack of node n to
+        # the node of the longer stack. Stacks are spelled out only in
+        # reports, so a call costs the same at any depth.
+        self._children: List[Dict[str, int]] = [{}]
+        # Exclusive time of the nodes of finished calls.
+        self._node_time: Dict[int, float] = {}
+        # Open calls: [profile, start time, time spent in callees, node].
+        self._stack: List[List[Any]] = []
+
+    # ------------------------------------------------------------------
+    # Instrumentation
+    # ------------------------------------------------------------------
+
+    def instrument(self, functions: Dict[str, CFG]) -> Dict[str, CFG]:
+        """Instrumented copies of the CFGs of a program."""
+        return {name: _instrument(cfg) for name, cfg in functions.items()}
+
+    def install(self, interpreter):
+        """Register the profiling hooks with an interpreter."""
+        interpreter.hooks[ENTER_HOOK] = self.enter
+        interpreter.hooks[EXIT_HOOK] = self.exit
+        interpreter.hooks[LINE_HOOK] = self.line
+
+    # ------------------------------------------------------------------
+    # Hooks
+    # ------------------------------------------------------------------
+
+    def enter(self, name: str):
+        profile = self.functions.get(name)
+        if profile is None:
+            profile = self.functions[name] = FunctionProfile(name)
+        profile.calls += 1
+        profile.active += 1
+        parent = self._stack[-1][3] if self._stack else 0
+        node = self._children[parent].get(name)
+        if node is None:
+            node = self._children[parent][name] = len(self._children)
+            self._children.append({})
+        self._stack.append([profile, self.clock(), 0.0, node])
+
+    def exit(self, name: str):
+        profile, start, children, node = self._stack.pop()
+        elapsed = self.clock() - start
+        profile.active -= 1
+        # Time of a recursive call is already inside its outermost call.
+        if profile.active == 0:
+            profile.inclusive += elapsed
+        own = elapsed - children
+        profile.exclusive += own
+        self._node_time[node] = self._node_time.get(node, 0.0) + own
+        if self._stack:
+            self._stack[-1][2] += elapsed
+
+    def line(self, line: int):
+        self.lines[line] = self.lines.get(line, 0) + 1
+
+    # ------------------------------------------------------------------
+    # Reports
+    # ------------------------------------------------------------------
+
+    @property
+    def stacks(self) -> Dict[Tuple[str, ...], float]:
+        """Exclusive time by call stack."""
+        return {stack: self._node_time[node] for node, stack in self._paths(lambda stack, name: stack + (name,), ())}
+
+    def collapsed(self) -> str:
+        """One 'main;f;g weight' line per call stack, weighted by the
+        exclusive time of its innermost function in microseconds."""
+        return "".join(self._collapsed_lines())
+
+    def _collapsed_lines(self):
+        # Each stack of a recursion is a line of its own, so the lines of
+        # a deep one add up to far more than the trie; write() streams them.
+        for node, stack in self._paths(lambda stack, name: f"{stack};{name}" if stack else name, ""):
+            yield f"{stack} {round(self._node_time[node] * 1e6)}\n"
+
+    def _paths(self, extend, root):
+        """(node, stack) for every stack of a finished call, in sorted
+        order; a callee's stack is extend(its caller's stack, its name)."""
+        # Depth first without recursion, since stacks may be deep.
+        work = [(0, root)]
+        while work:
+            node, stack = work.pop()
+            if node in self._node_time:
+                yield node, stack
+            for name, child in sorted(self._children[node].items(), reverse=True):
+                work.append((child, extend(stack, name)))
+
+    def summary(self) -> Dict[str, Any]:
+        """Function counters sorted by exclusive time, and line counts."""
+        functions = sorted(self.functions.values(), key=lambda p: -p.exclusive)
+        return {
+            "functions": {p.name: p.as_dict() for p in functions},
+            "lines": {str(line): count for line, count in sorted(self.lines.items())},
+        }
+
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        return json.dumps(self.summary(), indent=indent)
+
+    def write(self, collapsed_path: Optional[str] = None, json_path: Optional[str] = None):
+        if collapsed_path is not None:
+            with open(collapsed_path, "w") as f:
+                f.writelines(self._collapsed_lines())
+        if json_path is not None:
+            with open(json_path, "w") as f:
+                f.write(self.to_json())
+                f.write("\n")
+
+
+def _hook(name: str, value: Any, origin: Optional[Instruction] = None) -> Call:
+    instr = Call(None, name, [Const(value)])
+    if origin is not None:
+        instr.line, instr.column = origin.line, origin.column
+    return instr
+
+
+def _instrument(cfg: CFG) -> CFG:
+    cfg = cfg.copy()
+    for block in cfg.blocks:
+        instructions = []
+        phis = [i for i in block.instructions if isinstance(i, Phi)]
+        line = None
+        for instr in block.instructions[len(phis):]:
+            if instr.line is not None and instr.line != line:
+                line = instr.line
+                instructions.append(_hook(LINE_HOOK, line, instr))
+            instructions.append(instr)
+        term = block.terminator
+        if term.line is not None and term.line != line:
+            instructions.append(_hook(LINE_HOOK, term.line, term))
+        if isinstance(term, Return):
+            instructions.append(_hook(EXIT_HOOK, cfg.name, term))
+        block.instructions = phis + instructions
+    if cfg.preds[cfg.entry]:
+        # The entry is also a loop header; count the call only once.
+        entry = cfg.new_block()
+        entry.terminator = Jump(cfg.entry)
+        cfg.entry = entry.id
+        cfg.compute_edges()
+    entry = cfg.blocks[cfg.entry]
+    entry.instructions.insert(0, _hook(ENTER_HOOK, cfg.name))
+    return cfg
+
+
+class CountingProfiler:
+    """Count branch outcomes, loop iterations and call-site executions of
+    one or more runs of a program, by function and source position.
+    Branches, loop headers and call sites without a source position are
+    not counted. Sites are registered when a program is instrumented, so
+    sites that never run are recorded with a count of 0."""
+
+    def __init__(self):
+        # Sites: (function, (line, column)) and their counters.
+        self.branch_sites: List[Tuple[str, Tuple[int, int]]] = []
+        self.branch_counts: List[List[int]] = []
+        self.loop_sites: List[Tuple[str, Tuple[int, int]]] = []
+        self.loop_counts: List[List[int]] = []
+        self.call_sites: List[Tuple[str, Tuple[int, int]]] = []
+        self.call_counts: List[int] = []
+
+    def instrument(self, functions: Dict[str, CFG]) -> Dict[str, CFG]:
+        """Instrumented copies of the CFGs of a program."""
+        return {name: self._instrument(cfg, functions) for name, cfg in functions.items()}
+
+    def install(self, interpreter):
+        """Register the counting hooks with an interpreter."""
+        interpreter.hooks[BRANCH_HOOK] = self.branch
+        interpreter.hooks[LOOP_HOOK] = self.loop
+        interpreter.hooks[CALL_HOOK] = self.call
+
+    # ------------------------------------------------------------------
+    # Hooks
+    # ------------------------------------------------------------------
+
+    def branch(self, site: int, cond):
+        self.branch_counts[site][0 if cond else 1] += 1
+
+    def loop(self, site: int, back_edge: int):
+        # [header executions, back edges taken]
+        self.loop_counts[site][back_edge] += 1
+
+    def call(self, site: int):
+        self.call_counts[site] += 1
+
+    # ------------------------------------------------------------------
+    # Results
+    # ------------------------------------------------------------------
+
+    def profile(self) -> ProgramProfile:
+        """The counts collected so far."""
+        profile = ProgramProfile()
+        for (function, position), (taken, not_taken) in zip(self.branch_sites, self.branch_counts):
+            profile.add_branch(function, position, taken, not_taken)
+        for (function, position), (headers, back_edges) in zip(self.loop_sites, self.loop_counts):
+            profile.add_loop(function, position, headers - back_edges, back_edges)
+        for (function, position), count in zip(self.call_sites, self.call_counts):
+            profile.add_call(function, position, count)
+        return profile
+
+    # ------------------------------------------------------------------
+    # Instrumentation
+    # ------------------------------------------------------------------
+
+    def _instrument(self, cfg: CFG, functions: Dict[str, CFG]) -> CFG:
+        cfg = cfg.copy()
+        headers = self._loops(cfg)
+        for block in cfg.blocks:
+            instructions = []
+            for instr in block.instructions:
+                if isinstance(instr, Call) and instr.func in functions and instr.line is not None:
+                    site = len(self.call_sites)
+                    self.call_sites.append((cfg.name, (instr.line, instr.column)))
+                    self.call_counts.append(0)
+                    instructions.append(_hook(CALL_HOOK, site, instr))
+                instructions.append(instr)
+            term = block.terminator
+            if isinstance(term, Branch) and term.line is not None:
+                site = len(self.branch_sites)
+                self.branch_sites.append((cfg.name, (term.line, term.column)))
+                self.branch_counts.append([0, 0])
+                hook = _hook(BRANCH_HOOK, site, term)
+                hook.args.append(term.cond)
+                instructions.append(hook)
+            block.instructions = instructions
+
+        for header, (origin, back_edges) in headers.items():
+            site = len(self.loop_sites)
+            self.loop_sites.append((cfg.name, (origin.line, origin.column)))
+            self.loop_counts.append([0, 0])
+            block = cfg.blocks[header]
+            phis = [i for i in block.instructions if isinstance(i, Phi)]
+            hook = _hook(LOOP_HOOK, site, origin)
+            hook.args.append(Const(0))
+            block.instructions.insert(len(phis), hook)
+            for source in back_edges:
+                # Count the edge on a block of its own, since the source
+                # may also branch elsewhere.
+                edge = cfg.new_block()
+                hook = _hook(LOOP_HOOK, site, origin)
+                hook.args.append(Const(1))
+                edge.instructions.append(hook)
+                edge.terminator = Jump(header)
+                cfg.blocks[source].terminator.replace_targets(
+                    lambda t: edge.id if t == header else t
+                )
+                for phi in phis:
+                    if source in phi.incoming:
+                        phi.incoming[edge.id] = phi.incoming.pop(source)
+        cfg.compute_edges()
+        return cfg
+
+    def _loops(self, cfg: CFG) -> Dict[int, Tuple[Instruction, List[int]]]:
+        """Loop headers with a source position: the instruction giving the
+        position (the loop condition when there is one) and the sources
+        of the back edges."""
+        idom = immediate_dominators(cfg)
+        loops: Dict[int, Tuple[Instruction, List[int]]] = {}
+        for block in cfg.blocks:
+            for succ in cfg.succs[block.id]:
+                if idom[block.id] == -1 or not dominates(idom, succ, block.id):
+                    continue
+                header = cfg.blocks[succ]
+                origin = next(
+                    (i for i in header.instructions + [header.terminator] if i.line is not None),
+                    None,
+                )
+                if origin is None:
+                    continue
+                if succ not in loops:
+                    loops[succ] = (origin, [])
+                if block.id not in loops[succ][1]:
+                    loops[succ][1].append(block.id)
+        return loops
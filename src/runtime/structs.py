@@ -0,0 +1,190 @@
+"""
+Runtime representation of TyC struct values.
+Every StructDecl gets a StructLayout fixing the order of its members, and
+a struct value is a fixed-size list of member values in that order. The
+list is an instance of a class generated per struct type, so a value
+still knows its layout when a member has to be found by name.
+
+Member accesses whose struct type is known are resolved to indexes before
+execution (see src.ir.types.resolve_members); only unresolved accesses
+look the member name up in the layout.
+
+Struct assignment, argument passing and returns share struct values
+instead of copying them; the copy the spec asks for is made only when a
+shared value is written through a member store (copy on write). A store
+into a value that nothing else references updates it in place. Whether a
+value is shared is read from its CPython reference count, so on Python
+implementations without sys.getrefcount every store copies.
+"""
+
+import sys
+from typing import Any, Dict, List, MutableMapping, Optional, Sequence, Tuple, Union
+
+from src.runtime.errors import TyCRuntimeError
+from src.utils.nodes import FloatType, IntType, StringType, StructDecl, StructType
+
+
+class StructValue(list):
+    """Base class of the generated per-struct value classes."""
+
+    __slots__ = ()
+
+    layout: "StructLayout" = None
+
+    def __repr__(self):
+        members = ", ".join(f"{n}: {v!r}" for n, v in zip(self.layout.members, self))
+        return f"{self.layout.name}{{{members}}}"
+
+
+class StructLayout:
+    """Member order of one struct type and the class of its values."""
+
+    def __init__(self, decl: StructDecl, layouts: Dict[str, "StructLayout"]):
+        self.name = decl.name
+        self.decl = decl
+        self.members: List[str] = [m.name for m in decl.members]
+        self.index: Dict[str, int] = {name: i for i, name in enumerate(self.members)}
+        self.size = len(self.members)
+        self.layouts = layouts
+        self.value_class = type(decl.name, (StructValue,), {"__slots__": (), "layout": self})
+
+    def make(self, values: Sequence[Any]) -> StructValue:
+        if len(values) != self.size:
+            raise TyCRuntimeError(f"Wrong number of values for struct {self.name}")
+        return self.value_class(values)
+
+    def default(self) -> StructValue:
+        """Value of a variable of this type declared without initializer."""
+        return self.value_class(
+            default_value(m.member_type, self.layouts) for m in self.decl.members
+        )
+
+    def index_of(self, member: str) -> int:
+        try:
+            return self.index[member]
+        except KeyError:
+            raise TyCRuntimeError(f"No member {member} in struct {self.name}") from None
+
+
+def build_layouts(structs: Dict[str, StructDecl]) -> Dict[str, StructLayout]:
+    """Layouts for every struct of a program, by struct name."""
+    layouts: Dict[str, StructLayout] = {}
+    for name, decl in structs.items():
+        layouts[name] = StructLayout(decl, layouts)
+    return layouts
+
+
+def default_value(var_type, layouts: Dict[str, StructLayout]) -> Any:
+    """Value of a variable declared without an initializer."""
+    if isinstance(var_type, IntType):
+        return 0
+    if isinstance(var_type, FloatType):
+        return 0.0
+    if isinstance(var_type, StringType):
+        return ""
+    if isinstance(var_type, StructType):
+        layout = layouts.get(var_type.struct_name)
+        if layout is None:
+            raise TyCRuntimeError(f"Undefined struct: {var_type.struct_name}")
+        return layout.default()
+    return None
+
+
+def get_member(obj: Any, member: str, index: Optional[int] = None) -> Any:
+    """obj.member, by the resolved index when there is one."""
+    if not isinstance(obj, StructValue):
+        raise TyCRuntimeError(f"No member {member} in {obj!r}")
+    if index is None:
+        index = obj.layout.index_of(member)
+    return obj[index]
+
+
+def replace_path(
+    obj: Any,
+    path: Tuple[str, ...],
+    value: Any,
+    indexes: Optional[Tuple[int, ...]] = None,
+) -> StructValue:
+    """Copy of obj with the member at path replaced by value."""
+    if not isinstance(obj, StructValue):
+        raise TyCRuntimeError(f"No member {path[0]} in {obj!r}")
+    index = indexes[0] if indexes is not None else obj.layout.index_of(path[0])
+    new = obj.__class__(obj)
+    if len(path) == 1:
+        new[index] = value
+    else:
+        rest = indexes[1:] if indexes is not None else None
+        new[index] = replace_path(obj[index], path[1:], value, rest)
+    return new
+
+
+def _references(container, key) -> int:
+    obj = container[key]
+    return sys.getrefcount(obj)
+
+
+# Reference count of a value held only by one container slot, as seen
+# from a function holding it in one local variable (see store_member).
+_UNSHARED = _references([StructValue()], 0) if hasattr(sys, "getrefcount") else None
+
+
+def store_member(
+    container: Union[MutableMapping[Any, Any], List[Any]],
+    key: Any,
+    path: Tuple[str, ...],
+    value: Any,
+    indexes: Optional[Tuple[int, ...]] = None,
+):
+    """container[key] = container[key] with the member at path replaced
+    by value. The struct is updated in place when container[key] is its
+    only reference, and copied first when it is shared; nested structs
+    along path are handled the same way."""
+    obj = container[key]
+    if not isinstance(obj, StructValue):
+        raise TyCRuntimeError(f"No member {path[0]} in {obj!r}")
+    if _UNSHARED is None or sys.getrefcount(obj) != _UNSHARED:
+        obj = obj.__class__(obj)
+        container[key] = obj
+    index = indexes[0] if indexes is not None else obj.layout.index_of(path[0])
+    if len(path) == 1:
+        obj[index] = value
+    else:
+        rest = indexes[1:] if indexes is not None else None
+        store_member(obj, index, path[1:], value, rest)
+
+
+def _probe(obj, path, value, indexes):
+    return sys.getrefcount(obj)
+
+
+def _probe_local() -> int:
+    obj = StructValue()
+    return _probe(obj, (), None, None)
+
+
+# Reference count, seen from update_member, of a value held only by the
+# local variable of the caller that passes it.
+_UNSHARED_LOCAL = _probe_local() if hasattr(sys, "getrefcount") else None
+
+
+def update_member(
+    obj: Any,
+    path: Tuple[str, ...],
+    value: Any,
+    indexes: Optional[Tuple[int, ...]] = None,
+) -> StructValue:
+    """obj with the member at path replaced by value, for generated code
+    that writes the result back to the local variable holding obj
+    ('x = update_member(x, ...)'). Like store_member, the struct is
+    updated in place when that variable is its only reference."""
+    if not isinstance(obj, StructValue):
+        raise TyCRuntimeError(f"No member {path[0]} in {obj!r}")
+    if _UNSHARED_LOCAL is None or sys.getrefcount(obj) != _UNSHARED_LOCAL:
+        obj = obj.__class__(obj)
+    index = indexes[0] if indexes is not None else obj.layout.index_of(path[0])
+    if len(path) == 1:
+        obj[index] = value
+    else:
+        rest = indexes[1:] if indexes is not None else None
+        store_member(obj, index, path[1:], value, rest)
+    return obj
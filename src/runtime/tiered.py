@@ -0,0 +1,296 @@
+"""
+Tiered execution of TyC programs.
+Every function starts in tier 0, the dict-based interpreter loop, which
+costs nothing to start. Each function has an invocation counter and a
+back-edge counter (a back edge being a transfer to a block whose id is
+not greater than the current one, which holds for the loops built by
+src.ir.cfg and kept by the optimizer and the block layout). When either
+crosses its threshold the function is compiled to a Python function by
+src.runtime.codegen, in a background thread unless background is False;
+the thread is stopped when run() returns.
+
+Later calls of a compiled function run the compiled code (tier 1). An
+interpreted activation that keeps looping switches over too: at its next
+back edge once the compiled code is ready, the activation continues in
+the compiled function from the target block (on-stack replacement).
+
+Compiled code calls other TyC functions through invoke, recursing on the
+Python stack. Past max_native_depth nested compiled activations, calls
+are interpreted again, on tier 0's heap-allocated stack, so TyC recursion
+depth stays bounded only by memory and max_call_depth.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, TextIO
+
+from src.ir.cfg import CFG
+from src.ir.instructions import *
+from src.runtime.codegen import NativeFunction, compile_function
+from src.runtime.errors import TyCRuntimeError
+from src.runtime.interpreter import Frame, Interpreter
+from src.runtime.memo import memo_key
+from src.utils.nodes import StructDecl
+
+TIER_INTERPRETED = 0
+TIER_COMPILED = 1
+
+
+class FunctionTier:
+    """Counters and compiled code of one function."""
+
+    __slots__ = ("cfg", "calls", "back_edges", "code", "native", "queued", "compile_time", "error")
+
+    def __init__(self, cfg: CFG):
+        self.cfg = cfg
+        self.calls = 0
+        self.back_edges = 0
+        # The compiled Python function, once compilation has finished.
+        self.code = None
+        self.native: Optional[NativeFunction] = None
+        self.queued = False
+        self.compile_time = 0.0
+        self.error: Optional[str] = None
+
+    @property
+    def tier(self) -> int:
+        return TIER_INTERPRETED if self.code is None else TIER_COMPILED
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "tier": self.tier,
+            "calls": self.calls,
+            "back_edges": self.back_edges,
+            "compile_time": self.compile_time,
+            "error": self.error,
+        }
+
+
+class TieredInterpreter(Interpreter):
+    """Interpret functions first and promote the hot ones to compiled
+    Python code."""
+
+    def __init__(
+        self,
+        functions: Dict[str, CFG],
+        structs: Optional[Dict[str, StructDecl]] = None,
+        stdin: Optional[TextIO] = None,
+        stdout: Optional[TextIO] = None,
+        max_call_depth: Optional[int] = None,
+        memoize: Optional[Iterable[str]] = None,
+        memo_size: int = 4096,
+        call_threshold: int = 50,
+        loop_threshold: int = 1000,
+        background: bool = True,
+        max_native_depth: int = 200,
+    ):
+        super().__init__(functions, structs, stdin, stdout, max_call_depth, memoize, memo_size)
+        self.tiers: Dict[str, FunctionTier] = {
+            name: FunctionTier(cfg) for name, cfg in functions.items()
+        }
+        self.call_threshold = call_threshold
+        self.loop_threshold = loop_threshold
+        self.background = background
+        self.max_native_depth = max_native_depth
+        # Active TyC activations, and how many of them run compiled code.
+        self.depth = 0
+        self.native_depth = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: List[Any] = []
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Promotion
+    # ------------------------------------------------------------------
+
+    def promote(self, tier: FunctionTier):
+        """Compile a function, in the background unless disabled."""
+        with self._lock:
+            if tier.queued:
+                return
+            tier.queued = True
+        if not self.background:
+            self._compile(tier)
+            return
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tyc-compile")
+        self._pending.append(self._executor.submit(self._compile, tier))
+
+    def _compile(self, tier: FunctionTier):
+        start = time.perf_counter()
+        try:
+            native = compile_function(tier.cfg, self)
+        except Exception as e:
+            # The function stays interpreted.
+            tier.error = f"{type(e).__name__}: {e}"
+            return
+        finally:
+            tier.compile_time = time.perf_counter() - start
+        tier.native = native
+        tier.code = native.function
+
+    def wait(self):
+        """Block until every queued compilation has finished."""
+        pending, self._pending = self._pending, []
+        for future in pending:
+            future.result()
+
+    def close(self):
+        """Stop the background compiler, waiting for running jobs."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self._pending = []
+
+    def tier_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Counters and tier of every function."""
+        return {name: tier.as_dict() for name, tier in self.tiers.items()}
+
+    # ------------------------------------------------------------------
+    # Calls
+    # ------------------------------------------------------------------
+
+    def run(self, entry: str = "main") -> Any:
+        self.depth = self.native_depth = 0
+        try:
+            return super().run(entry)
+        finally:
+            # A later run starts another compiler thread if it needs one.
+            self.close()
+
+    def call(self, name: str, args: List[Any]) -> Any:
+        if name not in self.functions:
+            return self._call_builtin(name, args)
+        return self.invoke(name, args)
+
+    def invoke(self, name: str, args: List[Any]) -> Any:
+        """Call a TyC function in whichever tier it is in."""
+        tier = self.tiers[name]
+        tier.calls += 1
+        if tier.calls == self.call_threshold:
+            self.promote(tier)
+        cache = self.memo.get(name) if self.memo else None
+        if cache is not None:
+            key = memo_key(args)
+            hit, result = cache.lookup(key)
+            if hit:
+                return result
+        if self.max_call_depth is not None and self.depth >= self.max_call_depth:
+            raise TyCRuntimeError("Stack overflow")
+        self.depth += 1
+        try:
+            if tier.code is not None and self.native_depth < self.max_native_depth:
+                result = self._native(tier, args)
+            else:
+                result = self._execute(self._enter(tier.cfg, args))
+        finally:
+            self.depth -= 1
+        if cache is not None:
+            cache.store(key, result)
+        return result
+
+    def _native(self, tier: FunctionTier, args: List[Any], state=None) -> Any:
+        self.native_depth += 1
+        try:
+            return tier.code(args, state)
+        except UnboundLocalError as e:
+            raise TyCRuntimeError(f"Undefined variable: {tier.native.variable(e)}") from None
+        finally:
+            self.native_depth -= 1
+
+    # ------------------------------------------------------------------
+    # Tier 0
+    # ------------------------------------------------------------------
+
+    def _execute(self, frame: Frame) -> Any:
+        """Interpret frame to completion, like Interpreter._execute, while
+        counting calls and back edges and switching to compiled code."""
+        stack: List[Frame] = []
+        functions = self.functions
+        tiers = self.tiers
+        memo = self.memo
+        dispatch = self._dispatch
+        value = self._value
+        env = frame.env
+        block = frame.block
+        index = frame.index
+        while True:
+            instructions = block.instructions
+            if index == 0 and instructions and isinstance(instructions[0], Phi):
+                values = {}
+                for instr in instructions:
+                    if not isinstance(instr, Phi):
+                        break
+                    values[instr.dest] = value(instr.incoming[frame.pred], env)
+                    index += 1
+                env.update(values)
+            count = len(instructions)
+            while index < count:
+                instr = instructions[index]
+                index += 1
+                if instr.__class__ is Call and instr.func in functions:
+                    args = [value(a, env) for a in instr.args]
+                    tier = tiers[instr.func]
+                    if tier.code is not None and self.native_depth < self.max_native_depth:
+                        result = self.invoke(instr.func, args)
+                        if instr.dest is not None:
+                            env[instr.dest] = result
+                        continue
+                    tier.calls += 1
+                    if tier.calls == self.call_threshold:
+                        self.promote(tier)
+                    cache = memo.get(instr.func) if memo else None
+                    if cache is not None:
+                        key = memo_key(args)
+                        hit, result = cache.lookup(key)
+                        if hit:
+                            if instr.dest is not None:
+                                env[instr.dest] = result
+                            continue
+                    if self.max_call_depth is not None and self.depth >= self.max_call_depth:
+                        raise TyCRuntimeError("Stack overflow")
+                    self.depth += 1
+                    frame.block, frame.index = block, index
+                    stack.append(frame)
+                    frame = self._enter(functions[instr.func], args)
+                    if cache is not None:
+                        frame.memo = (cache, key)
+                    env, block, index = frame.env, frame.block, 0
+                    break
+                dispatch[instr.__class__](self, instr, env)
+            else:
+                term = block.terminator
+                if term.__class__ is Return:
+                    result = None if term.value is None else value(term.value, env)
+                else:
+                    if term.__class__ is Jump:
+                        target = term.target
+                    else:
+                        target = term.if_true if value(term.cond, env) else term.if_false
+                    frame.pred, index = block.id, 0
+                    block = frame.cfg.blocks[target]
+                    if target > frame.pred:
+                        continue
+                    tier = tiers[frame.cfg.name]
+                    tier.back_edges += 1
+                    if (
+                        tier.code is None
+                        or self.native_depth >= self.max_native_depth
+                        or (block.instructions and isinstance(block.instructions[0], Phi))
+                    ):
+                        if tier.back_edges >= self.loop_threshold and not tier.queued:
+                            self.promote(tier)
+                        continue
+                    # Continue this activation in the compiled code.
+                    result = self._native(tier, None, (target, env))
+                if frame.memo is not None:
+                    frame.memo[0].store(frame.memo[1], result)
+                if not stack:
+                    return result
+                self.depth -= 1
+                frame = stack.pop()
+                env, block, index = frame.env, frame.block, frame.index
+                dest = block.instructions[index - 1].dest
+                if dest is not None:
+                    env[dest] = result
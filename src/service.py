@@ -0,0 +1,205 @@
+"""
+Asynchronous compile service for TyC.
+CompileService is an asyncio front end to the requests of src.daemon
+(check, compile and tokenize), for servers that take many requests at
+once, such as a playground:
+
+- the work is done in a pool of worker processes, warmed as the
+  daemon is, so the event loop is never blocked by the compiler;
+- requests for the same op on the same source (by hash) while one is
+  in flight share it: the source is compiled once and every caller gets
+  the response;
+- each caller waits at most its timeout, and may be cancelled; work is
+  abandoned once no caller waits for it, which stops it if it has not
+  reached a worker yet (a running worker cannot be interrupted, and
+  its response is dropped);
+- at most as many jobs as workers are handed to the pool (an abandoned
+  job counts until its worker is done), the rest wait in a queue, and
+  a request that would make the queue deeper than max_queue is refused
+  with Overloaded at once rather than left to wait.
+
+    async with CompileService(workers=4) as service:
+        response = await service.submit("check", source, timeout=2.0)
+"""
+
+import asyncio
+import functools
+import hashlib
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+from src.daemon import SOURCE_OPS, respond, warm_up
+from src.frontend.parallel import pool_context
+
+
+class Overloaded(Exception):
+    """A request refused because the queue is full."""
+
+
+class _Job:
+    """Work shared by the callers waiting for it."""
+
+    __slots__ = ("task", "waiters", "queued")
+
+    def __init__(self):
+        self.task: Optional[asyncio.Task] = None
+        self.waiters = 0
+        self.queued = True
+
+
+class ServiceStats:
+    """Request counters."""
+
+    __slots__ = ("requests", "coalesced", "rejected", "timed_out", "cancelled", "completed")
+
+    def __init__(self):
+        self.requests = 0
+        self.coalesced = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.cancelled = 0
+        self.completed = 0
+
+    def __str__(self):
+        return (
+            f"{self.requests} requests: {self.completed} completed, {self.coalesced} coalesced, "
+            f"{self.rejected} rejected, {self.timed_out} timed out, {self.cancelled} cancelled"
+        )
+
+
+class CompileService:
+    """Compile requests run in a pool of worker processes (by default one
+    per CPU), or in executor if one is given; the service shuts down only
+    a pool it made."""
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        max_queue: int = 64,
+        timeout: float = 10.0,
+        executor: Optional[Executor] = None,
+        lexer: str = "scanner",
+        parser: str = "ast",
+    ):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.lexer = lexer
+        self.parser = parser
+        self.stats = ServiceStats()
+        self._own_executor = executor is None
+        self.executor = executor or ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=pool_context(),
+            initializer=warm_up,
+            initargs=(lexer, parser),
+        )
+        self._jobs: Dict[Tuple[str, bytes], _Job] = {}
+        self._queued = 0
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    @property
+    def depth(self) -> int:
+        """Jobs waiting for a worker."""
+        return self._queued
+
+    async def submit(self, op: str, source: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """The response to a check, compile or tokenize request, as the
+        daemon gives it. Raises asyncio.TimeoutError after timeout seconds
+        (by default the service's), and Overloaded if the queue is full."""
+        if op not in SOURCE_OPS:
+            raise ValueError(f"Unknown op: {op}")
+        self.stats.requests += 1
+        key = (op, hashlib.sha256(source.encode("utf-8", "surrogatepass")).digest())
+        job = self._jobs.get(key)
+        if job is not None:
+            self.stats.coalesced += 1
+        elif self.depth >= self.max_queue:
+            self.stats.rejected += 1
+            raise Overloaded(f"{self.depth} requests are waiting")
+        else:
+            job = self._start(key, op, source)
+        job.waiters += 1
+        try:
+            response = await asyncio.wait_for(asyncio.shield(job.task), self.timeout if timeout is None else timeout)
+        except asyncio.TimeoutError:
+            self.stats.timed_out += 1
+            raise
+        except asyncio.CancelledError:
+            if not job.task.cancelled():
+                self.stats.cancelled += 1
+            raise
+        finally:
+            job.waiters -= 1
+            if not job.waiters and not job.task.done():
+                self._forget(key, job)
+                job.task.cancel()
+        self.stats.completed += 1
+        return response
+
+    def _start(self, key: Tuple[str, bytes], op: str, source: str) -> _Job:
+        job = _Job()
+        job.task = asyncio.ensure_future(self._run(job, op, source))
+        job.task.add_done_callback(lambda _: self._finish(key, job))
+        self._jobs[key] = job
+        self._queued += 1
+        return job
+
+    def _dequeue(self, job: _Job):
+        if job.queued:
+            job.queued = False
+            self._queued -= 1
+
+    def _finish(self, key: Tuple[str, bytes], job: _Job):
+        # A job cancelled before it started never ran _run().
+        self._dequeue(job)
+        self._forget(key, job)
+
+    def _forget(self, key: Tuple[str, bytes], job: _Job):
+        # A job that lost its callers is forgotten at once, so that a new
+        # request for the same source starts afresh rather than joining it.
+        if self._jobs.get(key) is job:
+            del self._jobs[key]
+
+    async def _run(self, job: _Job, op: str, source: str) -> Dict[str, Any]:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.workers)
+        await self._slots.acquire()
+        try:
+            self._dequeue(job)
+            future = self.executor.submit(respond, op, source, self.lexer, self.parser)
+        except BaseException:
+            self._slots.release()
+            raise
+        # The slot is held until the worker is done, not until no one
+        # waits: an abandoned job keeps its worker busy to the end.
+        loop = asyncio.get_running_loop()
+        future.add_done_callback(lambda _: _call_soon(loop, self._slots.release))
+        return await asyncio.wrap_future(future)
+
+    async def close(self):
+        """Cancel the jobs in flight and shut down the pool, if the
+        service made it."""
+        jobs = list(self._jobs.values())
+        self._jobs.clear()
+        for job in jobs:
+            job.task.cancel()
+        await asyncio.gather(*(job.task for job in jobs), return_exceptions=True)
+        if self._own_executor:
+            shutdown = functools.partial(self.executor.shutdown, wait=True, cancel_futures=True)
+            await asyncio.get_running_loop().run_in_executor(None, shutdown)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+
+def _call_soon(loop: asyncio.AbstractEventLoop, callback):
+    """Run callback in the loop's thread, unless the loop is closed."""
+    try:
+        loop.call_soon_threadsafe(callback)
+    except RuntimeError:
+        pass
@@ -16,3 +16,42 @@ class NewErrorListener(ConsoleErrorListener):
 
 
 NewErrorListener.INSTANCE = NewErrorListener()
+
+
+class Diagnostic:
+    """A lexical or syntax error found by a recovering parse."""
+
+    def __init__(self, line, column, message):
+        self.line = line
+        self.column = column
+        self.message = message
+
+    def __str__(self):
+        return self.message
+
+    def __repr__(self):
+        return f"Diagnostic({self.line}, {self.column}, {self.message!r})"
+
+
+class TooManyErrors(Exception):
+    """Raised by CollectingErrorListener to stop at its limit."""
+
+
+class CollectingErrorListener(ConsoleErrorListener):
+    """Error listener recording every syntax error, in the message format
+    of NewErrorListener, instead of raising on the first. Lexical errors
+    are added through add(). Once limit errors are recorded it raises
+    TooManyErrors."""
+
+    def __init__(self, limit=None):
+        self.diagnostics = []
+        self.limit = limit
+
+    def syntaxError(self, recognizer, offendingSymbol, line, column, msg, e):
+        text = getattr(offendingSymbol, "text", str(offendingSymbol))
+        self.add(line, column, f"Error on line {line} col {column}: {text}")
+
+    def add(self, line, column, message):
+        self.diagnostics.append(Diagnostic(line, column, message))
+        if self.limit is not None and len(self.diagnostics) >= self.limit:
+            raise TooManyErrors(message)
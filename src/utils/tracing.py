@@ -0,0 +1,180 @@
+"""
+Phase timing for the TyC compiler.
+A Tracer records nested, timed spans: one per compiler phase (lexing,
+parsing, AST generation, CFG construction, optimization, execution) and,
+inside the phases that work declaration by declaration, one per top-level
+declaration. With memory=True it also records, through tracemalloc, the
+peak memory allocated above the start of each span.
+
+Spans export as Chrome trace-event JSON (load the file in
+chrome://tracing or Perfetto) and as a one-line summary of the top-level
+phases.
+
+Code being traced calls tracer.span(...) unconditionally; NULL_TRACER,
+used when tracing is off, returns one shared span that does nothing, so
+an untraced compilation pays one method call per span.
+"""
+
+import json
+import os
+import threading
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+
+class Span:
+    """One timed region; a context manager."""
+
+    __slots__ = ("tracer", "name", "args", "start", "end", "depth", "memory", "peak")
+
+    def __init__(self, tracer: "Tracer", name: str, args: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+        self.start = self.end = 0.0
+        self.depth = 0
+        # Traced memory at the start of the span, and the peak since.
+        self.memory = self.peak = 0
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+    def __enter__(self):
+        self.tracer._enter(self)
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer._exit(self)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class NullTracer:
+    """Tracer that records nothing."""
+
+    enabled = False
+    memory = False
+
+    def span(self, name: str, **args) -> _NullSpan:
+        return _NULL_SPAN
+
+
+NULL_TRACER = NullTracer()
+
+
+class Tracer:
+    """Record nested spans of compiler phases."""
+
+    enabled = True
+
+    def __init__(self, memory: bool = False, clock=time.perf_counter):
+        self.memory = memory
+        self.clock = clock
+        self.origin = clock()
+        self.spans: List[Span] = []
+        self._open: List[Span] = []
+        self._started_tracemalloc = False
+
+    def span(self, name: str, **args) -> Span:
+        """A span to use as 'with tracer.span("phase", decl=name):'."""
+        return Span(self, name, args)
+
+    def _enter(self, span: Span):
+        if self.memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracemalloc = True
+            span.memory = self._fold_peak()
+            span.peak = span.memory
+        span.depth = len(self._open)
+        self._open.append(span)
+        self.spans.append(span)
+        span.start = self.clock()
+
+    def _exit(self, span: Span):
+        span.end = self.clock()
+        if self.memory and tracemalloc.is_tracing():
+            self._fold_peak()
+        self._open.pop()
+        if self._started_tracemalloc and not self._open:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def _fold_peak(self) -> int:
+        """Credit the peak since the last check to every open span and
+        start a new peak window; returns the current traced memory."""
+        current, peak = tracemalloc.get_traced_memory()
+        for span in self._open:
+            if peak > span.peak:
+                span.peak = peak
+        tracemalloc.reset_peak()
+        return current
+
+    # ------------------------------------------------------------------
+    # Reports
+    # ------------------------------------------------------------------
+
+    def phases(self) -> Dict[str, float]:
+        """Total seconds of each top-level span name, in first-seen order."""
+        totals: Dict[str, float] = {}
+        for span in self.spans:
+            if span.depth == 0:
+                totals[span.name] = totals.get(span.name, 0.0) + span.duration
+        return totals
+
+    def summary(self) -> str:
+        """One line: the time of each top-level phase and the total, plus
+        the peak memory of the largest phase when memory is traced."""
+        phases = self.phases()
+        parts = [f"{name} {seconds * 1000:.1f}ms" for name, seconds in phases.items()]
+        line = ", ".join(parts) + f"; total {sum(phases.values()) * 1000:.1f}ms"
+        if self.memory:
+            peak = max((s.peak - s.memory for s in self.spans if s.depth == 0), default=0)
+            line += f"; peak {peak / (1 << 20):.1f}MB"
+        return line
+
+    def trace_events(self) -> List[Dict[str, Any]]:
+        """The spans as Chrome trace complete ("X") events."""
+        pid, tid = os.getpid(), threading.get_ident()
+        events = []
+        for span in self.spans:
+            args = dict(span.args)
+            if self.memory:
+                args["peak_bytes"] = span.peak - span.memory
+            events.append({
+                "name": span.name,
+                "cat": "compiler",
+                "ph": "X",
+                "ts": round((span.start - self.origin) * 1e6, 3),
+                "dur": round(span.duration * 1e6, 3),
+                "pid": pid,
+                "tid": tid,
+                "args": args,
+            })
+        return events
+
+    def to_chrome_trace(self) -> str:
+        return json.dumps({"traceEvents": self.trace_events(), "displayTimeUnit": "ms"})
+
+    def write_chrome_trace(self, path: str):
+        with open(path, "w") as f:
+            f.write(self.to_chrome_trace())
+            f.write("\n")
+
+
+def tracer_or_null(tracer: Optional[Tracer]):
+    return tracer if tracer is not None else NULL_TRACER
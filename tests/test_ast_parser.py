@@ -0,0 +1,171 @@
+"""
+AST parser test cases for TyC compiler
+The hand-written parser is checked against TyCParser, which must accept
+and reject the same programs with the same messages, and its trees are
+checked directly.
+"""
+
+import io
+import os
+
+import pytest
+from tests.utils import Parser, corpus
+from src.compiler import compile_source, parse as compile_parse
+from src.frontend.parser import ASTParser, parse_program
+from src.frontend.scanner import TyCScanner
+from src.utils.error_listener import SyntaxException
+
+BENCH_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks")
+
+
+def check(source):
+    """The message TyCParser's parse() returns for the AST parser."""
+    try:
+        parse_program(source)
+        return "success"
+    except Exception as e:
+        return str(e)
+
+
+def tree(source):
+    return str(parse_program(source))
+
+
+def body(source):
+    """The statements of a void main() whose body is source."""
+    return str(parse_program("void main() { " + source + " }").decls[0].body)
+
+
+ERROR_CASES = [
+    "void main() { int x = ; }",
+    "void main() { x + 1 = 2; }",
+    "void main() { f() = 1; }",
+    "void main() { for (i = 0; i < 3; i + 1) {} }",
+    "void main() { { } <= }",
+    "void main() { if (a) if (b) x; else y; else z; else w; }",
+    "void main() { switch (x) { case 1: default: case 2: default: } }",
+    "void main() { a b c; }",
+    "struct S { int x; } int main() {}",
+    "void main() { int x = 1 + ; }\nvoid f() { @ }",
+    "void main() { x = ; }\nvoid f() { @ }",
+    "void main() { 1 @ }",
+    'void main() { string s = "a\\q"; }',
+    "void main() {",
+    "",
+]
+
+
+class TestDifferential:
+    """Test the AST parser against TyCParser"""
+
+    @pytest.mark.parametrize("source", corpus("test_parser.py", "Parser") + ERROR_CASES)
+    def test_parser_corpus(self, source):
+        """Test accept/reject and error messages on the parser test inputs"""
+        assert check(source) == Parser(source).parse()
+
+    def test_lexical_error_after_prediction(self):
+        """Test a later lexical error wins over an error found by prediction"""
+        source = "void main() { x + 1 = 2; }\nvoid f() { @ }"
+        assert check(source) == Parser(source).parse() == "Error Token @"
+
+
+class TestTrees:
+    """Test the trees the AST parser builds"""
+
+    def test_declarations(self):
+        """Test struct, function and parameter declarations"""
+        assert tree("void main() {}") == "Program([FuncDecl(VoidType(), main, [], BlockStmt([]))])"
+        assert tree("struct P { int x; float y; }; P f(P p, string s) {}") == (
+            "Program([StructDecl(P, [MemberDecl(IntType(), x), MemberDecl(FloatType(), y)]), "
+            "FuncDecl(StructType(P), f, [Param(StructType(P), p), Param(StringType(), s)], BlockStmt([]))])"
+        )
+        assert tree("f() {}") == "Program([FuncDecl(auto, f, [], BlockStmt([]))])"
+
+    def test_precedence(self):
+        """Test operator precedence and left associativity"""
+        assert body("a || b && c == d < e + f * -g;") == (
+            "BlockStmt([ExprStmt(BinaryOp(Identifier(a), ||, BinaryOp(Identifier(b), &&, "
+            "BinaryOp(Identifier(c), ==, BinaryOp(Identifier(d), <, BinaryOp(Identifier(e), +, "
+            "BinaryOp(Identifier(f), *, PrefixOp(-Identifier(g)))))))))])"
+        )
+        assert body("a - b - c;") == (
+            "BlockStmt([ExprStmt(BinaryOp(BinaryOp(Identifier(a), -, Identifier(b)), -, Identifier(c)))])"
+        )
+        assert body("(a + b) * c;") == (
+            "BlockStmt([ExprStmt(BinaryOp(BinaryOp(Identifier(a), +, Identifier(b)), *, Identifier(c)))])"
+        )
+
+    def test_assignment(self):
+        """Test right-associative assignment to lvalues"""
+        assert body("a = b.c = 1;") == (
+            "BlockStmt([ExprStmt(AssignExpr(Identifier(a) = AssignExpr(MemberAccess(Identifier(b).c) = IntLiteral(1))))])"
+        )
+        assert body("f(x).y++;") == (
+            "BlockStmt([ExprStmt(PostfixOp(MemberAccess(FuncCall(f, [Identifier(x)]).y)++))])"
+        )
+
+    def test_declarations_in_body(self):
+        """Test auto and typed variables and struct literals"""
+        assert body('auto q = {1, 2.5, "s"}; P p; int x = 1;') == (
+            "BlockStmt([VarDecl(auto, q = StructLiteral({IntLiteral(1), FloatLiteral(2.5), StringLiteral('s')})), "
+            "VarDecl(StructType(P), p), VarDecl(IntType(), x = IntLiteral(1))])"
+        )
+
+    def test_statements(self):
+        """Test for, switch and if-else statements"""
+        assert body("for (int i = 0; i < n; ++i) x = x + i;") == (
+            "BlockStmt([ForStmt(for VarDecl(IntType(), i = IntLiteral(0)); "
+            "BinaryOp(Identifier(i), <, Identifier(n)); PrefixOp(++Identifier(i)) do "
+            "ExprStmt(AssignExpr(Identifier(x) = BinaryOp(Identifier(x), +, Identifier(i)))))])"
+        )
+        assert body("switch (n) { case 1: break; default: return; }") == (
+            "BlockStmt([SwitchStmt(switch Identifier(n) cases [CaseStmt(case IntLiteral(1): [BreakStmt()])], "
+            "default DefaultStmt(default: [ReturnStmt(return)]))])"
+        )
+        assert body("if (a) if (b) x; else y;") == (
+            "BlockStmt([IfStmt(if Identifier(a) then IfStmt(if Identifier(b) then "
+            "ExprStmt(Identifier(x)), else ExprStmt(Identifier(y))))])"
+        )
+
+    def test_positions(self):
+        """Test nodes carry the line and column of their first token"""
+        program = parse_program("struct S { int x; };\n\nvoid main() {\n  while (x) { x = x - 1; }\n}")
+        function = program.decls[1]
+        loop = function.body.statements[0]
+        assert (function.line, function.column) == (3, 0)
+        assert (loop.line, loop.column) == (4, 2)
+        assert (loop.body.statements[0].line, loop.body.statements[0].column) == (4, 14)
+
+    def test_token_source(self):
+        """Test parsing tokens from a scanner"""
+        assert str(ASTParser(TyCScanner("void main() {}")).parse()) == tree("void main() {}")
+
+
+class TestCompiler:
+    """Test the compiler driver with both parsers"""
+
+    @pytest.mark.parametrize("lexer", ["scanner", "antlr"])
+    def test_parse(self, lexer):
+        """Test compiler.parse builds the tree with the AST parser"""
+        source = "void main() { int x = 1 + 2; }"
+        assert str(compile_parse(source, lexer=lexer)) == tree(source)
+
+    def test_errors(self):
+        """Test compiler.parse raises the same errors with either parser"""
+        source = "void main() { x + 1 = 2; }"
+        for parser in ("ast", "antlr"):
+            with pytest.raises(SyntaxException) as e:
+                compile_parse(source, parser=parser)
+            assert e.value.message == "Error on line 1 col 20: ="
+
+    def test_unknown_parser(self):
+        """Test an unknown parser name is rejected"""
+        with pytest.raises(ValueError):
+            compile_parse("void main() {}", parser="yacc")
+
+    def test_compile_source(self):
+        """Test a program compiles and runs end to end"""
+        source = open(os.path.join(BENCH_DIR, "fib.tyc")).read()
+        out = io.StringIO()
+        compile_source(source).run(io.StringIO("18\n"), out)
+        assert out.getvalue() == "2584\n48620\n"
@@ -0,0 +1,115 @@
+"""
+Batch compilation test cases for TyC compiler
+Many files are checked in worker processes, each result reported as it
+completes, with totals and throughput for the batch.
+"""
+
+import io
+import os
+
+import pytest
+from src.batch import BatchStats, check_file, check_paths, compile_files, expand
+
+GOOD = "int twice(int n) { return 2 * n; } void main() { printInt(twice(21)); }"
+WARNS = "void main() { int x; printInt(x); }"
+SYNTAX = "void main() { int x = ; }"
+LEXICAL = 'void main() { string s = "a\\q"; }'
+UNDECLARED = "void main() { y = 1; }"
+
+
+@pytest.fixture
+def tree(tmp_path):
+    """A directory of programs, a few of them broken."""
+    sources = {
+        "good.tyc": GOOD,
+        "warns.tyc": WARNS,
+        "bad/syntax.tyc": SYNTAX,
+        "bad/lexical.tyc": LEXICAL,
+        "bad/undeclared.tyc": UNDECLARED,
+        "notes.txt": "not a program",
+    }
+    for name, source in sources.items():
+        path = tmp_path / name
+        path.parent.mkdir(exist_ok=True)
+        path.write_text(source)
+    for i in range(20):
+        (tmp_path / f"many{i:02}.tyc").write_text(GOOD)
+    return tmp_path
+
+
+class TestExpand:
+    """Test naming files by path, glob and directory"""
+
+    def test_directory(self, tree):
+        """Test a directory stands for every .tyc file below it"""
+        paths = expand([str(tree)])
+        assert len(paths) == 25
+        assert all(path.endswith(".tyc") for path in paths)
+
+    def test_globs_and_duplicates(self, tree):
+        """Test globs are expanded and each file is named once"""
+        paths = expand([str(tree / "bad" / "*.tyc"), str(tree / "**" / "syntax.tyc"), str(tree / "good.tyc")])
+        assert [os.path.relpath(path, tree) for path in paths] == [
+            os.path.join("bad", "lexical.tyc"),
+            os.path.join("bad", "syntax.tyc"),
+            os.path.join("bad", "undeclared.tyc"),
+            "good.tyc",
+        ]
+
+
+class TestCheckFile:
+    """Test checking one file"""
+
+    def test_results(self, tree):
+        """Test each phase's errors and the analysis warnings are reported"""
+        good = check_file(str(tree / "good.tyc"))
+        assert good.ok and good.warnings == [] and good.size == len(GOOD)
+        assert check_file(str(tree / "warns.tyc")).warnings == ["line 1: x may be read before it is assigned"]
+        assert check_file(str(tree / "bad" / "syntax.tyc")).error == "Error on line 1 col 22: ;"
+        assert check_file(str(tree / "bad" / "lexical.tyc")).error == "Illegal Escape In String: a\\q"
+        assert "y" in check_file(str(tree / "bad" / "undeclared.tyc")).error
+        assert not check_file(str(tree / "missing.tyc")).ok
+
+
+class TestCompileFiles:
+    """Test checking files in worker processes"""
+
+    @pytest.mark.parametrize("workers", [0, 2])
+    def test_every_file_once(self, tree, workers):
+        """Test every file gets one result, the same as checking it alone"""
+        paths = expand([str(tree)])
+        results = list(compile_files(paths, workers, batch_size=3))
+        assert sorted(result.path for result in results) == sorted(paths)
+        for result in results:
+            expected = check_file(result.path)
+            assert (result.error, result.warnings, result.size) == (expected.error, expected.warnings, expected.size)
+
+    def test_streams_results(self, tree):
+        """Test results arrive before the whole batch is done"""
+        results = compile_files(expand([str(tree)]), workers=1, batch_size=1)
+        assert next(results).path.endswith(".tyc")
+        results.close()
+
+    def test_check_paths(self, tree):
+        """Test failures are printed as found and the totals at the end"""
+        out = io.StringIO()
+        stats = check_paths([str(tree)], workers=2, out=out)
+        lines = out.getvalue().splitlines()
+        assert (stats.files, stats.failed) == (25, 3)
+        assert sorted(line.split(":")[0] for line in lines[:-1]) == [
+            f"FAIL {tree / 'bad' / name}" for name in ("lexical.tyc", "syntax.tyc", "undeclared.tyc")
+        ]
+        assert lines[-1].startswith("25 files, 3 failed,")
+        assert "files/s" in lines[-1] and "MB/s" in lines[-1]
+
+
+class TestBatchStats:
+    """Test batch totals"""
+
+    def test_throughput(self, tree):
+        """Test files and bytes are counted and rates derived from them"""
+        stats = BatchStats()
+        for name in ("good.tyc", "bad/syntax.tyc"):
+            stats.add(check_file(str(tree / name)))
+        assert (stats.files, stats.failed, stats.bytes) == (2, 1, len(GOOD) + len(SYNTAX))
+        assert stats.files_per_second > 0 and stats.megabytes_per_second > 0
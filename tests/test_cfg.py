@@ -0,0 +1,375 @@
+"""
+Control-flow graph test cases for TyC compiler
+"""
+
+import pytest
+from src.batch import check_source
+from src.utils.nodes import *
+from tests.utils import call, func, ident
+from src.ir.cfg import CFGError, build_cfg, build_cfgs
+from src.ir.instructions import Branch, Return
+
+
+def check_edges(cfg):
+    """succs/preds are consistent and block ids are compact."""
+    assert [b.id for b in cfg.blocks] == list(range(len(cfg.blocks)))
+    for b in cfg.blocks:
+        assert cfg.succs[b.id] == b.terminator.targets()
+        for s in cfg.succs[b.id]:
+            assert b.id in cfg.preds[s]
+
+
+# =============================================================================
+# STRAIGHT-LINE CODE
+# =============================================================================
+
+class TestStraightLine:
+    """Test lowering of expressions into three-address code"""
+
+    def test_add_function(self):
+        """Test the add helper from the specification"""
+        f = func(
+            "add",
+            [ReturnStmt(BinaryOp(ident("x"), "+", ident("y")))],
+            [Param(IntType(), "x"), Param(IntType(), "y")],
+            IntType(),
+        )
+        assert str(build_cfg(f)) == (
+            "function add(x, y):\n"
+            "B0:\n"
+            "  $1 = x + y\n"
+            "  return $1"
+        )
+
+    def test_void_function_gets_return(self):
+        """Test falling off the end of a function returns"""
+        cfg = build_cfg(func("main", [call("printInt", IntLiteral(1))]))
+        assert len(cfg.blocks) == 1
+        assert isinstance(cfg.blocks[0].terminator, Return)
+        assert str(cfg.blocks[0].instructions[0]) == "call printInt(1)"
+
+    def test_declaration_without_initializer(self):
+        """Test 'int a;' is lowered to a declaration"""
+        cfg = build_cfg(func("main", [VarDecl(IntType(), "a")]))
+        assert str(cfg.blocks[0].instructions[0]) == "declare IntType() a"
+
+    def test_initializer_is_retargeted(self):
+        """Test no copy is emitted for a fresh temporary"""
+        cfg = build_cfg(func("main", [
+            VarDecl(None, "a", FuncCall("readInt", [])),
+        ]))
+        assert [str(i) for i in cfg.blocks[0].instructions] == ["a = call readInt()"]
+
+    def test_left_operand_pinned_before_assignment(self):
+        """Test x + (x = 5) reads x before the assignment"""
+        cfg = build_cfg(func("main", [
+            VarDecl(IntType(), "x", IntLiteral(1)),
+            VarDecl(None, "y", BinaryOp(
+                ident("x"), "+", AssignExpr(ident("x"), IntLiteral(5)))),
+        ]))
+        assert [str(i) for i in cfg.blocks[0].instructions] == [
+            "x = 1", "$1 = x", "x = 5", "y = $1 + x",
+        ]
+
+    def test_postfix_increment(self):
+        """Test x++ yields the old value"""
+        cfg = build_cfg(func("main", [
+            VarDecl(IntType(), "x", IntLiteral(1)),
+            VarDecl(None, "y", PostfixOp("++", ident("x"))),
+        ]))
+        assert [str(i) for i in cfg.blocks[0].instructions] == [
+            "x = 1", "$1 = x", "x = $1 + 1", "y = $1",
+        ]
+
+    def test_shadowed_variable_is_renamed(self):
+        """Test inner declarations get distinct names"""
+        cfg = build_cfg(func("main", [
+            VarDecl(IntType(), "x", IntLiteral(1)),
+            BlockStmt([
+                VarDecl(IntType(), "x", BinaryOp(ident("x"), "+", IntLiteral(1))),
+                call("printInt", ident("x")),
+            ]),
+            call("printInt", ident("x")),
+        ]))
+        assert [str(i) for i in cfg.blocks[0].instructions] == [
+            "x = 1", "x#2 = x + 1", "call printInt(x#2)", "call printInt(x)",
+        ]
+
+    def test_string_escapes_decoded(self):
+        """Test string constants hold the decoded value"""
+        cfg = build_cfg(func("main", [call("printString", StringLiteral("a\\tb"))]))
+        assert cfg.blocks[0].instructions[0].args[0].value == "a\tb"
+
+    def test_undeclared_variable(self):
+        """Test reading an undeclared variable is reported"""
+        with pytest.raises(CFGError):
+            build_cfg(func("main", [call("printInt", ident("nope"))]))
+
+    @pytest.mark.parametrize("source, error", [
+        ("void main() { --4; }", "-- needs a variable or a member of one"),
+        ("void main() { int a = 1; (a + 1)++; }", "++ needs a variable or a member of one"),
+        ("int f() { return 1; } void main() { f()++; }", "++ needs a variable or a member of one"),
+        ("int f() { return 1; } void main() { int x = ++f(); }", "++ needs a variable or a member of one"),
+        ("struct P { int x; }; P f() { P p = {1}; return p; } void main() { f().x = 2; }",
+         "Assignment needs a variable or a member of one"),
+    ])
+    def test_not_assignable(self, source, error):
+        """Test ++, -- and = on something other than a variable or its members are reported"""
+        assert check_source(source)[0] == error
+        assert check_source(source, optimize=True)[0] == error
+
+
+# =============================================================================
+# STRUCTS
+# =============================================================================
+
+class TestStructs:
+    """Test lowering of struct literals and member access"""
+
+    def setup_method(self):
+        self.point = StructDecl("Point", [
+            MemberDecl(IntType(), "x"), MemberDecl(IntType(), "y"),
+        ])
+
+    def test_struct_literal_named_by_declaration(self):
+        """Test a struct literal takes the declared struct type"""
+        f = func("main", [
+            VarDecl(StructType("Point"), "p", StructLiteral([IntLiteral(1), IntLiteral(2)])),
+        ])
+        cfg = build_cfgs(Program([self.point, f]))["main"]
+        assert str(cfg.blocks[0].instructions[0]) == "p = {1, 2} : Point"
+
+    def test_struct_literal_argument(self):
+        """Test a struct literal argument takes the parameter type"""
+        g = func("g", [], [Param(StructType("Point"), "p")])
+        f = func("main", [call("g", StructLiteral([IntLiteral(4), IntLiteral(5)]))])
+        cfg = build_cfgs(Program([self.point, g, f]))["main"]
+        assert str(cfg.blocks[0].instructions[0]) == "$1 = {4, 5} : Point"
+
+    def test_nested_member_store(self):
+        """Test a.b.c = v is a single path store"""
+        f = func("main", [
+            VarDecl(StructType("Line"), "a"),
+            ExprStmt(AssignExpr(
+                MemberAccess(MemberAccess(ident("a"), "b"), "c"), IntLiteral(3))),
+        ])
+        cfg = build_cfg(f)
+        assert str(cfg.blocks[0].instructions[1]) == "a = setfield a.b.c, 3"
+
+    def test_member_read(self):
+        """Test member reads go through a temporary"""
+        f = func("main", [
+            VarDecl(StructType("Point"), "p"),
+            call("printInt", MemberAccess(ident("p"), "x")),
+        ])
+        cfg = build_cfg(f)
+        assert [str(i) for i in cfg.blocks[0].instructions[1:]] == [
+            "$1 = p.x", "call printInt($1)",
+        ]
+
+
+# =============================================================================
+# CONTROL FLOW
+# =============================================================================
+
+class TestControlFlow:
+    """Test basic block and edge construction"""
+
+    def test_if_else_diamond(self):
+        """Test if/else builds a diamond"""
+        f = func("main", [
+            VarDecl(None, "a", FuncCall("readInt", [])),
+            IfStmt(ident("a"), call("printInt", IntLiteral(1)), call("printInt", IntLiteral(0))),
+            call("printInt", IntLiteral(2)),
+        ])
+        cfg = build_cfg(f)
+        check_edges(cfg)
+        assert len(cfg.blocks) == 4
+        then_b, else_b = cfg.succs[0]
+        assert cfg.succs[then_b] == cfg.succs[else_b]
+        join = cfg.succs[then_b][0]
+        assert sorted(cfg.preds[join]) == sorted([then_b, else_b])
+
+    def test_while_back_edge(self):
+        """Test a while loop has a back edge to its header"""
+        f = func("main", [
+            VarDecl(None, "i", IntLiteral(0)),
+            WhileStmt(
+                BinaryOp(ident("i"), "<", IntLiteral(10)),
+                ExprStmt(PrefixOp("++", ident("i"))),
+            ),
+        ])
+        cfg = build_cfg(f)
+        check_edges(cfg)
+        header = cfg.succs[0][0]
+        body, exit_block = cfg.succs[header]
+        assert cfg.succs[body] == [header]
+        assert isinstance(cfg.blocks[exit_block].terminator, Return)
+
+    def test_for_continue_goes_to_update(self):
+        """Test continue in a for loop jumps to the update"""
+        f = func("main", [
+            ForStmt(
+                VarDecl(None, "i", IntLiteral(0)),
+                BinaryOp(ident("i"), "<", IntLiteral(10)),
+                PrefixOp("++", ident("i")),
+                BlockStmt([ContinueStmt()]),
+            ),
+        ])
+        cfg = build_cfg(f)
+        check_edges(cfg)
+        header = cfg.succs[0][0]
+        body = cfg.succs[header][0]
+        # The empty body is threaded straight to the update block.
+        assert str(cfg.blocks[body].instructions[0]) == "i = i + 1"
+        assert cfg.succs[body] == [header]
+
+    def test_for_without_condition(self):
+        """Test for(;;) loops until break"""
+        f = func("main", [ForStmt(None, None, None, BlockStmt([BreakStmt()]))])
+        cfg = build_cfg(f)
+        check_edges(cfg)
+        assert str(cfg) == "function main():\nB0:\n  jump B1\nB1:\n  return"
+
+    def test_return_in_nested_control_flow(self):
+        """Test code after return is dropped"""
+        f = func("f", [
+            IfStmt(ident("n"), ReturnStmt(IntLiteral(1)), ReturnStmt(IntLiteral(2))),
+            call("printInt", IntLiteral(3)),
+        ], [Param(IntType(), "n")], IntType())
+        cfg = build_cfg(f)
+        check_edges(cfg)
+        assert len(cfg.blocks) == 3
+        assert all("printInt" not in str(b) for b in cfg.blocks)
+
+    def test_break_outside_loop(self):
+        """Test break outside loop or switch is reported"""
+        with pytest.raises(CFGError):
+            build_cfg(func("main", [BreakStmt()]))
+
+    def test_continue_in_switch_targets_loop(self):
+        """Test continue inside a switch continues the loop"""
+        f = func("main", [
+            VarDecl(None, "i", IntLiteral(0)),
+            WhileStmt(
+                BinaryOp(ident("i"), "<", IntLiteral(3)),
+                BlockStmt([
+                    ExprStmt(PostfixOp("++", ident("i"))),
+                    SwitchStmt(ident("i"), [CaseStmt(IntLiteral(1), [ContinueStmt()])]),
+                    call("printInt", ident("i")),
+                ]),
+            ),
+        ])
+        cfg = build_cfg(f)
+        check_edges(cfg)
+        header = cfg.succs[0][0]
+        jumps_to_header = [p for p in cfg.preds[header] if p != 0]
+        assert len(jumps_to_header) == 2
+
+
+# =============================================================================
+# SWITCH
+# =============================================================================
+
+class TestSwitch:
+    """Test switch dispatch and fall-through"""
+
+    def make_switch(self, default_first=False):
+        case1 = CaseStmt(IntLiteral(1), [call("printInt", IntLiteral(1)), BreakStmt()])
+        case2 = CaseStmt(IntLiteral(2), [])
+        case3 = CaseStmt(IntLiteral(3), [call("printInt", IntLiteral(2))])
+        default = DefaultStmt([call("printInt", IntLiteral(0))])
+        for i, clause in enumerate([case1, case2, case3]):
+            clause.line, clause.column = 2 + i, 4
+        default.line, default.column = (1, 4) if default_first else (9, 4)
+        return func("main", [
+            VarDecl(None, "d", FuncCall("readInt", [])),
+            SwitchStmt(ident("d"), [case1, case2, case3], default),
+        ])
+
+    def body_of(self, cfg, text):
+        for b in cfg.blocks:
+            if any(str(i) == text for i in b.instructions):
+                return b.id
+        raise AssertionError(text)
+
+    def test_dispatch_chain(self):
+        """Test each case label is compared in source order"""
+        cfg = build_cfg(self.make_switch())
+        check_edges(cfg)
+        compares = [str(i) for b in cfg.blocks for i in b.instructions if " == " in str(i)]
+        assert compares == ["$2 = d == 1", "$3 = d == 2", "$4 = d == 3"]
+
+    def test_fall_through(self):
+        """Test case 2 falls into case 3 and case 3 into default"""
+        cfg = build_cfg(self.make_switch())
+        case3 = self.body_of(cfg, "call printInt(2)")
+        default = self.body_of(cfg, "call printInt(0)")
+        assert cfg.succs[case3] == [default]
+        branches = [b.terminator for b in cfg.blocks if isinstance(b.terminator, Branch)]
+        assert branches[1].if_true == case3
+
+    def test_break_leaves_switch(self):
+        """Test break in case 1 skips the other clauses"""
+        cfg = build_cfg(self.make_switch())
+        case1 = self.body_of(cfg, "call printInt(1)")
+        (after,) = cfg.succs[case1]
+        assert isinstance(cfg.blocks[after].terminator, Return)
+
+    def test_default_position_respected(self):
+        """Test a leading default falls into the first case"""
+        cfg = build_cfg(self.make_switch(default_first=True))
+        default = self.body_of(cfg, "call printInt(0)")
+        assert cfg.succs[default] == [self.body_of(cfg, "call printInt(1)")]
+
+
+# =============================================================================
+# SHORT-CIRCUIT OPERATORS
+# =============================================================================
+
+class TestShortCircuit:
+    """Test && and || become control flow"""
+
+    def test_and_in_condition(self):
+        """Test a && b in a condition branches twice without a temporary"""
+        f = func("main", [
+            VarDecl(None, "a", FuncCall("readInt", [])),
+            VarDecl(None, "b", FuncCall("readInt", [])),
+            IfStmt(BinaryOp(ident("a"), "&&", ident("b")), call("printInt", IntLiteral(1))),
+        ])
+        cfg = build_cfg(f)
+        check_edges(cfg)
+        first = cfg.blocks[0].terminator
+        assert str(first).startswith("branch a ?")
+        second = cfg.blocks[first.if_true].terminator
+        assert str(second).startswith("branch b ?")
+        assert first.if_false == second.if_false
+
+    def test_or_with_not_in_condition(self):
+        """Test !a || b swaps the targets of the first test"""
+        f = func("main", [
+            VarDecl(None, "a", FuncCall("readInt", [])),
+            VarDecl(None, "b", FuncCall("readInt", [])),
+            WhileStmt(
+                BinaryOp(PrefixOp("!", ident("a")), "||", ident("b")),
+                ExprStmt(AssignExpr(ident("a"), IntLiteral(1))),
+            ),
+        ])
+        cfg = build_cfg(f)
+        check_edges(cfg)
+        header = cfg.blocks[cfg.succs[0][0]].terminator
+        test_b = cfg.blocks[header.if_true].terminator
+        assert str(test_b).startswith("branch b ?")
+        assert header.if_false == test_b.if_true
+
+    def test_and_in_value_context(self):
+        """Test a && b used as a value produces 0 or 1"""
+        f = func("main", [
+            VarDecl(None, "a", FuncCall("readInt", [])),
+            VarDecl(None, "c", BinaryOp(ident("a"), "&&", FuncCall("readInt", []))),
+        ])
+        cfg = build_cfg(f)
+        check_edges(cfg)
+        copies = sorted(str(i) for b in cfg.blocks for i in b.instructions if str(i).startswith("$2 = "))
+        assert copies == ["$2 = 0", "$2 = 1"]
+        assert any(str(i) == "c = $2" for b in cfg.blocks for i in b.instructions)
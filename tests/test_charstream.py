@@ -0,0 +1,83 @@
+"""
+Character stream test cases for TyC compiler
+The compact streams must lex exactly like ANTLR's InputStream.
+"""
+
+import tracemalloc
+
+import pytest
+from tests.utils import corpus
+from antlr4 import InputStream
+from build.TyCLexer import TyCLexer
+from src.frontend.charstream import ByteStream, CodePointStream, open_source
+from src.frontend.scanner import TyCScanner
+from tests.test_scanner import EDGE_CASES, tokens
+
+
+def lex(stream):
+    return tokens(TyCLexer(stream))
+
+
+class TestCodePointStream:
+    """Test the str-backed stream"""
+
+    @pytest.mark.parametrize("source", corpus("test_lexer.py", "Tokenizer") + EDGE_CASES)
+    def test_lexer_corpus(self, source):
+        """Test TyCLexer reads the same tokens and errors as from InputStream"""
+        assert lex(CodePointStream(source)) == lex(InputStream(source))
+
+    def test_char_stream_interface(self):
+        """Test lookahead, lookbehind, seek and text slices"""
+        stream = CodePointStream("abé")
+        assert (stream.LA(1), stream.LA(3), stream.LA(4), stream.LA(-1)) == (97, 0xE9, -1, -1)
+        stream.consume()
+        assert (stream.index, stream.LA(-1), stream.LT(1)) == (1, 97, 98)
+        stream.seek(10)
+        assert stream.index == stream.size == 3
+        assert stream.getText(1, 5) == "bé"
+        with pytest.raises(Exception):
+            stream.consume()
+
+    def test_compact(self):
+        """Test the stream allocates nothing per character"""
+        source = "int x = 1;\n" * 20000
+        tracemalloc.start()
+        try:
+            stream = CodePointStream(source)
+            assert tracemalloc.get_traced_memory()[1] < 1024
+        finally:
+            tracemalloc.stop()
+        assert stream.size == len(source)
+
+
+class TestFiles:
+    """Test memory-mapped and decoded source files"""
+
+    @pytest.mark.parametrize("text, encoding, kind", [
+        ('void main() { printString("a"); }\n', "utf-8", ByteStream),
+        ('void main() { string s = "naïve 中"; }\n', "utf-8", CodePointStream),
+        ('void main() { string s = "naïve"; }\n', "latin-1", ByteStream),
+        ("", "utf-8", CodePointStream),
+    ])
+    def test_open_source(self, tmp_path, text, encoding, kind):
+        """Test each encoding gets its stream and lexes like the decoded text"""
+        path = tmp_path / "program.tyc"
+        path.write_bytes(text.encode(encoding))
+        stream = open_source(str(path), encoding)
+        assert type(stream) is kind and stream.getSourceName() == str(path)
+        assert lex(stream) == lex(InputStream(text))
+        assert str(stream) == text
+        if isinstance(stream, ByteStream):
+            stream.close()
+
+    def test_scanner(self, tmp_path):
+        """Test the scanner reads a mapped file"""
+        path = tmp_path / "program.tyc"
+        path.write_bytes(b"int x;\n")
+        with open_source(str(path)) as stream:
+            assert [t.text for t in TyCScanner(stream).tokens()] == ["int", "x", ";", "<EOF>"]
+
+    def test_unsupported_encoding(self, tmp_path):
+        """Test only UTF-8 and Latin-1 are accepted"""
+        with pytest.raises(ValueError):
+            open_source(str(tmp_path / "program.tyc"), "utf-16")
@@ -0,0 +1,229 @@
+"""
+Compiler daemon test cases for TyC compiler
+A long-lived daemon answers check, compile and tokenize requests over a
+Unix socket, with length-prefixed JSON messages and cached responses.
+"""
+
+import os
+import shutil
+import socket
+import tempfile
+import threading
+
+import pytest
+from src.client import HEADER, Client, ProtocolError, default_socket_path, main, recv_message, send_message
+from src.daemon import CompilerDaemon
+
+GOOD = "int twice(int n) { return 2 * n; } void main() { printInt(twice(21)); }"
+WARNS = "void main() { int x; printInt(x); }"
+
+
+@pytest.fixture
+def socket_path():
+    # Unix socket paths are short, so not under pytest's tmp_path.
+    directory = tempfile.mkdtemp(prefix="tyc")
+    yield os.path.join(directory, "d.sock")
+    shutil.rmtree(directory)
+
+
+@pytest.fixture
+def daemon(socket_path):
+    server = CompilerDaemon(socket_path, cache_size=2)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    yield server
+    server.shutdown()
+    thread.join()
+    server.server_close()
+
+
+class TestProtocol:
+    """Test length-prefixed messages"""
+
+    def test_round_trip(self):
+        """Test messages arrive whole and in order, and a close between them ends the stream"""
+        a, b = socket.socketpair()
+        with a, b:
+            send_message(a, {"op": "check", "source": "é" * 3})
+            send_message(a, {"op": "ping"})
+            a.shutdown(socket.SHUT_WR)
+            assert recv_message(b) == {"op": "check", "source": "ééé"}
+            assert recv_message(b) == {"op": "ping"}
+            assert recv_message(b) is None
+
+    @pytest.mark.parametrize("data", [
+        HEADER.pack(10) + b"{}",
+        HEADER.pack(2) + b"[]",
+        HEADER.pack(3) + b"{x}",
+        HEADER.pack(1 << 30),
+        b"\x00\x00",
+    ])
+    def test_bad_messages(self, data):
+        """Test truncated, malformed and oversized messages are refused"""
+        a, b = socket.socketpair()
+        with a, b:
+            a.sendall(data)
+            a.shutdown(socket.SHUT_WR)
+            with pytest.raises(ProtocolError):
+                recv_message(b)
+
+
+class TestDaemon:
+    """Test the daemon's requests"""
+
+    def test_check_and_compile(self, daemon, socket_path):
+        """Test errors, warnings and compiled programs are reported"""
+        with Client(socket_path) as client:
+            assert client.request("check", source=WARNS) == {
+                "ok": True, "warnings": ["line 1: x may be read before it is assigned"], "cached": False,
+            }
+            assert client.request("check", source="void main() { int x = ; }") == {
+                "ok": False, "error": "Error on line 1 col 22: ;", "cached": False,
+            }
+            response = client.request("compile", source=GOOD)
+            assert response["ok"] and response["functions"] == ["main"] and response["instructions"] > 0
+
+    def test_tokenize(self, daemon, socket_path):
+        """Test every token is returned and lexical errors are listed"""
+        with Client(socket_path) as client:
+            response = client.request("tokenize", source='a @ "b')
+        assert response["tokens"] == [
+            ["IDENTIFIER", "a", 1, 0], ["ERROR_CHAR", "@", 1, 2], ["UNCLOSE_STRING", '"b', 1, 4], ["EOF", "<EOF>", 1, 6],
+        ]
+        assert response["errors"] == [
+            {"line": 1, "column": 2, "message": "Error Token @"},
+            {"line": 1, "column": 4, "message": "Unclosed String: b"},
+        ]
+
+    def test_cache(self, daemon, socket_path):
+        """Test an unchanged source is answered from the cache, which keeps the latest entries"""
+        with Client(socket_path) as client:
+            assert not client.request("check", source=GOOD)["cached"]
+            assert client.request("check", source=GOOD)["cached"]
+            assert not client.request("compile", source=GOOD)["cached"]
+            client.request("check", source=WARNS)
+            client.request("check", source=WARNS + " ")
+            assert not client.request("check", source=GOOD)["cached"]
+            assert client.request("stats")["caches"][0] == "check: 1 hits, 4 misses (20.0%), 2/2 entries"
+
+    def test_bad_requests(self, daemon, socket_path):
+        """Test unknown ops and missing sources are errors and the connection stays usable"""
+        with Client(socket_path) as client:
+            assert client.request("run") == {"ok": False, "error": "Unknown op: run"}
+            assert client.request("check") == {"ok": False, "error": "check needs the source"}
+            assert client.request("ping")["pid"] == os.getpid()
+
+    def test_malformed_message(self, daemon, socket_path):
+        """Test a malformed message is answered with an error and the connection closed"""
+        with Client(socket_path) as client:
+            client.sock.sendall(HEADER.pack(3) + b"{x}")
+            assert not recv_message(client.sock)["ok"]
+            assert recv_message(client.sock) is None
+
+    def test_connections(self, daemon, socket_path):
+        """Test an idle connection does not hold up another"""
+        with Client(socket_path) as idle, Client(socket_path, timeout=5) as client:
+            assert client.request("check", source=GOOD)["ok"]
+            assert idle.request("ping")["ok"]
+
+    def test_ping_while_compiling(self, daemon, socket_path, monkeypatch):
+        """Test ping and stats are answered while a source request runs"""
+        started, release = threading.Event(), threading.Event()
+
+        def respond(op, source, lexer, parser):
+            started.set()
+            release.wait(5)
+            return {"ok": True, "warnings": []}
+
+        monkeypatch.setattr("src.daemon.respond", respond)
+        with Client(socket_path, timeout=5) as busy, Client(socket_path, timeout=1) as client:
+            worker = threading.Thread(target=busy.request, args=("check",), kwargs={"source": GOOD})
+            worker.start()
+            assert started.wait(5)
+            try:
+                assert client.request("ping")["ok"]
+                assert client.request("stats")["requests"] == 3
+            finally:
+                release.set()
+                worker.join()
+
+
+class TestLifetime:
+    """Test starting and stopping the daemon"""
+
+    def test_shutdown(self, socket_path):
+        """Test a shutdown request is answered, then the daemon stops and removes its socket"""
+        server = CompilerDaemon(socket_path)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        assert not os.stat(socket_path).st_mode & 0o077
+        with Client(socket_path) as client:
+            assert client.request("shutdown") == {"ok": True}
+        thread.join(5)
+        assert not thread.is_alive()
+        server.server_close()
+        assert not os.path.exists(socket_path)
+
+    def test_one_daemon_per_socket(self, daemon, socket_path):
+        """Test a second daemon refuses a live socket"""
+        with pytest.raises(OSError):
+            CompilerDaemon(socket_path)
+
+    def test_stale_socket(self, socket_path):
+        """Test the socket of a daemon that is gone is replaced"""
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(socket_path)
+        stale.close()
+        server = CompilerDaemon(socket_path)
+        server.server_close()
+
+    def test_not_a_socket(self, socket_path):
+        """Test a file that is not a socket is left alone"""
+        with open(socket_path, "w") as f:
+            f.write("keep")
+        with pytest.raises(OSError):
+            CompilerDaemon(socket_path)
+        with open(socket_path) as f:
+            assert f.read() == "keep"
+
+
+class TestClient:
+    """Test the command line client"""
+
+    def test_main(self, daemon, socket_path, tmp_path, capsys):
+        """Test results are printed and the exit status tells of errors"""
+        good, bad = tmp_path / "good.tyc", tmp_path / "bad.tyc"
+        good.write_text(WARNS)
+        bad.write_text("void main() { y = 1; }")
+        assert main(["check", str(good), "--socket", socket_path]) == 0
+        assert main(["compile", str(bad), "--socket", socket_path]) == 1
+        assert capsys.readouterr().out.splitlines() == [
+            f"{good}: line 1: x may be read before it is assigned",
+            f"{bad}: Undeclared variable: y",
+        ]
+
+    def test_default_socket_path(self, monkeypatch, tmp_path):
+        """Test the default socket is in the runtime directory, or in a directory private to the user"""
+        monkeypatch.delenv("TYC_SOCKET", raising=False)
+        monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path / "run"))
+        assert default_socket_path() == str(tmp_path / "run" / "tyc.sock")
+        monkeypatch.delenv("XDG_RUNTIME_DIR")
+        monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+        path = default_socket_path()
+        assert os.path.dirname(path) == str(tmp_path / f"tyc-{os.getuid()}")
+        assert os.stat(os.path.dirname(path)).st_mode & 0o777 == 0o700
+        os.chmod(os.path.dirname(path), 0o777)
+        with pytest.raises(OSError):
+            default_socket_path()
+
+    def test_socket_of_another_user(self, daemon, socket_path, monkeypatch):
+        """Test the client does not connect to a socket another user owns"""
+        uid = os.getuid()
+        monkeypatch.setattr(os, "getuid", lambda: uid + 1)
+        with pytest.raises(OSError, match="another user"):
+            Client(socket_path)
+
+    def test_no_daemon(self, socket_path, capsys):
+        """Test a missing daemon is reported"""
+        assert main(["ping", "--socket", socket_path]) == 2
+        assert "cannot reach the daemon" in capsys.readouterr().err
@@ -0,0 +1,185 @@
+"""
+Dataflow analysis test cases for TyC compiler
+"""
+
+from src.utils.nodes import *
+from tests.utils import call, func, ident
+from src.ir.cfg import build_cfg
+from src.ir.dataflow import (
+    BitIndex,
+    DefiniteAssignment,
+    UninitializedRead,
+    find_uninitialized_reads,
+    liveness,
+    reaching_definitions,
+)
+from src.ir.ssa import construct_ssa
+
+
+def assign(name, expr):
+    return ExprStmt(AssignExpr(ident(name), expr))
+
+
+def at(node, line, column):
+    node.line, node.column = line, column
+    return node
+
+
+def loop_program():
+    """int s = 0; while (n) { s = s + n; n = n - 1; } printInt(s);"""
+    return func("f", [
+        VarDecl(IntType(), "s", IntLiteral(0)),
+        WhileStmt(ident("n"), BlockStmt([
+            assign("s", BinaryOp(ident("s"), "+", ident("n"))),
+            assign("n", BinaryOp(ident("n"), "-", IntLiteral(1))),
+        ])),
+        call("printInt", ident("s")),
+    ], [Param(IntType(), "n")])
+
+
+class TestBitIndex:
+    """Test the item to bit mapping"""
+
+    def test_round_trip(self):
+        """Test bits and members are inverse"""
+        index = BitIndex(["a", "b", "c"])
+        assert index.bits(["a", "c"]) == 0b101
+        assert index.members(0b110) == ["b", "c"]
+        assert index.full == 0b111
+        assert index.add("b") == 1
+
+
+class TestLiveness:
+    """Test live variable analysis"""
+
+    def test_loop(self):
+        """Test loop-carried variables are live around the back edge"""
+        cfg = build_cfg(loop_program())
+        result = liveness(cfg)
+        header = cfg.blocks[cfg.entry].terminator.target
+        assert sorted(result.live_in(header)) == ["n", "s"]
+        assert result.live_in(cfg.entry) == ["n"]
+        exit_block = cfg.blocks[header].terminator.if_false
+        assert result.live_out(exit_block) == []
+
+    def test_dead_assignment(self):
+        """Test a variable overwritten before use is not live"""
+        cfg = build_cfg(func("f", [
+            assign("x", IntLiteral(1)),
+            call("printInt", ident("x")),
+        ], [Param(IntType(), "x")]))
+        assert liveness(cfg).live_in(cfg.entry) == []
+
+    def test_phi_operands_live_in_predecessor(self):
+        """Test in SSA form a phi operand is live only along its edge"""
+        cfg = construct_ssa(build_cfg(func("main", [
+            VarDecl(None, "n", FuncCall("readInt", [])),
+            VarDecl(IntType(), "x", IntLiteral(1)),
+            IfStmt(ident("n"), assign("x", IntLiteral(2))),
+            call("printInt", ident("x")),
+        ])))
+        result = liveness(cfg)
+        join = cfg.blocks[1].terminator.target
+        assert not any(v.startswith("x") for v in result.live_in(join))
+        assert "x.1" in result.live_out(cfg.entry)
+        assert "x.1" not in result.live_out(1)
+
+
+class TestReachingDefinitions:
+    """Test reaching definitions"""
+
+    def test_both_arms_reach_join(self):
+        """Test definitions from both arms of an if reach the join"""
+        cfg = build_cfg(func("main", [
+            VarDecl(None, "n", FuncCall("readInt", [])),
+            VarDecl(IntType(), "x", IntLiteral(1)),
+            IfStmt(ident("n"), assign("x", IntLiteral(2))),
+            call("printInt", ident("x")),
+        ]))
+        result = reaching_definitions(cfg)
+        join = cfg.blocks[1].terminator.target
+        values = sorted(str(instr) for _, instr in result.reaching(join, "x"))
+        assert values == ["x = 1", "x = 2"]
+
+    def test_parameters_reach_entry(self):
+        """Test parameters are defined on entry and killed by assignments"""
+        cfg = build_cfg(loop_program())
+        result = reaching_definitions(cfg)
+        header = cfg.blocks[cfg.entry].terminator.target
+        assert result.reaching(cfg.entry) == [("n", None)]
+        defs = result.reaching(header, "n")
+        assert ("n", None) in defs and len(defs) == 2
+
+
+class TestDefiniteAssignment:
+    """Test the check for reads of possibly-uninitialized variables"""
+
+    def test_declared_then_read(self):
+        """Test 'int a; printInt(a);' is flagged at the read"""
+        cfg = build_cfg(func("main", [
+            VarDecl(IntType(), "a"),
+            ExprStmt(at(FuncCall("printInt", [ident("a")]), 2, 4)),
+        ]))
+        assert find_uninitialized_reads(cfg) == [UninitializedRead("a", 2, 4)]
+
+    def test_assigned_on_one_path(self):
+        """Test assignment on only one arm of an if is not enough"""
+        cfg = build_cfg(func("main", [
+            VarDecl(None, "n", FuncCall("readInt", [])),
+            VarDecl(IntType(), "a"),
+            IfStmt(ident("n"), assign("a", IntLiteral(1))),
+            call("printInt", ident("a")),
+        ]))
+        assert [r.name for r in find_uninitialized_reads(cfg)] == ["a"]
+
+    def test_assigned_on_every_path(self):
+        """Test assignment on both arms makes the read safe"""
+        cfg = build_cfg(func("main", [
+            VarDecl(None, "n", FuncCall("readInt", [])),
+            VarDecl(None, "a"),
+            IfStmt(ident("n"), assign("a", IntLiteral(1)), assign("a", IntLiteral(2))),
+            call("printInt", ident("a")),
+        ]))
+        assert find_uninitialized_reads(cfg) == []
+
+    def test_declaration_in_loop(self):
+        """Test a declaration inside a loop un-assigns its variable"""
+        cfg = build_cfg(func("main", [
+            VarDecl(None, "n", FuncCall("readInt", [])),
+            WhileStmt(ident("n"), BlockStmt([
+                VarDecl(IntType(), "t"),
+                call("printInt", ident("t")),
+                assign("t", IntLiteral(1)),
+                assign("n", BinaryOp(ident("n"), "-", IntLiteral(1))),
+            ])),
+        ]))
+        assert [r.name for r in find_uninitialized_reads(cfg)] == ["t"]
+
+    def test_member_store_assigns_struct(self):
+        """Test 'Point p; p.x = 1;' does not read p"""
+        cfg = build_cfg(func("main", [
+            VarDecl(StructType("Point"), "p"),
+            ExprStmt(AssignExpr(MemberAccess(ident("p"), "x"), IntLiteral(1))),
+            call("printInt", MemberAccess(ident("p"), "x")),
+        ]))
+        assert find_uninitialized_reads(cfg) == []
+
+    def test_shadowed_name_reported(self):
+        """Test the source name of a shadowing declaration is reported"""
+        cfg = build_cfg(func("main", [
+            VarDecl(IntType(), "x", IntLiteral(1)),
+            BlockStmt([VarDecl(IntType(), "x"), call("printInt", ident("x"))]),
+        ]))
+        assert [r.name for r in find_uninitialized_reads(cfg)] == ["x"]
+
+    def test_large_function(self):
+        """Test thousands of statements and variables are handled"""
+        body = [VarDecl(None, "n", FuncCall("readInt", []))]
+        for i in range(1500):
+            body.append(VarDecl(IntType(), f"v{i}"))
+            body.append(IfStmt(ident("n"), assign(f"v{i}", IntLiteral(i)),
+                               assign(f"v{i}", IntLiteral(-i))))
+        body.append(VarDecl(IntType(), "late"))
+        body.append(call("printInt", BinaryOp(ident("v1499"), "+", ident("late"))))
+        analysis = DefiniteAssignment(build_cfg(func("main", body))).solve()
+        assert [r.name for r in analysis.uninitialized_reads()] == ["late"]
@@ -0,0 +1,158 @@
+"""
+Type inference and typed frame test cases for TyC compiler
+"""
+
+import io
+
+import pytest
+from src.utils.nodes import *
+from tests.utils import call, func, ident
+from src.ir.cfg import build_cfgs
+from src.ir.types import FLOAT, INT, MIXED, STRING, infer_types
+from src.optimizer.pipeline import optimize_all
+from src.runtime.errors import TyCRuntimeError
+from src.runtime.frames import FLOAT_SLOT, INT_SLOT, OBJECT_SLOT, FrameLayout, TypedInterpreter
+from src.runtime.interpreter import Interpreter
+
+
+def engines(decls, stdin="", optimize=False):
+    """Output of the dict-based and the typed interpreter."""
+    cfgs = build_cfgs(Program(decls))
+    if optimize:
+        optimize_all(cfgs)
+    structs = {d.name: d for d in decls if isinstance(d, StructDecl)}
+    outputs = []
+    for engine in (Interpreter, TypedInterpreter):
+        out = io.StringIO()
+        engine(cfgs, structs, io.StringIO(stdin), out).run()
+        outputs.append(out.getvalue())
+    return outputs
+
+
+def sum_program():
+    """Sum 0..n-1 into an int and add 0.5 to a float n times."""
+    return [func("main", [
+        VarDecl(IntType(), "n", FuncCall("readInt", [])),
+        VarDecl(IntType(), "s", IntLiteral(0)),
+        VarDecl(FloatType(), "f", FloatLiteral(0.0)),
+        VarDecl(None, "i", IntLiteral(0)),
+        WhileStmt(BinaryOp(ident("i"), "<", ident("n")), BlockStmt([
+            ExprStmt(AssignExpr(ident("s"), BinaryOp(ident("s"), "+", ident("i")))),
+            ExprStmt(AssignExpr(ident("f"), BinaryOp(ident("f"), "+", FloatLiteral(0.5)))),
+            ExprStmt(PostfixOp("++", ident("i"))),
+        ])),
+        call("printInt", ident("s")),
+        call("printFloat", ident("f")),
+        call("printString", StringLiteral("done")),
+    ])]
+
+
+class TestTypeInference:
+    """Test types inferred for IR variables"""
+
+    def test_declared_and_auto_variables(self):
+        """Test declared types are kept and auto variables inferred"""
+        types = infer_types(build_cfgs(Program(sum_program())))["main"]
+        assert types["n"] == INT and types["f"] == FLOAT and types["i"] == INT
+
+    def test_auto_return_type(self):
+        """Test calls to a function with an inferred return type"""
+        half = func("half", [ReturnStmt(BinaryOp(ident("x"), "/", FloatLiteral(2.0)))],
+                    [Param(IntType(), "x")])
+        main = func("main", [VarDecl(None, "h", FuncCall("half", [IntLiteral(3)]))])
+        types = infer_types(build_cfgs(Program([half, main])))
+        assert types["main"]["h"] == FLOAT
+
+    def test_struct_member_types(self):
+        """Test member reads take the member's declared type"""
+        point = StructDecl("P", [MemberDecl(IntType(), "x"), MemberDecl(StringType(), "s")])
+        main = func("main", [
+            VarDecl(StructType("P"), "p"),
+            VarDecl(None, "a", MemberAccess(ident("p"), "x")),
+            VarDecl(None, "b", MemberAccess(ident("p"), "s")),
+        ])
+        types = infer_types(build_cfgs(Program([point, main])), {"P": point})["main"]
+        assert (types["p"], types["a"], types["b"]) == ("P", INT, STRING)
+
+    def test_conflicting_types_are_mixed(self):
+        """Test a variable assigned values of two types is mixed"""
+        main = func("main", [
+            VarDecl(None, "x", IntLiteral(1)),
+            ExprStmt(AssignExpr(ident("x"), StringLiteral("a"))),
+        ])
+        assert infer_types(build_cfgs(Program([main])))["main"]["x"] == MIXED
+
+
+class TestFrameLayout:
+    """Test slot assignment"""
+
+    def test_slots_by_type(self):
+        """Test ints, floats and other values get separate slot kinds"""
+        cfgs = build_cfgs(Program(sum_program()))
+        layout = FrameLayout(cfgs["main"], infer_types(cfgs)["main"])
+        assert layout.slots["n"][0] == INT_SLOT
+        assert layout.slots["f"][0] == FLOAT_SLOT
+        kinds = [kind for kind, _ in layout.slots.values()]
+        assert layout.counts == [kinds.count(k) for k in (INT_SLOT, FLOAT_SLOT, OBJECT_SLOT)]
+
+    def test_new_frame_is_zeroed(self):
+        """Test each frame gets its own zeroed storage"""
+        cfgs = build_cfgs(Program(sum_program()))
+        layout = FrameLayout(cfgs["main"], infer_types(cfgs)["main"])
+        first, second = layout.new_frame(), layout.new_frame()
+        first[INT_SLOT][0] = 5
+        assert second[INT_SLOT][0] == 0
+        assert first[INT_SLOT].typecode == "q" and first[FLOAT_SLOT].typecode == "d"
+
+
+class TestTypedInterpreter:
+    """Test the typed interpreter agrees with the dict-based one"""
+
+    @pytest.mark.parametrize("optimize", [False, True])
+    def test_loop(self, optimize):
+        """Test int, float and string locals in a loop"""
+        dict_out, typed_out = engines(sum_program(), "10", optimize)
+        assert typed_out == dict_out == "45\n5.0\ndone\n"
+
+    @pytest.mark.parametrize("optimize", [False, True])
+    def test_recursion_and_structs(self, optimize):
+        """Test calls pass typed arguments and struct values"""
+        point = StructDecl("P", [MemberDecl(IntType(), "x"), MemberDecl(FloatType(), "y")])
+        fib = func("fib", [
+            IfStmt(BinaryOp(ident("n"), "<", IntLiteral(2)), ReturnStmt(ident("n"))),
+            ReturnStmt(BinaryOp(FuncCall("fib", [BinaryOp(ident("n"), "-", IntLiteral(1))]), "+",
+                                FuncCall("fib", [BinaryOp(ident("n"), "-", IntLiteral(2))]))),
+        ], [Param(IntType(), "n")], IntType())
+        main = func("main", [
+            VarDecl(StructType("P"), "p"),
+            ExprStmt(AssignExpr(MemberAccess(ident("p"), "x"), FuncCall("fib", [IntLiteral(15)]))),
+            ExprStmt(AssignExpr(MemberAccess(ident("p"), "y"), FloatLiteral(2.5))),
+            call("printInt", MemberAccess(ident("p"), "x")),
+            call("printFloat", MemberAccess(ident("p"), "y")),
+        ])
+        dict_out, typed_out = engines([point, fib, main], optimize=optimize)
+        assert typed_out == dict_out == "610\n2.5\n"
+
+    def test_integer_overflow(self):
+        """Test an int that does not fit in 64 bits is a runtime error"""
+        main = func("main", [
+            VarDecl(IntType(), "x", FuncCall("readInt", [])),
+            ExprStmt(AssignExpr(ident("x"), BinaryOp(ident("x"), "*", ident("x")))),
+            call("printInt", ident("x")),
+        ])
+        interpreter = TypedInterpreter(build_cfgs(Program([main])), {},
+                                       io.StringIO("10000000000"), io.StringIO())
+        with pytest.raises(TyCRuntimeError) as e:
+            interpreter.run()
+        assert e.value.message == "Integer overflow"
+
+    def test_max_call_depth(self):
+        """Test the typed interpreter honours the depth limit"""
+        loop = func("loop", [ReturnStmt(FuncCall("loop", [ident("n")]))],
+                    [Param(IntType(), "n")], IntType())
+        main = func("main", [call("loop", IntLiteral(1))])
+        interpreter = TypedInterpreter(build_cfgs(Program([loop, main])), {},
+                                       io.StringIO(), io.StringIO(), max_call_depth=20)
+        with pytest.raises(TyCRuntimeError) as e:
+            interpreter.run()
+        assert e.value.message == "Stack overflow"
@@ -0,0 +1,152 @@
+"""
+Inliner and call graph test cases for TyC compiler
+"""
+
+import io
+
+from src.utils.nodes import *
+from tests.utils import call, func, ident
+from src.ir.callgraph import CallGraph
+from src.ir.cfg import build_cfgs
+from src.ir.instructions import Call
+from src.optimizer.inliner import Inliner, run_inliner
+from src.optimizer.pipeline import optimize_all
+from src.runtime.interpreter import Interpreter
+
+
+def int_params(*names):
+    return [Param(IntType(), n) for n in names]
+
+
+def add_func():
+    return func("add", [ReturnStmt(BinaryOp(ident("x"), "+", ident("y")))],
+                int_params("x", "y"), IntType())
+
+
+def abs_func():
+    """Returns from both arms of an if."""
+    return func("abs", [
+        IfStmt(BinaryOp(ident("x"), "<", IntLiteral(0)),
+               BlockStmt([ReturnStmt(PrefixOp("-", ident("x")))]),
+               BlockStmt([ReturnStmt(ident("x"))])),
+    ], int_params("x"), IntType())
+
+
+def fact_func():
+    return func("fact", [
+        IfStmt(BinaryOp(ident("n"), "<=", IntLiteral(1)), ReturnStmt(IntLiteral(1))),
+        ReturnStmt(BinaryOp(ident("n"), "*",
+                            FuncCall("fact", [BinaryOp(ident("n"), "-", IntLiteral(1))]))),
+    ], int_params("n"), IntType())
+
+
+def main_func(*body):
+    return func("main", [VarDecl(None, "n", FuncCall("readInt", []))] + list(body))
+
+
+def calls_in(cfg):
+    return [i.func for b in cfg.blocks for i in b.instructions if isinstance(i, Call)]
+
+
+def run(cfgs, decls, stdin):
+    out = io.StringIO()
+    structs = {d.name: d for d in decls if isinstance(d, StructDecl)}
+    Interpreter(cfgs, structs, io.StringIO(stdin), out).run()
+    return out.getvalue()
+
+
+class TestCallGraph:
+    """Test call graph construction"""
+
+    def test_edges_and_order(self):
+        """Test callees come before callers and builtins are external"""
+        cfgs = build_cfgs(Program([
+            main_func(call("printInt", FuncCall("add", [ident("n"), IntLiteral(1)]))),
+            add_func(),
+        ]))
+        graph = CallGraph(cfgs)
+        assert graph.callees["main"] == {"add"}
+        assert graph.external["main"] == {"readInt", "printInt"}
+        assert graph.bottom_up() == ["add", "main"]
+        assert graph.reachable_from("main") == {"main", "add"}
+
+    def test_recursion(self):
+        """Test direct and mutual recursion are detected"""
+        even = func("even", [ReturnStmt(FuncCall("odd", [ident("n")]))], int_params("n"), IntType())
+        odd = func("odd", [ReturnStmt(FuncCall("even", [ident("n")]))], int_params("n"), IntType())
+        graph = CallGraph(build_cfgs(Program([fact_func(), even, odd, add_func()])))
+        assert graph.is_recursive("fact")
+        assert graph.is_recursive("even") and graph.is_recursive("odd")
+        assert not graph.is_recursive("add")
+
+
+class TestInliner:
+    """Test inlining of calls"""
+
+    def test_inline_small_function(self):
+        """Test a call to add is replaced by its body"""
+        decls = [add_func(), main_func(
+            call("printInt", FuncCall("add", [ident("n"), IntLiteral(1)])))]
+        cfgs = build_cfgs(Program(decls))
+        assert run_inliner(cfgs) == 1
+        assert calls_in(cfgs["main"]) == ["readInt", "printInt"]
+        assert run(cfgs, decls, "41") == "42\n"
+
+    def test_returns_in_nested_control_flow(self):
+        """Test every return of the callee continues after the call"""
+        decls = [abs_func(), main_func(
+            call("printInt", FuncCall("abs", [ident("n")])),
+            call("printInt", FuncCall("abs", [PrefixOp("-", ident("n"))])))]
+        cfgs = build_cfgs(Program(decls))
+        assert run_inliner(cfgs) == 2
+        assert "abs" not in calls_in(cfgs["main"])
+        assert run(cfgs, decls, "-5") == "5\n5\n"
+
+    def test_recursive_not_inlined(self):
+        """Test recursive functions are left alone"""
+        decls = [fact_func(), main_func(call("printInt", FuncCall("fact", [ident("n")])))]
+        cfgs = build_cfgs(Program(decls))
+        assert run_inliner(cfgs) == 0
+        assert run(cfgs, decls, "5") == "120\n"
+
+    def test_size_threshold(self):
+        """Test callees above the size threshold are not inlined"""
+        decls = [abs_func(), main_func(call("printInt", FuncCall("abs", [ident("n")])))]
+        cfgs = build_cfgs(Program(decls))
+        assert Inliner(cfgs, max_callee_size=3, constant_arg_bonus=0).run() == 0
+        assert Inliner(cfgs, max_callee_size=100).run() == 1
+
+    def test_constant_argument_bonus(self):
+        """Test constant arguments raise the size budget"""
+        decls = [abs_func(), main_func(call("printInt", FuncCall("abs", [IntLiteral(-3)])))]
+        size = build_cfgs(Program(decls))["abs"].instruction_count()
+        cfgs = build_cfgs(Program(decls))
+        inliner = Inliner(cfgs, max_callee_size=size - 1, constant_arg_bonus=1)
+        assert inliner.run() == 1
+        assert inliner.inlined_into == {"main": 1}
+
+    def test_nested_inlining(self):
+        """Test a callee's own calls are inlined first"""
+        twice = func("twice", [ReturnStmt(FuncCall("add", [ident("x"), ident("x")]))],
+                     int_params("x"), IntType())
+        decls = [add_func(), twice, main_func(call("printInt", FuncCall("twice", [ident("n")])))]
+        cfgs = build_cfgs(Program(decls))
+        assert run_inliner(cfgs) == 2
+        assert calls_in(cfgs["main"]) == ["readInt", "printInt"]
+        assert run(cfgs, decls, "4") == "8\n"
+
+    def test_pipeline_reports_inlining(self):
+        """Test the pipeline inlines and still computes the same result"""
+        decls = [add_func(), abs_func(), main_func(
+            VarDecl(IntType(), "s", IntLiteral(0)),
+            ForStmt(VarDecl(IntType(), "i", IntLiteral(0)),
+                    BinaryOp(ident("i"), "<", ident("n")),
+                    PrefixOp("++", ident("i")),
+                    ExprStmt(AssignExpr(ident("s"), FuncCall("add", [
+                        ident("s"), FuncCall("abs", [BinaryOp(ident("i"), "-", IntLiteral(3))])])))),
+            call("printInt", ident("s")))]
+        expected = run(build_cfgs(Program(decls)), decls, "6")
+        cfgs = build_cfgs(Program(decls))
+        stats = optimize_all(cfgs)
+        assert stats["main"].changes["inline"] == 2
+        assert run(cfgs, decls, "6") == expected == "9\n"
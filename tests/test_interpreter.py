@@ -0,0 +1,134 @@
+"""
+Interpreter test cases for TyC compiler
+"""
+
+import io
+
+import pytest
+from src.utils.nodes import *
+from tests.utils import call, func, ident
+from src.ir.cfg import build_cfgs
+from src.runtime.errors import TyCRuntimeError
+from src.runtime.interpreter import Interpreter
+
+
+def run(decls, stdin=""):
+    program = Program(decls)
+    out = io.StringIO()
+    structs = {d.name: d for d in decls if isinstance(d, StructDecl)}
+    Interpreter(build_cfgs(program), structs, io.StringIO(stdin), out).run()
+    return out.getvalue()
+
+
+class TestBuiltins:
+    """Test input and output builtins"""
+
+    def test_print_each_type(self):
+        """Test each print builtin writes one line"""
+        assert run([func("main", [
+            call("printInt", IntLiteral(42)),
+            call("printFloat", FloatLiteral(1.5)),
+            call("printFloat", IntLiteral(2)),
+            call("printString", StringLiteral("a\\tb")),
+        ])]) == "42\n1.5\n2.0\na\tb\n"
+
+    def test_reads_whitespace_separated_tokens(self):
+        """Test read builtins consume one token each"""
+        assert run([func("main", [
+            call("printInt", FuncCall("readInt", [])),
+            call("printFloat", FuncCall("readFloat", [])),
+            call("printString", FuncCall("readString", [])),
+        ])], "7\n  2.5 word\n") == "7\n2.5\nword\n"
+
+    def test_output_flushed_on_error(self):
+        """Test output printed before a runtime error is not lost"""
+        out = io.StringIO()
+        cfgs = build_cfgs(Program([func("main", [
+            call("printInt", IntLiteral(1)),
+            call("printInt", FuncCall("readInt", [])),
+        ])]))
+        with pytest.raises(TyCRuntimeError):
+            Interpreter(cfgs, {}, io.StringIO(""), out).run()
+        assert out.getvalue() == "1\n"
+
+    def test_end_of_input(self):
+        """Test reading past the end of input is a runtime error"""
+        with pytest.raises(TyCRuntimeError):
+            run([func("main", [call("printInt", FuncCall("readInt", []))])])
+
+
+class TestSemantics:
+    """Test the runtime semantics of statements and expressions"""
+
+    def test_c_division(self):
+        """Test integer division and remainder truncate toward zero"""
+        assert run([func("main", [
+            call("printInt", BinaryOp(PrefixOp("-", IntLiteral(7)), "/", IntLiteral(2))),
+            call("printInt", BinaryOp(PrefixOp("-", IntLiteral(7)), "%", IntLiteral(2))),
+            call("printInt", BinaryOp(IntLiteral(7), "%", PrefixOp("-", IntLiteral(2)))),
+        ])]) == "-3\n-1\n1\n"
+
+    def test_division_by_zero(self):
+        """Test division by zero raises a runtime error"""
+        with pytest.raises(TyCRuntimeError) as e:
+            run([func("main", [
+                VarDecl(None, "z", FuncCall("readInt", [])),
+                call("printInt", BinaryOp(IntLiteral(1), "/", ident("z"))),
+            ])], "0")
+        assert str(e.value) == "Runtime Error: Division by zero"
+
+    def test_recursion(self):
+        """Test recursive calls return values"""
+        fact = func("fact", [
+            IfStmt(BinaryOp(ident("n"), "<=", IntLiteral(1)), ReturnStmt(IntLiteral(1))),
+            ReturnStmt(BinaryOp(ident("n"), "*",
+                                FuncCall("fact", [BinaryOp(ident("n"), "-", IntLiteral(1))]))),
+        ], [Param(IntType(), "n")], IntType())
+        assert run([fact, func("main", [
+            call("printInt", FuncCall("fact", [IntLiteral(10)])),
+        ])]) == "3628800\n"
+
+    def test_struct_defaults_and_nested_store(self):
+        """Test declared structs are zeroed and nested stores copy"""
+        point = StructDecl("Point", [MemberDecl(IntType(), "x"), MemberDecl(FloatType(), "y")])
+        line = StructDecl("Line", [MemberDecl(StructType("Point"), "a")])
+        assert run([point, line, func("main", [
+            VarDecl(StructType("Line"), "l"),
+            VarDecl(StructType("Line"), "m", ident("l")),
+            ExprStmt(AssignExpr(MemberAccess(MemberAccess(ident("l"), "a"), "x"), IntLiteral(5))),
+            call("printInt", MemberAccess(MemberAccess(ident("l"), "a"), "x")),
+            call("printInt", MemberAccess(MemberAccess(ident("m"), "a"), "x")),
+            call("printFloat", MemberAccess(MemberAccess(ident("m"), "a"), "y")),
+        ])]) == "5\n0\n0.0\n"
+
+    def test_undefined_function(self):
+        """Test calling an unknown function is a runtime error"""
+        with pytest.raises(TyCRuntimeError):
+            run([func("main", [call("missing")])])
+
+
+class TestCallStack:
+    """Test the interpreter's own call stack"""
+
+    def depth_program(self):
+        """int depth(int n) { if (n == 0) return 0; return 1 + depth(n - 1); }"""
+        depth = func("depth", [
+            IfStmt(BinaryOp(ident("n"), "==", IntLiteral(0)), ReturnStmt(IntLiteral(0))),
+            ReturnStmt(BinaryOp(IntLiteral(1), "+",
+                                FuncCall("depth", [BinaryOp(ident("n"), "-", IntLiteral(1))]))),
+        ], [Param(IntType(), "n")], IntType())
+        main = func("main", [call("printInt", FuncCall("depth", [FuncCall("readInt", [])]))])
+        return [depth, main]
+
+    def test_recursion_deeper_than_python(self):
+        """Test recursion depth is not limited by Python's recursion limit"""
+        assert run(self.depth_program(), "100000") == "100000\n"
+
+    def test_max_call_depth(self):
+        """Test an explicit depth limit reports a stack overflow"""
+        decls = self.depth_program()
+        interpreter = Interpreter(build_cfgs(Program(decls)), {}, io.StringIO("50"),
+                                  io.StringIO(), max_call_depth=10)
+        with pytest.raises(TyCRuntimeError) as e:
+            interpreter.run()
+        assert e.value.message == "Stack overflow"
@@ -0,0 +1,126 @@
+"""
+Runtime I/O test cases for TyC compiler
+"""
+
+import io
+import os
+import threading
+
+import pytest
+from src.compiler import compile_source
+from src.runtime.errors import TyCRuntimeError
+from src.runtime.io import InputReader, OutputWriter
+
+
+class TextStream(io.StringIO):
+    """Text stream without getvalue(), read in chunks like a pipe."""
+
+    getvalue = None
+
+
+class FakeTTY(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def isatty(self):
+        return True
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+
+class TestInputReader:
+    """Test lazy tokenizing of stdin"""
+
+    def test_tokens_across_chunks(self):
+        """Test tokens split by a chunk boundary are joined"""
+        reader = InputReader(TextStream("12345 678\n  -9\t3.25 word"), chunk_size=3)
+        assert reader.read_int() == 12345
+        assert reader.read_int() == 678
+        assert reader.read_int() == -9
+        assert reader.read_float() == 3.25
+        assert reader.read_string() == "word"
+
+    def test_binary_stream_chunks(self):
+        """Test a binary buffer behind a text wrapper is read as bytes"""
+        stream = io.TextIOWrapper(io.BytesIO(b"1 22 333 4444"))
+        reader = InputReader(stream, chunk_size=2)
+        assert [reader.read_int() for _ in range(4)] == [1, 22, 333, 4444]
+
+    def test_memory_mapped_file(self, tmp_path):
+        """Test a regular file is memory-mapped"""
+        path = tmp_path / "input.txt"
+        path.write_text("7 8.5 hello\n")
+        with open(path) as stream:
+            reader = InputReader(stream)
+            assert reader.read_int() == 7
+            assert reader._map is not None
+            assert reader.read_float() == 8.5
+            assert reader.read_string() == "hello"
+            reader.close()
+
+    def test_pipe_line_at_a_time(self):
+        """Test a line written to a pipe is read while the writer keeps it open"""
+        program = compile_source("void main() { int x = readInt(); printInt(2 * x); }")
+        out = io.StringIO()
+        read_fd, write_fd = os.pipe()
+        with os.fdopen(read_fd) as stdin, os.fdopen(write_fd, "w") as feed:
+            runner = threading.Thread(target=program.run, args=(stdin, out))
+            runner.start()
+            feed.write("21\n")
+            feed.flush()
+            runner.join(5)
+            assert not runner.is_alive()
+            assert out.getvalue() == "42\n"
+
+    def test_end_of_input(self):
+        """Test reading past the last token is a runtime error"""
+        reader = InputReader(TextStream("1  \n"), chunk_size=2)
+        assert reader.read_int() == 1
+        with pytest.raises(TyCRuntimeError):
+            reader.read_int()
+
+    def test_invalid_number(self):
+        """Test a malformed number is a runtime error"""
+        with pytest.raises(TyCRuntimeError) as e:
+            InputReader(io.StringIO("abc")).read_int()
+        assert e.value.message == "Invalid int input: abc"
+
+    def test_stream_untouched_until_read(self):
+        """Test nothing is read before the first read builtin"""
+        stream = TextStream("5")
+        InputReader(stream)
+        assert stream.tell() == 0
+
+
+class TestOutputWriter:
+    """Test buffered output"""
+
+    def test_buffered_until_threshold(self):
+        """Test output is held until the buffer fills or is flushed"""
+        stream = io.StringIO()
+        writer = OutputWriter(stream, buffer_size=8, line_buffered=False)
+        writer.write("1\n")
+        writer.write("2\n")
+        assert stream.getvalue() == ""
+        writer.write("34567\n")
+        assert stream.getvalue() == "1\n2\n34567\n"
+        writer.write("8\n")
+        writer.flush()
+        assert stream.getvalue() == "1\n2\n34567\n8\n"
+
+    def test_line_buffered_on_tty(self):
+        """Test each print reaches a terminal right away"""
+        tty = FakeTTY()
+        writer = OutputWriter(tty)
+        assert writer.line_buffered
+        writer.write("1\n")
+        writer.write("2\n")
+        assert tty.writes == 2
+        assert tty.getvalue() == "1\n2\n"
+
+    def test_not_line_buffered_otherwise(self):
+        """Test a pipe or file is fully buffered"""
+        assert not OutputWriter(io.StringIO()).line_buffered
@@ -0,0 +1,316 @@
+"""
+Optimizer test cases for TyC compiler
+"""
+
+import io
+
+from src.utils.nodes import *
+from tests.utils import call, func, ident
+from src.ir.cfg import build_cfg, build_cfgs
+from src.ir.instructions import BinOp, Branch, Call, Copy, Phi
+from src.ir.ssa import construct_ssa
+from src.optimizer.copy_propagation import run_copy_propagation
+from src.optimizer.dce import run_dce
+from src.optimizer.gvn import run_gvn
+from src.optimizer.pipeline import optimize, optimize_all
+from src.optimizer.sccp import run_sccp
+from src.optimizer.simplify_cfg import run_simplify_cfg
+from src.runtime.interpreter import Interpreter
+
+
+def assign(name, expr):
+    return ExprStmt(AssignExpr(ident(name), expr))
+
+
+def binop(left, op, right):
+    return BinaryOp(left, op, right)
+
+
+def instructions(cfg):
+    return [str(i) for b in cfg.blocks for i in b.instructions]
+
+
+def run(program, stdin="", optimized=False):
+    cfgs = build_cfgs(program)
+    if optimized:
+        optimize_all(cfgs)
+    out = io.StringIO()
+    structs = {d.name: d for d in program.decls if isinstance(d, StructDecl)}
+    Interpreter(cfgs, structs, io.StringIO(stdin), out).run()
+    return out.getvalue()
+
+
+def read_n():
+    return VarDecl(None, "n", FuncCall("readInt", []))
+
+
+# =============================================================================
+# INDIVIDUAL PASSES
+# =============================================================================
+
+class TestSCCP:
+    """Test sparse conditional constant propagation"""
+
+    def test_folds_arithmetic(self):
+        """Test constants propagate through a chain of operations"""
+        cfg = construct_ssa(build_cfg(func("main", [
+            VarDecl(IntType(), "x", binop(IntLiteral(3), "*", IntLiteral(4))),
+            VarDecl(IntType(), "y", binop(ident("x"), "+", IntLiteral(2))),
+            call("printInt", ident("y")),
+        ])))
+        run_sccp(cfg)
+        assert instructions(cfg) == ["call printInt(14)"]
+
+    def test_folds_constant_branch(self):
+        """Test the untaken arm of a constant condition is removed"""
+        cfg = construct_ssa(build_cfg(func("main", [
+            VarDecl(IntType(), "debug", IntLiteral(0)),
+            IfStmt(ident("debug"), call("printInt", IntLiteral(1)),
+                   call("printInt", IntLiteral(2))),
+        ])))
+        run_sccp(cfg)
+        assert instructions(cfg) == ["call printInt(2)"]
+        assert not any(isinstance(b.terminator, Branch) for b in cfg.blocks)
+
+    def test_constant_through_loop(self):
+        """Test a value assigned the same constant around a loop stays constant"""
+        cfg = construct_ssa(build_cfg(func("main", [
+            read_n(),
+            VarDecl(IntType(), "k", IntLiteral(7)),
+            WhileStmt(ident("n"), BlockStmt([
+                assign("k", IntLiteral(7)),
+                assign("n", binop(ident("n"), "-", IntLiteral(1))),
+            ])),
+            call("printInt", ident("k")),
+        ])))
+        run_sccp(cfg)
+        assert "call printInt(7)" in instructions(cfg)
+
+    def test_division_by_zero_not_folded(self):
+        """Test a trapping division is left for the runtime"""
+        cfg = construct_ssa(build_cfg(func("main", [
+            call("printInt", binop(IntLiteral(1), "/", IntLiteral(0))),
+        ])))
+        run_sccp(cfg)
+        assert instructions(cfg)[0] == "$1.1 = 1 / 0"
+
+    def test_c_division_semantics(self):
+        """Test folding truncates toward zero like the runtime"""
+        cfg = construct_ssa(build_cfg(func("main", [
+            call("printInt", binop(PrefixOp("-", IntLiteral(7)), "/", IntLiteral(2))),
+        ])))
+        run_sccp(cfg)
+        assert instructions(cfg) == ["call printInt(-3)"]
+
+    def test_signed_zero_phi(self):
+        """Test a phi of 0.0 and -0.0 is not folded to one constant"""
+        program = Program([func("main", [
+            read_n(),
+            VarDecl(FloatType(), "z", FloatLiteral(0.0)),
+            IfStmt(ident("n"), assign("z", PrefixOp("-", FloatLiteral(0.0)))),
+            call("printFloat", ident("z")),
+        ])])
+        for stdin in ("0", "1"):
+            assert run(program, stdin, True) == run(program, stdin)
+        assert run(program, "1", True) == "-0.0\n"
+
+
+class TestCopyPropagation:
+    """Test copy propagation"""
+
+    def test_chain(self):
+        """Test uses of a copy chain read the original value"""
+        cfg = construct_ssa(build_cfg(func("main", [
+            read_n(),
+            VarDecl(None, "a", ident("n")),
+            VarDecl(None, "b", ident("a")),
+            call("printInt", ident("b")),
+        ])))
+        run_copy_propagation(cfg)
+        assert instructions(cfg) == ["n.1 = call readInt()", "call printInt(n.1)"]
+
+
+class TestGVN:
+    """Test global value numbering"""
+
+    def test_redundant_expression(self):
+        """Test a recomputed expression reuses the first result"""
+        cfg = construct_ssa(build_cfg(func("main", [
+            read_n(),
+            call("printInt", binop(ident("n"), "*", IntLiteral(3))),
+            call("printInt", binop(ident("n"), "*", IntLiteral(3))),
+        ])))
+        assert run_gvn(cfg) == 1
+        assert instructions(cfg)[-2:] == ["call printInt($2.1)", "call printInt($2.1)"]
+
+    def test_commutative(self):
+        """Test a + b and b + a get the same number"""
+        cfg = construct_ssa(build_cfg(func("f", [
+            call("printInt", binop(ident("a"), "+", ident("b"))),
+            call("printInt", binop(ident("b"), "+", ident("a"))),
+        ], [Param(IntType(), "a"), Param(IntType(), "b")])))
+        assert run_gvn(cfg) == 1
+
+    def test_not_across_sibling_branches(self):
+        """Test a value computed in one arm is not reused in the other"""
+        cfg = construct_ssa(build_cfg(func("main", [
+            read_n(),
+            IfStmt(ident("n"),
+                   call("printInt", binop(ident("n"), "-", IntLiteral(1))),
+                   call("printInt", binop(ident("n"), "-", IntLiteral(1)))),
+        ])))
+        assert run_gvn(cfg) == 0
+
+    def test_signed_zero_operands(self):
+        """Test x + 0.0 and x + -0.0 get different numbers"""
+        cfg = construct_ssa(build_cfg(func("f", [
+            call("printFloat", binop(ident("x"), "+", FloatLiteral(0.0))),
+            call("printFloat", binop(ident("x"), "+", PrefixOp("-", FloatLiteral(0.0)))),
+        ], [Param(FloatType(), "x")])))
+        run_sccp(cfg)
+        assert run_gvn(cfg) == 0
+        program = Program([func("main", [
+            VarDecl(FloatType(), "x", FuncCall("readFloat", [])),
+            call("printFloat", binop(ident("x"), "+", FloatLiteral(0.0))),
+            call("printFloat", binop(ident("x"), "+", PrefixOp("-", FloatLiteral(0.0)))),
+        ])])
+        assert run(program, "-0.0", True) == run(program, "-0.0") == "0.0\n-0.0\n"
+
+    def test_multiply_by_one(self):
+        """Test x * 1 is replaced by x"""
+        cfg = construct_ssa(build_cfg(func("f", [
+            ReturnStmt(binop(ident("x"), "*", IntLiteral(1))),
+        ], [Param(IntType(), "x")], IntType())))
+        run_gvn(cfg)
+        assert instructions(cfg) == []
+        assert str(cfg.blocks[0].terminator) == "return x"
+
+
+class TestDCE:
+    """Test dead-code elimination"""
+
+    def test_unused_values_removed(self):
+        """Test computations whose results are never used are deleted"""
+        cfg = construct_ssa(build_cfg(func("main", [
+            read_n(),
+            VarDecl(None, "a", binop(ident("n"), "+", IntLiteral(1))),
+            VarDecl(None, "b", binop(ident("a"), "*", IntLiteral(2))),
+        ])))
+        assert run_dce(cfg) == 2
+        assert instructions(cfg) == ["n.1 = call readInt()"]
+
+    def test_calls_kept(self):
+        """Test calls survive even when their result is unused"""
+        cfg = construct_ssa(build_cfg(func("main", [read_n()])))
+        run_dce(cfg)
+        assert isinstance(cfg.blocks[0].instructions[0], Call)
+
+    def test_possible_trap_kept(self):
+        """Test a division by a variable is kept since it may trap"""
+        cfg = construct_ssa(build_cfg(func("main", [
+            read_n(),
+            VarDecl(None, "q", binop(IntLiteral(1), "/", ident("n"))),
+        ])))
+        run_dce(cfg)
+        assert any(isinstance(i, BinOp) for i in cfg.blocks[0].instructions)
+
+    def test_dead_loop_phis_removed(self):
+        """Test a loop-carried value that is never read is deleted"""
+        cfg = construct_ssa(build_cfg(func("main", [
+            read_n(),
+            VarDecl(IntType(), "unused", IntLiteral(0)),
+            WhileStmt(ident("n"), BlockStmt([
+                assign("unused", binop(ident("unused"), "+", ident("n"))),
+                assign("n", binop(ident("n"), "-", IntLiteral(1))),
+            ])),
+        ])))
+        run_dce(cfg)
+        assert not any("unused" in s for s in instructions(cfg))
+
+
+class TestSimplifyCFG:
+    """Test control-flow simplification"""
+
+    def test_merges_straight_line_blocks(self):
+        """Test a folded if/else collapses into one block"""
+        cfg = construct_ssa(build_cfg(func("main", [
+            IfStmt(IntLiteral(1), call("printInt", IntLiteral(1)),
+                   call("printInt", IntLiteral(2))),
+            call("printInt", IntLiteral(3)),
+        ])))
+        run_simplify_cfg(cfg)
+        assert len(cfg.blocks) == 1
+        assert instructions(cfg) == ["call printInt(1)", "call printInt(3)"]
+
+    def test_phi_becomes_copy_on_merge(self):
+        """Test a phi with a single remaining predecessor becomes a copy"""
+        cfg = construct_ssa(build_cfg(func("main", [
+            VarDecl(IntType(), "x", IntLiteral(1)),
+            IfStmt(IntLiteral(0), assign("x", IntLiteral(2))),
+            call("printInt", ident("x")),
+        ])))
+        run_simplify_cfg(cfg)
+        assert len(cfg.blocks) == 1
+        assert not any(isinstance(i, Phi) for i in cfg.blocks[0].instructions)
+        assert any(isinstance(i, Copy) for i in cfg.blocks[0].instructions)
+
+
+# =============================================================================
+# PIPELINE
+# =============================================================================
+
+def sum_program():
+    return Program([
+        func("square", [ReturnStmt(binop(ident("x"), "*", ident("x")))],
+             [Param(IntType(), "x")], IntType()),
+        func("main", [
+            read_n(),
+            VarDecl(IntType(), "total", IntLiteral(0)),
+            VarDecl(IntType(), "scale", IntLiteral(2)),
+            ForStmt(
+                VarDecl(IntType(), "i", IntLiteral(0)),
+                binop(ident("i"), "<", ident("n")),
+                PrefixOp("++", ident("i")),
+                BlockStmt([
+                    VarDecl(None, "a", binop(ident("scale"), "*", ident("i"))),
+                    VarDecl(None, "b", binop(ident("scale"), "*", ident("i"))),
+                    IfStmt(binop(ident("scale"), ">", IntLiteral(5)),
+                           call("printInt", ident("a"))),
+                    assign("total", binop(ident("total"), "+",
+                                          binop(ident("b"), "+", FuncCall("square", [ident("i")])))),
+                ]),
+            ),
+            call("printInt", ident("total")),
+        ]),
+    ])
+
+
+class TestPipeline:
+    """Test the full optimization pipeline"""
+
+    def test_same_output(self):
+        """Test optimized and unoptimized programs print the same"""
+        for stdin in ("0", "1", "10"):
+            assert run(sum_program(), stdin, True) == run(sum_program(), stdin)
+
+    def test_reduces_instructions(self):
+        """Test the pipeline shrinks the program and reports it"""
+        cfg = build_cfgs(sum_program())["main"]
+        stats = optimize(cfg)
+        assert stats.after < stats.before
+        assert stats.after == cfg.instruction_count()
+        assert stats.changes["sccp"] > 0
+        assert stats.changes["gvn"] > 0
+        assert not cfg.ssa
+
+    def test_struct_copy_semantics(self):
+        """Test forwarding struct copies keeps value semantics"""
+        point = StructDecl("Point", [MemberDecl(IntType(), "x"), MemberDecl(IntType(), "y")])
+        program = Program([point, func("main", [
+            VarDecl(StructType("Point"), "p", StructLiteral([IntLiteral(1), IntLiteral(2)])),
+            VarDecl(StructType("Point"), "q", ident("p")),
+            ExprStmt(AssignExpr(MemberAccess(ident("p"), "x"), IntLiteral(9))),
+            call("printInt", MemberAccess(ident("q"), "x")),
+            call("printInt", MemberAccess(ident("p"), "x")),
+        ])])
+        assert run(program, optimized=True) == run(program) == "1\n9\n"
@@ -0,0 +1,115 @@
+"""
+Parallel parsing test cases for TyC compiler
+Programs parsed in pieces in worker processes must give the tree, node
+positions and errors of a serial parse.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+from tests.utils import corpus
+from src.compiler import parse as compile_parse
+from src.frontend.parallel import declaration_ends, parse_parallel, pool_context, split
+from src.frontend.parser import ASTParser
+from src.utils.nodes import ASTNode
+
+PROGRAM = """struct Point { int x; float y; } ;
+// a comment with } and ;
+int sum(Point p) {
+    string s = "}{;\\"";   /* } { */
+    auto q = {p.x, 2.5};
+    return p.x + q.x;
+}
+void main() { printInt(sum({1, 2.0})); }  int twice(int n) { return 2 * n; }
+"""
+
+
+def serial(source):
+    try:
+        return ASTParser(source).parse()
+    except Exception as e:
+        return str(e)
+
+
+def positions(node):
+    """(type, line, column) of every node, in a fixed order."""
+    result = [(type(node).__name__, node.line, node.column)]
+    for value in vars(node).values():
+        for child in value if isinstance(value, list) else [value]:
+            if isinstance(child, ASTNode):
+                result.extend(positions(child))
+    return result
+
+
+@pytest.fixture(scope="module")
+def pool():
+    with ProcessPoolExecutor(max_workers=2, mp_context=pool_context()) as executor:
+        yield executor
+
+
+def parallel(source, pool):
+    try:
+        return parse_parallel(source, chunk_size=1, executor=pool)
+    except Exception as e:
+        return str(e)
+
+
+class TestSplit:
+    """Test finding declaration boundaries"""
+
+    def test_declaration_ends(self):
+        """Test braces and semicolons in strings and comments are skipped"""
+        ends = declaration_ends(PROGRAM)
+        assert [PROGRAM[:end].rsplit("\n", 1)[-1] for end in ends] == [
+            "struct Point { int x; float y; } ;",
+            "}",
+            "void main() { printInt(sum({1, 2.0})); }",
+            "void main() { printInt(sum({1, 2.0})); }  int twice(int n) { return 2 * n; }",
+        ]
+
+    def test_unterminated(self):
+        """Test no cut is made past an unterminated string or comment"""
+        assert declaration_ends('void f() {} "a\\" } void g() {}') == [11]
+        assert declaration_ends("void f() {} /* void g() {}") == [11]
+
+    def test_positions(self):
+        """Test each piece starts at its line and column in the source"""
+        chunks = split(PROGRAM, 1)
+        assert "".join(text for text, _, _ in chunks) == PROGRAM
+        assert [(line, column) for _, line, column in chunks] == [(1, 0), (1, 34), (7, 1), (8, 40), (8, 76)]
+
+
+class TestParallel:
+    """Test parsing pieces in worker processes"""
+
+    def test_tree_and_positions(self, pool):
+        """Test the merged program and its node positions match a serial parse"""
+        program = parse_parallel(PROGRAM, chunk_size=1, executor=pool)
+        expected = ASTParser(PROGRAM).parse()
+        assert str(program) == str(expected)
+        assert positions(program) == positions(expected)
+
+    @pytest.mark.parametrize("source", corpus("test_parser.py", "Parser") + [
+        PROGRAM + "void f() { int x = ; }",
+        PROGRAM + "void f() { x + 1 = 2; }\nvoid g() { @ }",
+        "void f() { x + 1 = 2; }\n" + PROGRAM + "void g() { @ }",
+        PROGRAM + "void f() {",
+        PROGRAM + 'void f() { string s = "a\\q"; }',
+        PROGRAM + "void f() { } /* " + PROGRAM,
+        PROGRAM.replace("} ;", "}"),
+    ])
+    def test_same_as_serial(self, source, pool):
+        """Test trees and errors match a serial parse"""
+        assert str(parallel(source, pool)) == str(serial(source))
+
+    def test_own_pool(self):
+        """Test a pool of workers that are not forked is made for the call when none is given"""
+        assert pool_context().get_start_method() != "fork"
+        source = PROGRAM * 4
+        assert str(parse_parallel(source, workers=2, chunk_size=1)) == str(ASTParser(source).parse())
+
+    def test_compiler(self):
+        """Test compiler.parse with the parallel parser"""
+        assert str(compile_parse(PROGRAM, parser="parallel")) == str(ASTParser(PROGRAM).parse())
+        with pytest.raises(ValueError):
+            compile_parse(PROGRAM, lexer="antlr", parser="parallel")
@@ -0,0 +1,163 @@
+"""
+Profile-guided optimization test cases for TyC compiler
+"""
+
+import io
+
+from src.utils.nodes import *
+from tests.utils import func, ident
+from src.compiler import collect_profile, compile_program
+from src.ir.cfg import build_cfgs
+from src.ir.instructions import BinOp, Call, Const
+from src.ir.profile import ProgramProfile
+from src.optimizer.block_layout import run_block_layout
+from src.optimizer.inliner import Inliner
+from src.runtime.frames import TypedInterpreter
+from src.runtime.profiler import CountingProfiler
+
+
+def at(node, line, column=1):
+    node.line, node.column = line, column
+    return node
+
+
+def program():
+    """
+     1 int big(int x) { return x * x; }
+     2 int pick(int x) {
+     3     switch (x) {
+     4         case 2: return 20;
+     5         case 1: return 10;
+     6         case 0: return 0;
+     7     }
+     8     return -1;
+     9 }
+    10 void main() {
+    11     int i = 0;
+    12     int s = 0;
+    13     while (i < 10) {
+    14         if (i == 100) { printInt(big(i)); }
+    15         s = s + pick(i / 4);
+    16         i = i + 1;
+    17     }
+    18     printInt(s);
+    19 }
+    """
+    big = func("big", [ReturnStmt(BinaryOp(ident("x"), "*", ident("x")))],
+               [Param(IntType(), "x")], IntType())
+    cases = [
+        at(CaseStmt(IntLiteral(value), [ReturnStmt(IntLiteral(result))]), line, 9)
+        for value, result, line in ((2, 20, 4), (1, 10, 5), (0, 0, 6))
+    ]
+    pick = func("pick", [SwitchStmt(ident("x"), cases), ReturnStmt(IntLiteral(-1))],
+                [Param(IntType(), "x")], IntType())
+    main = func("main", [
+        VarDecl(IntType(), "i", IntLiteral(0)),
+        VarDecl(IntType(), "s", IntLiteral(0)),
+        WhileStmt(at(BinaryOp(ident("i"), "<", IntLiteral(10)), 13, 12), BlockStmt([
+            IfStmt(at(BinaryOp(ident("i"), "==", IntLiteral(100)), 14, 13), BlockStmt([
+                ExprStmt(FuncCall("printInt", [at(FuncCall("big", [ident("i")]), 14, 34)])),
+            ])),
+            ExprStmt(AssignExpr(ident("s"), BinaryOp(ident("s"), "+", at(FuncCall(
+                "pick", [BinaryOp(ident("i"), "/", IntLiteral(4))]), 15, 17)))),
+            ExprStmt(AssignExpr(ident("i"), BinaryOp(ident("i"), "+", IntLiteral(1)))),
+        ])),
+        ExprStmt(FuncCall("printInt", [ident("s")])),
+    ])
+    return Program([big, pick, main])
+
+
+def training_profile(engine="dict"):
+    return collect_profile(program(), io.StringIO(), io.StringIO(), engine)
+
+
+def run(compiled, engine="dict"):
+    out = io.StringIO()
+    compiled.run(io.StringIO(), out, engine)
+    return out.getvalue()
+
+
+def first_case_label(cfg):
+    for block in cfg.blocks:
+        for instr in block.instructions:
+            if isinstance(instr, BinOp) and instr.operator == "==":
+                return instr.right
+
+
+class TestCountingProfiler:
+    """Test the branch, loop and call counts collected for a program"""
+
+    def test_counts(self):
+        """Test counts are keyed by function and source position in both engines"""
+        for engine in ("dict", "typed"):
+            counts = training_profile(engine).to_dict()["functions"]
+            assert counts["main"]["branches"] == {"13:12": [10, 1], "14:13": [0, 10]}
+            assert counts["main"]["loops"] == {"13:12": [1, 10]}
+            assert counts["main"]["calls"] == {"14:34": 0, "15:17": 10}
+            assert counts["pick"]["branches"] == {"4:9": [2, 8], "5:9": [4, 4], "6:9": [4, 0]}
+
+    def test_save_and_load(self, tmp_path):
+        """Test a profile survives a round trip through its JSON file"""
+        profile = training_profile()
+        path = str(tmp_path / "program.profile.json")
+        profile.save(path)
+        assert ProgramProfile.load(path).to_dict() == profile.to_dict()
+
+    def test_counts_accumulate_over_runs(self):
+        """Test running an instrumented program twice adds up its counts"""
+        counter = CountingProfiler()
+        cfgs = counter.instrument(build_cfgs(program()))
+        for _ in range(2):
+            interpreter = TypedInterpreter(cfgs, {}, io.StringIO(), io.StringIO())
+            counter.install(interpreter)
+            interpreter.run()
+        assert counter.profile().to_dict()["functions"]["main"]["calls"]["15:17"] == 20
+
+
+class TestProfileGuidedOptimization:
+    """Test the optimizer decisions taken from a profile"""
+
+    def test_switch_cases_ordered_by_frequency(self):
+        """Test the most frequent case is tested first, ties in source order"""
+        cfgs = build_cfgs(program(), training_profile())
+        assert first_case_label(cfgs["pick"]) == Const(1)
+        assert first_case_label(build_cfgs(program())["pick"]) == Const(2)
+
+    def test_non_constant_cases_keep_source_order(self):
+        """Test cases whose labels are not constants are never reordered"""
+        prog = program()
+        pick = prog.decls[1].body.statements[0]
+        pick.cases[0].expr = ident("x")
+        cfgs = build_cfgs(prog, training_profile())
+        assert first_case_label(cfgs["pick"]) == "x"
+
+    def test_cold_call_site_not_inlined(self):
+        """Test a call site the profiled run never reached keeps its call"""
+        calls = lambda compiled: {
+            i.func for b in compiled.functions["main"].blocks for i in b.instructions
+            if isinstance(i, Call)
+        }
+        assert "big" not in calls(compile_program(program()))
+        assert "big" in calls(compile_program(program(), profile=training_profile()))
+
+    def test_hot_call_site_gets_larger_budget(self):
+        """Test a hot call site inlines a callee too big for the static budget"""
+        cfgs = build_cfgs(program())
+        assert Inliner(cfgs, max_callee_size=1).inline_calls(cfgs["main"]) == 0
+        inliner = Inliner(cfgs, max_callee_size=1, profile=training_profile())
+        assert inliner.inline_calls(cfgs["main"]) == 1
+
+    def test_cold_block_laid_out_last(self):
+        """Test a branch target never taken moves to the end of the function"""
+        cfg = build_cfgs(program())["main"]
+        assert run_block_layout(cfg, training_profile()) > 0
+        assert cfg.entry == 0
+        last = cfg.blocks[-1]
+        assert any(isinstance(i, Call) and i.func == "big" for i in last.instructions)
+
+    def test_same_output_with_profile(self):
+        """Test a profile-guided build computes what the static build does"""
+        static = compile_program(program())
+        guided = compile_program(program(), profile=training_profile())
+        for engine in ("dict", "typed"):
+            assert run(static, engine) == run(guided, engine) == "80\n"
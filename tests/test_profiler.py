@@ -0,0 +1,121 @@
+"""
+Profiler test cases for TyC compiler
+"""
+
+import io
+import itertools
+import json
+
+import pytest
+from src.utils.nodes import *
+from tests.utils import call, func, ident
+from src.ir.cfg import build_cfgs
+from src.runtime.frames import TypedInterpreter
+from src.runtime.interpreter import Interpreter
+from src.runtime.profiler import ENTER_HOOK, Profiler
+
+
+def at(node, line):
+    node.line, node.column = line, 1
+    if isinstance(node, ExprStmt):
+        at(node.expr, line)
+    return node
+
+
+def program():
+    """
+    1 int sq(int x) {
+    2     return x * x;
+    3 }
+    4 void main() {
+    5     int i = 0;
+    6     while (i < 3) {
+    7         printInt(sq(i));
+    8         i = i + 1;
+    9     }
+   10 }
+    """
+    sq = func("sq", [at(ReturnStmt(at(BinaryOp(ident("x"), "*", ident("x")), 2)), 2)],
+              [Param(IntType(), "x")], IntType())
+    main = func("main", [
+        at(VarDecl(IntType(), "i", at(IntLiteral(0), 5)), 5),
+        at(WhileStmt(at(BinaryOp(ident("i"), "<", IntLiteral(3)), 6), BlockStmt([
+            at(call("printInt", at(FuncCall("sq", [ident("i")]), 7)), 7),
+            at(ExprStmt(at(AssignExpr(ident("i"), at(BinaryOp(ident("i"), "+", IntLiteral(1)), 8)),
+                           8)), 8),
+        ])), 6),
+    ])
+    return build_cfgs(Program([sq, main]))
+
+
+def profile(engine=Interpreter):
+    profiler = Profiler(clock=itertools.count().__next__)
+    cfgs = profiler.instrument(program())
+    out = io.StringIO()
+    interpreter = engine(cfgs, {}, io.StringIO(), out)
+    profiler.install(interpreter)
+    interpreter.run()
+    return profiler, out.getvalue()
+
+
+class TestProfiler:
+    """Test the counters collected by the profiler"""
+
+    @pytest.mark.parametrize("engine", [Interpreter, TypedInterpreter])
+    def test_call_and_line_counts(self, engine):
+        """Test calls and source lines are counted in both engines"""
+        profiler, out = profile(engine)
+        assert out == "0\n1\n4\n"
+        assert profiler.functions["sq"].calls == 3 and profiler.functions["main"].calls == 1
+        assert profiler.lines[2] == 3 and profiler.lines[6] == 4 and profiler.lines[8] == 3
+
+    def test_inclusive_and_exclusive_time(self):
+        """Test callee time counts as inclusive but not exclusive time"""
+        profiler, _ = profile()
+        main, sq = profiler.functions["main"], profiler.functions["sq"]
+        assert main.inclusive == main.exclusive + sq.inclusive
+        assert sq.inclusive == sq.exclusive > 0
+
+    def test_exports(self):
+        """Test collapsed stacks and the JSON summary"""
+        profiler, _ = profile()
+        stacks = dict(line.rsplit(" ", 1) for line in profiler.collapsed().splitlines())
+        assert set(stacks) == {"main", "main;sq"}
+        summary = json.loads(profiler.to_json())
+        assert summary["functions"]["sq"]["calls"] == 3
+        assert summary["lines"]["7"] == 3
+
+    def test_uninstrumented_program_unchanged(self):
+        """Test instrumenting copies the CFGs and leaves them untouched"""
+        cfgs = program()
+        before = {name: str(cfg) for name, cfg in cfgs.items()}
+        instrumented = Profiler().instrument(cfgs)
+        assert {name: str(cfg) for name, cfg in cfgs.items()} == before
+        assert ENTER_HOOK in str(instrumented["main"]) and ENTER_HOOK not in before["main"]
+
+    def test_stacks(self):
+        """Test each call stack is reported once, in order, with its own time"""
+        profiler = Profiler(clock=itertools.count().__next__)
+        for name in ("main", "f", "g"):
+            profiler.enter(name)
+        for name in ("g", "f"):
+            profiler.exit(name)
+        profiler.enter("a-b")
+        profiler.exit("a-b")
+        profiler.enter("f")
+        profiler.exit("f")
+        profiler.exit("main")
+        assert profiler.collapsed() == "main 4000000\nmain;a-b 1000000\nmain;f 3000000\nmain;f;g 1000000\n"
+        assert profiler.stacks == {("main",): 4, ("main", "a-b"): 1, ("main", "f"): 3, ("main", "f", "g"): 1}
+
+    def test_deep_recursion(self):
+        """Test deep recursion is profiled in linear time and memory"""
+        profiler = Profiler(clock=itertools.count().__next__)
+        depth = 200000
+        for _ in range(depth):
+            profiler.enter("f")
+        for _ in range(depth):
+            profiler.exit("f")
+        assert profiler.functions["f"].calls == depth
+        assert profiler.functions["f"].inclusive == 2 * depth - 1
+
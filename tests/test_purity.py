@@ -0,0 +1,116 @@
+"""
+Purity analysis and memoization test cases for TyC compiler
+"""
+
+import io
+
+import pytest
+from src.utils.nodes import *
+from tests.utils import call, func, ident
+from src.ir.cfg import build_cfgs
+from src.ir.purity import PurityAnalysis, find_pure_functions
+from src.runtime.frames import TypedInterpreter
+from src.runtime.interpreter import Interpreter
+from src.runtime.memo import MemoCache, memo_key
+
+
+def int_params(*names):
+    return [Param(IntType(), n) for n in names]
+
+
+def fib_func():
+    return func("fib", [
+        IfStmt(BinaryOp(ident("n"), "<", IntLiteral(2)), ReturnStmt(ident("n"))),
+        ReturnStmt(BinaryOp(FuncCall("fib", [BinaryOp(ident("n"), "-", IntLiteral(1))]), "+",
+                            FuncCall("fib", [BinaryOp(ident("n"), "-", IntLiteral(2))]))),
+    ], int_params("n"), IntType())
+
+
+def fib_main():
+    return func("main", [call("printInt", FuncCall("fib", [FuncCall("readInt", [])]))])
+
+
+class TestPurityAnalysis:
+    """Test which functions are found pure"""
+
+    def test_recursive_arithmetic_is_pure(self):
+        """Test a recursive function over ints is pure and main is not"""
+        assert find_pure_functions(build_cfgs(Program([fib_func(), fib_main()]))) == {"fib"}
+
+    def test_io_is_impure_transitively(self):
+        """Test I/O makes a function and its callers impure"""
+        log = func("log", [call("printInt", ident("n")), ReturnStmt(ident("n"))],
+                   int_params("n"), IntType())
+        twice = func("twice", [ReturnStmt(BinaryOp(FuncCall("log", [ident("n")]), "*",
+                                                   IntLiteral(2)))],
+                     int_params("n"), IntType())
+        analysis = PurityAnalysis(build_cfgs(Program([log, twice, fib_main()])))
+        assert analysis.run() == set()
+        assert analysis.reasons["log"] == "calls I/O builtin printInt"
+        assert analysis.reasons["twice"] == "calls impure function log"
+
+    def test_mutual_recursion(self):
+        """Test mutually recursive pure functions are pure together"""
+        even = func("even", [
+            IfStmt(BinaryOp(ident("n"), "==", IntLiteral(0)), ReturnStmt(IntLiteral(1))),
+            ReturnStmt(FuncCall("odd", [BinaryOp(ident("n"), "-", IntLiteral(1))])),
+        ], int_params("n"), IntType())
+        odd = func("odd", [
+            IfStmt(BinaryOp(ident("n"), "==", IntLiteral(0)), ReturnStmt(IntLiteral(0))),
+            ReturnStmt(FuncCall("even", [BinaryOp(ident("n"), "-", IntLiteral(1))])),
+        ], int_params("n"), IntType())
+        assert find_pure_functions(build_cfgs(Program([even, odd]))) == {"even", "odd"}
+
+    def test_struct_signature_is_impure(self):
+        """Test functions taking or returning structs are not memoized"""
+        point = StructDecl("P", [MemberDecl(IntType(), "x")])
+        get_x = func("getX", [ReturnStmt(MemberAccess(ident("p"), "x"))],
+                     [Param(StructType("P"), "p")], IntType())
+        analysis = PurityAnalysis(build_cfgs(Program([point, get_x])), {"P": point})
+        assert analysis.run() == set()
+        assert "parameter p" in analysis.reasons["getX"]
+
+
+class TestMemoCache:
+    """Test the bounded LRU caches"""
+
+    def test_lru_eviction_and_counters(self):
+        """Test the least recently used entry is evicted first"""
+        cache = MemoCache("f", maxsize=2)
+        cache.store((1,), 10)
+        cache.store((2,), 20)
+        assert cache.lookup((1,)) == (True, 10)
+        cache.store((3,), 30)
+        assert cache.lookup((2,)) == (False, None)
+        assert cache.lookup((3,)) == (True, 30)
+        assert (cache.hits, cache.misses, len(cache.entries)) == (2, 1, 2)
+        assert str(cache) == "f: 2 hits, 1 misses (66.7%), 2/2 entries"
+
+    def test_signed_zero_keys(self):
+        """Test 0.0 and -0.0 arguments are cached separately"""
+        assert memo_key([0.0]) != memo_key([-0.0])
+        assert memo_key([1, "a"]) == (1, "a")
+
+
+class TestMemoizedExecution:
+    """Test memoized calls in both interpreters"""
+
+    @pytest.mark.parametrize("engine", [Interpreter, TypedInterpreter])
+    def test_fib_is_linear(self, engine):
+        """Test memoized fib computes each value once"""
+        cfgs = build_cfgs(Program([fib_func(), fib_main()]))
+        out = io.StringIO()
+        interpreter = engine(cfgs, {}, io.StringIO("30"), out, memoize={"fib"}, memo_size=64)
+        interpreter.run()
+        assert out.getvalue() == "832040\n"
+        cache = interpreter.memo["fib"]
+        assert cache.misses == 31 and cache.hits == 28
+
+    @pytest.mark.parametrize("engine", [Interpreter, TypedInterpreter])
+    def test_small_cache_stays_correct(self, engine):
+        """Test results stay correct when the cache evicts entries"""
+        cfgs = build_cfgs(Program([fib_func(), fib_main()]))
+        out = io.StringIO()
+        interpreter = engine(cfgs, {}, io.StringIO("15"), out, memoize={"fib"}, memo_size=1)
+        interpreter.run()
+        assert out.getvalue() == "610\n" and len(interpreter.memo["fib"].entries) == 1
@@ -0,0 +1,106 @@
+"""
+Error recovery test cases for TyC compiler
+A recovering parse reports every lexical and syntax error in one pass;
+the default parse still stops at the first.
+"""
+
+import pytest
+from tests.utils import Parser, corpus
+from build.TyCLexer import TyCLexer
+from src.compiler import diagnose, parse as compile_parse
+from src.frontend.charstream import CodePointStream
+from src.frontend.recovery import RecoveringLexer, collect_errors
+from src.frontend.scanner import TyCScanner
+from src.utils.error_listener import CollectingErrorListener, SyntaxException
+from tests.test_scanner import EDGE_CASES
+
+SOURCE = """void main() {
+  int x = ;
+  string s = "a\\q";
+  y = @ 3;
+  if (x) { z = ; }
+  "open
+  return 1
+}
+int f( { }
+"""
+
+
+def recovered(token_source):
+    """(type, text, line, column, channel) of every token, and the errors."""
+    listener = CollectingErrorListener()
+    lexer = RecoveringLexer(token_source, listener)
+    tokens = []
+    for token in iter(lexer.nextToken, None):
+        tokens.append((token.type, token.text, token.line, token.column, token.channel))
+        if token.type == -1:
+            break
+    return tokens, [repr(d) for d in listener.diagnostics]
+
+
+class TestRecoveringLexer:
+    """Test lexing past lexical errors"""
+
+    @pytest.mark.parametrize("source", corpus("test_lexer.py", "Tokenizer") + EDGE_CASES + [SOURCE])
+    def test_scanner_and_lexer_agree(self, source):
+        """Test the scanner's error tokens match those built from TyCLexer's errors"""
+        assert recovered(TyCScanner(source, recover=True)) == recovered(TyCLexer(CodePointStream(source)))
+
+    def test_error_tokens(self):
+        """Test bad lexemes become hidden tokens and lexing goes on"""
+        tokens, errors = recovered(TyCScanner('a @ "b\\q x "c\nd', recover=True))
+        assert [(t[1], t[4]) for t in tokens] == [
+            ("a", 0), ("@", 1), ('"b\\q', 1), ("x", 0), ('"c\n', 1), ("d", 0), ("<EOF>", 0),
+        ]
+        assert errors == [
+            "Diagnostic(1, 2, 'Error Token @')",
+            "Diagnostic(1, 4, 'Illegal Escape In String: b\\\\q')",
+            "Diagnostic(1, 11, 'Unclosed String: c')",
+        ]
+
+
+class TestCollectErrors:
+    """Test collecting every error of a program"""
+
+    def test_all_errors(self):
+        """Test lexical and syntax errors are all reported, in order"""
+        assert [(d.line, d.column, str(d)) for d in collect_errors(SOURCE)] == [
+            (2, 10, "Error on line 2 col 10: ;"),
+            (3, 13, "Illegal Escape In String: a\\q"),
+            (3, 17, "Unclosed String: ;"),
+            (4, 6, "Error Token @"),
+            (5, 15, "Error on line 5 col 15: ;"),
+            (6, 2, "Unclosed String: open"),
+            (7, 2, "Error on line 7 col 2: return"),
+            (9, 7, "Error on line 9 col 7: {"),
+        ]
+
+    def test_limit(self):
+        """Test collection stops at the limit"""
+        assert [str(d) for d in collect_errors(SOURCE, 2)] == [
+            "Error on line 2 col 10: ;",
+            "Illegal Escape In String: a\\q",
+        ]
+
+    @pytest.mark.parametrize("lexer", ["scanner", "antlr"])
+    def test_lexers(self, lexer):
+        """Test both lexers give the same diagnostics"""
+        assert [repr(d) for d in diagnose(SOURCE, lexer=lexer)] == [repr(d) for d in collect_errors(SOURCE)]
+
+    @pytest.mark.parametrize("source", corpus("test_parser.py", "Parser"))
+    def test_parser_corpus(self, source):
+        """Test valid programs have no errors and invalid ones report the first syntax error"""
+        expected = Parser(source).parse()
+        errors = collect_errors(source)
+        if expected == "success":
+            assert errors == []
+        else:
+            assert errors
+            if expected.startswith("Error on line"):
+                assert str(errors[0]) == expected
+
+    def test_default_stops_at_first_error(self):
+        """Test parse() still raises the first error only"""
+        with pytest.raises(SyntaxException) as e:
+            compile_parse(SOURCE)
+        assert e.value.message == "Error on line 2 col 10: ;"
@@ -0,0 +1,144 @@
+"""
+Escape analysis and scalar replacement test cases for TyC compiler
+"""
+
+import io
+
+from src.utils.nodes import *
+from tests.utils import call, func, ident
+from src.ir.cfg import build_cfgs
+from src.ir.instructions import GetField, MakeStruct, SetField
+from src.ir.ssa import construct_ssa
+from src.optimizer.pipeline import optimize_all
+from src.optimizer.scalar_replacement import ScalarReplacement
+from src.runtime.interpreter import Interpreter
+
+
+def member(obj, *path):
+    node = ident(obj)
+    for name in path:
+        node = MemberAccess(node, name)
+    return node
+
+
+def store(target, value):
+    return ExprStmt(AssignExpr(target, value))
+
+
+VEC = StructDecl("Vec", [MemberDecl(IntType(), "x"), MemberDecl(IntType(), "y")])
+SEG = StructDecl("Seg", [MemberDecl(StructType("Vec"), "a"), MemberDecl(StructType("Vec"), "b")])
+STRUCTS = {"Vec": VEC, "Seg": SEG}
+
+
+def struct_instructions(cfg):
+    return [
+        i for b in cfg.blocks for i in b.instructions
+        if isinstance(i, (GetField, SetField, MakeStruct))
+    ]
+
+
+def compile_and_run(decls, stdin=""):
+    """Output before optimization and after, and the optimized CFGs."""
+    outputs = []
+    for optimize in (False, True):
+        cfgs = build_cfgs(Program(decls))
+        if optimize:
+            optimize_all(cfgs, structs=STRUCTS)
+        out = io.StringIO()
+        Interpreter(cfgs, STRUCTS, io.StringIO(stdin), out).run()
+        outputs.append(out.getvalue())
+    return outputs, cfgs
+
+
+def loop_program(*extra):
+    """Accumulate into a local Vec in a loop, then print its members."""
+    return func("main", [
+        VarDecl(StructType("Vec"), "v", StructLiteral([IntLiteral(1), IntLiteral(2)])),
+        VarDecl(None, "n", FuncCall("readInt", [])),
+        WhileStmt(BinaryOp(ident("n"), ">", IntLiteral(0)), BlockStmt([
+            store(member("v", "x"), BinaryOp(member("v", "x"), "+", member("v", "y"))),
+            store(ident("n"), BinaryOp(ident("n"), "-", IntLiteral(1))),
+        ])),
+        call("printInt", member("v", "x")),
+    ] + list(extra))
+
+
+class TestEscapeAnalysis:
+    """Test which struct values escape"""
+
+    def analyze(self, decls):
+        cfg = construct_ssa(build_cfgs(Program(decls))["main"])
+        analysis = ScalarReplacement(cfg, STRUCTS)
+        analysis.analyze()
+        return analysis, cfg
+
+    def test_local_values_do_not_escape(self):
+        """Test a literal only read and updated locally"""
+        analysis, cfg = self.analyze([VEC, loop_program()])
+        structs = [i.dest for b in cfg.blocks for i in b.instructions
+                   if i.dest and analysis.is_struct(i.dest)]
+        assert structs and all(analysis.replaceable(v) for v in structs)
+
+    def test_call_argument_escapes(self):
+        """Test passing any value of a web to a call makes it escape"""
+        use = func("use", [], [Param(StructType("Vec"), "p")])
+        analysis, cfg = self.analyze([VEC, use, loop_program(call("use", ident("v")))])
+        structs = [i.dest for b in cfg.blocks for i in b.instructions
+                   if i.dest and analysis.is_struct(i.dest)]
+        assert structs and not any(analysis.replaceable(v) for v in structs)
+
+    def test_returned_value_escapes(self):
+        """Test a returned struct is kept"""
+        make = func("main", [
+            VarDecl(StructType("Vec"), "v", StructLiteral([IntLiteral(1), IntLiteral(2)])),
+            ReturnStmt(ident("v")),
+        ], return_type=StructType("Vec"))
+        analysis, cfg = self.analyze([VEC, make])
+        assert analysis.escaping
+
+
+class TestScalarReplacement:
+    """Test struct values are replaced by scalars"""
+
+    def test_loop_carried_struct(self):
+        """Test a struct updated in a loop becomes scalar phis"""
+        (base, opt), cfgs = compile_and_run([VEC, loop_program()], "4")
+        assert base == opt == "9\n"
+        assert struct_instructions(cfgs["main"]) == []
+
+    def test_nested_structs_are_flattened(self):
+        """Test nested literals, nested stores and whole-member copies"""
+        main = func("main", [
+            VarDecl(StructType("Seg"), "s", StructLiteral([
+                StructLiteral([IntLiteral(1), IntLiteral(2)]),
+                StructLiteral([IntLiteral(3), IntLiteral(4)]),
+            ])),
+            VarDecl(StructType("Vec"), "t", member("s", "a")),
+            store(member("s", "a"), member("s", "b")),
+            store(member("s", "b", "y"), FuncCall("readInt", [])),
+            call("printInt", member("s", "a", "x")),
+            call("printInt", member("s", "b", "y")),
+            call("printInt", member("t", "y")),
+        ])
+        (base, opt), cfgs = compile_and_run([VEC, SEG, main], "9")
+        assert base == opt == "3\n9\n2\n"
+        assert struct_instructions(cfgs["main"]) == []
+
+    def test_declared_struct_defaults(self):
+        """Test a struct declared without initializer starts zeroed"""
+        main = func("main", [
+            VarDecl(StructType("Seg"), "s"),
+            store(member("s", "a", "x"), IntLiteral(5)),
+            call("printInt", BinaryOp(member("s", "a", "x"), "+", member("s", "b", "y"))),
+        ])
+        (base, opt), cfgs = compile_and_run([VEC, SEG, main])
+        assert base == opt == "5\n"
+        assert struct_instructions(cfgs["main"]) == []
+
+    def test_inlined_argument_is_replaced(self):
+        """Test a struct passed to a call that gets inlined no longer escapes"""
+        show = func("show", [call("printInt", member("p", "x"))],
+                    [Param(StructType("Vec"), "p")])
+        (base, opt), cfgs = compile_and_run([VEC, show, loop_program(call("show", ident("v")))], "2")
+        assert base == opt == "5\n5\n"
+        assert struct_instructions(cfgs["main"]) == []
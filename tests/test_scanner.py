@@ -0,0 +1,117 @@
+"""
+Scanner test cases for TyC compiler
+The hand-written scanner is checked against the generated lexer on every
+input of the lexer and parser test suites.
+"""
+
+import pytest
+from tests.utils import Parser, corpus
+from antlr4 import CommonTokenStream, InputStream
+from build.TyCLexer import TyCLexer
+from build.TyCParser import TyCParser
+from src.frontend.scanner import TyCScanner
+from src.frontend.tokens import KEYWORDS, OPERATORS, SYMBOLIC_NAMES
+from src.compiler import parse as compile_parse
+from src.utils.error_listener import NewErrorListener, SyntaxException
+
+
+def tokens(source):
+    """(type, text, line, column, start, stop) of every token, ending with
+    the lexical error, if any."""
+    result = []
+    try:
+        for token in iter(source.nextToken, None):
+            result.append((token.type, token.text, token.line, token.column, token.start, token.stop))
+            if token.type == -1:
+                return result
+    except Exception as e:
+        result.append((type(e).__name__, str(e)))
+    return result
+
+
+def scan(source):
+    return tokens(TyCScanner(source))
+
+
+def antlr(source):
+    return tokens(TyCLexer(InputStream(source)))
+
+
+def parse(token_source):
+    parser = TyCParser(CommonTokenStream(token_source))
+    parser.removeErrorListeners()
+    parser.addErrorListener(NewErrorListener.INSTANCE)
+    try:
+        parser.program()
+        return "success"
+    except Exception as e:
+        return str(e)
+
+
+EDGE_CASES = [
+    "1.e5 .5e-3 1e 1e+ 1.2.3 ..5 1..2 0. 12abc",
+    '"a\\',
+    '"a\\\r\nb',
+    '"x\r',
+    '"abc\\\n',
+    '"',
+    '"\\"" x',
+    "/* open",
+    "/*/ */ a",
+    "a & b | c",
+    "\x0b",
+    "a\r\nb\n  c\r d",
+    'x = "naïve" + y;',
+]
+
+
+class TestDifferential:
+    """Test the scanner against the generated lexer"""
+
+    @pytest.mark.parametrize("source", corpus("test_lexer.py", "Tokenizer"))
+    def test_lexer_corpus(self, source):
+        """Test tokens and errors on the lexer test inputs"""
+        assert scan(source) == antlr(source)
+
+    @pytest.mark.parametrize("source", corpus("test_parser.py", "Parser") + EDGE_CASES)
+    def test_parser_corpus(self, source):
+        """Test tokens and errors on the parser test inputs and edge cases"""
+        assert scan(source) == antlr(source)
+
+    @pytest.mark.parametrize("source", corpus("test_parser.py", "Parser"))
+    def test_plugs_into_parser(self, source):
+        """Test TyCParser accepts and rejects the same programs with the scanner"""
+        assert parse(TyCScanner(source)) == Parser(source).parse()
+
+
+class TestScanner:
+    """Test the scanner on its own"""
+
+    def test_token_tables(self):
+        """Test the token numbers agree with the generated lexer"""
+        assert SYMBOLIC_NAMES == list(TyCLexer.symbolicNames)
+        for word, kind in KEYWORDS.items():
+            assert scan(word)[0][:2] == (kind, word)
+        for text, kind in OPERATORS.items():
+            assert scan(text)[0][:2] == (kind, text)
+
+    def test_errors(self):
+        """Test the lexer error messages"""
+        assert scan('"ab\\q"')[-1] == ("IllegalEscape", "Illegal Escape In String: ab\\q")
+        assert scan('x "ab\r\n')[-1] == ("UncloseString", "Unclosed String: ab")
+        assert scan("a @")[-1] == ("ErrorToken", "Error Token @")
+
+    def test_input_stream_and_eof(self):
+        """Test an InputStream source and repeated EOF tokens"""
+        scanner = TyCScanner(InputStream("int x;\n"))
+        assert [t.text for t in scanner.tokens()] == ["int", "x", ";", "<EOF>"]
+        assert scanner.nextToken().type == -1
+        assert (scanner.line, scanner.column) == (2, 0)
+
+    def test_syntax_error_before_lexical_error(self):
+        """Test buffering all tokens keeps an earlier syntax error first"""
+        source = "void main() { int x = ; }\nvoid f() { @ }"
+        for lexer in ("scanner", "antlr"):
+            with pytest.raises(SyntaxException) as e:
+                compile_parse(source, lexer=lexer)
+            assert e.value.message == Parser(source).parse() == "Error on line 1 col 22: ;"
@@ -0,0 +1,219 @@
+"""
+Compile service test cases for TyC compiler
+Concurrent requests for the same source are compiled once, callers time
+out or are cancelled on their own, and a deep queue refuses new work.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from src.daemon import respond
+from src.service import CompileService, Overloaded
+
+GOOD = "int twice(int n) { return 2 * n; } void main() { printInt(twice(21)); }"
+WARNS = "void main() { int x; printInt(x); }"
+
+
+class Gate:
+    """Stand-in for the work done in a worker: each call is recorded and
+    held until the gate opens."""
+
+    def __init__(self):
+        self.open = threading.Event()
+        self.calls = []
+        self.running = self.most_running = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, op, source, lexer, parser):
+        with self._lock:
+            self.calls.append(source)
+            self.running += 1
+            self.most_running = max(self.most_running, self.running)
+        try:
+            self.open.wait(5)
+            return respond(op, source, lexer, parser)
+        finally:
+            with self._lock:
+                self.running -= 1
+
+
+@pytest.fixture
+def gate(monkeypatch):
+    gate = Gate()
+    monkeypatch.setattr("src.service.respond", gate)
+    yield gate
+    gate.open.set()
+
+
+@pytest.fixture
+def threads():
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        yield executor
+
+
+async def settle():
+    """Let every ready task run until it blocks."""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class TestService:
+    """Test requests in worker processes"""
+
+    def test_responses(self):
+        """Test responses match the daemon's"""
+        sources = [("check", WARNS), ("compile", GOOD), ("check", "void main() { y = 1; }"), ("tokenize", 'a @ "b')]
+
+        async def main():
+            async with CompileService(workers=2) as service:
+                return await asyncio.gather(*(service.submit(op, source) for op, source in sources))
+
+        assert asyncio.run(main()) == [respond(op, source) for op, source in sources]
+
+    def test_unknown_op(self, threads):
+        """Test only source requests are served"""
+        with pytest.raises(ValueError):
+            asyncio.run(CompileService(executor=threads).submit("shutdown", ""))
+
+
+class TestCoalescing:
+    """Test sharing work between identical requests"""
+
+    def test_identical_requests(self, gate, threads):
+        """Test requests for one source in flight together are compiled once"""
+
+        async def main():
+            service = CompileService(workers=2, executor=threads)
+            requests = [asyncio.ensure_future(service.submit("check", WARNS)) for _ in range(10)]
+            other = asyncio.ensure_future(service.submit("check", GOOD))
+            compiled = asyncio.ensure_future(service.submit("compile", WARNS))
+            await settle()
+            gate.open.set()
+            responses = await asyncio.gather(*requests)
+            await asyncio.gather(other, compiled)
+            return service, responses
+
+        service, responses = asyncio.run(main())
+        assert responses == [respond("check", WARNS)] * 10
+        assert sorted(gate.calls) == sorted([WARNS, GOOD, WARNS])
+        assert (service.stats.requests, service.stats.coalesced, service.stats.completed) == (12, 9, 12)
+
+    def test_not_a_cache(self, gate, threads):
+        """Test a request after the first has finished is compiled again"""
+        gate.open.set()
+
+        async def main():
+            service = CompileService(executor=threads)
+            await service.submit("check", GOOD)
+            await service.submit("check", GOOD)
+
+        asyncio.run(main())
+        assert gate.calls == [GOOD, GOOD]
+
+
+class TestTimeouts:
+    """Test per-request timeouts and cancellation"""
+
+    def test_timeout(self, gate, threads):
+        """Test a caller times out alone while another sharing its work waits on"""
+
+        async def main():
+            service = CompileService(executor=threads)
+            patient = asyncio.ensure_future(service.submit("check", GOOD, timeout=5))
+            with pytest.raises(asyncio.TimeoutError):
+                await service.submit("check", GOOD, timeout=0.05)
+            gate.open.set()
+            return service, await patient
+
+        service, response = asyncio.run(main())
+        assert response == respond("check", GOOD)
+        assert gate.calls == [GOOD]
+        assert (service.stats.timed_out, service.stats.completed) == (1, 1)
+
+    def test_abandoned_work(self, gate, threads):
+        """Test work no caller waits for is dropped, and not started if still queued"""
+
+        async def main():
+            service = CompileService(workers=1, executor=threads)
+            running = asyncio.ensure_future(service.submit("check", GOOD))
+            await settle()
+            queued = asyncio.ensure_future(service.submit("check", WARNS))
+            await settle()
+            assert service.depth == 1
+            queued.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await queued
+            await settle()
+            assert service.depth == 0
+            # A new request for the abandoned source starts afresh.
+            again = asyncio.ensure_future(service.submit("check", WARNS))
+            await settle()
+            gate.open.set()
+            await asyncio.gather(running, again)
+            return service
+
+        service = asyncio.run(main())
+        assert gate.calls == [GOOD, WARNS]
+        assert service.stats.cancelled == 1
+
+    def test_abandoned_work_keeps_its_worker(self, gate, threads):
+        """Test a cancelled job that is running holds its slot until its worker is done"""
+
+        async def main():
+            service = CompileService(workers=1, executor=threads)
+            running = asyncio.ensure_future(service.submit("check", GOOD))
+            await settle()
+            running.cancel()
+            await asyncio.gather(running, return_exceptions=True)
+            waiting = asyncio.ensure_future(service.submit("check", WARNS))
+            await settle()
+            assert gate.calls == [GOOD] and service.depth == 1
+            gate.open.set()
+            return await waiting
+
+        assert asyncio.run(main()) == respond("check", WARNS)
+        assert gate.calls == [GOOD, WARNS]
+        assert gate.most_running == 1
+
+    def test_close(self, gate, threads):
+        """Test closing the service cancels its callers"""
+
+        async def main():
+            service = CompileService(executor=threads)
+            waiting = asyncio.ensure_future(service.submit("check", GOOD))
+            await settle()
+            await service.close()
+            gate.open.set()
+            return await asyncio.gather(waiting, return_exceptions=True)
+
+        (result,) = asyncio.run(main())
+        assert isinstance(result, asyncio.CancelledError)
+
+
+class TestBackpressure:
+    """Test refusing work when the queue is deep"""
+
+    def test_overloaded(self, gate, threads):
+        """Test new sources are refused once max_queue wait, while duplicates still join"""
+
+        async def main():
+            service = CompileService(workers=1, max_queue=2, executor=threads)
+            first = asyncio.ensure_future(service.submit("check", GOOD))
+            await settle()
+            queued = [asyncio.ensure_future(service.submit("check", WARNS + " " * i)) for i in range(2)]
+            await settle()
+            assert service.depth == 2
+            with pytest.raises(Overloaded):
+                await service.submit("check", "void main() {}")
+            duplicate = asyncio.ensure_future(service.submit("check", WARNS))
+            gate.open.set()
+            await asyncio.gather(first, duplicate, *queued)
+            assert service.depth == 0
+            await service.submit("check", "void main() {}")
+            return service
+
+        service = asyncio.run(main())
+        assert (service.stats.rejected, service.stats.coalesced) == (1, 1)
+        assert len(gate.calls) == 4
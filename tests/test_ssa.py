@@ -0,0 +1,227 @@
+"""
+SSA construction and destruction test cases for TyC compiler
+"""
+
+import io
+
+from src.utils.nodes import *
+from tests.utils import call, func, ident
+from src.ir.cfg import build_cfg, build_cfgs
+from src.ir.dominance import dominance_frontiers, dominates, immediate_dominators
+from src.ir.instructions import Copy, Phi, SetField, UNDEF
+from src.ir.ssa import construct_ssa, destruct_ssa, sequentialize_copies
+from src.runtime.interpreter import Interpreter
+
+
+def assign(name, expr):
+    return ExprStmt(AssignExpr(ident(name), expr))
+
+
+def run(program, stdin="", transform=None):
+    cfgs = build_cfgs(program)
+    if transform is not None:
+        for cfg in cfgs.values():
+            transform(cfg)
+    out = io.StringIO()
+    structs = {d.name: d for d in program.decls if isinstance(d, StructDecl)}
+    Interpreter(cfgs, structs, io.StringIO(stdin), out).run()
+    return out.getvalue()
+
+
+def diamond():
+    """if (n) x = 1; else x = 2; printInt(x);"""
+    return func("main", [
+        VarDecl(None, "n", FuncCall("readInt", [])),
+        VarDecl(IntType(), "x"),
+        IfStmt(ident("n"), assign("x", IntLiteral(1)), assign("x", IntLiteral(2))),
+        call("printInt", ident("x")),
+    ])
+
+
+def counting_loop():
+    """int s = 0; for (int i = 0; i < n; ++i) s = s + i; printInt(s);"""
+    return func("main", [
+        VarDecl(None, "n", FuncCall("readInt", [])),
+        VarDecl(IntType(), "s", IntLiteral(0)),
+        ForStmt(
+            VarDecl(IntType(), "i", IntLiteral(0)),
+            BinaryOp(ident("i"), "<", ident("n")),
+            PrefixOp("++", ident("i")),
+            assign("s", BinaryOp(ident("s"), "+", ident("i"))),
+        ),
+        call("printInt", ident("s")),
+    ])
+
+
+def single_assignment(cfg):
+    defined = set()
+    for block in cfg.blocks:
+        for instr in block.instructions:
+            if instr.dest is not None:
+                assert instr.dest not in defined
+                defined.add(instr.dest)
+
+
+# =============================================================================
+# DOMINATORS
+# =============================================================================
+
+class TestDominance:
+    """Test immediate dominators and dominance frontiers"""
+
+    def test_diamond(self):
+        """Test the join block of an if/else is dominated by the entry only"""
+        cfg = build_cfg(diamond())
+        idom = immediate_dominators(cfg)
+        join = cfg.blocks[1].terminator.target
+        assert idom[cfg.entry] == cfg.entry
+        assert idom[join] == cfg.entry
+        frontiers = dominance_frontiers(cfg, idom)
+        else_block = cfg.blocks[cfg.entry].terminator.if_false
+        assert frontiers[1] == {join}
+        assert frontiers[else_block] == {join}
+
+    def test_loop_header_dominates_body(self):
+        """Test the loop header dominates every block of the loop"""
+        cfg = build_cfg(counting_loop())
+        idom = immediate_dominators(cfg)
+        header = cfg.blocks[cfg.entry].terminator.target
+        for block in cfg.blocks:
+            if block.id != cfg.entry:
+                assert dominates(idom, header, block.id)
+        assert header in dominance_frontiers(cfg, idom)[header]
+
+
+# =============================================================================
+# CONSTRUCTION
+# =============================================================================
+
+class TestConstruction:
+    """Test conversion into SSA form"""
+
+    def test_phi_at_join(self):
+        """Test a variable assigned on both arms gets a phi at the join"""
+        cfg = construct_ssa(build_cfg(diamond()))
+        single_assignment(cfg)
+        phis = [i for b in cfg.blocks for i in b.instructions if isinstance(i, Phi)]
+        assert len(phis) == 1
+        assert sorted(str(v) for v in phis[0].incoming.values()) == ["x.2", "x.4"]
+
+    def test_loop_phis(self):
+        """Test loop-carried variables get phis at the loop header"""
+        cfg = construct_ssa(build_cfg(counting_loop()))
+        single_assignment(cfg)
+        header = cfg.blocks[cfg.entry].terminator.target
+        phis = [i for i in cfg.blocks[header].instructions if isinstance(i, Phi)]
+        assert sorted(p.dest.split(".")[0] for p in phis) == ["i", "s"]
+
+    def test_no_phi_for_block_local_temp(self):
+        """Test temporaries used only in their block get no phi"""
+        cfg = construct_ssa(build_cfg(counting_loop()))
+        for block in cfg.blocks:
+            for instr in block.instructions:
+                if isinstance(instr, Phi):
+                    assert not instr.dest.startswith("$")
+
+    def test_params_keep_their_name(self):
+        """Test parameters are version 0 of themselves"""
+        f = func("f", [ReturnStmt(BinaryOp(ident("x"), "*", IntLiteral(2)))],
+                 [Param(IntType(), "x")], IntType())
+        cfg = construct_ssa(build_cfg(f))
+        assert str(cfg.blocks[0].instructions[0]) == "$1.1 = x * 2"
+
+    def test_undefined_on_one_path(self):
+        """Test a loop-local variable flows into the loop header as undef"""
+        f = func("main", [
+            VarDecl(None, "n", FuncCall("readInt", [])),
+            WhileStmt(ident("n"), BlockStmt([
+                VarDecl(IntType(), "t", ident("n")),
+                IfStmt(ident("t"), assign("n", BinaryOp(ident("n"), "-", IntLiteral(1)))),
+                call("printInt", ident("t")),
+            ])),
+        ])
+        cfg = construct_ssa(build_cfg(f))
+        values = [v for b in cfg.blocks for i in b.instructions
+                  if isinstance(i, Phi) for v in i.incoming.values()]
+        assert UNDEF in values
+        program = Program([f])
+        assert run(program, "3", lambda c: destruct_ssa(construct_ssa(c))) == "3\n2\n1\n"
+
+    def test_ssa_form_runs(self):
+        """Test the interpreter executes phis"""
+        program = Program([counting_loop()])
+        assert run(program, "5", construct_ssa) == run(program, "5")
+
+
+# =============================================================================
+# DESTRUCTION
+# =============================================================================
+
+class TestDestruction:
+    """Test conversion out of SSA form"""
+
+    def test_round_trip(self):
+        """Test construct + destruct preserves behaviour"""
+        for f in (diamond(), counting_loop()):
+            program = Program([f])
+            for stdin in ("0", "1", "4"):
+                assert run(program, stdin, lambda c: destruct_ssa(construct_ssa(c))) == \
+                    run(program, stdin)
+
+    def test_no_phis_left(self):
+        """Test destruction removes every phi"""
+        cfg = destruct_ssa(construct_ssa(build_cfg(counting_loop())))
+        assert not cfg.ssa
+        assert not any(isinstance(i, Phi) for b in cfg.blocks for i in b.instructions)
+
+    def test_loop_copies_coalesced(self):
+        """Test phi webs of a counting loop need no variable copies"""
+        cfg = destruct_ssa(construct_ssa(build_cfg(counting_loop())))
+        assert not any(
+            isinstance(i, Copy) and isinstance(i.src, str)
+            for b in cfg.blocks for i in b.instructions
+        )
+
+    def test_member_stores_keep_their_struct(self):
+        """Test a member store and its struct share a name after destruction"""
+        point = StructDecl("P", [MemberDecl(IntType(), "x")])
+        f = func("main", [
+            VarDecl(StructType("P"), "p"),
+            ExprStmt(AssignExpr(MemberAccess(ident("p"), "x"), IntLiteral(1))),
+            ExprStmt(AssignExpr(MemberAccess(ident("p"), "x"),
+                                BinaryOp(MemberAccess(ident("p"), "x"), "+", IntLiteral(1)))),
+            call("printInt", MemberAccess(ident("p"), "x")),
+        ])
+        cfg = destruct_ssa(construct_ssa(build_cfgs(Program([point, f]))["main"]))
+        stores = [i for b in cfg.blocks for i in b.instructions if isinstance(i, SetField)]
+        assert len(stores) == 2 and all(s.dest == s.obj for s in stores)
+
+    def test_swap_is_sequentialized(self):
+        """Test the parallel copy (a, b) = (b, a) uses a temporary"""
+        copies = sequentialize_copies([("a", "b"), ("b", "a")], lambda: "$t")
+        assert [str(c) for c in copies] == ["$t = a", "a = b", "b = $t"]
+
+    def test_copy_chain_order(self):
+        """Test (a, b) = (b, c) reads b before overwriting it"""
+        copies = sequentialize_copies([("b", "c"), ("a", "b")], lambda: "$t")
+        assert [str(c) for c in copies] == ["a = b", "b = c"]
+
+    def test_swap_loop(self):
+        """Test the swap problem: a rotating pair of loop variables"""
+        f = func("main", [
+            VarDecl(IntType(), "a", IntLiteral(1)),
+            VarDecl(IntType(), "b", IntLiteral(2)),
+            VarDecl(None, "n", FuncCall("readInt", [])),
+            WhileStmt(ident("n"), BlockStmt([
+                VarDecl(None, "t", ident("a")),
+                assign("a", ident("b")),
+                assign("b", ident("t")),
+                assign("n", BinaryOp(ident("n"), "-", IntLiteral(1))),
+            ])),
+            call("printInt", ident("a")),
+            call("printInt", ident("b")),
+        ])
+        program = Program([f])
+        for stdin in ("0", "1", "3"):
+            assert run(program, stdin, lambda c: destruct_ssa(construct_ssa(c))) == \
+                run(program, stdin)
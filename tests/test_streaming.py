@@ -0,0 +1,127 @@
+"""
+Streaming AST generation test cases for TyC compiler
+Declarations are built as soon as they are parsed and their parse trees
+are dropped; errors are the ones of a whole-tree parse.
+"""
+
+import pytest
+from tests.test_parallel import positions
+from tests.utils import Parser, corpus
+from antlr4 import CommonTokenStream
+from build.TyCParser import TyCParser
+from src.astgen.ast_generation import ASTGeneration
+from src.astgen.streaming import DeclarationBuilder, parse_program
+from src.batch import check_source
+from src.compiler import parse as compile_parse
+from src.frontend.scanner import TyCScanner
+from src.utils.error_listener import NewErrorListener, SyntaxException
+from src.utils.nodes import BlockStmt, FuncDecl, StructDecl
+from src.utils.tracing import Tracer
+
+SOURCE = """struct P { int x; };
+int f(P p) { return p.x; }
+void main() { P p = {1}; printInt(f(p)); }
+"""
+
+
+class Names(ASTGeneration):
+    """Builds declarations with their names only, and records how many
+    declarations the program context holds at each visit."""
+
+    def __init__(self):
+        self.held = []
+
+    def held_declarations(self, ctx):
+        children = ctx.parentCtx.children or []
+        self.held.append(sum(1 for c in children if isinstance(c, (
+            TyCParser.StructDeclarationContext, TyCParser.FunctionDeclarationContext))))
+
+    def visitStructDeclaration(self, ctx):
+        self.held_declarations(ctx)
+        return StructDecl(ctx.IDENTIFIER().getText(), [])
+
+    def visitFunctionDeclaration(self, ctx):
+        self.held_declarations(ctx)
+        return FuncDecl(None, ctx.IDENTIFIER().getText(), [], BlockStmt([]))
+
+
+def outcome(source, mode):
+    """The tree and node positions of source, or the error parsing it."""
+    try:
+        program = compile_parse(source, parser=mode)
+    except Exception as e:
+        return str(e)
+    return str(program), positions(program)
+
+
+def parser(source):
+    result = TyCParser(CommonTokenStream(TyCScanner(source)))
+    result.removeErrorListeners()
+    result.addErrorListener(NewErrorListener.INSTANCE)
+    return result
+
+
+class TestStreaming:
+    """Test declaration-at-a-time AST generation"""
+
+    def test_declarations_in_order(self):
+        """Test each declaration is built once, in source order"""
+        program = parse_program(parser(SOURCE), Names())
+        assert [d.name for d in program.decls] == ["P", "f", "main"]
+
+    def test_subtrees_released(self):
+        """Test finished declarations are detached from the parse tree"""
+        names = Names()
+        tree_parser = parser(SOURCE)
+        builder = DeclarationBuilder(names)
+        tree_parser.addParseListener(builder)
+        tree = tree_parser.program()
+        assert len(builder.program().decls) == 3
+        # Only the declaration being parsed next is ever in the tree.
+        assert max(names.held) <= 1
+        assert tree.getChildCount() == 1 and tree.getText() == "<EOF>"
+
+    @pytest.mark.parametrize("source, built", [
+        (SOURCE + "void g() { int x = ; }", 3),
+        (SOURCE + "void g() { x + 1 = 2; }\nvoid h() { @ }", 3),
+        ("void f() {} struct", 1),
+        ('"abc', 0),
+    ])
+    def test_errors(self, source, built):
+        """Test errors match the whole-tree parse and partial declarations are not built"""
+        names = Names()
+        with pytest.raises(Exception) as e:
+            parse_program(parser(source), names)
+        assert str(e.value) == Parser(source).parse()
+        assert len(names.held) == built
+
+    def test_tracing(self):
+        """Test each declaration gets an astgen span"""
+        tracer = Tracer()
+        parse_program(parser(SOURCE), Names(), tracer)
+        assert [s.args["decl"] for s in tracer.spans if s.name == "astgen"] == ["P", "f", "main"]
+
+
+class TestCompiler:
+    """Test the streaming mode of the compiler driver"""
+
+    def test_syntax_error(self):
+        """Test the streaming parser reports the same syntax errors"""
+        source = "void main() { int x = ; }"
+        with pytest.raises(SyntaxException) as e:
+            compile_parse(source, parser="stream")
+        assert e.value.message == Parser(source).parse()
+
+    @pytest.mark.parametrize("mode", ["antlr", "stream"])
+    @pytest.mark.parametrize("source", corpus("test_parser.py", "Parser"))
+    def test_parser_corpus(self, mode, source):
+        """Test the trees and node positions match the AST parser's"""
+        assert outcome(source, mode) == outcome(source, "ast")
+
+    @pytest.mark.parametrize("mode", ["antlr", "stream"])
+    def test_check_source(self, mode):
+        """Test programs parsed through ASTGeneration are lowered and analysed"""
+        source = "void main() { int x; for (x = 0; x < 3; x++) printInt(-x); auto y; printInt(y); }"
+        error, warnings, program = check_source(source, True, parser=mode)
+        assert error is None and program is not None
+        assert warnings == check_source(source, True)[1] != []
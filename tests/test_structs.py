@@ -0,0 +1,137 @@
+"""
+Struct layout test cases for TyC compiler
+"""
+
+import io
+
+import pytest
+from src.utils.nodes import *
+from tests.utils import call, func, ident
+from src.ir.cfg import build_cfgs
+from src.ir.instructions import GetField, SetField
+from src.ir.types import resolve_members
+from src.runtime.errors import TyCRuntimeError
+from src.runtime.frames import TypedInterpreter
+from src.runtime.interpreter import Interpreter
+from src.runtime.structs import build_layouts, get_member, replace_path, store_member
+
+
+POINT = StructDecl("Point", [MemberDecl(IntType(), "x"), MemberDecl(FloatType(), "y")])
+LINE = StructDecl("Line", [MemberDecl(StructType("Point"), "a"), MemberDecl(StringType(), "tag")])
+STRUCTS = {"Point": POINT, "Line": LINE}
+
+
+def line_program():
+    """Nested member stores and reads through a copied struct."""
+    return [POINT, LINE, func("main", [
+        VarDecl(StructType("Line"), "l"),
+        ExprStmt(AssignExpr(MemberAccess(MemberAccess(ident("l"), "a"), "y"), FloatLiteral(2.5))),
+        VarDecl(StructType("Line"), "m", ident("l")),
+        ExprStmt(AssignExpr(MemberAccess(ident("m"), "tag"), StringLiteral("copy"))),
+        call("printFloat", MemberAccess(MemberAccess(ident("m"), "a"), "y")),
+        call("printString", MemberAccess(ident("l"), "tag")),
+        call("printString", MemberAccess(ident("m"), "tag")),
+    ])]
+
+
+class TestStructLayout:
+    """Test the runtime representation of struct values"""
+
+    def test_member_order(self):
+        """Test members are laid out in declaration order"""
+        layout = build_layouts(STRUCTS)["Point"]
+        assert layout.members == ["x", "y"] and layout.index == {"x": 0, "y": 1}
+        assert layout.make([1, 2.0]) == [1, 2.0]
+
+    def test_nested_defaults(self):
+        """Test default values are zeroed recursively"""
+        value = build_layouts(STRUCTS)["Line"].default()
+        assert value == [[0, 0.0], ""]
+        assert repr(value) == "Line{a: Point{x: 0, y: 0.0}, tag: ''}"
+
+    def test_replace_path_copies(self):
+        """Test member stores copy the changed values and share the rest"""
+        layouts = build_layouts(STRUCTS)
+        line = layouts["Line"].make([layouts["Point"].make([1, 2.0]), "t"])
+        new = replace_path(line, ("a", "x"), 5)
+        assert line == [[1, 2.0], "t"] and new == [[5, 2.0], "t"]
+        assert type(new) is type(line) and type(new[0]) is type(line[0])
+        assert replace_path(line, ("tag",), "u", (1,))[0] is line[0]
+
+    def test_unknown_member(self):
+        """Test reading a member the struct does not have"""
+        point = build_layouts(STRUCTS)["Point"].default()
+        with pytest.raises(TyCRuntimeError):
+            get_member(point, "z")
+
+
+class TestResolveMembers:
+    """Test member accesses are resolved to layout indexes"""
+
+    def test_indexes(self):
+        """Test reads and nested stores get member positions"""
+        cfgs = build_cfgs(Program(line_program()))
+        resolve_members(cfgs, STRUCTS)
+        instrs = [i for b in cfgs["main"].blocks for i in b.instructions]
+        stores = [i for i in instrs if isinstance(i, SetField)]
+        reads = [i for i in instrs if isinstance(i, GetField)]
+        assert [s.indexes for s in stores] == [(0, 1), (1,)]
+        assert [r.index for r in reads] == [0, 1, 1, 1]
+
+    @pytest.mark.parametrize("engine", [Interpreter, TypedInterpreter])
+    def test_resolved_and_unresolved_agree(self, engine):
+        """Test programs run the same with and without resolution"""
+        outputs = []
+        for resolve in (False, True):
+            cfgs = build_cfgs(Program(line_program()))
+            if resolve:
+                resolve_members(cfgs, STRUCTS)
+            out = io.StringIO()
+            engine(cfgs, STRUCTS, io.StringIO(), out).run()
+            outputs.append(out.getvalue())
+        assert outputs[0] == outputs[1] == "2.5\n\ncopy\n"
+
+
+class TestCopyOnWrite:
+    """Test struct values are shared until written"""
+
+    def test_unshared_store_is_in_place(self):
+        """Test a store into an unshared value keeps the value"""
+        env = {"p": build_layouts(STRUCTS)["Point"].make([1, 2.0])}
+        before = id(env["p"])
+        store_member(env, "p", ("x",), 5, (0,))
+        assert id(env["p"]) == before and env["p"] == [5, 2.0]
+
+    def test_shared_store_copies(self):
+        """Test a store into a shared value leaves the other holder alone"""
+        layouts = build_layouts(STRUCTS)
+        line = layouts["Line"].make([layouts["Point"].make([1, 2.0]), "t"])
+        env = {"l": line}
+        store_member(env, "l", ("a", "x"), 5)
+        assert line == [[1, 2.0], "t"] and env["l"] == [[5, 2.0], "t"]
+        inner = id(env["l"][0])
+        store_member(env, "l", ("a", "y"), 1.5)
+        assert id(env["l"][0]) == inner and env["l"] == [[5, 1.5], "t"]
+
+    @pytest.mark.parametrize("engine", [Interpreter, TypedInterpreter])
+    def test_copy_semantics(self, engine):
+        """Test assignment, arguments and returns behave as eager copies"""
+        bump = func("bump", [
+            ExprStmt(AssignExpr(MemberAccess(MemberAccess(ident("l"), "a"), "x"),
+                                BinaryOp(MemberAccess(MemberAccess(ident("l"), "a"), "x"),
+                                         "+", IntLiteral(1)))),
+            ReturnStmt(ident("l")),
+        ], [Param(StructType("Line"), "l")], StructType("Line"))
+        main = func("main", [
+            VarDecl(StructType("Line"), "l"),
+            VarDecl(StructType("Line"), "m", FuncCall("bump", [ident("l")])),
+            VarDecl(StructType("Point"), "p", MemberAccess(ident("m"), "a")),
+            ExprStmt(AssignExpr(ident("m"), FuncCall("bump", [ident("m")]))),
+            call("printInt", MemberAccess(MemberAccess(ident("l"), "a"), "x")),
+            call("printInt", MemberAccess(MemberAccess(ident("m"), "a"), "x")),
+            call("printInt", MemberAccess(ident("p"), "x")),
+        ])
+        cfgs = build_cfgs(Program([POINT, LINE, bump, main]))
+        out = io.StringIO()
+        engine(cfgs, STRUCTS, io.StringIO(), out).run()
+        assert out.getvalue() == "0\n2\n1\n"
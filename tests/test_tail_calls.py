@@ -0,0 +1,96 @@
+"""
+Tail-call elimination test cases for TyC compiler
+"""
+
+import io
+
+from src.utils.nodes import *
+from tests.utils import call, func, ident
+from src.ir.cfg import build_cfg, build_cfgs
+from src.ir.instructions import Call
+from src.optimizer.tail_calls import eliminate_tail_calls
+from src.runtime.interpreter import Interpreter
+
+
+def int_params(*names):
+    return [Param(IntType(), n) for n in names]
+
+
+def sum_func():
+    """int sum(int n, int acc) { if (n == 0) return acc; return sum(n - 1, acc + n); }"""
+    return func("sum", [
+        IfStmt(BinaryOp(ident("n"), "==", IntLiteral(0)), ReturnStmt(ident("acc"))),
+        ReturnStmt(FuncCall("sum", [BinaryOp(ident("n"), "-", IntLiteral(1)),
+                                    BinaryOp(ident("acc"), "+", ident("n"))])),
+    ], int_params("n", "acc"), IntType())
+
+
+def gcd_func():
+    """Swaps its parameters in the tail call."""
+    return func("gcd", [
+        IfStmt(BinaryOp(ident("b"), "==", IntLiteral(0)),
+               BlockStmt([ReturnStmt(ident("a"))]),
+               BlockStmt([ReturnStmt(FuncCall("gcd", [
+                   ident("b"), BinaryOp(ident("a"), "%", ident("b"))]))])),
+    ], int_params("a", "b"), IntType())
+
+
+def self_calls(cfg):
+    return [i for b in cfg.blocks for i in b.instructions
+            if isinstance(i, Call) and i.func == cfg.name]
+
+
+def run(decls, stdin="", transform=None):
+    cfgs = build_cfgs(Program(decls))
+    if transform is not None:
+        for cfg in cfgs.values():
+            transform(cfg)
+    out = io.StringIO()
+    Interpreter(cfgs, {}, io.StringIO(stdin), out).run()
+    return out.getvalue()
+
+
+def main_printing(expr):
+    return func("main", [VarDecl(None, "n", FuncCall("readInt", [])), call("printInt", expr)])
+
+
+class TestTailCalls:
+    """Test self tail calls become loops"""
+
+    def test_accumulator(self):
+        """Test 'return sum(n - 1, acc + n)' becomes a jump"""
+        cfg = build_cfg(sum_func())
+        assert eliminate_tail_calls(cfg) == 1
+        assert self_calls(cfg) == []
+        assert cfg.preds[cfg.entry] == []
+
+    def test_parameter_swap(self):
+        """Test parallel parameter assignment in 'return gcd(b, a % b)'"""
+        decls = [gcd_func(), main_printing(FuncCall("gcd", [ident("n"), IntLiteral(35)]))]
+        assert run(decls, "91", eliminate_tail_calls) == run(decls, "91") == "7\n"
+
+    def test_void_tail_call(self):
+        """Test a void self call followed by 'return;'"""
+        count = func("count", [
+            IfStmt(BinaryOp(ident("n"), "==", IntLiteral(0)), ReturnStmt()),
+            call("printInt", ident("n")),
+            call("count", BinaryOp(ident("n"), "-", IntLiteral(1))),
+        ], int_params("n"), VoidType())
+        cfg = build_cfg(count)
+        assert eliminate_tail_calls(cfg) == 1
+        decls = [count, func("main", [call("count", IntLiteral(3))])]
+        assert run(decls, transform=eliminate_tail_calls) == "3\n2\n1\n"
+
+    def test_non_tail_call_kept(self):
+        """Test 'return n * fact(n - 1)' is not a tail call"""
+        fact = func("fact", [
+            IfStmt(BinaryOp(ident("n"), "<=", IntLiteral(1)), ReturnStmt(IntLiteral(1))),
+            ReturnStmt(BinaryOp(ident("n"), "*",
+                                FuncCall("fact", [BinaryOp(ident("n"), "-", IntLiteral(1))]))),
+        ], int_params("n"), IntType())
+        assert eliminate_tail_calls(build_cfg(fact)) == 0
+
+    def test_deep_recursion_after_elimination(self):
+        """Test 200000 tail-recursive levels run as a loop"""
+        decls = [sum_func(), main_printing(FuncCall("sum", [ident("n"), IntLiteral(0)]))]
+        assert run(decls, "200000", eliminate_tail_calls) == "20000100000\n"
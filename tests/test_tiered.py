@@ -0,0 +1,182 @@
+"""
+Tiered execution test cases for TyC compiler
+"""
+
+import io
+import threading
+
+import pytest
+from src.utils.nodes import *
+from tests.utils import call, func, ident
+from src.ir.cfg import CFG, BasicBlock, build_cfgs
+from src.ir.instructions import Call, Return
+from src.optimizer.pipeline import optimize_all
+from src.runtime.codegen import compile_function, mangle
+from src.runtime.errors import TyCRuntimeError
+from src.runtime.interpreter import Interpreter
+from src.runtime.tiered import TIER_COMPILED, TIER_INTERPRETED, TieredInterpreter
+
+
+def assign(name, value):
+    return ExprStmt(AssignExpr(ident(name), value))
+
+
+def count_loop(limit, body):
+    """int i = 0; while (i < limit) { body; i = i + 1; }"""
+    return [
+        VarDecl(IntType(), "i", IntLiteral(0)),
+        WhileStmt(BinaryOp(ident("i"), "<", IntLiteral(limit)), BlockStmt(
+            body + [assign("i", BinaryOp(ident("i"), "+", IntLiteral(1)))]
+        )),
+    ]
+
+
+def square_program(calls):
+    """int sq(int x) { return x * x; } and a main summing sq(i) over a loop."""
+    sq = func("sq", [ReturnStmt(BinaryOp(ident("x"), "*", ident("x")))],
+              [Param(IntType(), "x")], IntType())
+    main = func("main", [VarDecl(IntType(), "s", IntLiteral(0))] + count_loop(calls, [
+        assign("s", BinaryOp(ident("s"), "+", FuncCall("sq", [ident("i")]))),
+    ]) + [call("printInt", ident("s"))])
+    return [sq, main]
+
+
+def sum_program(n):
+    """int sum(int n) { if (n == 0) return 0; return n + sum(n - 1); }"""
+    body = [
+        IfStmt(BinaryOp(ident("n"), "==", IntLiteral(0)), ReturnStmt(IntLiteral(0))),
+        ReturnStmt(BinaryOp(ident("n"), "+", FuncCall("sum", [
+            BinaryOp(ident("n"), "-", IntLiteral(1))
+        ]))),
+    ]
+    sum_decl = func("sum", body, [Param(IntType(), "n")], IntType())
+    main = func("main", [call("printInt", FuncCall("sum", [IntLiteral(n)]))])
+    return [sum_decl, main]
+
+
+def run_tiered(decls, optimize=False, **options):
+    cfgs = build_cfgs(Program(decls))
+    structs = {d.name: d for d in decls if isinstance(d, StructDecl)}
+    if optimize:
+        optimize_all(cfgs, structs=structs)
+    out = io.StringIO()
+    options.setdefault("background", False)
+    interpreter = TieredInterpreter(cfgs, structs, io.StringIO(), out, **options)
+    interpreter.run()
+    interpreter.wait()
+    return out.getvalue(), interpreter
+
+
+def run_dict(decls):
+    out = io.StringIO()
+    structs = {d.name: d for d in decls if isinstance(d, StructDecl)}
+    Interpreter(build_cfgs(Program(decls)), structs, io.StringIO(), out).run()
+    return out.getvalue()
+
+
+class TestPromotion:
+    """Test functions move from the interpreter to compiled code"""
+
+    def test_hot_function_compiled(self):
+        """Test a function called call_threshold times is compiled"""
+        out, interpreter = run_tiered(square_program(30), call_threshold=10, loop_threshold=10**9)
+        assert out == run_dict(square_program(30)) == "8555\n"
+        stats = interpreter.tier_stats()
+        assert stats["sq"]["tier"] == TIER_COMPILED and stats["sq"]["calls"] == 30
+        assert stats["main"]["tier"] == TIER_INTERPRETED
+
+    def test_cold_program_stays_interpreted(self):
+        """Test nothing is compiled below the thresholds"""
+        _, interpreter = run_tiered(square_program(5), call_threshold=10, loop_threshold=10)
+        assert all(s["tier"] == TIER_INTERPRETED for s in interpreter.tier_stats().values())
+
+    def test_hot_loop_switches_mid_call(self):
+        """Test an activation looping past loop_threshold finishes compiled"""
+        for optimize in (False, True):
+            out, interpreter = run_tiered(
+                square_program(100), optimize, call_threshold=10**9, loop_threshold=20
+            )
+            assert out == "328350\n"
+            assert interpreter.tier_stats()["main"]["tier"] == TIER_COMPILED
+            # Back edges stop being counted once the loop runs compiled.
+            assert interpreter.tier_stats()["main"]["back_edges"] == 21
+
+    def test_background_compilation(self):
+        """Test compiling in a background thread gives the same output, and the thread ends with the run"""
+        out, interpreter = run_tiered(square_program(200), call_threshold=5, background=True)
+        assert not any(t.name.startswith("tyc-compile") for t in threading.enumerate())
+        assert out == run_dict(square_program(200))
+        assert interpreter.tier_stats()["sq"]["tier"] == TIER_COMPILED
+
+
+class TestCompiledSemantics:
+    """Test compiled code behaves like the interpreter"""
+
+    def test_recursion_deeper_than_native_limit(self):
+        """Test deep recursion falls back to the interpreter's own stack"""
+        out, interpreter = run_tiered(sum_program(3000), call_threshold=1, max_native_depth=20)
+        assert out == "4501500\n"
+        assert interpreter.tier_stats()["sum"]["tier"] == TIER_COMPILED
+
+    def test_max_call_depth(self):
+        """Test the call depth limit counts compiled and interpreted calls"""
+        with pytest.raises(TyCRuntimeError) as e:
+            run_tiered(sum_program(100), call_threshold=1, max_native_depth=10, max_call_depth=50)
+        assert e.value.message == "Stack overflow"
+
+    def test_runtime_errors(self):
+        """Test division by zero and undefined variables in compiled code"""
+        div = func("div", [ReturnStmt(BinaryOp(IntLiteral(7), "/", ident("x")))],
+                   [Param(IntType(), "x")], IntType())
+        main = func("main", count_loop(3, [call("printInt", FuncCall("div", [
+            BinaryOp(IntLiteral(2), "-", ident("i"))
+        ]))]))
+        out = io.StringIO()
+        interpreter = TieredInterpreter(build_cfgs(Program([div, main])), {}, io.StringIO(), out,
+                                        call_threshold=1, background=False)
+        with pytest.raises(TyCRuntimeError) as e:
+            interpreter.run()
+        assert e.value.message == "Division by zero" and out.getvalue() == "3\n7\n"
+
+        block = BasicBlock(0)
+        block.instructions = [Call(None, "printInt", ["x.1"])]
+        block.terminator = Return()
+        interpreter = TieredInterpreter({"main": CFG("main", [], [block])}, call_threshold=1,
+                                        background=False)
+        with pytest.raises(TyCRuntimeError) as e:
+            interpreter.run()
+        assert e.value.message == "Undefined variable: x.1"
+
+    def test_struct_copies_stay_independent(self):
+        """Test member stores in compiled code do not leak into copies"""
+        point = StructDecl("Point", [MemberDecl(IntType(), "x"), MemberDecl(IntType(), "y")])
+        main = func("main", [
+            VarDecl(StructType("Point"), "p", StructLiteral([IntLiteral(1), IntLiteral(2)])),
+            VarDecl(StructType("Point"), "q", ident("p")),
+        ] + count_loop(3, [
+            ExprStmt(AssignExpr(MemberAccess(ident("p"), "x"), ident("i"))),
+        ]) + [
+            call("printInt", MemberAccess(ident("p"), "x")),
+            call("printInt", MemberAccess(ident("q"), "x")),
+        ])
+        out, interpreter = run_tiered([point, main], loop_threshold=1)
+        assert out == run_dict([point, main]) == "2\n1\n"
+        assert interpreter.tier_stats()["main"]["tier"] == TIER_COMPILED
+
+
+class TestCodegen:
+    """Test the generated Python functions"""
+
+    def test_mangled_names_are_distinct(self):
+        """Test IR names differing only in punctuation map apart"""
+        names = ["a.1", "a_1", "a_2e1", "$1", "a#1", "a@1", "v:x.y", "v_x"]
+        mangled = [mangle(n) for n in names]
+        assert len(set(mangled)) == len(names)
+        assert all(m.isidentifier() for m in mangled)
+
+    def test_relational_branch_folded(self):
+        """Test a comparison feeding only a branch becomes its condition"""
+        cfgs = build_cfgs(Program(square_program(3)))
+        interpreter = TieredInterpreter(cfgs)
+        source = compile_function(cfgs["main"], interpreter).source
+        assert "if v_i < 3:" in source
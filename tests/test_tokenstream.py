@@ -0,0 +1,96 @@
+"""
+Token stream test cases for TyC compiler
+TyCParser must accept and reject the same programs reading a sliding
+window of tokens as reading CommonTokenStream, while the window stays
+bounded.
+"""
+
+import pytest
+from tests.utils import Parser, corpus
+from antlr4.tree.Tree import ParseTreeListener
+from build.TyCLexer import TyCLexer
+from build.TyCParser import TyCParser
+from src.astgen.streaming import parse_program
+from src.frontend.charstream import CodePointStream
+from src.frontend.scanner import TyCScanner
+from src.frontend.tokenstream import WindowTokenStream
+from src.utils.error_listener import NewErrorListener
+from tests.test_streaming import Names
+
+FUNCTION = """int f{n}(int a, float b) {{
+    auto x = {{a, b}};
+    for (int i = 0; i < a; ++i) {{ if (i % 2 == 0) x.a = x.a + i; else b = b * 2.0; }}
+    switch (a) {{ case 1: return f{n}(a - 1, b); default: break; }}
+    return x.a;
+}}
+"""
+
+
+def parse(tokens):
+    parser = TyCParser(tokens)
+    parser.removeErrorListeners()
+    parser.addErrorListener(NewErrorListener.INSTANCE)
+    try:
+        parser.program()
+        return "success"
+    except Exception as e:
+        return str(e)
+
+
+class Window(ParseTreeListener):
+    """Records the largest window at each rule exit."""
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.largest = 0
+
+    def exitEveryRule(self, ctx):
+        self.largest = max(self.largest, self.tokens.window)
+
+
+class TestWindowTokenStream:
+    """Test the sliding-window token stream"""
+
+    @pytest.mark.parametrize("source", corpus("test_parser.py", "Parser"))
+    def test_parser_corpus(self, source):
+        """Test accept/reject and error messages on the parser test inputs"""
+        expected = Parser(source).parse()
+        assert parse(WindowTokenStream(TyCScanner(source))) == expected
+        assert parse(WindowTokenStream(TyCLexer(CodePointStream(source)))) == expected
+
+    def test_lexical_error_after_syntax_error(self):
+        """Test an error report reads ahead to a later lexical error like CommonTokenStream"""
+        for source in ["void main() { x + 1 = 2; }\nvoid f() { @ }", "void main() { int x = ; }\nvoid f() { @ }"]:
+            assert parse(WindowTokenStream(TyCScanner(source))) == Parser(source).parse()
+
+    def test_bounded_window(self):
+        """Test the window stays bounded on a large program"""
+        source = "".join(FUNCTION.format(n=n) for n in range(60))
+        tokens = WindowTokenStream(TyCScanner(source))
+        parser = TyCParser(tokens)
+        window = Window(tokens)
+        parser.addParseListener(window)
+        program = parse_program(parser, Names())
+        assert len(program.decls) == 60
+        assert tokens.index > 4000
+        assert window.largest < 1200
+
+    def test_dropped_tokens(self):
+        """Test token indexes and lookahead, and that dropped tokens are gone"""
+        source = "int x;\n" * 1000
+        tokens = WindowTokenStream(TyCScanner(source))
+        assert tokens.LT(-1) is None and tokens.LA(3) == 43
+        for _ in range(2000):
+            tokens.consume()
+        assert tokens.LT(1).tokenIndex == tokens.index == 2000
+        assert tokens.LT(-1).text == "x"
+        assert tokens.window < 1100
+        with pytest.raises(IndexError):
+            tokens.seek(0)
+        marker = tokens.mark()
+        for _ in range(1000):
+            tokens.consume()
+        assert tokens.LA(1) == -1
+        tokens.seek(marker)
+        tokens.release(marker)
+        assert tokens.get(2000).text == ";"
@@ -0,0 +1,106 @@
+"""
+Phase tracing test cases for TyC compiler
+"""
+
+import io
+import json
+
+from src.utils.nodes import *
+from tests.utils import call, func, ident
+from src.compiler import compile_program
+from src.utils.tracing import NULL_TRACER, Tracer
+
+
+def program():
+    """int twice(int x) { return x + x; } void main() { printInt(twice(21)); }"""
+    twice = func("twice", [ReturnStmt(BinaryOp(ident("x"), "+", ident("x")))],
+                 [Param(IntType(), "x")], IntType())
+    main = func("main", [call("printInt", FuncCall("twice", [IntLiteral(21)]))])
+    return Program([twice, main])
+
+
+class FakeClock:
+    """A clock advancing one second per reading"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        self.now += 1.0
+        return self.now
+
+
+class TestSpans:
+    """Test span nesting and the reports"""
+
+    def test_nested_spans(self):
+        """Test spans record their depth, arguments and duration"""
+        tracer = Tracer(clock=FakeClock())
+        with tracer.span("optimize"):
+            with tracer.span("function", decl="main"):
+                pass
+        with tracer.span("run"):
+            pass
+        outer, inner, run = tracer.spans
+        assert (outer.depth, inner.depth, run.depth) == (0, 1, 0)
+        assert inner.args == {"decl": "main"}
+        assert inner.duration == 1.0 and outer.duration == 3.0
+        assert tracer.phases() == {"optimize": 3.0, "run": 1.0}
+        assert tracer.summary() == "optimize 3000.0ms, run 1000.0ms; total 4000.0ms"
+
+    def test_chrome_trace(self):
+        """Test spans export as complete trace events"""
+        tracer = Tracer(clock=FakeClock())
+        with tracer.span("cfg"):
+            with tracer.span("function", decl="f"):
+                pass
+        trace = json.loads(tracer.to_chrome_trace())
+        events = trace["traceEvents"]
+        assert [e["name"] for e in events] == ["cfg", "function"]
+        assert all(e["ph"] == "X" for e in events)
+        assert events[0]["ts"] == 1e6 and events[0]["dur"] == 3e6
+        assert events[1]["ts"] == 2e6 and events[1]["args"] == {"decl": "f"}
+
+    def test_memory_peak(self):
+        """Test the peak of an allocation is credited to its enclosing spans"""
+        tracer = Tracer(memory=True)
+        with tracer.span("outer"):
+            with tracer.span("alloc"):
+                data = [0] * 500_000
+                del data
+            with tracer.span("small"):
+                pass
+        outer, alloc, small = tracer.spans
+        assert alloc.peak - alloc.memory >= 4_000_000
+        assert outer.peak - outer.memory >= 4_000_000
+        assert small.peak - small.memory < 1_000_000
+        assert "peak_bytes" in tracer.trace_events()[0]["args"]
+        assert tracer.summary().endswith("MB")
+
+    def test_null_tracer(self):
+        """Test the disabled tracer shares one span that records nothing"""
+        assert NULL_TRACER.span("a") is NULL_TRACER.span("b", decl="f")
+        with NULL_TRACER.span("a"):
+            pass
+        assert not NULL_TRACER.enabled
+
+
+class TestCompilerTracing:
+    """Test the compiler reports its phases"""
+
+    def test_phases_and_declarations(self):
+        """Test each phase and each function gets a span"""
+        tracer = Tracer()
+        compiled = compile_program(program(), tracer=tracer)
+        out = io.StringIO()
+        compiled.run(stdout=out)
+        assert out.getvalue() == "42\n"
+        assert list(tracer.phases()) == ["cfg", "analysis", "optimize", "resolve", "run"]
+        lowered = [s.args["decl"] for s in tracer.spans if s.name == "function" and s.depth == 1]
+        assert lowered == ["twice", "main", "twice", "main"]
+        passes = {s.name for s in tracer.spans if s.depth == 2}
+        assert {"inline", "construct_ssa", "simplify_cfg"} <= passes
+
+    def test_untraced_compilation(self):
+        """Test compiling without a tracer uses the null tracer"""
+        assert compile_program(program()).tracer is NULL_TRACER
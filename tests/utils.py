@@ -2,6 +2,7 @@
 Utility functions and classes for testing TyC compiler
 """
 
+import ast
 import os
 import sys
 
@@ -13,8 +14,60 @@ sys.path.insert(0, build_dir)
 
 from build.TyCLexer import TyCLexer
 from build.TyCParser import TyCParser
-from antlr4 import InputStream, CommonTokenStream
+from antlr4 import CommonTokenStream
+from src.frontend.charstream import CodePointStream
 from src.utils.error_listener import NewErrorListener
+from src.utils.nodes import BlockStmt, ExprStmt, FuncCall, FuncDecl, Identifier
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def corpus(filename: str, wrapper: str) -> list:
+    """The source strings passed to wrapper(...) in a test module, given
+    literally or through a variable assigned a literal in the same test."""
+    with open(os.path.join(TESTS_DIR, filename)) as f:
+        tree = ast.parse(f.read())
+    sources = []
+    for function in ast.walk(tree):
+        if not isinstance(function, ast.FunctionDef):
+            continue
+        names = {}
+        for node in ast.walk(function):
+            if (
+                isinstance(node, ast.Assign)
+                and isinstance(node.value, ast.Constant)
+                and isinstance(node.value.value, str)
+            ):
+                for target in node.targets:
+                    if isinstance(target, ast.Name):
+                        names[target.id] = node.value.value
+        for node in ast.walk(function):
+            if not (
+                isinstance(node, ast.Call)
+                and getattr(node.func, "id", None) == wrapper
+                and node.args
+            ):
+                continue
+            arg = node.args[0]
+            if isinstance(arg, ast.Constant) and isinstance(arg.value, str):
+                sources.append(arg.value)
+            elif isinstance(arg, ast.Name) and arg.id in names:
+                sources.append(names[arg.id])
+    return sources
+
+
+def func(name, body, params=None, return_type=None):
+    """A function declaration with body as its block."""
+    return FuncDecl(return_type, name, params or [], BlockStmt(body))
+
+
+def ident(name):
+    return Identifier(name)
+
+
+def call(name, *args):
+    """A call statement."""
+    return ExprStmt(FuncCall(name, list(args)))
 
 
 class ASTGenerator:
@@ -22,7 +75,7 @@ class ASTGenerator:
 
     def __init__(self, input_string: str):
         self.input_string = input_string
-        self.input_stream = InputStream(input_string)
+        self.input_stream = CodePointStream(input_string)
         self.lexer = TyCLexer(self.input_stream)
         self.token_stream = CommonTokenStream(self.lexer)
         self.parser = TyCParser(self.token_stream)
@@ -59,7 +112,7 @@ class Tokenizer:
 
     def get_tokens_as_string(self) -> str:
         """Get tokens as comma-separated string (only token text)"""
-        input_stream = InputStream(self.source_code)
+        input_stream = CodePointStream(self.source_code)
         lexer = TyCLexer(input_stream)
 
         tokens = []
@@ -88,7 +141,7 @@ class Tokenizer:
             - "auto" -> "KEYWORD_AUTO:auto,<EOF>"
             - "Auto" -> "IDENTIFIER:Auto,<EOF>"
         """
-        input_stream = InputStream(self.source_code)
+        input_stream = CodePointStream(self.source_code)
         lexer = TyCLexer(input_stream)
 
         tokens = []
@@ -115,7 +168,7 @@ class Parser:
 
     def parse(self) -> str:
         """Parse source code and return result"""
-        input_stream = InputStream(self.source_code)
+        input_stream = CodePointStream(self.source_code)
         lexer = TyCLexer(input_stream)
         token_stream = CommonTokenStream(lexer)
         parser = TyCParser(token_stream)